@@ -0,0 +1,186 @@
+"""
+章节趋势的服务端聚合
+
+把 chapters / chapter_reading_power / review_metrics 按卷（或按固定章数分桶）汇总成
+一行一组的统计结果：字数、钩子强度分布、审查分位数、追读债余额。
+聚合全部在 SQLite 内用窗口函数完成，Python 侧只做字段整形。
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+FetchAll = Callable[[str, tuple], list[dict]]
+
+GROUP_BY_VOLUME = "volume"
+GROUP_BY_BUCKET = "bucket"
+
+_HOOK_VALUE_SQL = "CASE hook_strength WHEN 'strong' THEN 5 WHEN 'medium' THEN 3 WHEN 'weak' THEN 1 ELSE 0 END"
+
+_ROLLUP_SQL = """
+WITH {ranges_cte}
+base AS (
+    SELECT
+        c.chapter AS chapter,
+        COALESCE(c.word_count, 0) AS word_count,
+        LOWER(TRIM(COALESCE(rp.hook_strength, ''))) AS hook_strength,
+        COALESCE(rp.is_transition, 0) AS is_transition,
+        COALESCE(rp.override_count, 0) AS override_count,
+        COALESCE(rp.debt_balance, 0.0) AS debt_balance,
+        rm.overall_score AS review_score,
+        {group_expr} AS grp
+    FROM chapters c
+    LEFT JOIN chapter_reading_power rp ON rp.chapter = c.chapter
+    LEFT JOIN review_metrics rm ON rm.end_chapter = c.chapter
+),
+ranked AS (
+    SELECT
+        base.*,
+        ROW_NUMBER() OVER (PARTITION BY grp ORDER BY chapter DESC) AS recency_rank,
+        CUME_DIST() OVER (
+            PARTITION BY grp, review_score IS NULL
+            ORDER BY review_score
+        ) AS score_cume
+    FROM base
+)
+SELECT
+    grp,
+    COUNT(*) AS chapters,
+    MIN(chapter) AS chapter_start,
+    MAX(chapter) AS chapter_end,
+    SUM(word_count) AS word_total,
+    AVG(word_count) AS word_avg,
+    MIN(word_count) AS word_min,
+    MAX(word_count) AS word_max,
+    SUM(SUM(word_count)) OVER (ORDER BY grp IS NULL, grp) AS word_cumulative,
+    SUM(hook_strength = 'strong') AS hook_strong,
+    SUM(hook_strength = 'medium') AS hook_medium,
+    SUM(hook_strength = 'weak') AS hook_weak,
+    SUM(hook_strength NOT IN ('strong', 'medium', 'weak')) AS hook_none,
+    AVG({hook_value}) AS hook_value_avg,
+    COUNT(review_score) AS review_count,
+    AVG(review_score) AS review_avg,
+    MIN(review_score) AS review_min,
+    MAX(review_score) AS review_max,
+    MIN(CASE WHEN review_score IS NOT NULL AND score_cume >= 0.5 THEN review_score END) AS review_p50,
+    MIN(CASE WHEN review_score IS NOT NULL AND score_cume >= 0.9 THEN review_score END) AS review_p90,
+    MAX(CASE WHEN recency_rank = 1 THEN debt_balance END) AS debt_closing,
+    MAX(debt_balance) AS debt_max,
+    AVG(debt_balance) AS debt_avg,
+    SUM(is_transition) AS transition_chapters,
+    SUM(override_count) AS override_count
+FROM ranked
+GROUP BY grp
+ORDER BY grp IS NULL, grp
+"""
+
+# 与 dashboard._resolve_volume_for_chapter 相同的选择规则：起始章最大者优先，同起点取小卷号。
+_VOLUME_GROUP_EXPR = """(
+            SELECT vr.volume FROM volume_ranges vr
+            WHERE c.chapter BETWEEN vr.start_chapter AND vr.end_chapter
+            ORDER BY vr.start_chapter DESC, vr.volume ASC
+            LIMIT 1
+        )"""
+
+
+def _round(value, digits: int = 2):
+    if value is None:
+        return None
+    return round(float(value), digits)
+
+
+def _volume_ranges_cte(volume_ranges: list[tuple[int, int, int]]) -> tuple[str, list]:
+    if not volume_ranges:
+        return "volume_ranges(volume, start_chapter, end_chapter) AS (SELECT NULL, NULL, NULL WHERE 0),", []
+    values = ", ".join("(?, ?, ?)" for _ in volume_ranges)
+    params: list = []
+    for volume, start, end in volume_ranges:
+        params.extend([volume, start, end])
+    return f"volume_ranges(volume, start_chapter, end_chapter) AS (VALUES {values}),", params
+
+
+def _shape_row(row: dict, group_by: str, bucket_size: int) -> dict:
+    group_value = row.get("grp")
+    item: dict = {}
+    if group_by == GROUP_BY_BUCKET:
+        bucket = int(group_value or 0)
+        item["bucket"] = bucket
+        item["bucket_start"] = bucket * bucket_size + 1
+        item["bucket_end"] = (bucket + 1) * bucket_size
+    else:
+        item["volume"] = int(group_value) if group_value is not None else None
+    item.update(
+        {
+            "chapters": int(row.get("chapters") or 0),
+            "chapter_start": int(row.get("chapter_start") or 0),
+            "chapter_end": int(row.get("chapter_end") or 0),
+            "word_count": {
+                "total": int(row.get("word_total") or 0),
+                "avg": _round(row.get("word_avg"), 1),
+                "min": int(row.get("word_min") or 0),
+                "max": int(row.get("word_max") or 0),
+                "cumulative": int(row.get("word_cumulative") or 0),
+            },
+            "hook_strength": {
+                "strong": int(row.get("hook_strong") or 0),
+                "medium": int(row.get("hook_medium") or 0),
+                "weak": int(row.get("hook_weak") or 0),
+                "none": int(row.get("hook_none") or 0),
+                "avg_value": _round(row.get("hook_value_avg")),
+            },
+            "review_score": {
+                "count": int(row.get("review_count") or 0),
+                "avg": _round(row.get("review_avg")),
+                "min": _round(row.get("review_min")),
+                "max": _round(row.get("review_max")),
+                "p50": _round(row.get("review_p50")),
+                "p90": _round(row.get("review_p90")),
+            },
+            "debt_balance": {
+                "closing": _round(row.get("debt_closing")) or 0.0,
+                "max": _round(row.get("debt_max")) or 0.0,
+                "avg": _round(row.get("debt_avg")) or 0.0,
+            },
+            "transition_chapters": int(row.get("transition_chapters") or 0),
+            "override_count": int(row.get("override_count") or 0),
+        }
+    )
+    return item
+
+
+def build_chapter_rollups(
+    fetchall: FetchAll,
+    *,
+    volume_ranges: Iterable[tuple[int, int, int]] = (),
+    group_by: str = GROUP_BY_VOLUME,
+    bucket_size: int = 10,
+) -> dict:
+    """按卷或按章数分桶汇总章节趋势。
+
+    volume_ranges 为 (volume, start_chapter, end_chapter) 列表，通常来自
+    state.json 的 progress.volumes_planned；不落在任何卷内的章节归入 volume=None。
+    """
+    if group_by not in {GROUP_BY_VOLUME, GROUP_BY_BUCKET}:
+        raise ValueError(f"unsupported group_by: {group_by}")
+    bucket_size = max(1, int(bucket_size))
+
+    if group_by == GROUP_BY_BUCKET:
+        ranges_cte, params = "", []
+        group_expr = "(c.chapter - 1) / ?"
+        params.append(bucket_size)
+    else:
+        ranges_cte, params = _volume_ranges_cte(list(volume_ranges))
+        group_expr = _VOLUME_GROUP_EXPR
+
+    sql = _ROLLUP_SQL.format(ranges_cte=ranges_cte, group_expr=group_expr, hook_value=_HOOK_VALUE_SQL)
+    rows = fetchall(sql, tuple(params))
+    groups = [_shape_row(row, group_by, bucket_size) for row in rows]
+
+    return {
+        "group_by": group_by,
+        "bucket_size": bucket_size if group_by == GROUP_BY_BUCKET else None,
+        "groups": groups,
+        "total_chapters": sum(item["chapters"] for item in groups),
+        "total_words": groups[-1]["word_count"]["cumulative"] if groups else 0,
+        "latest_chapter": max((item["chapter_end"] for item in groups), default=0),
+    }
@@ -6,18 +6,47 @@ Webnovel Dashboard - FastAPI 主应用
 
 import asyncio
 import json
+import mimetypes
 import sqlite3
 import sys
 from datetime import datetime, timezone
-from contextlib import asynccontextmanager, closing
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse
+from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+from .analytics import GROUP_BY_VOLUME, build_chapter_rollups
+from .data_layer import (
+    DEFAULT_DB_THREADS,
+    DEFAULT_FS_THREADS,
+    DEFAULT_POOL_SIZE,
+    DashboardDataLayer,
+    PoolTimeout,
+    etag_matches,
+    make_etag,
+)
+from .encoding import (
+    NegotiatedResponse,
+    ResponseEncodingMiddleware,
+    encode_payload,
+    preferred_media_type,
+)
+from .file_reader import (
+    BINARY_PLACEHOLDER,
+    LineIndexCache,
+    RangeNotSatisfiable,
+    accepts_gzip,
+    iter_file_range,
+    iter_gzip,
+    parse_range,
+    read_line_window,
+)
+from .file_tree import DOCUMENT_FOLDERS, FileTreeIndex
 from .path_guard import safe_resolve
 from .watcher import FileWatcher
 
@@ -28,6 +57,11 @@ _project_root: Path | None = None
 _watcher = FileWatcher()
 
 STATIC_DIR = Path(__file__).parent / "frontend" / "dist"
+MAX_INLINE_READ_BYTES = 2 * 1024 * 1024
+DEFAULT_WINDOW_LINES = 500
+MAX_WINDOW_LINES = 5000
+GZIP_MIN_BYTES = 1024
+RESPONSE_COMPRESS_MIN_BYTES = 1024
 LOCAL_CORS_ORIGINS = [
     "http://localhost",
     "http://localhost:5173",
@@ -72,8 +106,11 @@ def _load_state_payload(*, required: bool = False) -> dict:
             raise HTTPException(404, "state.json 不存在")
         return {}
 
+    from data_modules.state_store import load_state
+
     try:
-        payload = json.loads(state_path.read_text(encoding="utf-8"))
+        # 分段布局（.webnovel/state_segments/）在这里合并回完整 state
+        payload = load_state(state_path, strict=True)
     except (OSError, json.JSONDecodeError) as exc:
         raise HTTPException(status_code=500, detail=f"state.json 读取失败: {exc}") from exc
 
@@ -93,15 +130,16 @@ def _parse_json_value(raw: object, default):
         return default
 
 
-def _resolve_volume_for_chapter(state: dict, chapter: int) -> int | None:
+def _planned_volume_ranges(state: dict) -> list[tuple[int, int, int]]:
+    """解析 progress.volumes_planned，返回合法的 (volume, start, end) 列表。"""
     progress = state.get("progress") if isinstance(state, dict) else {}
     if not isinstance(progress, dict):
-        return None
+        return []
     volumes_planned = progress.get("volumes_planned")
     if not isinstance(volumes_planned, list):
-        return None
+        return []
 
-    best: tuple[int, int] | None = None
+    ranges: list[tuple[int, int, int]] = []
     for item in volumes_planned:
         if not isinstance(item, dict):
             continue
@@ -119,6 +157,13 @@ def _resolve_volume_for_chapter(state: dict, chapter: int) -> int | None:
             continue
         if start <= 0 or end <= 0 or start > end:
             continue
+        ranges.append((volume, start, end))
+    return ranges
+
+
+def _resolve_volume_for_chapter(state: dict, chapter: int) -> int | None:
+    best: tuple[int, int] | None = None
+    for volume, start, end in _planned_volume_ranges(state):
         if start <= chapter <= end:
             candidate = (start, volume)
             if best is None or candidate[0] > best[0] or (
@@ -249,34 +294,60 @@ def _projection_status_for_commit(project_root: Path, chapter: int, commit_paylo
     return commit_payload.get("projection_status") or {}, "commit", {}
 
 
+def _file_version(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns:x}.{stat.st_size:x}"
+
+
 # ---------------------------------------------------------------------------
 # 应用工厂
 # ---------------------------------------------------------------------------
 
-def create_app(project_root: str | Path | None = None) -> FastAPI:
+def create_app(
+    project_root: str | Path | None = None,
+    *,
+    db_pool_size: int = DEFAULT_POOL_SIZE,
+    db_threads: int = DEFAULT_DB_THREADS,
+    fs_threads: int = DEFAULT_FS_THREADS,
+) -> FastAPI:
     global _project_root
 
     if project_root:
         _project_root = Path(project_root).resolve()
 
     _ensure_scripts_dir_on_path()
+    data_layer = DashboardDataLayer(pool_size=db_pool_size, db_threads=db_threads, fs_threads=fs_threads)
+
+    tree_index = FileTreeIndex(_get_project_root())
+    line_index_cache = LineIndexCache()
 
     @asynccontextmanager
     async def _lifespan(_: FastAPI):
         webnovel = _webnovel_dir()
         story_system = _story_system_dir()
-        if webnovel.is_dir() or story_system.is_dir():
-            _watcher.start(
-                watch_webnovel_dir=webnovel if webnovel.is_dir() else None,
-                watch_story_system_dir=story_system if story_system.is_dir() else None,
-                loop=asyncio.get_running_loop(),
-            )
+        _watcher.start(
+            watch_webnovel_dir=webnovel if webnovel.is_dir() else None,
+            watch_story_system_dir=story_system if story_system.is_dir() else None,
+            loop=asyncio.get_running_loop(),
+            tree_index=tree_index,
+        )
         try:
             yield
         finally:
             _watcher.stop()
+            data_layer.close()
 
-    app = FastAPI(title="Webnovel Dashboard", version="0.1.0", lifespan=_lifespan)
+    app = FastAPI(
+        title="Webnovel Dashboard",
+        version="0.1.0",
+        lifespan=_lifespan,
+        default_response_class=NegotiatedResponse,
+    )
+    app.state.data_layer = data_layer
+    app.state.tree_index = tree_index
 
     app.add_middleware(
         CORSMiddleware,
@@ -284,31 +355,71 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
         allow_methods=["GET"],
         allow_headers=["*"],
     )
+    app.add_middleware(ResponseEncodingMiddleware, minimum_size=RESPONSE_COMPRESS_MIN_BYTES)
 
     # ===========================================================
     # API：项目元信息
     # ===========================================================
 
     @app.get("/api/project/info")
-    def project_info():
+    async def project_info():
         """返回 state.json 完整内容（只读）。"""
-        return _load_state_payload(required=True)
+        return await data_layer.run_fs(partial(_load_state_payload, required=True))
 
     @app.get("/api/story-runtime/health")
-    def story_runtime_health():
-        return _build_story_runtime_health_report(_get_project_root())
+    async def story_runtime_health():
+        return await data_layer.run_fs(_build_story_runtime_health_report, _get_project_root())
 
     # ===========================================================
-    # API：实体数据库（index.db 只读查询）
+    # API：实体数据库（index.db 只读连接池）
     # ===========================================================
 
-    def _get_db() -> sqlite3.Connection:
+    def _get_pool():
         db_path = _webnovel_dir() / "index.db"
         if not db_path.is_file():
             raise HTTPException(404, "index.db 不存在")
-        conn = sqlite3.connect(str(db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+        return data_layer.pool_for(db_path)
+
+    async def _run_query(query: Callable[[sqlite3.Connection], object]):
+        pool = _get_pool()
+        try:
+            return await data_layer.run_db(pool.run, query)
+        except PoolTimeout as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    async def _db_json(
+        request: Request,
+        query: Callable[[sqlite3.Connection], object],
+        *,
+        depends_on_state: bool = False,
+    ) -> Response:
+        """执行只读查询并按 index.db data_version 做 ETag 缓存。
+
+        depends_on_state=True 的端点还会混入 state.json 的 mtime/size，
+        避免只改 state.json 时返回旧数据。
+        """
+        pool = _get_pool()
+        version = await data_layer.run_db(pool.data_version)
+        if depends_on_state:
+            webnovel = _webnovel_dir()
+            # 日志模式下增量写在 state.journal.jsonl，快照本身可能长时间不变
+            version = (
+                f"{version}|{_file_version(webnovel / 'state.json')}"
+                f"|{_file_version(webnovel / 'state.journal.jsonl')}"
+            )
+        media_type = preferred_media_type()
+        key = f"{request.url.path}?{request.url.query}|{media_type}"
+        etag = make_etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        body = data_layer.cache.get(key, etag)
+        if body is None:
+            payload = await _run_query(query)
+            body = encode_payload(payload, media_type)
+            data_layer.cache.put(key, etag, body)
+        return Response(content=body, media_type=media_type, headers=headers)
 
     def _fetchall_safe(conn: sqlite3.Connection, query: str, params: tuple = ()) -> list[dict]:
         """执行只读查询；若目标表不存在（旧库），返回空列表。"""
@@ -321,12 +432,13 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
             raise HTTPException(status_code=500, detail=f"数据库查询失败: {exc}") from exc
 
     @app.get("/api/entities")
-    def list_entities(
+    async def list_entities(
+        request: Request,
         entity_type: Optional[str] = Query(None, alias="type"),
         include_archived: bool = False,
     ):
         """列出所有实体（可按类型过滤）。"""
-        with closing(_get_db()) as conn:
+        def _query(conn: sqlite3.Connection):
             q = "SELECT * FROM entities"
             params: list = []
             clauses: list[str] = []
@@ -341,17 +453,21 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
             rows = conn.execute(q, params).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/entities/{entity_id}")
-    def get_entity(entity_id: str):
-        with closing(_get_db()) as conn:
+    async def get_entity(request: Request, entity_id: str):
+        def _query(conn: sqlite3.Connection):
             row = conn.execute("SELECT * FROM entities WHERE id = ?", (entity_id,)).fetchone()
             if not row:
                 raise HTTPException(404, "实体不存在")
             return dict(row)
 
+        return await _db_json(request, _query)
+
     @app.get("/api/relationships")
-    def list_relationships(entity: Optional[str] = None, limit: int = 200):
-        with closing(_get_db()) as conn:
+    async def list_relationships(request: Request, entity: Optional[str] = None, limit: int = 200):
+        def _query(conn: sqlite3.Connection):
             if entity:
                 rows = conn.execute(
                     "SELECT * FROM relationships WHERE from_entity = ? OR to_entity = ? ORDER BY chapter DESC LIMIT ?",
@@ -364,14 +480,17 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 ).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/relationship-events")
-    def list_relationship_events(
+    async def list_relationship_events(
+        request: Request,
         entity: Optional[str] = None,
         from_chapter: Optional[int] = None,
         to_chapter: Optional[int] = None,
         limit: int = 200,
     ):
-        with closing(_get_db()) as conn:
+        def _query(conn: sqlite3.Connection):
             q = "SELECT * FROM relationship_events"
             params: list = []
             clauses: list[str] = []
@@ -391,9 +510,11 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
             rows = conn.execute(q, params).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/chapters")
-    def list_chapters():
-        with closing(_get_db()) as conn:
+    async def list_chapters(request: Request):
+        def _query(conn: sqlite3.Connection):
             rows = conn.execute("SELECT * FROM chapters ORDER BY chapter ASC").fetchall()
             normalized = []
             for row in rows:
@@ -402,9 +523,11 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 normalized.append(item)
             return normalized
 
+        return await _db_json(request, _query)
+
     @app.get("/api/scenes")
-    def list_scenes(chapter: Optional[int] = None, limit: int = 500):
-        with closing(_get_db()) as conn:
+    async def list_scenes(request: Request, chapter: Optional[int] = None, limit: int = 500):
+        def _query(conn: sqlite3.Connection):
             if chapter is not None:
                 rows = conn.execute(
                     "SELECT * FROM scenes WHERE chapter = ? ORDER BY scene_index ASC", (chapter,)
@@ -415,17 +538,21 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 ).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/reading-power")
-    def list_reading_power(limit: int = 50):
-        with closing(_get_db()) as conn:
+    async def list_reading_power(request: Request, limit: int = 50):
+        def _query(conn: sqlite3.Connection):
             rows = conn.execute(
                 "SELECT * FROM chapter_reading_power ORDER BY chapter DESC LIMIT ?", (limit,)
             ).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/review-metrics")
-    def list_review_metrics(limit: int = 20):
-        with closing(_get_db()) as conn:
+    async def list_review_metrics(request: Request, limit: int = 20):
+        def _query(conn: sqlite3.Connection):
             rows = conn.execute(
                 "SELECT * FROM review_metrics ORDER BY end_chapter DESC LIMIT ?", (limit,)
             ).fetchall()
@@ -438,12 +565,18 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 normalized.append(item)
             return normalized
 
+        return await _db_json(request, _query)
+
     @app.get("/api/stats/chapter-trend")
-    def chapter_trend(limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)):
-        state = _load_state_payload()
-        strand_map = _build_strand_map(state)
+    async def chapter_trend(
+        request: Request,
+        limit: int = Query(50, ge=1, le=500),
+        offset: int = Query(0, ge=0),
+    ):
+        def _query(conn: sqlite3.Connection):
+            state = _load_state_payload()
+            strand_map = _build_strand_map(state)
 
-        with closing(_get_db()) as conn:
             total_rows = _fetchall_safe(conn, "SELECT COUNT(*) AS count FROM chapters")
             latest_rows = _fetchall_safe(conn, "SELECT MAX(chapter) AS chapter FROM chapters")
             rows = _fetchall_safe(
@@ -477,42 +610,61 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 (limit, offset),
             )
 
-        hook_strength_value = {"weak": 1, "medium": 3, "strong": 5}
-        items = []
-        for row in rows:
-            chapter = int(row.get("chapter") or 0)
-            hook_strength = str(row.get("hook_strength") or "").strip().lower()
-            items.append(
-                {
-                    "chapter": chapter,
-                    "title": row.get("title") or "",
-                    "location": row.get("location") or "",
-                    "word_count": int(row.get("word_count") or 0),
-                    "characters": _parse_json_value(row.get("characters"), []),
-                    "summary": row.get("summary") or "",
-                    "review_score": row.get("review_score"),
-                    "review_severity_counts": _parse_json_value(row.get("severity_counts"), {}),
-                    "hook_type": row.get("hook_type") or "",
-                    "hook_strength": hook_strength,
-                    "hook_strength_value": hook_strength_value.get(hook_strength, 0),
-                    "is_transition": bool(row.get("is_transition")),
-                    "override_count": int(row.get("override_count") or 0),
-                    "debt_balance": float(row.get("debt_balance") or 0.0),
-                    "strand": strand_map.get(chapter, ""),
-                    "volume": _resolve_volume_for_chapter(state, chapter),
-                }
+            hook_strength_value = {"weak": 1, "medium": 3, "strong": 5}
+            items = []
+            for row in rows:
+                chapter = int(row.get("chapter") or 0)
+                hook_strength = str(row.get("hook_strength") or "").strip().lower()
+                items.append(
+                    {
+                        "chapter": chapter,
+                        "title": row.get("title") or "",
+                        "location": row.get("location") or "",
+                        "word_count": int(row.get("word_count") or 0),
+                        "characters": _parse_json_value(row.get("characters"), []),
+                        "summary": row.get("summary") or "",
+                        "review_score": row.get("review_score"),
+                        "review_severity_counts": _parse_json_value(row.get("severity_counts"), {}),
+                        "hook_type": row.get("hook_type") or "",
+                        "hook_strength": hook_strength,
+                        "hook_strength_value": hook_strength_value.get(hook_strength, 0),
+                        "is_transition": bool(row.get("is_transition")),
+                        "override_count": int(row.get("override_count") or 0),
+                        "debt_balance": float(row.get("debt_balance") or 0.0),
+                        "strand": strand_map.get(chapter, ""),
+                        "volume": _resolve_volume_for_chapter(state, chapter),
+                    }
+                )
+
+            return {
+                "items": items,
+                "total": int(total_rows[0]["count"] or 0) if total_rows else 0,
+                "latest_chapter": int(latest_rows[0]["chapter"] or 0) if latest_rows else 0,
+                "limit": limit,
+                "offset": offset,
+            }
+
+        return await _db_json(request, _query, depends_on_state=True)
+
+    @app.get("/api/stats/chapter-rollups")
+    async def chapter_rollups(
+        request: Request,
+        group_by: str = Query(GROUP_BY_VOLUME, pattern="^(volume|bucket)$"),
+        bucket_size: int = Query(10, ge=1, le=500),
+    ):
+        """按卷（或按固定章数分桶）预聚合的章节趋势，一次返回全书汇总。"""
+        def _query(conn: sqlite3.Connection):
+            state = _load_state_payload()
+            return build_chapter_rollups(
+                lambda sql, params: _fetchall_safe(conn, sql, params),
+                volume_ranges=_planned_volume_ranges(state),
+                group_by=group_by,
+                bucket_size=bucket_size,
             )
 
-        return {
-            "items": items,
-            "total": int(total_rows[0]["count"] or 0) if total_rows else 0,
-            "latest_chapter": int(latest_rows[0]["chapter"] or 0) if latest_rows else 0,
-            "limit": limit,
-            "offset": offset,
-        }
+        return await _db_json(request, _query, depends_on_state=True)
 
-    @app.get("/api/commits")
-    def list_commits(limit: int = Query(20, ge=1, le=200)):
+    def _list_commits(limit: int) -> dict:
         commits_dir = _story_system_dir() / "commits"
         if not commits_dir.is_dir():
             return {"items": [], "total": 0, "limit": limit}
@@ -551,8 +703,11 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
         items.sort(key=lambda item: item["chapter"], reverse=True)
         return {"items": items[:limit], "total": len(items), "limit": limit}
 
-    @app.get("/api/contracts/summary")
-    def contracts_summary():
+    @app.get("/api/commits")
+    async def list_commits(limit: int = Query(20, ge=1, le=200)):
+        return await data_layer.run_fs(_list_commits, limit)
+
+    def _contracts_summary() -> dict:
         from data_modules.story_contracts import StoryContractPaths, read_json_if_exists
 
         project_root = _get_project_root()
@@ -590,12 +745,15 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
             },
         }
 
+    @app.get("/api/contracts/summary")
+    async def contracts_summary():
+        return await data_layer.run_fs(_contracts_summary)
+
     @app.get("/api/env-status")
-    def env_status():
-        return _build_env_status(_get_project_root())
+    async def env_status():
+        return await data_layer.run_fs(_build_env_status, _get_project_root())
 
-    @app.get("/api/env-status/probe")
-    def env_status_probe():
+    def _env_status_probe() -> dict:
         status = _build_env_status(_get_project_root())
         runtime = _build_story_runtime_health_report(_get_project_root())
         vector_db = status["vector_db"]
@@ -633,9 +791,13 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
             "checked_at": datetime.now(timezone.utc).isoformat(),
         }
 
+    @app.get("/api/env-status/probe")
+    async def env_status_probe():
+        return await data_layer.run_fs(_env_status_probe)
+
     @app.get("/api/state-changes")
-    def list_state_changes(entity: Optional[str] = None, limit: int = 100):
-        with closing(_get_db()) as conn:
+    async def list_state_changes(request: Request, entity: Optional[str] = None, limit: int = 100):
+        def _query(conn: sqlite3.Connection):
             if entity:
                 rows = conn.execute(
                     "SELECT * FROM state_changes WHERE entity_id = ? ORDER BY chapter DESC LIMIT ?",
@@ -647,9 +809,11 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 ).fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     @app.get("/api/aliases")
-    def list_aliases(entity: Optional[str] = None):
-        with closing(_get_db()) as conn:
+    async def list_aliases(request: Request, entity: Optional[str] = None):
+        def _query(conn: sqlite3.Connection):
             if entity:
                 rows = conn.execute(
                     "SELECT * FROM aliases WHERE entity_id = ?", (entity,)
@@ -658,112 +822,86 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 rows = conn.execute("SELECT * FROM aliases").fetchall()
             return [dict(r) for r in rows]
 
+        return await _db_json(request, _query)
+
     # ===========================================================
     # API：扩展表（v5.3+ / v5.4+）
     # ===========================================================
 
-    @app.get("/api/overrides")
-    def list_overrides(status: Optional[str] = None, limit: int = 100):
-        with closing(_get_db()) as conn:
-            if status:
+    def _filtered_table_query(
+        table: str,
+        order_by: str,
+        column: str,
+        value: object,
+        limit: int,
+    ) -> Callable[[sqlite3.Connection], list[dict]]:
+        def _query(conn: sqlite3.Connection):
+            if value is not None and value != "":
                 return _fetchall_safe(
                     conn,
-                    "SELECT * FROM override_contracts WHERE status = ? ORDER BY chapter DESC LIMIT ?",
-                    (status, limit),
+                    f"SELECT * FROM {table} WHERE {column} = ? ORDER BY {order_by} LIMIT ?",
+                    (value, limit),
                 )
             return _fetchall_safe(
                 conn,
-                "SELECT * FROM override_contracts ORDER BY chapter DESC LIMIT ?",
+                f"SELECT * FROM {table} ORDER BY {order_by} LIMIT ?",
                 (limit,),
             )
 
+        return _query
+
+    @app.get("/api/overrides")
+    async def list_overrides(request: Request, status: Optional[str] = None, limit: int = 100):
+        return await _db_json(
+            request,
+            _filtered_table_query("override_contracts", "chapter DESC", "status", status, limit),
+        )
+
     @app.get("/api/debts")
-    def list_debts(status: Optional[str] = None, limit: int = 100):
-        with closing(_get_db()) as conn:
-            if status:
-                return _fetchall_safe(
-                    conn,
-                    "SELECT * FROM chase_debt WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
-                    (status, limit),
-                )
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM chase_debt ORDER BY updated_at DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_debts(request: Request, status: Optional[str] = None, limit: int = 100):
+        return await _db_json(
+            request,
+            _filtered_table_query("chase_debt", "updated_at DESC", "status", status, limit),
+        )
 
     @app.get("/api/debt-events")
-    def list_debt_events(debt_id: Optional[int] = None, limit: int = 200):
-        with closing(_get_db()) as conn:
-            if debt_id is not None:
-                return _fetchall_safe(
-                    conn,
-                    "SELECT * FROM debt_events WHERE debt_id = ? ORDER BY chapter DESC, id DESC LIMIT ?",
-                    (debt_id, limit),
-                )
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM debt_events ORDER BY chapter DESC, id DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_debt_events(request: Request, debt_id: Optional[int] = None, limit: int = 200):
+        return await _db_json(
+            request,
+            _filtered_table_query("debt_events", "chapter DESC, id DESC", "debt_id", debt_id, limit),
+        )
 
     @app.get("/api/invalid-facts")
-    def list_invalid_facts(status: Optional[str] = None, limit: int = 100):
-        with closing(_get_db()) as conn:
-            if status:
-                return _fetchall_safe(
-                    conn,
-                    "SELECT * FROM invalid_facts WHERE status = ? ORDER BY marked_at DESC LIMIT ?",
-                    (status, limit),
-                )
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM invalid_facts ORDER BY marked_at DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_invalid_facts(request: Request, status: Optional[str] = None, limit: int = 100):
+        return await _db_json(
+            request,
+            _filtered_table_query("invalid_facts", "marked_at DESC", "status", status, limit),
+        )
 
     @app.get("/api/rag-queries")
-    def list_rag_queries(query_type: Optional[str] = None, limit: int = 100):
-        with closing(_get_db()) as conn:
-            if query_type:
-                return _fetchall_safe(
-                    conn,
-                    "SELECT * FROM rag_query_log WHERE query_type = ? ORDER BY created_at DESC LIMIT ?",
-                    (query_type, limit),
-                )
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM rag_query_log ORDER BY created_at DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_rag_queries(request: Request, query_type: Optional[str] = None, limit: int = 100):
+        return await _db_json(
+            request,
+            _filtered_table_query("rag_query_log", "created_at DESC", "query_type", query_type, limit),
+        )
 
     @app.get("/api/tool-stats")
-    def list_tool_stats(tool_name: Optional[str] = None, limit: int = 200):
-        with closing(_get_db()) as conn:
-            if tool_name:
-                return _fetchall_safe(
-                    conn,
-                    "SELECT * FROM tool_call_stats WHERE tool_name = ? ORDER BY created_at DESC LIMIT ?",
-                    (tool_name, limit),
-                )
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM tool_call_stats ORDER BY created_at DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_tool_stats(request: Request, tool_name: Optional[str] = None, limit: int = 200):
+        return await _db_json(
+            request,
+            _filtered_table_query("tool_call_stats", "created_at DESC", "tool_name", tool_name, limit),
+        )
 
     @app.get("/api/checklist-scores")
-    def list_checklist_scores(limit: int = 100):
-        with closing(_get_db()) as conn:
-            return _fetchall_safe(
-                conn,
-                "SELECT * FROM writing_checklist_scores ORDER BY chapter DESC LIMIT ?",
-                (limit,),
-            )
+    async def list_checklist_scores(request: Request, limit: int = 100):
+        return await _db_json(
+            request,
+            _filtered_table_query("writing_checklist_scores", "chapter DESC", "chapter", None, limit),
+        )
 
     @app.get("/api/story-events")
-    def list_story_events(chapter: Optional[int] = None, limit: int = 200):
-        with closing(_get_db()) as conn:
+    async def list_story_events(request: Request, chapter: Optional[int] = None, limit: int = 200):
+        def _query(conn: sqlite3.Connection):
             if chapter is not None:
                 rows = _fetchall_safe(
                     conn,
@@ -788,19 +926,21 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                     (limit,),
                 )
 
-        normalized = []
-        for row in rows:
-            payload = {}
-            try:
-                payload = json.loads(row.get("payload_json") or "{}")
-            except json.JSONDecodeError:
+            normalized = []
+            for row in rows:
                 payload = {}
-            normalized.append({**row, "payload": payload})
-        return normalized
+                try:
+                    payload = json.loads(row.get("payload_json") or "{}")
+                except json.JSONDecodeError:
+                    payload = {}
+                normalized.append({**row, "payload": payload})
+            return normalized
+
+        return await _db_json(request, _query)
 
     @app.get("/api/story-events/health")
-    def story_event_health():
-        with closing(_get_db()) as conn:
+    async def story_event_health():
+        def _query(conn: sqlite3.Connection):
             event_rows = _fetchall_safe(conn, "SELECT COUNT(*) AS count FROM story_events")
             proposal_rows = _fetchall_safe(
                 conn,
@@ -810,9 +950,16 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
                 WHERE record_type = 'amend_proposal' AND status = 'pending'
                 """,
             )
+            return event_rows, proposal_rows
 
-        events_dir = _story_system_dir() / "events"
-        file_count = len(list(events_dir.glob("chapter_*.events.json"))) if events_dir.is_dir() else 0
+        # 事件文件数量来自文件系统，不纳入 data_version 缓存。
+        event_rows, proposal_rows = await _run_query(_query)
+
+        def _count_event_files() -> int:
+            events_dir = _story_system_dir() / "events"
+            return len(list(events_dir.glob("chapter_*.events.json"))) if events_dir.is_dir() else 0
+
+        file_count = await data_layer.run_fs(_count_event_files)
         return {
             "story_events": event_rows[0]["count"] if event_rows else 0,
             "pending_amend_proposals": proposal_rows[0]["count"] if proposal_rows else 0,
@@ -823,45 +970,145 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
     # API：文档浏览（正文/大纲/设定集 —— 只读）
     # ===========================================================
 
+    def _tree_response(request: Request, build_payload: Callable[[], object]) -> Response:
+        """目录树响应按索引版本号生成 ETag；watcher 未接入时版本号每次扫描都会变化。"""
+        payload = build_payload()
+        media_type = preferred_media_type()
+        key = f"{request.url.path}?{request.url.query}|{media_type}"
+        etag = make_etag(key, f"tree.{id(tree_index):x}.{tree_index.version}")
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        body = data_layer.cache.get(key, etag)
+        if body is None:
+            body = encode_payload(payload, media_type)
+            data_layer.cache.put(key, etag, body)
+        return Response(content=body, media_type=media_type, headers=headers)
+
     @app.get("/api/files/tree")
-    def file_tree():
-        """列出 正文/、大纲/、设定集/ 三个目录的树结构。"""
+    async def file_tree(request: Request):
+        """列出 正文/、大纲/、设定集/ 三个目录的树结构（内存索引，watchdog 增量维护）。"""
+        return await data_layer.run_fs(_tree_response, request, tree_index.snapshot)
+
+    @app.get("/api/files/subtree")
+    async def file_subtree(request: Request, path: str, depth: int = Query(1, ge=1, le=8)):
+        """按需展开单个目录：只返回 path 下 depth 层，更深的目录只带 child_count。"""
         root = _get_project_root()
-        result = {}
-        for folder_name in ("正文", "大纲", "设定集"):
-            folder = root / folder_name
-            if not folder.is_dir():
-                result[folder_name] = []
-                continue
-            result[folder_name] = _walk_tree(folder, root)
-        return result
+        resolved = safe_resolve(root, path)
+        folder = next((name for name in DOCUMENT_FOLDERS if _is_child(resolved, root / name)), None)
+        if folder is None:
+            raise HTTPException(403, "仅允许浏览 正文/大纲/设定集 目录")
+        rel_path = str(resolved.relative_to(root.resolve())).replace("\\", "/")
 
-    @app.get("/api/files/read")
-    def file_read(path: str):
-        """只读读取一个文件内容（限 正文/大纲/设定集 目录）。"""
+        def _payload() -> dict:
+            items = tree_index.subtree(rel_path, depth=depth)
+            if items is None:
+                raise HTTPException(404, "目录不存在")
+            return {"path": rel_path, "depth": depth, "items": items}
+
+        return await data_layer.run_fs(_tree_response, request, _payload)
+
+    def _resolve_document_file(path: str) -> Path:
         root = _get_project_root()
         resolved = safe_resolve(root, path)
 
         # 二次限制：只允许三大目录
-        allowed_parents = [root / n for n in ("正文", "大纲", "设定集")]
+        allowed_parents = [root / n for n in DOCUMENT_FOLDERS]
         if not any(_is_child(resolved, p) for p in allowed_parents):
             raise HTTPException(403, "仅允许读取 正文/大纲/设定集 目录下的文件")
 
         if not resolved.is_file():
             raise HTTPException(404, "文件不存在")
+        return resolved
+
+    def _file_read(path: str, offset_line: Optional[int], limit_lines: Optional[int]) -> dict:
+        resolved = _resolve_document_file(path)
+
+        # 行窗口模式：借助行偏移索引只读取需要的片段，不受整文件大小限制。
+        if offset_line is not None or limit_lines is not None:
+            window = read_line_window(
+                line_index_cache,
+                resolved,
+                offset_line or 0,
+                limit_lines or DEFAULT_WINDOW_LINES,
+            )
+            return {"path": path, **window}
 
-        max_bytes = 2 * 1024 * 1024
-        if resolved.stat().st_size > max_bytes:
-            raise HTTPException(413, "文件过大，无法预览")
+        if resolved.stat().st_size > MAX_INLINE_READ_BYTES:
+            raise HTTPException(
+                413,
+                "文件过大，无法整体预览；请使用 offset_line/limit_lines 分页读取，或 /api/files/raw 分段下载",
+            )
 
         # 文本文件直接读；其他情况返回占位信息
         try:
             content = resolved.read_text(encoding="utf-8")
         except UnicodeDecodeError:
-            content = "[二进制文件，无法预览]"
+            content = BINARY_PLACEHOLDER
 
         return {"path": path, "content": content}
 
+    @app.get("/api/files/read")
+    async def file_read(
+        path: str,
+        offset_line: Optional[int] = Query(None, ge=0),
+        limit_lines: Optional[int] = Query(None, ge=1, le=MAX_WINDOW_LINES),
+    ):
+        """只读读取一个文件内容（限 正文/大纲/设定集 目录），支持按行分页。"""
+        return await data_layer.run_fs(_file_read, path, offset_line, limit_lines)
+
+    @app.get("/api/files/raw")
+    async def file_raw(request: Request, path: str):
+        """流式读取原始文件：支持 HTTP Range（206）与 gzip 压缩（仅整文件响应）。"""
+        resolved = await data_layer.run_fs(_resolve_document_file, path)
+        stat = await data_layer.run_fs(resolved.stat)
+        size = stat.st_size
+        # 整文件 gzip 与原始字节是同一文件的两种表示，强 ETag 必须区分；Range 只针对原始字节
+        identity_etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        gzip_etag = f'"{stat.st_mtime_ns:x}-{size:x}-gz"'
+        if resolved.suffix.lower() == ".md":
+            media_type = "text/markdown"
+        else:
+            media_type = mimetypes.guess_type(resolved.name)[0] or "application/octet-stream"
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if if_range and if_range.strip() != identity_etag:
+            range_header = None
+        use_gzip = (
+            range_header is None
+            and size >= GZIP_MIN_BYTES
+            and accepts_gzip(request.headers.get("accept-encoding"))
+        )
+        etag = gzip_etag if use_gzip else identity_etag
+        headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_file_range(resolved, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers,
+            )
+
+        chunks = iter_file_range(resolved, 0, size - 1) if size else iter(())
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(iter_gzip(chunks), media_type=media_type, headers=headers)
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
     # ===========================================================
     # SSE：实时变更推送
     # ===========================================================
@@ -915,17 +1162,6 @@ def create_app(project_root: str | Path | None = None) -> FastAPI:
 # 辅助函数
 # ---------------------------------------------------------------------------
 
-def _walk_tree(folder: Path, root: Path) -> list[dict]:
-    items = []
-    for child in sorted(folder.iterdir()):
-        rel = str(child.relative_to(root)).replace("\\", "/")
-        if child.is_dir():
-            items.append({"name": child.name, "type": "dir", "path": rel, "children": _walk_tree(child, root)})
-        else:
-            items.append({"name": child.name, "type": "file", "path": rel, "size": child.stat().st_size})
-    return items
-
-
 def _is_child(path: Path, parent: Path) -> bool:
     try:
         path.resolve().relative_to(parent.resolve())
@@ -0,0 +1,276 @@
+"""
+Dashboard 数据访问层
+
+- ReadOnlyConnectionPool：index.db 的有界只读连接池（``mode=ro`` + ``PRAGMA query_only``），
+  请求之间复用连接，不再每次 ``sqlite3.connect``；
+- ResponseCache：按「请求路径 + 数据版本」生成 ETag，命中 ``If-None-Match`` 时直接 304；
+- DashboardDataLayer：统一持有连接池、响应缓存与两条独立的线程池配额，
+  让慢速文件遍历（/api/files/tree 等）不会与 SQL 查询争抢同一批工作线程。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+import anyio
+import anyio.to_thread
+
+T = TypeVar("T")
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_DB_THREADS = 8
+DEFAULT_FS_THREADS = 4
+DEFAULT_CACHE_ENTRIES = 256
+
+
+class PoolTimeout(TimeoutError):
+    """在等待时间内没有可用的只读连接。"""
+
+
+class ReadOnlyConnectionPool:
+    """index.db 只读连接池。
+
+    连接以 ``check_same_thread=False`` 打开，以便在线程池的不同工作线程间复用；
+    同一时刻一个连接只会借给一个调用方。index.db 被整体替换（inode 变化）时，
+    旧连接在归还时关闭，新请求重新建连。
+    """
+
+    def __init__(self, db_path: Path, *, max_size: int = DEFAULT_POOL_SIZE, timeout: float = 5.0):
+        self._db_path = Path(db_path)
+        self._max_size = max(1, int(max_size))
+        self._timeout = float(timeout)
+        self._cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._created = 0
+        self._generation = 0
+        self._identity: tuple[int, int] | None = None
+        self._version_conn: sqlite3.Connection | None = None
+        # 进程级随机前缀：服务重启后旧 ETag 不会误命中。
+        self._nonce = uuid.uuid4().hex[:8]
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"{self._db_path.resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=self._timeout)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _file_identity(self) -> tuple[int, int] | None:
+        try:
+            stat = self._db_path.stat()
+        except OSError:
+            return None
+        return (int(stat.st_dev), int(stat.st_ino))
+
+    def _refresh_identity_locked(self) -> None:
+        identity = self._file_identity()
+        if identity == self._identity:
+            return
+        self._identity = identity
+        self._generation += 1
+        for conn in self._idle:
+            conn.close()
+        self._created -= len(self._idle)
+        self._idle.clear()
+        if self._version_conn is not None:
+            self._version_conn.close()
+            self._version_conn = None
+
+    def _acquire(self) -> tuple[sqlite3.Connection, int]:
+        deadline = time.monotonic() + self._timeout
+        with self._cond:
+            self._refresh_identity_locked()
+            while True:
+                if self._idle:
+                    return self._idle.pop(), self._generation
+                if self._created < self._max_size:
+                    self._created += 1
+                    generation = self._generation
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"等待 index.db 只读连接超时（{self._timeout:.1f}s）")
+                self._cond.wait(remaining)
+
+        try:
+            return self._connect(), generation
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn: sqlite3.Connection, generation: int, *, discard: bool) -> None:
+        with self._cond:
+            if discard or generation != self._generation:
+                conn.close()
+                self._created -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn, generation = self._acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as exc:
+            # OperationalError（缺表/缺列）不影响连接本身；其余数据库错误直接丢弃连接。
+            discard = not isinstance(exc, sqlite3.OperationalError)
+            raise
+        finally:
+            self._release(conn, generation, discard=discard)
+
+    def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        with self.connection() as conn:
+            return fn(conn)
+
+    def data_version(self) -> str:
+        """返回 index.db 的内容版本号。
+
+        基于专用连接上的 ``PRAGMA data_version``：其它连接（含其它进程）每提交一次写入，
+        该值就会变化。再拼上文件 inode 与进程随机前缀，保证库文件替换、服务重启后不会复用旧值。
+        """
+        with self._cond:
+            self._refresh_identity_locked()
+            if self._version_conn is None:
+                self._version_conn = self._connect()
+            row = self._version_conn.execute("PRAGMA data_version").fetchone()
+            inode = self._identity[1] if self._identity else 0
+            return f"{self._nonce}.{inode:x}.{self._generation}.{int(row[0])}"
+
+    def close(self) -> None:
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+            self._created -= len(self._idle)
+            self._idle.clear()
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+            self._cond.notify_all()
+
+
+def make_etag(key: str, version: str) -> str:
+    digest = hashlib.sha1(f"{key}\0{version}".encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+class ResponseCache:
+    """按端点缓存已序列化的响应体（LRU），以 ETag 作为版本校验。"""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self._max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, etag: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class DashboardDataLayer:
+    """一个 dashboard 应用实例的数据访问入口。"""
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        db_threads: int = DEFAULT_DB_THREADS,
+        fs_threads: int = DEFAULT_FS_THREADS,
+        cache_entries: int = DEFAULT_CACHE_ENTRIES,
+    ):
+        self.pool_size = max(1, int(pool_size))
+        self.db_threads = max(1, int(db_threads))
+        self.fs_threads = max(1, int(fs_threads))
+        self.cache = ResponseCache(cache_entries)
+        self._pools: dict[Path, ReadOnlyConnectionPool] = {}
+        self._pools_lock = threading.Lock()
+        self._db_limiter: anyio.CapacityLimiter | None = None
+        self._fs_limiter: anyio.CapacityLimiter | None = None
+
+    def pool_for(self, db_path: Path) -> ReadOnlyConnectionPool:
+        key = Path(db_path).resolve()
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ReadOnlyConnectionPool(key, max_size=self.pool_size)
+                self._pools[key] = pool
+            return pool
+
+    # CapacityLimiter 需在事件循环内创建，因此延迟到第一次调度时初始化。
+    def _limiter(self, kind: str) -> anyio.CapacityLimiter:
+        if kind == "db":
+            if self._db_limiter is None:
+                self._db_limiter = anyio.CapacityLimiter(self.db_threads)
+            return self._db_limiter
+        if self._fs_limiter is None:
+            self._fs_limiter = anyio.CapacityLimiter(self.fs_threads)
+        return self._fs_limiter
+
+    async def run_db(self, fn: Callable[..., T], *args: Any) -> T:
+        """在 SQL 专用线程配额内执行阻塞函数。"""
+        return await anyio.to_thread.run_sync(partial(fn, *args), limiter=self._limiter("db"))
+
+    async def run_fs(self, fn: Callable[..., T], *args: Any) -> T:
+        """在文件系统专用线程配额内执行阻塞函数。"""
+        return await anyio.to_thread.run_sync(partial(fn, *args), limiter=self._limiter("fs"))
+
+    def close(self) -> None:
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+        self.cache.clear()
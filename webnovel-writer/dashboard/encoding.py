@@ -0,0 +1,222 @@
+"""
+Dashboard 响应编码层
+
+- encode_payload：所有 /api/* 共用的序列化入口。安装了 orjson 时走 orjson，
+  否则使用标准库，输出与 FastAPI 默认 JSONResponse 一致；
+- 内容协商：请求 ``Accept`` 声明 ``application/msgpack`` 且安装了 msgpack 时返回 msgpack；
+- ResponseEncodingMiddleware：记录本次请求的协商结果，并对超过阈值的一次性响应体
+  做 br（安装了 brotli 时）或 gzip 压缩，并把强 ETag 改为弱 ETag；流式响应（SSE、/api/files/raw）原样透传。
+
+orjson / msgpack / brotli 均为可选依赖，缺失时自动退回 JSON + gzip。
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+DEFAULT_MINIMUM_SIZE = 1024
+
+_preferred_media_type: ContextVar[str] = ContextVar("dashboard_preferred_media_type", default=JSON_MEDIA_TYPE)
+
+
+def _parse_accept_tokens(header: Optional[str]) -> list[tuple[str, float]]:
+    tokens: list[tuple[str, float]] = []
+    for token in str(header or "").split(","):
+        name, *params = [part.strip() for part in token.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        tokens.append((name.lower(), quality))
+    return tokens
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """显式列出的 coding 以其 q 值为准（q=0 即拒绝）；未列出时才看 ``*``。"""
+    explicit: Optional[float] = None
+    wildcard: Optional[float] = None
+    for name, quality in _parse_accept_tokens(accept_encoding):
+        if name == coding:
+            explicit = quality if explicit is None else max(explicit, quality)
+        elif name == "*":
+            wildcard = quality if wildcard is None else max(wildcard, quality)
+    quality = explicit if explicit is not None else wildcard
+    return quality is not None and quality > 0
+
+
+def weaken_etag(etag: Optional[str]) -> Optional[str]:
+    """压缩后的响应与原始字节不再逐字节一致，强 ETag 改为弱 ETag（If-None-Match 仍按弱比较命中）。"""
+    if not etag or etag.startswith("W/"):
+        return etag
+    return f"W/{etag}"
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """只有客户端显式要求 msgpack 且服务端可用时才切换，其余一律 JSON。"""
+    if msgpack is None:
+        return JSON_MEDIA_TYPE
+    for name, quality in _parse_accept_tokens(accept):
+        if name in {MSGPACK_MEDIA_TYPE, "application/x-msgpack"} and quality > 0:
+            return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def preferred_media_type() -> str:
+    return _preferred_media_type.get()
+
+
+def dumps_json(payload: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return orjson.dumps(jsonable_encoder(payload), option=orjson.OPT_NON_STR_KEYS)
+    try:
+        text = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except TypeError:
+        text = json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def dumps_msgpack(payload: Any) -> bytes:
+    try:
+        return msgpack.packb(payload, use_bin_type=True)
+    except TypeError:
+        return msgpack.packb(jsonable_encoder(payload), use_bin_type=True)
+
+
+def encode_payload(payload: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+        return dumps_msgpack(payload)
+    return dumps_json(payload)
+
+
+class NegotiatedResponse(Response):
+    """FastAPI 默认响应类：按本次请求的协商结果输出 JSON 或 msgpack。"""
+
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(self, content: Any = None, status_code: int = 200, headers=None, media_type=None, background=None):
+        super().__init__(
+            content,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type or preferred_media_type(),
+            background=background,
+        )
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        return encode_payload(content, self.media_type)
+
+
+class ResponseEncodingMiddleware:
+    """纯 ASGI 中间件：内容协商 + 响应压缩。"""
+
+    def __init__(self, app, *, minimum_size: int = DEFAULT_MINIMUM_SIZE, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = max(0, int(minimum_size))
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_coding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        if brotli is not None and accepts_encoding(accept_encoding, "br"):
+            return "br"
+        if accepts_encoding(accept_encoding, "gzip"):
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, coding: str) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not str(scope.get("path") or "").startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        token = _preferred_media_type.set(negotiate_media_type(request_headers.get("accept")))
+        coding = self._choose_coding(request_headers.get("accept-encoding"))
+        if coding is None:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _preferred_media_type.reset(token)
+            return
+
+        start_message: dict | None = None
+        passthrough = False
+
+        async def _send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            skip = (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or start_message.get("status") in (204, 206, 304)
+                or headers.get("content-type", "").startswith("text/event-stream")
+            )
+            if skip:
+                # 流式或过小的响应保持原样；后续消息全部直通。
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, coding)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = weaken_etag(headers["etag"])
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _preferred_media_type.reset(token)
@@ -0,0 +1,189 @@
+"""
+大文件只读访问工具
+
+- LineOffsetIndex：一次顺序扫描得到总行数，并每隔 ``stride`` 行记录一个字节偏移（稀疏索引），
+  行窗口读取只需 seek 到最近的检查点再跳过不足 stride 的行；
+- LineIndexCache：按 (路径, mtime_ns, size) 缓存索引，文件变化后自动重建；
+- parse_range / iter_file_range / iter_gzip：支撑 /api/files/raw 的 HTTP Range 与 gzip 流式输出。
+"""
+
+from __future__ import annotations
+
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .encoding import accepts_encoding
+
+READ_CHUNK_SIZE = 64 * 1024
+LINE_INDEX_STRIDE = 256
+BINARY_PLACEHOLDER = "[二进制文件，无法预览]"
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range 请求头落在文件范围之外。"""
+
+
+class LineOffsetIndex:
+    """单个文件的稀疏行偏移索引。"""
+
+    __slots__ = ("path", "mtime_ns", "size", "stride", "total_lines", "_checkpoints")
+
+    def __init__(self, path: Path, mtime_ns: int, size: int, stride: int, total_lines: int, checkpoints: array):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.stride = stride
+        self.total_lines = total_lines
+        self._checkpoints = checkpoints
+
+    @classmethod
+    def build(cls, path: Path, *, stride: int = LINE_INDEX_STRIDE) -> "LineOffsetIndex":
+        stat = path.stat()
+        checkpoints = array("q", [0])
+        line_no = 0
+        pos = 0
+        last_byte = b""
+        with open(path, "rb") as fh:
+            while True:
+                chunk = fh.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newlines = chunk.count(b"\n")
+                if (line_no + newlines) // stride == line_no // stride:
+                    # 本块内没有落在检查点上的行，直接累加计数。
+                    line_no += newlines
+                else:
+                    start = 0
+                    while True:
+                        idx = chunk.find(b"\n", start)
+                        if idx < 0:
+                            break
+                        line_no += 1
+                        if line_no % stride == 0:
+                            checkpoints.append(pos + idx + 1)
+                        start = idx + 1
+                pos += len(chunk)
+                last_byte = chunk[-1:]
+        total_lines = line_no + (1 if pos > 0 and last_byte != b"\n" else 0)
+        return cls(path, stat.st_mtime_ns, stat.st_size, stride, total_lines, checkpoints)
+
+    def read_lines(self, offset_line: int, limit_lines: int) -> bytes:
+        """读取 [offset_line, offset_line + limit_lines) 行的原始字节（0 起始）。"""
+        if limit_lines <= 0 or offset_line >= self.total_lines:
+            return b""
+        checkpoint = min(offset_line // self.stride, len(self._checkpoints) - 1)
+        skip = offset_line - checkpoint * self.stride
+        parts: list[bytes] = []
+        with open(self.path, "rb") as fh:
+            fh.seek(self._checkpoints[checkpoint])
+            for _ in range(skip):
+                if not fh.readline():
+                    return b""
+            for _ in range(limit_lines):
+                line = fh.readline()
+                if not line:
+                    break
+                parts.append(line)
+        return b"".join(parts)
+
+
+class LineIndexCache:
+    """LRU 缓存：同一文件未变化时复用行索引。"""
+
+    def __init__(self, max_entries: int = 32, *, stride: int = LINE_INDEX_STRIDE):
+        self._max_entries = max(1, int(max_entries))
+        self._stride = stride
+        self._entries: "OrderedDict[Path, LineOffsetIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> LineOffsetIndex:
+        stat = path.stat()
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._entries.move_to_end(path)
+                return cached
+        index = LineOffsetIndex.build(path, stride=self._stride)
+        with self._lock:
+            self._entries[path] = index
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+
+def read_line_window(cache: LineIndexCache, path: Path, offset_line: int, limit_lines: int) -> dict:
+    index = cache.get(path)
+    raw = index.read_lines(offset_line, limit_lines)
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        content = BINARY_PLACEHOLDER
+    end_line = min(offset_line + limit_lines, index.total_lines)
+    return {
+        "content": content,
+        "offset_line": offset_line,
+        "limit_lines": limit_lines,
+        "total_lines": index.total_lines,
+        "has_more": end_line < index.total_lines,
+        "size": index.size,
+    }
+
+
+def parse_range(header: Optional[str], size: int) -> tuple[int, int] | None:
+    """解析单段 ``bytes=`` Range，返回闭区间 (start, end)。
+
+    不是 bytes 单位或含多段时返回 None（按 RFC 9110 可退回整文件响应）；
+    区间不可满足时抛 RangeNotSatisfiable。
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: Path, start: int, end: int, *, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        while remaining > 0:
+            chunk = fh.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_gzip(chunks: Iterator[bytes], *, level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    return accepts_encoding(accept_encoding, "gzip")
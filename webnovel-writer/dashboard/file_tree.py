@@ -0,0 +1,208 @@
+"""
+文档目录树内存索引
+
+启动时对 正文/、大纲/、设定集/ 做一次全量扫描，之后由 watchdog 事件增量维护，
+/api/files/tree 与 /api/files/subtree 直接从内存读取，不再每次请求递归遍历磁盘。
+
+未接入 watcher（例如测试里未触发 lifespan，或 watchdog 启动失败）时，
+索引退化为「每次读取前重新扫描」，行为与旧实现一致。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+DOCUMENT_FOLDERS = ("正文", "大纲", "设定集")
+
+
+class _Node:
+    __slots__ = ("name", "rel", "is_dir", "size", "children")
+
+    def __init__(self, name: str, rel: str, is_dir: bool, size: int = 0):
+        self.name = name
+        self.rel = rel
+        self.is_dir = is_dir
+        self.size = size
+        self.children: dict[str, _Node] | None = {} if is_dir else None
+
+    def to_item(self, depth: Optional[int]) -> dict:
+        if not self.is_dir:
+            return {"name": self.name, "type": "file", "path": self.rel, "size": self.size}
+        children = self.children or {}
+        item: dict = {"name": self.name, "type": "dir", "path": self.rel}
+        if depth is None or depth > 1:
+            next_depth = None if depth is None else depth - 1
+            item["children"] = [children[key].to_item(next_depth) for key in sorted(children)]
+        else:
+            item["children"] = []
+            item["has_children"] = bool(children)
+            item["child_count"] = len(children)
+        return item
+
+
+class FileTreeIndex:
+    """线程安全的文档目录树索引（watchdog 线程写、请求线程读）。"""
+
+    def __init__(self, project_root: Path, folders: Iterable[str] = DOCUMENT_FOLDERS):
+        self._root = Path(project_root).resolve()
+        self._folders = tuple(folders)
+        self._lock = threading.RLock()
+        self._tops: dict[str, _Node | None] = {}
+        self._built = False
+        self._live = False
+        self._version = 0
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def folders(self) -> tuple[str, ...]:
+        return self._folders
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    @property
+    def live(self) -> bool:
+        return self._live
+
+    def set_live(self, live: bool) -> None:
+        """watcher 已覆盖所有文档目录时置为 True；否则每次读取都会重新扫描。"""
+        with self._lock:
+            self._live = bool(live)
+
+    # --- 构建 ---
+
+    def _scan_dir(self, path: Path, rel: str) -> _Node:
+        node = _Node(path.name, rel, True)
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return node
+        for entry in entries:
+            child_rel = f"{rel}/{entry.name}"
+            try:
+                if entry.is_dir():
+                    node.children[entry.name] = self._scan_dir(Path(entry.path), child_rel)
+                else:
+                    node.children[entry.name] = _Node(entry.name, child_rel, False, entry.stat().st_size)
+            except OSError:
+                continue
+        return node
+
+    def build(self) -> None:
+        tops: dict[str, _Node | None] = {}
+        for folder in self._folders:
+            path = self._root / folder
+            tops[folder] = self._scan_dir(path, folder) if path.is_dir() else None
+        with self._lock:
+            self._tops = tops
+            self._built = True
+            self._version += 1
+
+    def _ensure_fresh(self) -> None:
+        if not self._live or not self._built:
+            self.build()
+
+    # --- 读取 ---
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        """与旧版 /api/files/tree 完全一致的全量树。"""
+        self._ensure_fresh()
+        with self._lock:
+            result: dict[str, list[dict]] = {}
+            for folder in self._folders:
+                node = self._tops.get(folder)
+                children = (node.children or {}) if node else {}
+                result[folder] = [children[key].to_item(None) for key in sorted(children)]
+            return result
+
+    def subtree(self, rel_path: str, depth: int = 1) -> list[dict] | None:
+        """返回 rel_path 目录下 depth 层的子项；目录不存在时返回 None。"""
+        self._ensure_fresh()
+        with self._lock:
+            node = self._lookup(rel_path)
+            if node is None or not node.is_dir:
+                return None
+            children = node.children or {}
+            return [children[key].to_item(depth) for key in sorted(children)]
+
+    def _split(self, rel_path: str) -> list[str]:
+        return [part for part in str(rel_path).replace("\\", "/").split("/") if part and part != "."]
+
+    def _lookup(self, rel_path: str) -> _Node | None:
+        parts = self._split(rel_path)
+        if not parts or parts[0] not in self._folders:
+            return None
+        node = self._tops.get(parts[0])
+        for part in parts[1:]:
+            if node is None or not node.is_dir:
+                return None
+            node = (node.children or {}).get(part)
+        return node
+
+    # --- watchdog 增量更新 ---
+
+    def _relative(self, abs_path: str | Path) -> str | None:
+        try:
+            rel = Path(abs_path).resolve(strict=False).relative_to(self._root)
+        except (OSError, ValueError):
+            return None
+        parts = rel.parts
+        if not parts or parts[0] not in self._folders:
+            return None
+        return "/".join(parts)
+
+    def _refresh_path_locked(self, rel: str) -> None:
+        """按磁盘现状重建 rel 对应的节点（存在则扫描，不存在则删除）。"""
+        parts = self._split(rel)
+        abs_path = self._root.joinpath(*parts)
+        if len(parts) == 1:
+            self._tops[parts[0]] = self._scan_dir(abs_path, parts[0]) if abs_path.is_dir() else None
+            return
+
+        parent = self._lookup("/".join(parts[:-1]))
+        if parent is None or not parent.is_dir:
+            # 父目录还不在索引里（事件乱序），从最近的已知祖先整体重扫。
+            self._refresh_path_locked("/".join(parts[:-1]))
+            return
+
+        name = parts[-1]
+        try:
+            if abs_path.is_dir():
+                parent.children[name] = self._scan_dir(abs_path, rel)
+            elif abs_path.is_file():
+                existing = parent.children.get(name)
+                size = abs_path.stat().st_size
+                if existing is not None and not existing.is_dir:
+                    existing.size = size
+                else:
+                    parent.children[name] = _Node(name, rel, False, size)
+            else:
+                parent.children.pop(name, None)
+        except OSError:
+            parent.children.pop(name, None)
+
+    def apply_event(self, event_type: str, src_path: str, dest_path: str | None = None) -> bool:
+        """应用一个 watchdog 事件；索引发生变化时返回 True。"""
+        if event_type not in {"created", "deleted", "modified", "moved"}:
+            return False
+        targets = [self._relative(src_path)]
+        if event_type == "moved" and dest_path:
+            targets.append(self._relative(dest_path))
+        targets = [rel for rel in targets if rel]
+        if not targets:
+            return False
+        with self._lock:
+            if not self._built:
+                return False
+            for rel in targets:
+                self._refresh_path_locked(rel)
+            self._version += 1
+        return True
@@ -46,6 +46,9 @@ def main():
     parser.add_argument("--host", default="127.0.0.1", help="监听地址")
     parser.add_argument("--port", type=int, default=8765, help="监听端口")
     parser.add_argument("--no-browser", action="store_true", help="不自动打开浏览器")
+    parser.add_argument("--db-pool-size", type=int, default=4, help="index.db 只读连接池大小")
+    parser.add_argument("--db-threads", type=int, default=8, help="SQL 查询线程配额")
+    parser.add_argument("--fs-threads", type=int, default=4, help="文件读取/遍历线程配额")
     args = parser.parse_args()
 
     project_root = _resolve_project_root(args.project_root)
@@ -55,7 +58,12 @@ def main():
     import uvicorn
     from .app import create_app
 
-    app = create_app(project_root)
+    app = create_app(
+        project_root,
+        db_pool_size=args.db_pool_size,
+        db_threads=args.db_threads,
+        fs_threads=args.fs_threads,
+    )
 
     url = f"http://{args.host}:{args.port}"
     print(f"Dashboard 启动: {url}")
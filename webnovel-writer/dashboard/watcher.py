@@ -2,7 +2,8 @@
 Watchdog 文件变更监听器 + SSE 推送
 
 监控 PROJECT_ROOT/.webnovel/ 与 .story-system/ 的关键文件写事件，
-通过 SSE 通知所有已连接的前端客户端刷新数据。
+通过 SSE 通知所有已连接的前端客户端刷新数据；
+同时监听 正文/、大纲/、设定集/，把增删改事件应用到内存目录树索引。
 """
 
 import asyncio
@@ -14,6 +15,8 @@ from typing import AsyncGenerator
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
 from watchdog.observers import Observer
 
+from .file_tree import FileTreeIndex
+
 
 def _is_relative_to(path: Path, root: Path | None) -> bool:
     if root is None:
@@ -28,7 +31,7 @@ def _is_relative_to(path: Path, root: Path | None) -> bool:
 class _WebnovelFileHandler(FileSystemEventHandler):
     """关注 .webnovel/ 关键文件与 .story-system/ JSON 变更。"""
 
-    WATCH_NAMES = {"state.json", "index.db", "workflow_state.json"}
+    WATCH_NAMES = {"state.json", "state.journal.jsonl", "index.db", "workflow_state.json"}
 
     def __init__(
         self,
@@ -67,6 +70,30 @@ class _WebnovelFileHandler(FileSystemEventHandler):
         self._handle(event, "created")
 
 
+class _DocumentTreeHandler(FileSystemEventHandler):
+    """把文档目录的 watchdog 事件转交给 FileTreeIndex。"""
+
+    def __init__(self, tree_index: FileTreeIndex, on_top_level_created=None):
+        super().__init__()
+        self._tree_index = tree_index
+        self._on_top_level_created = on_top_level_created
+
+    def on_any_event(self, event):
+        # 目录自身的 modified 只表示其子项变化，子项事件会单独到达。
+        if event.is_directory and event.event_type == "modified":
+            return
+        dest_path = getattr(event, "dest_path", None) or None
+        self._tree_index.apply_event(event.event_type, event.src_path, dest_path)
+        if (
+            self._on_top_level_created
+            and event.is_directory
+            and event.event_type in {"created", "moved"}
+        ):
+            target = Path(dest_path or event.src_path)
+            if target.parent.resolve(strict=False) == self._tree_index.root and target.name in self._tree_index.folders:
+                self._on_top_level_created(target)
+
+
 class FileWatcher:
     """管理 watchdog Observer 和 SSE 客户端订阅。"""
 
@@ -74,6 +101,8 @@ class FileWatcher:
         self._observer: Observer | None = None
         self._subscribers: list[asyncio.Queue] = []
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._tree_index: FileTreeIndex | None = None
+        self._tree_handler: _DocumentTreeHandler | None = None
 
     # --- 订阅管理 ---
 
@@ -114,8 +143,9 @@ class FileWatcher:
         watch_webnovel_dir: Path | None,
         watch_story_system_dir: Path | None,
         loop: asyncio.AbstractEventLoop,
+        tree_index: FileTreeIndex | None = None,
     ):
-        """启动 watchdog observer，同时监听 .webnovel 与 .story-system。"""
+        """启动 watchdog observer，监听 .webnovel、.story-system 与文档目录。"""
         self.stop()
         self._loop = loop
         handler = _WebnovelFileHandler(
@@ -131,14 +161,50 @@ class FileWatcher:
         if watch_story_system_dir and Path(watch_story_system_dir).is_dir():
             self._observer.schedule(handler, str(watch_story_system_dir), recursive=True)
             has_watch_target = True
+        if tree_index is not None:
+            has_watch_target = self._schedule_tree(tree_index) or has_watch_target
         if not has_watch_target:
             self._observer = None
             return
         self._observer.daemon = True
         self._observer.start()
+        if self._tree_index is not None:
+            # observer 启动后再做全量扫描，扫描期间的变更要么被扫描看到，要么随后以事件到达。
+            self._tree_index.build()
+            self._tree_index.set_live(True)
+
+    def _schedule_tree(self, tree_index: FileTreeIndex) -> bool:
+        """为文档目录注册递归监听；根目录非递归监听，用于捕获三大目录的后续创建。"""
+        self._tree_index = tree_index
+        self._tree_handler = _DocumentTreeHandler(tree_index, on_top_level_created=self._watch_document_dir)
+        try:
+            self._observer.schedule(self._tree_handler, str(tree_index.root), recursive=False)
+            for folder in tree_index.folders:
+                folder_path = tree_index.root / folder
+                if folder_path.is_dir():
+                    self._observer.schedule(self._tree_handler, str(folder_path), recursive=True)
+        except OSError:
+            self._tree_index = None
+            self._tree_handler = None
+            tree_index.set_live(False)
+            return False
+        return True
+
+    def _watch_document_dir(self, folder_path: Path):
+        if self._observer is None or self._tree_handler is None:
+            return
+        try:
+            self._observer.schedule(self._tree_handler, str(folder_path), recursive=True)
+        except OSError:
+            if self._tree_index is not None:
+                self._tree_index.set_live(False)
 
     def stop(self):
         if self._observer:
             self._observer.stop()
             self._observer.join(timeout=3)
             self._observer = None
+        if self._tree_index is not None:
+            self._tree_index.set_live(False)
+            self._tree_index = None
+            self._tree_handler = None
@@ -19,6 +19,7 @@ PROTECTED_SUFFIXES = (
     ".webnovel/index.db",
     ".webnovel/vectors.db",
     ".webnovel/memory_scratchpad.json",
+    ".webnovel/memory_scratchpad.db",
     ".webnovel/projection_log.jsonl",
 )
 ALLOWED_RUNTIME_MARKERS = (
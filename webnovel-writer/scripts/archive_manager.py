@@ -15,6 +15,12 @@ state.json 数据归档管理脚本
 - 伏笔：status="已回收" 且超过 20 章的伏笔 → archive/plot_threads.json
 - 审查报告：超过 50 章的旧报告 → archive/reviews.json
 
+增量归档：
+- 新归档记录追加写入同名 .jsonl 段（archive/characters.jsonl 等），不再读出整个归档再重写；
+  读取时合并历史 JSON 数组与 JSONL 段
+- archive/archive_marks.json 记录各类数据已扫描到的章节截止线（高水位），
+  下次只考虑截止线之后新满足条件的数据；--full-scan 忽略高水位全量扫描
+
 使用方式：
   # 自动归档检查（推荐在 update_state.py 之后调用）
   python archive_manager.py --auto-check
@@ -30,6 +36,9 @@ state.json 数据归档管理脚本
 
   # Dry-run 模式（仅显示将被归档的数据）
   python archive_manager.py --auto-check --dry-run
+
+  # 忽略高水位，全量重新扫描
+  python archive_manager.py --force --full-scan
 """
 
 import json
@@ -39,6 +48,8 @@ import argparse
 from datetime import datetime
 from pathlib import Path
 
+import filelock
+
 from runtime_compat import enable_windows_utf8_stdio
 
 # ============================================================================
@@ -51,9 +62,11 @@ from project_locator import resolve_project_root
 try:
     from data_modules.index_manager import IndexManager
     from data_modules.config import get_config
+    from data_modules.state_store import SegmentedStateStore
 except ImportError:
     from scripts.data_modules.index_manager import IndexManager
     from scripts.data_modules.config import get_config
+    from scripts.data_modules.state_store import SegmentedStateStore
 
 # Windows UTF-8 编码修复
 if sys.platform == "win32":
@@ -89,6 +102,7 @@ class ArchiveManager:
         self.characters_archive = self.archive_dir / "characters.json"
         self.plot_threads_archive = self.archive_dir / "plot_threads.json"
         self.reviews_archive = self.archive_dir / "reviews.json"
+        self.marks_file = self.archive_dir / "archive_marks.json"
 
         # 归档规则配置
         self.config = {
@@ -99,32 +113,92 @@ class ArchiveManager:
             "chapter_trigger": 10                # 每 10 章检查一次
         }
 
-    def load_state(self):
-        """加载 state.json"""
+    def load_state(self, sections=None):
+        """加载 state.json（分段布局下 sections 可限定只读取需要的分段）"""
         if not self.state_file.exists():
             print(f"❌ state.json 不存在: {self.state_file}")
             sys.exit(1)
 
-        with open(self.state_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return SegmentedStateStore(self.state_file).load(sections, strict=True)
 
-    def save_state(self, state):
-        """保存 state.json（原子化写入）"""
-        # 使用集中式原子写入（自动备份）
-        atomic_write_json(self.state_file, state, use_lock=True, backup=True)
+    def save_state(self, state, sections=None):
+        """保存 state.json（原子化写入；sections 须与 load_state 时一致）"""
+        # 使用集中式原子写入（自动备份；分段布局同步写回各分段）
+        with filelock.FileLock(f"{self.state_file}.lock", timeout=10):
+            SegmentedStateStore(self.state_file).save(state, sections=sections, backup=True)
         print(f"✅ state.json 已原子化更新")
 
-    def load_archive(self, archive_file):
-        """加载归档文件"""
-        if not archive_file.exists():
-            return []
+    @staticmethod
+    def _segment_file(archive_file):
+        return archive_file.with_suffix(".jsonl")
 
-        with open(archive_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def load_archive(self, archive_file):
+        """加载归档（历史 JSON 数组 + 追加写入的 JSONL 段）"""
+        records = []
+        if archive_file.exists():
+            with open(archive_file, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+
+        segment_file = self._segment_file(archive_file)
+        if not segment_file.exists():
+            return records
+
+        with open(segment_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # 崩溃残留的半行
+
+        # save_archive 重写后、删除 JSONL 段前崩溃会留下重复记录，这里按内容去重
+        unique, seen = [], set()
+        for record in records:
+            key = json.dumps(record, ensure_ascii=False, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                unique.append(record)
+        return unique
+
+    def append_archive(self, archive_file, records):
+        """追加归档记录：只写新增的 JSONL 行（fsync），不读取已有归档"""
+        if not records:
+            return
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with filelock.FileLock(f"{archive_file}.lock", timeout=10):
+            with open(self._segment_file(archive_file), 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
 
     def save_archive(self, archive_file, data):
-        """保存归档文件（原子化写入）"""
+        """整体重写归档（原子化写入），并清空已合并进来的 JSONL 段；用于删除记录等场景"""
         atomic_write_json(archive_file, data, use_lock=True, backup=True)
+        segment_file = self._segment_file(archive_file)
+        if segment_file.exists():
+            segment_file.unlink()
+
+    def load_marks(self):
+        """读取各类数据的扫描高水位：{"characters": 章, "plot_threads": 章, "reviews": 章}"""
+        if not self.marks_file.exists():
+            return {}
+        try:
+            with open(self.marks_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        marks = payload.get("high_water") if isinstance(payload, dict) else None
+        return marks if isinstance(marks, dict) else {}
+
+    def save_marks(self, marks):
+        atomic_write_json(
+            self.marks_file,
+            {"high_water": marks, "updated_at": datetime.now().isoformat()},
+            use_lock=False,
+            backup=False,
+        )
 
     def check_trigger_conditions(self, state):
         """检查是否需要触发归档"""
@@ -145,13 +219,22 @@ class ArchiveManager:
             "chapter_trigger": chapter_trigger
         }
 
-    def identify_inactive_characters(self, state):
-        """识别不活跃的次要角色（v5.1 引入，v5.4 沿用）"""
+    def identify_inactive_characters(self, state, since_chapter=None):
+        """识别不活跃的次要角色（v5.1 引入，v5.4 沿用）
+
+        since_chapter 为上次扫描的截止线时，只查询 last_appearance 落在
+        (since_chapter, current_chapter - 阈值] 的角色。
+        """
         current_chapter = state.get("progress", {}).get("current_chapter", 0)
         threshold = self.config["character_inactive_threshold"]
 
-        # v5.1 引入: 从 SQLite 获取所有角色实体
-        characters = self._index_manager.get_entities_by_type("角色")
+        if since_chapter is None:
+            # v5.1 引入: 从 SQLite 获取所有角色实体
+            characters = self._index_manager.get_entities_by_type("角色")
+        else:
+            characters = self._index_manager.get_entities_last_seen_between(
+                "角色", since_chapter, current_chapter - threshold
+            )
 
         inactive = []
         for char in characters:
@@ -188,8 +271,8 @@ class ArchiveManager:
 
         return inactive
 
-    def identify_resolved_plot_threads(self, state):
-        """识别可归档的已回收伏笔"""
+    def identify_resolved_plot_threads(self, state, since_chapter=None):
+        """识别可归档的已回收伏笔（since_chapter：只考虑回收章节晚于该截止线的伏笔）"""
         current_chapter = state.get("progress", {}).get("current_chapter", 0)
         plot_threads = state.get("plot_threads", {}) or {}
         foreshadowing = plot_threads.get("foreshadowing", []) or []
@@ -209,6 +292,8 @@ class ArchiveManager:
                     resolved_chapter = int(item.get("resolved_chapter", 0))
                 except (TypeError, ValueError):
                     continue
+                if since_chapter is not None and 0 < resolved_chapter <= since_chapter:
+                    continue
                 chapters_since_resolved = current_chapter - resolved_chapter
                 if chapters_since_resolved >= threshold:
                     archivable.append({
@@ -226,6 +311,8 @@ class ArchiveManager:
                     resolved_chapter = int(item.get("resolved_chapter", 0))
                 except (TypeError, ValueError):
                     continue
+                if since_chapter is not None and 0 < resolved_chapter <= since_chapter:
+                    continue
                 chapters_since_resolved = current_chapter - resolved_chapter
                 if chapters_since_resolved >= threshold:
                     archivable.append({
@@ -236,8 +323,8 @@ class ArchiveManager:
 
         return archivable
 
-    def identify_old_reviews(self, state):
-        """识别可归档的旧审查报告"""
+    def identify_old_reviews(self, state, since_chapter=None):
+        """识别可归档的旧审查报告（since_chapter：只考虑结束章节晚于该截止线的报告）"""
         current_chapter = state.get("progress", {}).get("current_chapter", 0)
         reviews = state.get("review_checkpoints", [])
         threshold = self.config["review_old_threshold"]
@@ -283,6 +370,8 @@ class ArchiveManager:
         old_reviews = []
         for review in reviews:
             review_chapter = _parse_end_chapter(review)
+            if since_chapter is not None and 0 < review_chapter <= since_chapter:
+                continue
             chapters_since_review = current_chapter - review_chapter
 
             if chapters_since_review >= threshold:
@@ -299,11 +388,9 @@ class ArchiveManager:
         if not inactive_list:
             return 0
 
-        # 加载现有归档
-        archived = self.load_archive(self.characters_archive)
-
         # 添加时间戳
         timestamp = datetime.now().isoformat()
+        archived = []
         for item in inactive_list:
             item["character"]["archived_at"] = timestamp
             archived.append(item["character"])
@@ -321,7 +408,7 @@ class ArchiveManager:
                     print(f"⚠️ 实体状态更新失败（不影响归档）: {e}")
 
         if not dry_run:
-            self.save_archive(self.characters_archive, archived)
+            self.append_archive(self.characters_archive, archived)
 
         return len(inactive_list)
 
@@ -330,17 +417,15 @@ class ArchiveManager:
         if not resolved_list:
             return 0
 
-        # 加载现有归档
-        archived = self.load_archive(self.plot_threads_archive)
-
         # 添加时间戳
         timestamp = datetime.now().isoformat()
+        archived = []
         for item in resolved_list:
             item["thread"]["archived_at"] = timestamp
             archived.append(item["thread"])
 
         if not dry_run:
-            self.save_archive(self.plot_threads_archive, archived)
+            self.append_archive(self.plot_threads_archive, archived)
 
         return len(resolved_list)
 
@@ -349,17 +434,15 @@ class ArchiveManager:
         if not old_reviews_list:
             return 0
 
-        # 加载现有归档
-        archived = self.load_archive(self.reviews_archive)
-
         # 添加时间戳
         timestamp = datetime.now().isoformat()
+        archived = []
         for item in old_reviews_list:
             item["review"]["archived_at"] = timestamp
             archived.append(item["review"])
 
         if not dry_run:
-            self.save_archive(self.reviews_archive, archived)
+            self.append_archive(self.reviews_archive, archived)
 
         return len(old_reviews_list)
 
@@ -405,9 +488,11 @@ class ArchiveManager:
 
         return state
 
-    def run_auto_check(self, force=False, dry_run=False):
-        """自动归档检查"""
-        state = self.load_state()
+    def run_auto_check(self, force=False, dry_run=False, full_scan=False):
+        """自动归档检查（默认按高水位增量扫描；full_scan=True 时全量扫描）"""
+        # 归档只改写伏笔（根文档）与审查报告分段，其余分段不读不写
+        sections = ("review_checkpoints",)
+        state = self.load_state(sections)
 
         # 检查触发条件
         trigger = self.check_trigger_conditions(state)
@@ -422,10 +507,18 @@ class ArchiveManager:
         print(f"   文件大小: {trigger['file_size_mb']:.2f} MB")
         print(f"   当前章节: {trigger['current_chapter']}")
 
-        # 识别可归档数据
-        inactive_chars = self.identify_inactive_characters(state)
-        resolved_threads = self.identify_resolved_plot_threads(state)
-        old_reviews = self.identify_old_reviews(state)
+        # 识别可归档数据（高水位之前的数据在上次扫描时已处理过）
+        marks = {} if full_scan else self.load_marks()
+        current_chapter = trigger["current_chapter"]
+        new_marks = {
+            "characters": current_chapter - self.config["character_inactive_threshold"],
+            "plot_threads": current_chapter - self.config["plot_resolved_threshold"],
+            "reviews": current_chapter - self.config["review_old_threshold"],
+        }
+        new_marks = {key: max(0, value, int(marks.get(key, 0) or 0)) for key, value in new_marks.items()}
+        inactive_chars = self.identify_inactive_characters(state, since_chapter=marks.get("characters"))
+        resolved_threads = self.identify_resolved_plot_threads(state, since_chapter=marks.get("plot_threads"))
+        old_reviews = self.identify_old_reviews(state, since_chapter=marks.get("reviews"))
 
         # 输出统计
         print(f"\n📊 归档统计:")
@@ -435,6 +528,8 @@ class ArchiveManager:
 
         if not (inactive_chars or resolved_threads or old_reviews):
             print("\n✅ 无需归档（无符合条件的数据）")
+            if not dry_run:
+                self.save_marks(new_marks)
             return
 
         # Dry-run 模式
@@ -462,7 +557,8 @@ class ArchiveManager:
 
         # 从 state.json 中移除
         state = self.remove_from_state(state, inactive_chars, resolved_threads, old_reviews)
-        self.save_state(state)
+        self.save_state(state, sections=sections)
+        self.save_marks(new_marks)
 
         # 最终统计
         print(f"\n✅ 归档完成:")
@@ -526,8 +622,9 @@ class ArchiveManager:
         # 计算归档文件大小
         total_size = 0
         for archive_file in [self.characters_archive, self.plot_threads_archive, self.reviews_archive]:
-            if archive_file.exists():
-                total_size += archive_file.stat().st_size
+            for path in (archive_file, self._segment_file(archive_file)):
+                if path.exists():
+                    total_size += path.stat().st_size
 
         print(f"   归档大小: {total_size / 1024:.2f} KB")
 
@@ -542,6 +639,7 @@ def main():
     parser.add_argument("--auto-check", action="store_true", help="自动归档检查")
     parser.add_argument("--force", action="store_true", help="强制归档（忽略触发条件）")
     parser.add_argument("--dry-run", action="store_true", help="Dry-run 模式（仅显示将被归档的数据）")
+    parser.add_argument("--full-scan", action="store_true", help="忽略扫描高水位，全量检查")
     parser.add_argument("--restore-character", metavar="NAME", help="恢复归档的角色")
     parser.add_argument("--stats", action="store_true", help="显示归档统计")
     parser.add_argument("--project-root", metavar="PATH", help="项目根目录（默认为当前目录）")
@@ -559,7 +657,7 @@ def main():
 
     # 执行操作
     if args.auto_check or args.force:
-        manager.run_auto_check(force=args.force, dry_run=args.dry_run)
+        manager.run_auto_check(force=args.force, dry_run=args.dry_run, full_scan=args.full_scan)
     elif args.restore_character:
         manager.restore_character(args.restore_character)
     elif args.stats:
@@ -123,6 +123,7 @@ __pycache__/
 # Don't ignore .webnovel (we need to track state.json)
 # But ignore cache files
 .webnovel/context_cache.json
+.webnovel/state.sock
 
 # Env files
 .env
@@ -211,6 +212,17 @@ __pycache__/
                 shutil.copy2(state_file, target_state_dir / "state.json")
                 copied.append(".webnovel/state.json")
 
+                # 日志模式下尚未压缩的增量（state.journal.jsonl）与分段布局下的冷数据分段一并备份
+                journal_file = state_file.parent / "state.journal.jsonl"
+                if journal_file.exists():
+                    shutil.copy2(journal_file, target_state_dir / "state.journal.jsonl")
+                    copied.append(".webnovel/state.journal.jsonl")
+
+                segment_dir = state_file.parent / "state_segments"
+                if segment_dir.is_dir():
+                    shutil.copytree(segment_dir, target_state_dir / "state_segments")
+                    copied.append(".webnovel/state_segments")
+
             snapshots = sorted(
                 (path for path in backup_dir.glob("snapshot_ch*") if path.is_dir()),
                 key=lambda path: path.name,
@@ -1,20 +1,57 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""
+章节大纲读取：拆分大纲（大纲/第N章*.md）优先，否则从卷详细大纲中截取本章小节。
+
+卷大纲按文件解析一次建成 OutlineIndex（章节标题 → 文本区间，按章懒解析的 plot/directive 字段），
+按 (mtime_ns, size) 在进程内缓存；大纲目录的文件列表按目录 mtime 缓存，
+state.json 中的卷区间按 state 版本戳缓存。同一章在一次上下文构建里被多处读取时只付一次解析成本。
+"""
 
 from __future__ import annotations
 
-import json
+import copy
+import fnmatch
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     from chapter_paths import volume_num_for_chapter
+    from data_modules.context_cache import is_racy_mtime
+    from data_modules.state_store import read_state_sections, state_stamp
 except ImportError:  # pragma: no cover
     from scripts.chapter_paths import volume_num_for_chapter
+    from scripts.data_modules.context_cache import is_racy_mtime
+    from scripts.data_modules.state_store import read_state_sections, state_stamp
 
 
 _CHAPTER_RANGE_RE = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+_OUTLINE_HEADING_RE = re.compile(r"###\s*第\s*(\d+)\s*章[：:]")
+
+# 进程内缓存上限：超过后整体清空，避免长驻进程里切换大量项目时无限增长
+_CACHE_LIMIT = 64
+_cache_lock = threading.Lock()
+_volume_ranges_cache: Dict[Path, Tuple[Any, List[Tuple[int, int, int]]]] = {}
+_outline_dir_cache: Dict[Path, Tuple[int, Tuple[str, ...]]] = {}
+_outline_index_cache: Dict[Path, "OutlineIndex"] = {}
+
+
+def _cache_put(cache: Dict[Path, Any], key: Path, value: Any) -> None:
+    with _cache_lock:
+        if len(cache) >= _CACHE_LIMIT and key not in cache:
+            cache.clear()
+        cache[key] = value
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 def _parse_chapters_range(value: object) -> tuple[int, int] | None:
@@ -33,38 +70,40 @@ def _parse_chapters_range(value: object) -> tuple[int, int] | None:
     return start, end
 
 
-def volume_num_for_chapter_from_state(project_root: Path, chapter_num: int) -> int | None:
-    state_path = project_root / ".webnovel" / "state.json"
-    if not state_path.exists():
-        return None
+def _planned_volume_ranges(project_root: Path) -> List[Tuple[int, int, int]]:
+    """state.json progress.volumes_planned 中合法的 (start, end, volume)，按 state 版本戳缓存。"""
+    state_path = Path(project_root) / ".webnovel" / "state.json"
+    stamp = state_stamp(state_path)
+    if stamp is None:
+        return []
+    cache_key = state_path.resolve()
+    cached = _volume_ranges_cache.get(cache_key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
 
+    ranges: List[Tuple[int, int, int]] = []
     try:
-        state = json.loads(state_path.read_text(encoding="utf-8"))
+        state = read_state_sections(state_path, ("progress",))
     except Exception:
-        return None
-
-    if not isinstance(state, dict):
-        return None
-
+        state = {}
     progress = state.get("progress")
-    if not isinstance(progress, dict):
-        return None
-
-    volumes_planned = progress.get("volumes_planned")
-    if not isinstance(volumes_planned, list):
-        return None
-
-    best: tuple[int, int] | None = None
-    for item in volumes_planned:
+    volumes_planned = progress.get("volumes_planned") if isinstance(progress, dict) else None
+    for item in volumes_planned if isinstance(volumes_planned, list) else []:
         if not isinstance(item, dict):
             continue
         volume = item.get("volume")
         if not isinstance(volume, int) or volume <= 0:
             continue
         parsed = _parse_chapters_range(item.get("chapters_range"))
-        if not parsed:
-            continue
-        start, end = parsed
+        if parsed:
+            ranges.append((parsed[0], parsed[1], volume))
+    _cache_put(_volume_ranges_cache, cache_key, (stamp, ranges))
+    return ranges
+
+
+def volume_num_for_chapter_from_state(project_root: Path, chapter_num: int) -> int | None:
+    best: tuple[int, int] | None = None
+    for start, end, volume in _planned_volume_ranges(project_root):
         if start <= chapter_num <= end:
             candidate = (start, volume)
             if best is None or candidate[0] > best[0] or (candidate[0] == best[0] and candidate[1] < best[1]):
@@ -73,6 +112,25 @@ def volume_num_for_chapter_from_state(project_root: Path, chapter_num: int) -> i
     return best[1] if best else None
 
 
+def _outline_dir_names(outline_dir: Path) -> Tuple[str, ...]:
+    """大纲目录的文件名列表（已排序），按目录 mtime 缓存。"""
+    try:
+        mtime_ns = os.stat(outline_dir).st_mtime_ns
+    except OSError:
+        return ()
+    cache_key = outline_dir.resolve()
+    cached = _outline_dir_cache.get(cache_key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    try:
+        names = tuple(sorted(entry.name for entry in os.scandir(outline_dir)))
+    except OSError:
+        names = ()
+    if not is_racy_mtime(mtime_ns):
+        _cache_put(_outline_dir_cache, cache_key, (mtime_ns, names))
+    return names
+
+
 def _find_split_outline_file(outline_dir: Path, chapter_num: int) -> Path | None:
     patterns = [
         f"第{chapter_num}章*.md",
@@ -80,10 +138,13 @@ def _find_split_outline_file(outline_dir: Path, chapter_num: int) -> Path | None
         f"第{chapter_num:03d}章*.md",
         f"第{chapter_num:04d}章*.md",
     ]
+    names = _outline_dir_names(outline_dir)
+    if not names:
+        return None
     for pattern in patterns:
-        matches = sorted(outline_dir.glob(pattern))
+        matches = [name for name in names if fnmatch.fnmatchcase(name, pattern)]
         if matches:
-            return matches[0]
+            return outline_dir / matches[0]
     return None
 
 
@@ -98,13 +159,16 @@ def _find_volume_outline_file(project_root: Path, chapter_num: int) -> Path | No
     return next((path for path in candidates if path.exists()), None)
 
 
-def _extract_outline_section(content: str, chapter_num: int) -> str | None:
-    patterns = [
+def _outline_section_patterns(chapter_num: int) -> list[str]:
+    return [
         rf"###\s*第\s*{chapter_num}\s*章[：:]\s*(.+?)(?=###\s*第\s*\d+\s*章|##\s|$)",
         rf"###\s*第{chapter_num}章[：:]\s*(.+?)(?=###\s*第\d+章|##\s|$)",
     ]
-    for pattern in patterns:
-        match = re.search(pattern, content, re.DOTALL)
+
+
+def _extract_outline_section(content: str, chapter_num: int, pos: int = 0) -> str | None:
+    for pattern in _outline_section_patterns(chapter_num):
+        match = re.compile(pattern, re.DOTALL).search(content, pos)
         if match:
             return match.group(0).strip()
     return None
@@ -135,15 +199,97 @@ def _parse_chinese_chapter_num(value: str) -> int | None:
     return parsed or None
 
 
-def _extract_directive_section(content: str, chapter_num: int) -> str | None:
-    matches = list(_CHAPTER_HEADING_RE.finditer(content))
-    for index, match in enumerate(matches):
-        parsed = _parse_chinese_chapter_num(match.group(2))
-        if parsed != chapter_num:
-            continue
-        end = matches[index + 1].start() if index + 1 < len(matches) else len(content)
-        return content[match.start():end].strip()
-    return _extract_outline_section(content, chapter_num)
+class OutlineIndex:
+    """单个卷大纲文件的解析索引。
+
+    建索引时只扫描一遍标题：记录每章第一个「### 第N章：」标题的位置（大纲小节从这里匹配，
+    与全文 re.search 的结果一致），以及按任意级别章节标题切出的指令区间。
+    小节文本与 plot/directive 解析结果按章懒计算并缓存，返回值为副本。
+    """
+
+    def __init__(self, path: Path, stamp: Tuple[int, int], content: str):
+        self.path = path
+        self.stamp = stamp
+        self.content = content
+        self._outline_heads: Dict[int, int] = {}
+        for match in _OUTLINE_HEADING_RE.finditer(content):
+            self._outline_heads.setdefault(int(match.group(1)), match.start())
+        self._directive_spans: Dict[int, Tuple[int, int]] = {}
+        headings = list(_CHAPTER_HEADING_RE.finditer(content))
+        for index, match in enumerate(headings):
+            parsed = _parse_chinese_chapter_num(match.group(2))
+            if parsed is None or parsed in self._directive_spans:
+                continue
+            end = headings[index + 1].start() if index + 1 < len(headings) else len(content)
+            self._directive_spans[parsed] = (match.start(), end)
+        self._lock = threading.Lock()
+        self._memo: Dict[Tuple[str, int], Any] = {}
+
+    def _cached(self, kind: str, chapter_num: int, build) -> Any:
+        key = (kind, chapter_num)
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = build()
+        with self._lock:
+            self._memo[key] = value
+        return value
+
+    def chapters(self) -> List[int]:
+        return sorted(set(self._outline_heads) | set(self._directive_spans))
+
+    def outline_section(self, chapter_num: int) -> str | None:
+        pos = self._outline_heads.get(chapter_num)
+        if pos is None:
+            return None
+        return self._cached("outline", chapter_num, lambda: _extract_outline_section(self.content, chapter_num, pos))
+
+    def directive_section(self, chapter_num: int) -> str | None:
+        span = self._directive_spans.get(chapter_num)
+        if span is None:
+            return self.outline_section(chapter_num)
+        return self.content[span[0]:span[1]].strip()
+
+    def plot_structure(self, chapter_num: int) -> Dict[str, Any]:
+        value = self._cached(
+            "plot",
+            chapter_num,
+            lambda: parse_chapter_plot_structure(self.outline_section(chapter_num) or ""),
+        )
+        return copy.deepcopy(value)
+
+    def directive(self, chapter_num: int) -> Dict[str, Any]:
+        def _build() -> Dict[str, Any]:
+            section = self.directive_section(chapter_num)
+            return parse_chapter_execution_directive(section) if section is not None else {}
+
+        return copy.deepcopy(self._cached("directive", chapter_num, _build))
+
+
+def load_outline_index(path: Path) -> OutlineIndex | None:
+    """读取卷大纲的解析索引；文件 (mtime_ns, size) 未变时复用进程内缓存。"""
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return None
+    cache_key = Path(path).resolve()
+    cached = _outline_index_cache.get(cache_key)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    index = OutlineIndex(Path(path), stamp, content)
+    if not is_racy_mtime(stamp[0]):
+        _cache_put(_outline_index_cache, cache_key, index)
+    return index
+
+
+def _volume_outline_index(project_root: Path, chapter_num: int) -> OutlineIndex | None:
+    volume_outline = _find_volume_outline_file(project_root, chapter_num)
+    if volume_outline is None:
+        return None
+    return load_outline_index(volume_outline)
 
 
 def load_chapter_outline(project_root: Path, chapter_num: int, max_chars: int | None = 1500) -> str:
@@ -153,11 +299,11 @@ def load_chapter_outline(project_root: Path, chapter_num: int, max_chars: int |
     if split_outline is not None:
         return split_outline.read_text(encoding="utf-8")
 
-    volume_outline = _find_volume_outline_file(project_root, chapter_num)
-    if volume_outline is None:
+    index = _volume_outline_index(project_root, chapter_num)
+    if index is None:
         return f"⚠️ 大纲文件不存在：第 {chapter_num} 章"
 
-    outline = _extract_outline_section(volume_outline.read_text(encoding="utf-8"), chapter_num)
+    outline = index.outline_section(chapter_num)
     if outline is None:
         return f"⚠️ 未找到第 {chapter_num} 章的大纲"
 
@@ -325,6 +471,11 @@ def parse_chapter_plot_structure(outline_text: str) -> Dict[str, Any]:
 
 
 def load_chapter_plot_structure(project_root: Path, chapter_num: int) -> Dict[str, Any]:
+    split_outline = _find_split_outline_file(project_root / "大纲", chapter_num)
+    if split_outline is None:
+        index = _volume_outline_index(project_root, chapter_num)
+        if index is not None:
+            return index.plot_structure(chapter_num)
     outline = load_chapter_outline(project_root, chapter_num, max_chars=None)
     return parse_chapter_plot_structure(outline)
 
@@ -384,10 +535,17 @@ def load_chapter_execution_directive(project_root: Path, chapter_num: int) -> Di
     if split_outline is not None:
         return parse_chapter_execution_directive(split_outline.read_text(encoding="utf-8"))
 
-    volume_outline = _find_volume_outline_file(project_root, chapter_num)
-    if volume_outline is None:
+    index = _volume_outline_index(project_root, chapter_num)
+    if index is None:
         return {}
-    section = _extract_directive_section(volume_outline.read_text(encoding="utf-8"), chapter_num)
-    if section is None:
-        return {}
-    return parse_chapter_execution_directive(section)
+    return index.directive(chapter_num)
+
+
+def load_chapter_execution_directives(project_root: Path, start: int, end: int) -> Dict[int, Dict[str, Any]]:
+    """批量读取 [start, end] 各章的执行指令；同一卷大纲只解析一次，没有指令的章节不出现在结果里。"""
+    directives: Dict[int, Dict[str, Any]] = {}
+    for chapter_num in range(max(1, int(start)), int(end) + 1):
+        directive = load_chapter_execution_directive(project_root, chapter_num)
+        if directive:
+            directives[chapter_num] = directive
+    return directives
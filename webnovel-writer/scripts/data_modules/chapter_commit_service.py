@@ -14,6 +14,7 @@ from .chapter_commit_schema import (
     ReviewResult,
 )
 from .commit_artifacts import extraction_list
+from .commit_catalog import CommitCatalog
 from .config import DataModulesConfig
 from .event_log_store import EventLogStore
 from .event_projection_router import EventProjectionRouter
@@ -91,8 +92,10 @@ class ChapterCommitService:
     def persist_commit(self, payload: Dict[str, Any]) -> Path:
         target = self.project_root / ".story-system" / "commits"
         target.mkdir(parents=True, exist_ok=True)
-        path = target / f"chapter_{int(payload['meta']['chapter']):03d}.commit.json"
+        chapter = int(payload['meta']['chapter'])
+        path = target / f"chapter_{chapter:03d}.commit.json"
         write_json(path, payload)
+        CommitCatalog.from_project_root(self.project_root).record(chapter, path)
         return path
 
     def _projection_writers(self) -> dict[str, Any]:
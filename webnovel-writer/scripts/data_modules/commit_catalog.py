@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+chapter commit 目录索引（.story-system/commits/catalog.json）。
+
+记录每个 ``chapter_XXX.commit.json`` 的 status / 文件名 / mtime / size / sha256，
+由 ChapterCommitService.persist_commit 写入时维护。查询“≤ N 的最新 commit / 最新 accepted commit”
+时只对目录做一次 stat 校验，再在有序章节号上二分，不再逐个解析 commit 文件。
+
+目录里被其他途径写入或删除的 commit 文件会在校验时发现：只重新解析 stat 变化的文件，
+结果回写目录索引。索引文件本身丢失或损坏时按目录重建，因此它始终只是可再生的缓存。
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .story_contracts import StoryContractPaths, read_json_if_exists
+
+try:
+    from security_utils import AtomicWriteError, atomic_write_json, read_json_safe
+except ImportError:  # pragma: no cover
+    from scripts.security_utils import AtomicWriteError, atomic_write_json, read_json_safe
+
+
+CATALOG_FILENAME = "catalog.json"
+CATALOG_VERSION = 1
+_COMMIT_NAME_RE = re.compile(r"^chapter_(\d+)\.commit\.json$")
+
+
+def _status_of(payload: Any) -> str:
+    if not isinstance(payload, dict) or not payload:
+        return "empty"
+    meta = payload.get("meta")
+    status = meta.get("status") if isinstance(meta, dict) else None
+    return str(status or "missing").strip() or "missing"
+
+
+def _describe(path: Path, raw: bytes, st: os.stat_result) -> Dict[str, Any]:
+    try:
+        status = _status_of(json.loads(raw.decode("utf-8")))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        status = "invalid"
+    return {
+        "status": status,
+        "file": path.name,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+    }
+
+
+class CommitCatalog:
+    def __init__(self, paths: StoryContractPaths):
+        self.paths = paths
+        self.commits_dir = paths.commits_dir
+        self.path = self.commits_dir / CATALOG_FILENAME
+        self._entries: Optional[Dict[int, Dict[str, Any]]] = None
+        self._sorted: Dict[Optional[str], List[int]] = {}
+
+    @classmethod
+    def from_project_root(cls, project_root: str | Path) -> "CommitCatalog":
+        return cls(StoryContractPaths.from_project_root(project_root))
+
+    def _read(self) -> Dict[int, Dict[str, Any]]:
+        payload = read_json_safe(self.path, default={})
+        if not isinstance(payload, dict) or payload.get("version") != CATALOG_VERSION:
+            return {}
+        entries: Dict[int, Dict[str, Any]] = {}
+        for key, entry in (payload.get("entries") or {}).items():
+            if isinstance(entry, dict) and str(key).isdigit():
+                entries[int(key)] = entry
+        return entries
+
+    def _write(self, entries: Dict[int, Dict[str, Any]]) -> None:
+        payload = {
+            "version": CATALOG_VERSION,
+            "entries": {str(chapter): entries[chapter] for chapter in sorted(entries)},
+        }
+        # 并发写入的后写者覆盖先写者也无妨：下次 refresh 会按 stat 补齐
+        atomic_write_json(self.path, payload, use_lock=False, backup=False, compact=True, skip_unchanged=True)
+
+    def record(self, chapter: int, commit_path: Path) -> Dict[str, Any]:
+        """登记刚写入的 commit 文件。"""
+        commit_path = Path(commit_path)
+        entries = self._read()
+        entry = _describe(commit_path, commit_path.read_bytes(), commit_path.stat())
+        entries[int(chapter)] = entry
+        self._write(entries)
+        self._entries = entries
+        self._sorted = {}
+        return entry
+
+    def refresh(self) -> Dict[int, Dict[str, Any]]:
+        """按目录 stat 校验索引，只重新解析新增或变化的 commit 文件。"""
+        entries = self._read()
+        current: Dict[int, Dict[str, Any]] = {}
+        changed = False
+        try:
+            scan = list(os.scandir(self.commits_dir))
+        except OSError:
+            scan = []
+        for dir_entry in scan:
+            match = _COMMIT_NAME_RE.match(dir_entry.name)
+            if not match or not dir_entry.is_file():
+                continue
+            chapter = int(match.group(1))
+            if chapter <= 0:
+                continue
+            st = dir_entry.stat()
+            known = entries.get(chapter)
+            if (
+                known is not None
+                and known.get("file") == dir_entry.name
+                and known.get("mtime_ns") == st.st_mtime_ns
+                and known.get("size") == st.st_size
+            ):
+                current[chapter] = known
+                continue
+            path = Path(dir_entry.path)
+            try:
+                current[chapter] = _describe(path, path.read_bytes(), st)
+            except OSError:
+                continue
+            changed = True
+        if scan and (changed or set(current) != set(entries)):
+            try:
+                self._write(current)
+            except AtomicWriteError:
+                pass  # 只读场景下索引落盘失败不影响本次查询
+        self._entries = current
+        self._sorted = {}
+        return current
+
+    def entries(self) -> Dict[int, Dict[str, Any]]:
+        if self._entries is None:
+            return self.refresh()
+        return self._entries
+
+    def latest(self, chapter: int, *, status: Optional[str] = None) -> Optional[int]:
+        """返回 ≤ chapter 的最新 commit 章节号；指定 status 时只看该状态。"""
+        entries = self.entries()
+        chapters = self._sorted.get(status)
+        if chapters is None:
+            chapters = sorted(
+                ch for ch, entry in entries.items()
+                if entry.get("status") != "empty" and (status is None or entry.get("status") == status)
+            )
+            self._sorted[status] = chapters
+        pos = bisect.bisect_right(chapters, int(chapter))
+        return chapters[pos - 1] if pos else None
+
+    def load(self, chapter: Optional[int]) -> Optional[Dict[str, Any]]:
+        if chapter is None:
+            return None
+        entry = self.entries().get(chapter) or {}
+        return read_json_if_exists(self.commits_dir / str(entry.get("file") or self.paths.commit_json(chapter).name))
@@ -106,10 +106,22 @@ class DataModulesConfig:
     def scratchpad_file(self) -> Path:
         return self.webnovel_dir / "memory_scratchpad.json"
 
+    @property
+    def scratchpad_db(self) -> Path:
+        return self.webnovel_dir / "memory_scratchpad.db"
+
     @property
     def index_db(self) -> Path:
         return self.webnovel_dir / "index.db"
 
+    @property
+    def summary_index_db(self) -> Path:
+        return self.webnovel_dir / "summary_index.db"
+
+    @property
+    def context_cache_file(self) -> Path:
+        return self.webnovel_dir / "context_cache.json"
+
     # v5.1 引入: alias_index_file 已废弃，别名存储在 index.db aliases 表
 
     @property
@@ -199,6 +211,21 @@ class DataModulesConfig:
     extraction_confidence_high: float = 0.8
     extraction_confidence_medium: float = 0.5
 
+    # ================= state.json 写入模式 =================
+    # 日志模式：save_state 只追加补丁记录到 state.journal.jsonl，超过阈值时压缩回快照
+    state_journal_enabled: bool = field(
+        default_factory=lambda: os.getenv("WEBNOVEL_STATE_JOURNAL", "").strip().lower() in {"1", "true", "yes", "on"}
+    )
+    state_journal_max_records: int = 200
+    state_journal_max_bytes: int = 512 * 1024
+    # 状态守护进程：检测到正在运行的 state_daemon 时，save_state / update_state / 记忆写入改为向其提交增量，
+    # 由守护进程按 flush_interval 合并批量落盘；未运行时各 CLI 照旧直写
+    state_daemon_enabled: bool = field(
+        default_factory=lambda: os.getenv("WEBNOVEL_STATE_DAEMON", "").strip().lower() not in {"0", "false", "no", "off"}
+    )
+    state_daemon_flush_interval: float = 0.05
+    state_daemon_timeout: float = 30.0
+
     # ================= 列表截断限制 =================
     max_disambiguation_warnings: int = 500
     max_disambiguation_pending: int = 1000
@@ -213,6 +240,12 @@ class DataModulesConfig:
     context_story_skeleton_max_samples: int = 5
     context_story_skeleton_snippet_chars: int = 400
     context_extra_section_budget: int = 800
+    # 上下文包的全局 token 预算；> 0 时按 section 优先级与条目排序装配，超出部分不加载（0 为不限）
+    context_token_budget: int = 0
+    # 上下文 section 并发加载的线程数；1 表示顺序执行
+    context_parallel_workers: int = 4
+    # 按输入指纹复用上次构建的 section 结果（.webnovel/context_cache.json）
+    context_section_cache_enabled: bool = True
     context_ranker_enabled: bool = True
     context_ranker_recency_weight: float = 0.7
     context_ranker_frequency_weight: float = 0.3
@@ -227,6 +260,8 @@ class DataModulesConfig:
         "断裂",
     )
     context_ranker_debug: bool = False
+    # 排序打分后端：auto（NumPy 可用且条目足够多时向量化）/ numpy / python
+    context_ranker_backend: str = "auto"
     context_reader_signal_enabled: bool = True
     context_reader_signal_recent_limit: int = 5
     context_reader_signal_window_chapters: int = 20
@@ -282,6 +317,11 @@ class DataModulesConfig:
     memory_orchestrator_source_window: int = 20
     memory_compactor_enabled: bool = True
     memory_compactor_threshold: int = 500
+    # scratchpad 存储后端："json"（整文件 memory_scratchpad.json）或 "sqlite"（memory_scratchpad.db，
+    # 按行 upsert；JSON 通过 `memory export` 导出保持兼容）
+    memory_scratchpad_backend: str = field(
+        default_factory=lambda: os.getenv("WEBNOVEL_MEMORY_BACKEND", "json").strip().lower() or "json"
+    )
 
     export_recent_changes_slice: int = 20
     export_disambiguation_slice: int = 20
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上下文 section 级缓存（.webnovel/context_cache.json）。
+
+每个 section 由调用方给出输入指纹（文件 mtime/size、index.db 表级数据版本、章节窗口等），
+指纹的 sha256 作为缓存键。键不变则直接复用上次结果，只有输入变化的 section 才重新计算，
+因此相邻章节连续构建、重复运行 extract_chapter_context 时大部分 section 可以命中。
+
+缓存文件只是可再生的加速层：丢失、损坏或写入失败都只会退化为全部重新计算。
+mtime 落在最近 RACY_WINDOW_NS 内的文件，其 (mtime_ns, size) 不足以区分内容，相关 section 本次不读写缓存。
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from security_utils import AtomicWriteError, atomic_write_json, read_json_safe
+except ImportError:  # pragma: no cover
+    from scripts.security_utils import AtomicWriteError, atomic_write_json, read_json_safe
+
+
+CACHE_VERSION = 1
+# mtime 落在最近这段时间内的文件不进缓存：文件系统时间戳粒度较粗，同一刻内的再次修改可能不改变 mtime
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class RacyStampError(Exception):
+    """输入文件刚被修改，(mtime_ns, size) 可能与改写后相同，不能作为缓存指纹。"""
+
+
+def is_racy_mtime(mtime_ns: int) -> bool:
+    return time.time_ns() - mtime_ns < RACY_WINDOW_NS
+
+
+def fingerprint_key(parts: Any) -> str:
+    """把任意可 JSON 化的指纹结构归一为稳定的 sha256 键。"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """文件的 (mtime_ns, size)；文件不存在时返回 None，mtime 仍在竞态窗口内时抛出 RacyStampError。"""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    if is_racy_mtime(st.st_mtime_ns):
+        raise RacyStampError(str(path))
+    return st.st_mtime_ns, st.st_size
+
+
+class SectionCache:
+    def __init__(self, path: Path, enabled: bool = True):
+        self.path = Path(path)
+        self.enabled = bool(enabled)
+        self._lock = threading.Lock()
+        self._sections: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+
+    def _entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._sections is None:
+            payload = read_json_safe(self.path, default={})
+            sections = payload.get("sections") if isinstance(payload, dict) else None
+            if not isinstance(payload, dict) or payload.get("version") != CACHE_VERSION or not isinstance(sections, dict):
+                sections = {}
+            self._sections = {k: v for k, v in sections.items() if isinstance(v, dict) and "key" in v}
+        return self._sections
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        """返回 (是否命中, 值)；命中时返回深拷贝，调用方可以随意修改。"""
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries().get(name)
+            if entry is None or entry.get("key") != key:
+                return False, None
+            return True, copy.deepcopy(entry.get("value"))
+
+    def put(self, name: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            # 按落盘后的形态保存，保证命中时的值与从文件重新加载时一致
+            stored = json.loads(json.dumps(value, ensure_ascii=False))
+        except (TypeError, ValueError):
+            return  # 不可 JSON 化的结果不缓存
+        with self._lock:
+            entries = self._entries()
+            current = entries.get(name)
+            if current is not None and current.get("key") == key and current.get("value") == stored:
+                return
+            entries[name] = {"key": key, "value": stored}
+            self._dirty = True
+
+    def save(self) -> bool:
+        """有变化时落盘；返回是否写入。"""
+        if not self.enabled or not self._dirty:
+            return False
+        with self._lock:
+            payload = {"version": CACHE_VERSION, "sections": dict(sorted(self._entries().items()))}
+            try:
+                atomic_write_json(
+                    self.path, payload, use_lock=False, backup=False, compact=True, skip_unchanged=True
+                )
+            except AtomicWriteError:
+                return False  # 只读场景下缓存落盘失败不影响本次结果
+            self._dirty = False
+        return True
@@ -6,9 +6,9 @@ ContextManager - assemble context packs with weighted priorities.
 from __future__ import annotations
 
 import json
-import re
 import sys
 import logging
+import time
 from pathlib import Path
 
 from runtime_compat import enable_windows_utf8_stdio
@@ -26,11 +26,16 @@ except ImportError:  # pragma: no cover
     )
 
 from .config import get_config
+from .context_cache import SectionCache, file_stamp
+from .context_packer import BudgetedPacker
 from .index_manager import IndexManager, WritingChecklistScoreMeta
 from .context_ranker import ContextRanker
 from .prewrite_validator import PrewriteValidator
+from .section_scheduler import SectionScheduler
+from .state_store import load_state
 from .story_contracts import read_json_if_exists
 from .story_runtime_sources import RuntimeSourceSnapshot, load_runtime_sources
+from .summary_store import SUMMARY_SECTION_RE, SummaryStore
 from .context_weights import (
     DEFAULT_TEMPLATE as CONTEXT_DEFAULT_TEMPLATE,
     TEMPLATE_WEIGHTS as CONTEXT_TEMPLATE_WEIGHTS,
@@ -92,26 +97,61 @@ class ContextManager:
         "preferences",
         "alerts",
     ]
-    SUMMARY_SECTION_RE = re.compile(r"##\s*剧情摘要\s*\r?\n(.*?)(?=\r?\n##|\Z)", re.DOTALL)
+    # 上下文包各 section 依赖的调度 section（顺序即 _build_pack 的输出顺序）
+    PACK_SOURCES = {
+        "core": ("state", "chapter_outline", "recent_summaries", "long_term_memory"),
+        "story_contract": ("story_contract",),
+        "runtime_status": ("runtime_sources",),
+        "latest_commit": ("runtime_sources",),
+        "prewrite_validation": ("prewrite_validation",),
+        "scene": ("state", "appearing_characters"),
+        "global": ("worldview_skeleton", "power_system_skeleton", "style_contract_ref"),
+        "reader_signal": ("reader_signal",),
+        "genre_profile": ("genre_profile",),
+        "writing_guidance": ("writing_guidance",),
+        "plot_structure": ("plot_structure",),
+        "story_skeleton": ("story_skeleton",),
+        "preferences": ("preferences",),
+        "memory": ("memory",),
+        "long_term_memory": ("long_term_memory",),
+        "alerts": ("state",),
+    }
+    SUMMARY_SECTION_RE = SUMMARY_SECTION_RE
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, index_manager: Optional[IndexManager] = None):
         self.config = config or get_config()
-        self.index_manager = IndexManager(self.config)
+        self.index_manager = index_manager or IndexManager(self.config)
         self.context_ranker = ContextRanker(self.config)
+        self.summary_store = SummaryStore(self.config)
+        self.section_cache = SectionCache(
+            self.config.context_cache_file,
+            enabled=bool(getattr(self.config, "context_section_cache_enabled", True)),
+        )
 
     def build_context(
         self,
         chapter: int,
         template: str | None = None,
         max_chars: Optional[int] = None,
+        preloaded: Optional[Dict[str, Any]] = None,
+        token_budget: Optional[int] = None,
     ) -> Dict[str, Any]:
+        """构建上下文包。``preloaded`` 可传入调用方已加载的 section（如 state / chapter_outline），避免重复读取。
+
+        ``token_budget``（默认取 config.context_token_budget，0 为不限）为正时按预算装配，见 _build_budgeted_payload。
+        """
         template = template or self.DEFAULT_TEMPLATE
         self._active_template = template
         if template not in self.TEMPLATE_WEIGHTS:
             template = self.DEFAULT_TEMPLATE
             self._active_template = template
 
-        pack = self._build_pack(chapter)
+        if token_budget is None:
+            token_budget = int(getattr(self.config, "context_token_budget", 0) or 0)
+        if token_budget > 0:
+            return self._build_budgeted_payload(chapter, template, token_budget, preloaded=preloaded)
+
+        pack = self._build_pack(chapter, preloaded=preloaded)
         if getattr(self.config, "context_ranker_enabled", True):
             pack = self.context_ranker.rank_pack(pack, chapter)
 
@@ -140,6 +180,45 @@ class ContextManager:
 
         return payload
 
+    def _build_budgeted_payload(
+        self,
+        chapter: int,
+        template: str,
+        token_budget: int,
+        preloaded: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """按 SECTION_ORDER 的优先级逐个加载、排序并装入 section，直到 token 预算耗尽。
+
+        core 始终保留；预算耗尽后剩余 section 不再加载（记录在 meta.token_budget.skipped）。
+        """
+        weights = self._resolve_template_weights(template=template, chapter=chapter)
+        ranker_enabled = bool(getattr(self.config, "context_ranker_enabled", True))
+        scheduler = self._section_scheduler(chapter, preloaded)
+        packer = BudgetedPacker(token_budget)
+
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        for name in self.SECTION_ORDER:
+            if name == "global" or not (weights.get(name, 0.0) > 0 or name in self.EXTRA_SECTIONS):
+                continue  # 不进入输出的 section 不必加载
+            if name != "core" and packer.exhausted:
+                packer.skip(name)
+                continue
+            sections, timings = scheduler.run(self.PACK_SOURCES[name])
+            content = self._pack_section(name, sections, chapter)
+            if ranker_enabled:
+                content = self.context_ranker.rank_section(name, content, chapter)
+            packer.add(name, content, required=(name == "core"))
+        total_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.section_cache.save()
+
+        pack: Dict[str, Any] = {"meta": self._pack_meta(chapter, scheduler, timings, total_ms), **packer.sections}
+        if ranker_enabled:
+            pack["meta"]["ranker"] = self.context_ranker.ranker_meta()
+        payload = self._assemble_json_payload(pack, template=template)
+        payload["meta"]["token_budget"] = packer.report()
+        return payload
+
     def filter_invalid_items(self, items: List[Dict[str, Any]], source_type: str, id_key: str) -> List[Dict[str, Any]]:
         confirmed = self.index_manager.get_invalid_ids(source_type, status="confirmed")
         pending = self.index_manager.get_invalid_ids(source_type, status="pending")
@@ -162,28 +241,165 @@ class ContextManager:
                 filtered.append(item)
         return filtered
 
-    def _build_pack(self, chapter: int) -> Dict[str, Any]:
-        state = self._load_state()
-        runtime_sources = load_runtime_sources(self.config.project_root, chapter)
+    def _build_pack(self, chapter: int, preloaded: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        scheduler = self._section_scheduler(chapter, preloaded)
+        started = time.perf_counter()
+        sections, timings = scheduler.run()
+        total_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.section_cache.save()
+
+        pack: Dict[str, Any] = {"meta": self._pack_meta(chapter, scheduler, timings, total_ms)}
+        for name in self.PACK_SOURCES:
+            pack[name] = self._pack_section(name, sections, chapter)
+        return pack
+
+    def _section_scheduler(self, chapter: int, preloaded: Optional[Dict[str, Any]] = None) -> SectionScheduler:
         use_orchestrator = bool(getattr(self.config, "context_use_memory_orchestrator", False))
 
-        orchestrator_pack: Dict[str, Any] = {}
-        if use_orchestrator:
-            try:
-                from .memory.orchestrator import MemoryOrchestrator
+        # 各 section 的 I/O 相互独立，按依赖交给有界线程池并发加载；结果按名称取用，输出与执行先后无关
+        # 带 fingerprint 的 section 在输入未变时直接复用上次结果（跨进程持久化在 context_cache.json）
+        scheduler = SectionScheduler(
+            max_workers=int(getattr(self.config, "context_parallel_workers", 4) or 1),
+            cache=self.section_cache,
+            preloaded=preloaded,
+        )
+        scheduler.add("state", lambda r: self._load_state())
+        scheduler.add("runtime_sources", lambda r: load_runtime_sources(self.config.project_root, chapter))
+        scheduler.add(
+            "long_term_memory",
+            lambda r: self._load_orchestrator_pack(chapter) if use_orchestrator else {},
+        )
+        scheduler.add("chapter_outline", lambda r: self._load_outline(chapter))
+        summaries_window = self.config.context_recent_summaries_window
+        scheduler.add(
+            "recent_summaries",
+            lambda r: self._load_recent_summaries(chapter, window=summaries_window),
+            fingerprint=lambda r: self._recent_summaries_fingerprint(chapter, summaries_window),
+        )
+        max_appearing = self.config.context_max_appearing_characters
+        scheduler.add(
+            "appearing_characters",
+            lambda r: self.filter_invalid_items(
+                self._load_recent_appearances(limit=max_appearing),
+                source_type="entity",
+                id_key="entity_id",
+            ),
+            fingerprint=lambda r: {
+                "limit": max_appearing,
+                "tables": self.index_manager.get_table_versions(("appearances", "invalid_facts")),
+            },
+        )
+        for name, keyword in (
+            ("worldview_skeleton", "世界观"),
+            ("power_system_skeleton", "力量体系"),
+            ("style_contract_ref", "风格契约"),
+        ):
+            scheduler.add(
+                name,
+                lambda r, keyword=keyword: self._load_setting(keyword),
+                fingerprint=lambda r, keyword=keyword: self._setting_fingerprint(keyword),
+            )
+        for name, filename in (("preferences", "preferences.json"), ("memory", "project_memory.json")):
+            path = self.config.webnovel_dir / filename
+            scheduler.add(
+                name,
+                lambda r, path=path: self._load_json_optional(path),
+                fingerprint=lambda r, path=path: file_stamp(path),
+            )
+        scheduler.add(
+            "story_skeleton",
+            lambda r: self._load_story_skeleton(chapter),
+            fingerprint=lambda r: self._story_skeleton_fingerprint(chapter),
+        )
+        scheduler.add(
+            "reader_signal",
+            lambda r: self._load_reader_signal(chapter),
+            # 统计只取决于表版本与窗口配置，相邻章节可复用；next_chapter 在取得结果后再按本章补上
+            fingerprint=lambda r: self._reader_signal_fingerprint(),
+            finalize=lambda signal: self._with_next_chapter(signal, chapter),
+        )
+        scheduler.add("plot_structure", lambda r: self._load_plot_structure(chapter))
+        scheduler.add(
+            "story_contract",
+            lambda r: self._build_story_contract_from_runtime(r["runtime_sources"]),
+            deps=("runtime_sources",),
+        )
+        scheduler.add(
+            "genre_profile",
+            lambda r: self._build_runtime_genre_profile(r["state"], r["story_contract"]),
+            deps=("state", "story_contract"),
+            fingerprint=lambda r: self._genre_profile_fingerprint(r["state"], r["story_contract"]),
+        )
+        scheduler.add(
+            "writing_guidance",
+            lambda r: self._build_writing_guidance(chapter, r["reader_signal"], r["genre_profile"]),
+            deps=("reader_signal", "genre_profile"),
+        )
+        scheduler.add(
+            "prewrite_validation",
+            lambda r: PrewriteValidator(self.config.project_root).build(
+                chapter=chapter,
+                review_contract=r["story_contract"].get("review_contract") or {},
+                plot_structure=r["plot_structure"],
+                story_contract=r["story_contract"],
+            ),
+            deps=("story_contract", "plot_structure"),
+        )
+        return scheduler
+
+    def _pack_meta(
+        self, chapter: int, scheduler: SectionScheduler, timings: Dict[str, float], total_ms: float
+    ) -> Dict[str, Any]:
+        return {
+            "chapter": chapter,
+            "section_timings_ms": timings,
+            "section_build": {"workers": scheduler.max_workers, "total_ms": total_ms},
+            "section_cache": {"enabled": self.section_cache.enabled, **scheduler.cache_report()},
+        }
+
+    def _pack_section(self, name: str, sections: Dict[str, Any], chapter: int) -> Any:
+        """由调度器结果组装上下文包中的一个 section；所需调度 section 见 PACK_SOURCES。"""
+        if name == "core":
+            return self._pack_core(sections, chapter)
+        if name == "scene":
+            return {
+                "location_context": sections["state"].get("protagonist_state", {}).get("location", {}),
+                "appearing_characters": sections["appearing_characters"],
+            }
+        if name == "runtime_status":
+            return sections["runtime_sources"].to_dict()
+        if name == "latest_commit":
+            return sections["runtime_sources"].latest_commit or {}
+        if name == "global":
+            return {
+                "worldview_skeleton": sections["worldview_skeleton"],
+                "power_system_skeleton": sections["power_system_skeleton"],
+                "style_contract_ref": sections["style_contract_ref"],
+            }
+        if name == "long_term_memory":
+            return sections["long_term_memory"] or {}
+        if name == "alerts":
+            state = sections["state"]
+            alert_slice = max(0, int(self.config.context_alerts_slice))
+            return {
+                "disambiguation_warnings": (
+                    state.get("disambiguation_warnings", [])[-alert_slice:] if alert_slice else []
+                ),
+                "disambiguation_pending": (
+                    state.get("disambiguation_pending", [])[-alert_slice:] if alert_slice else []
+                ),
+            }
+        return sections[name]
 
-                orchestrator = MemoryOrchestrator(self.config)
-                orchestrator_pack = orchestrator.build_memory_pack(chapter)
-            except Exception as exc:
-                logger.warning("memory_orchestrator_failed: %s", exc)
+    def _pack_core(self, sections: Dict[str, Any], chapter: int) -> Dict[str, Any]:
+        use_orchestrator = bool(getattr(self.config, "context_use_memory_orchestrator", False))
+        state = sections["state"]
+        orchestrator_pack: Dict[str, Any] = sections["long_term_memory"] or {}
 
         core = {
-            "chapter_outline": self._load_outline(chapter),
+            "chapter_outline": sections["chapter_outline"],
             "protagonist_snapshot": state.get("protagonist_state", {}),
-            "recent_summaries": self._load_recent_summaries(
-                chapter,
-                window=self.config.context_recent_summaries_window,
-            ),
+            "recent_summaries": sections["recent_summaries"],
             "recent_meta": self._load_recent_meta(
                 state,
                 chapter,
@@ -205,69 +421,75 @@ class ContextManager:
                 core["protagonist_snapshot"] = state_export.get("protagonist_state", core["protagonist_snapshot"])
             if summary_items:
                 core["recent_summaries"] = summary_items
+        return core
 
-        scene = {
-            "location_context": state.get("protagonist_state", {}).get("location", {}),
-            "appearing_characters": self._load_recent_appearances(
-                limit=self.config.context_max_appearing_characters,
-            ),
+    # ---- section 输入指纹：覆盖对应 loader 读取的全部文件、表与配置 ----
+
+    def _recent_summaries_fingerprint(self, chapter: int, window: int) -> Dict[str, Any]:
+        chapters = range(max(1, chapter - window), chapter)
+        return {"chapters": [[ch, file_stamp(self.summary_store.summary_path(ch))] for ch in chapters]}
+
+    def _story_skeleton_fingerprint(self, chapter: int) -> Dict[str, Any]:
+        interval = max(1, int(self.config.context_story_skeleton_interval))
+        max_samples = max(0, int(self.config.context_story_skeleton_max_samples))
+        snippet_chars = int(self.config.context_story_skeleton_snippet_chars)
+        chapters = range(chapter - interval, 0, -interval) if max_samples > 0 and chapter > interval else ()
+        return {
+            "config": [interval, max_samples, snippet_chars],
+            "chapters": [[ch, file_stamp(self.summary_store.summary_path(ch))] for ch in chapters],
         }
-        scene["appearing_characters"] = self.filter_invalid_items(
-            scene["appearing_characters"], source_type="entity", id_key="entity_id"
-        )
-        story_contract = self._build_story_contract_from_runtime(runtime_sources)
-        runtime_status = runtime_sources.to_dict()
-        latest_commit = runtime_sources.latest_commit or {}
-
-        global_ctx = {
-            "worldview_skeleton": self._load_setting("世界观"),
-            "power_system_skeleton": self._load_setting("力量体系"),
-            "style_contract_ref": self._load_setting("风格契约"),
+
+    def _setting_fingerprint(self, keyword: str) -> Dict[str, Any]:
+        settings_dir = self.config.settings_dir
+        return {
+            "primary": file_stamp(settings_dir / f"{keyword}.md"),
+            "matches": sorted([p.name, file_stamp(p)] for p in settings_dir.glob(f"*{keyword}*.md")),
         }
 
-        preferences = self._load_json_optional(self.config.webnovel_dir / "preferences.json")
-        memory = self._load_json_optional(self.config.webnovel_dir / "project_memory.json")
-        long_term_memory: Dict[str, Any] = orchestrator_pack if orchestrator_pack else {}
-        story_skeleton = self._load_story_skeleton(chapter)
-        alert_slice = max(0, int(self.config.context_alerts_slice))
-        reader_signal = self._load_reader_signal(chapter)
-        genre_profile = self._build_runtime_genre_profile(state, story_contract)
-        writing_guidance = self._build_writing_guidance(chapter, reader_signal, genre_profile)
-        plot_structure = self._load_plot_structure(chapter)
-        prewrite_validation = PrewriteValidator(self.config.project_root).build(
-            chapter=chapter,
-            review_contract=story_contract.get("review_contract") or {},
-            plot_structure=plot_structure,
-            story_contract=story_contract,
-        )
+    def _reader_signal_fingerprint(self) -> Dict[str, Any]:
+        include_debt = bool(getattr(self.config, "context_reader_signal_include_debt", False))
+        tables = ["chapter_reading_power", "review_metrics"]
+        if include_debt:
+            tables += ["chase_debt", "override_contracts"]
+        return {
+            "config": [
+                getattr(self.config, "context_reader_signal_enabled", True),
+                getattr(self.config, "context_reader_signal_recent_limit", 5),
+                getattr(self.config, "context_reader_signal_window_chapters", 20),
+                getattr(self.config, "context_reader_signal_review_window", 5),
+                include_debt,
+            ],
+            "tables": self.index_manager.get_table_versions(tables),
+        }
 
+    def _genre_profile_fingerprint(self, state: Dict[str, Any], story_contract: Dict[str, Any]) -> Dict[str, Any]:
+        references_dir = self.config.project_root / ".claude" / "references"
+        route = (story_contract.get("master_setting") or {}).get("route") or {}
         return {
-            "meta": {"chapter": chapter},
-            "core": core,
-            "story_contract": story_contract,
-            "runtime_status": runtime_status,
-            "latest_commit": latest_commit,
-            "prewrite_validation": prewrite_validation,
-            "scene": scene,
-            "global": global_ctx,
-            "reader_signal": reader_signal,
-            "genre_profile": genre_profile,
-            "writing_guidance": writing_guidance,
-            "plot_structure": plot_structure,
-            "story_skeleton": story_skeleton,
-            "preferences": preferences,
-            "memory": memory,
-            "long_term_memory": long_term_memory,
-            "alerts": {
-                "disambiguation_warnings": (
-                    state.get("disambiguation_warnings", [])[-alert_slice:] if alert_slice else []
-                ),
-                "disambiguation_pending": (
-                    state.get("disambiguation_pending", [])[-alert_slice:] if alert_slice else []
-                ),
-            },
+            "project": state.get("project") or {},
+            "project_info": state.get("project_info") or {},
+            "primary_genre": route.get("primary_genre"),
+            "references": [
+                file_stamp(references_dir / "genre-profiles.md"),
+                file_stamp(references_dir / "reading-power-taxonomy.md"),
+            ],
+            "config": [
+                getattr(self.config, "context_genre_profile_enabled", True),
+                getattr(self.config, "context_genre_profile_fallback", "shuangwen"),
+                getattr(self.config, "context_genre_profile_max_genres", 2),
+                getattr(self.config, "context_genre_profile_max_refs", 8),
+            ],
         }
 
+    def _load_orchestrator_pack(self, chapter: int) -> Dict[str, Any]:
+        try:
+            from .memory.orchestrator import MemoryOrchestrator
+
+            return MemoryOrchestrator(self.config).build_memory_pack(chapter)
+        except Exception as exc:
+            logger.warning("memory_orchestrator_failed: %s", exc)
+            return {}
+
     def _load_reader_signal(self, chapter: int) -> Dict[str, Any]:
         if not getattr(self.config, "context_reader_signal_enabled", True):
             return {}
@@ -312,6 +534,12 @@ class ContextManager:
 
         return signal
 
+    @staticmethod
+    def _with_next_chapter(signal: Dict[str, Any], chapter: int) -> Dict[str, Any]:
+        if signal:
+            signal["next_chapter"] = chapter
+        return signal
+
     def _load_genre_profile(self, state: Dict[str, Any]) -> Dict[str, Any]:
         if not getattr(self.config, "context_genre_profile_enabled", True):
             return {}
@@ -685,7 +913,7 @@ class ContextManager:
         path = self.config.state_file
         if not path.exists():
             return {}
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_state(path, strict=True)
 
     def _load_outline(self, chapter: int) -> str:
         return load_chapter_outline(self.config.project_root, chapter, max_chars=1500)
@@ -704,12 +932,7 @@ class ContextManager:
         }
 
     def _load_recent_summaries(self, chapter: int, window: int = 3) -> List[Dict[str, Any]]:
-        summaries = []
-        for ch in range(max(1, chapter - window), chapter):
-            summary = self._load_summary_text(ch)
-            if summary:
-                summaries.append(summary)
-        return summaries
+        return [{"chapter": s.chapter, "summary": s.text} for s in self.summary_store.window(chapter, window)]
 
     def _load_recent_meta(self, state: Dict[str, Any], chapter: int, window: int = 3) -> List[Dict[str, Any]]:
         meta = state.get("chapter_meta", {}) or {}
@@ -739,26 +962,6 @@ class ContextManager:
             return matches[0].read_text(encoding="utf-8")
         return f"[{keyword}设定未找到]"
 
-    def _extract_summary_excerpt(self, text: str, max_chars: int) -> str:
-        if not text:
-            return ""
-        match = self.SUMMARY_SECTION_RE.search(text)
-        excerpt = match.group(1).strip() if match else text.strip()
-        if max_chars > 0 and len(excerpt) > max_chars:
-            return excerpt[:max_chars].rstrip()
-        return excerpt
-
-    def _load_summary_text(self, chapter: int, snippet_chars: Optional[int] = None) -> Optional[Dict[str, Any]]:
-        summary_path = self.config.webnovel_dir / "summaries" / f"ch{chapter:04d}.md"
-        if not summary_path.exists():
-            return None
-        text = summary_path.read_text(encoding="utf-8")
-        if snippet_chars:
-            summary_text = self._extract_summary_excerpt(text, snippet_chars)
-        else:
-            summary_text = text
-        return {"chapter": chapter, "summary": summary_text}
-
     def _load_story_skeleton(self, chapter: int) -> List[Dict[str, Any]]:
         interval = max(1, int(self.config.context_story_skeleton_interval))
         max_samples = max(0, int(self.config.context_story_skeleton_max_samples))
@@ -767,16 +970,8 @@ class ContextManager:
         if max_samples <= 0 or chapter <= interval:
             return []
 
-        samples: List[Dict[str, Any]] = []
-        cursor = chapter - interval
-        while cursor >= 1 and len(samples) < max_samples:
-            summary = self._load_summary_text(cursor, snippet_chars=snippet_chars)
-            if summary and summary.get("summary"):
-                samples.append(summary)
-            cursor -= interval
-
-        samples.reverse()
-        return samples
+        samples = self.summary_store.sample(chapter, interval, max_samples, snippet_chars=snippet_chars)
+        return [{"chapter": s.chapter, "summary": s.snippet(snippet_chars)} for s in samples]
 
     def _load_json_optional(self, path: Path) -> Dict[str, Any]:
         if not path.exists():
@@ -795,6 +990,7 @@ def main():
     parser.add_argument("--project-root", type=str, help="项目根目录")
     parser.add_argument("--chapter", type=int, required=True)
     parser.add_argument("--template", type=str, default=ContextManager.DEFAULT_TEMPLATE)
+    parser.add_argument("--token-budget", type=int, default=None, help="上下文 token 预算（默认取配置，0 为不限）")
 
     args = parser.parse_args()
 
@@ -812,6 +1008,7 @@ def main():
         payload = manager.build_context(
             chapter=args.chapter,
             template=args.template,
+            token_budget=args.token_budget,
         )
         print_success(payload, message="context_built")
         try:
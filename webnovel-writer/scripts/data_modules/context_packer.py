@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按 token 预算装配上下文包。
+
+ContextManager 按 section 优先级依次交给 BudgetedPacker：放得下整段就整段收入，
+放不下时对列表字段按（ContextRanker 排好的）顺序逐条贪心装入，剩余预算不够的条目丢弃。
+剩余预算连一个最小 section 都放不下时视为耗尽，后续 section 不再加载，既省 I/O，也省下游 LLM 的 token。
+
+token 数按字符估算（CJK 约 1 字 1 token，其余约 4 字符 1 token），
+同一内容的估算结果按内容哈希缓存在进程内，相邻章节重复出现的条目不必重复计算。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_CJK_RE = re.compile(r"[　-〿㐀-䶿一-鿿豈-﫿＀-￯]")
+
+
+def estimate_text_tokens(text: str) -> int:
+    """粗略估算文本的 token 数：CJK 字符各计 1，其余字符每 4 个计 1。"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + -(-(len(text) - cjk) // 4)
+
+
+class TokenEstimator:
+    """按内容哈希缓存的 token 估算器（线程安全，LRU 上限 max_entries）。"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max(1, int(max_entries))
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def estimate(self, value: Any) -> int:
+        if value is None:
+            return 0
+        raw = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+        key = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        tokens = estimate_text_tokens(raw)
+        with self._lock:
+            self._cache[key] = tokens
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return tokens
+
+
+# 进程内共享，跨 ContextManager 实例复用估算结果
+default_estimator = TokenEstimator()
+
+
+class BudgetedPacker:
+    """在全局 token 预算内按调用顺序（即优先级）装入 section。"""
+
+    def __init__(self, budget: int, estimator: Optional[TokenEstimator] = None, min_section_tokens: int = 16):
+        self.budget = max(0, int(budget))
+        self.min_section_tokens = max(1, int(min_section_tokens))
+        self.estimator = estimator or default_estimator
+        self.used = 0
+        self.sections: Dict[str, Any] = {}
+        self._report: Dict[str, Dict[str, int]] = {}
+        self._dropped: List[str] = []
+        self._skipped: List[str] = []
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used)
+
+    @property
+    def exhausted(self) -> bool:
+        """剩余预算已放不下一个最小的 section，后续 section 不必再加载。"""
+        return self.remaining < self.min_section_tokens
+
+    def skip(self, name: str) -> None:
+        """预算已耗尽、未加载的 section。"""
+        self._skipped.append(name)
+
+    def add(self, name: str, content: Any, required: bool = False) -> bool:
+        """装入 section，返回是否收入。``required`` 的 section 即使超预算也保留其非列表部分。"""
+        packed, tokens, dropped = self._fit(content, self.remaining, required)
+        if packed is None:
+            self._dropped.append(name)
+            return False
+        self.sections[name] = packed
+        self.used += tokens
+        self._report[name] = {"tokens": tokens, "items_dropped": dropped}
+        return True
+
+    def _fit(self, content: Any, remaining: int, required: bool) -> Tuple[Any, int, int]:
+        tokens = self.estimator.estimate(content)
+        if tokens <= remaining:
+            return content, tokens, 0
+        if isinstance(content, list):
+            items, used, dropped = self._fill(content, remaining)
+            if not items and not required:
+                return None, 0, len(content)
+            return items, used, dropped
+        if isinstance(content, dict):
+            list_keys = [key for key, value in content.items() if isinstance(value, list) and value]
+            fixed = {key: ([] if key in list_keys else value) for key, value in content.items()}
+            fixed_tokens = self.estimator.estimate(fixed)
+            if fixed_tokens > remaining and not required:
+                return None, 0, 0
+            packed = dict(fixed)
+            used, dropped = fixed_tokens, 0
+            for key in list_keys:
+                items, item_tokens, item_dropped = self._fill(content[key], max(0, remaining - used))
+                packed[key] = items
+                used += item_tokens
+                dropped += item_dropped
+            # 保持原字段顺序
+            return {key: packed[key] for key in content}, used, dropped
+        if required:
+            return content, tokens, 0
+        return None, 0, 0
+
+    def _fill(self, items: List[Any], remaining: int) -> Tuple[List[Any], int, int]:
+        """按既有顺序贪心装入条目：放不下的条目跳过，继续尝试后面更短的条目。"""
+        packed: List[Any] = []
+        used = 0
+        for item in items:
+            cost = self.estimator.estimate(item)
+            if used + cost <= remaining:
+                packed.append(item)
+                used += cost
+        return packed, used, len(items) - len(packed)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "used": self.used,
+            "sections": dict(self._report),
+            "dropped": list(self._dropped),
+            "skipped": list(self._skipped),
+        }
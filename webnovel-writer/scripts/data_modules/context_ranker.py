@@ -7,15 +7,147 @@ Goals:
 - Prefer recency while keeping frequent entities stable.
 - Prioritize high-signal hook/alert items.
 - Keep output shape backward compatible (same keys, re-ordered lists).
+
+Scoring is batched: each rank_* call extracts one feature column per signal
+(chapter, text length, appearance count, bonus) and RankingEngine scores the
+whole list at once -- with NumPy arrays when it is installed and the list is
+large enough, otherwise in pure Python. Both paths return the same stable order
+(ties keep their input order). ``benchmark_ranking`` compares the two paths.
 """
 
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Optional
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 from .config import get_config
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+
+# Below this many items array construction costs more than it saves.
+NUMPY_MIN_ITEMS = 64
+RANKER_BACKENDS = ("auto", "numpy", "python")
+
+
+@lru_cache(maxsize=32)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> Optional[Pattern[str]]:
+    """One alternation regex per keyword tuple, so each text is scanned once."""
+    words = sorted({word for word in keywords if word}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+def _contains_any(pattern: Optional[Pattern[str]], text: str) -> bool:
+    return pattern is not None and pattern.search(text) is not None
+
+
+@dataclass
+class RankFeatures:
+    """Feature columns for one batch; every column is aligned with the items.
+
+    Weighted sections use ``lengths`` (length score) or ``totals`` (log frequency
+    score). Alerts pass ``extra`` instead, which is added unweighted.
+    """
+
+    chapters: List[Optional[int]]
+    bonus: List[float]
+    lengths: Optional[List[int]] = None
+    totals: Optional[List[int]] = None
+    extra: Optional[List[float]] = None
+
+
+class RankingEngine:
+    """Score feature columns and return a stable descending order."""
+
+    def __init__(
+        self,
+        recency_weight: float,
+        frequency_weight: float,
+        length_bonus_cap: float,
+        backend: str = "auto",
+        numpy_min_items: int = NUMPY_MIN_ITEMS,
+    ):
+        self.recency_weight = float(recency_weight)
+        self.frequency_weight = float(frequency_weight)
+        self.length_bonus_cap = float(length_bonus_cap)
+        self.backend = backend if backend in RANKER_BACKENDS else "auto"
+        self.numpy_min_items = max(0, int(numpy_min_items))
+
+    def uses_numpy(self, size: int) -> bool:
+        if np is None or self.backend == "python":
+            return False
+        return self.backend == "numpy" or size >= self.numpy_min_items
+
+    def score(
+        self, features: RankFeatures, current_chapter: int
+    ) -> Tuple[List[float], List[float], List[float]]:
+        """Return (score, recency, frequency) columns as Python floats."""
+        if not features.chapters:
+            return [], [], []
+        if self.uses_numpy(len(features.chapters)):
+            return self._score_numpy(features, current_chapter)
+        return self._score_python(features, current_chapter)
+
+    def rank(self, features: RankFeatures, current_chapter: int) -> Tuple[List[int], List[float], List[float], List[float]]:
+        """Return (order, score, recency, frequency); order is descending by score, ties in input order."""
+        scores, recency, frequency = self.score(features, current_chapter)
+        if self.uses_numpy(len(scores)):
+            order = np.argsort(-np.asarray(scores, dtype=float), kind="stable").tolist()
+        else:
+            order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        return order, scores, recency, frequency
+
+    def _score_python(
+        self, features: RankFeatures, current_chapter: int
+    ) -> Tuple[List[float], List[float], List[float]]:
+        current = int(current_chapter)
+        recency = [0.0 if ch is None else 1.0 / (1.0 + max(0, current - int(ch))) for ch in features.chapters]
+        if features.extra is not None:
+            frequency = list(features.extra)
+            scores = [r + f + b for r, f, b in zip(recency, frequency, features.bonus)]
+            return scores, recency, frequency
+        if features.totals is not None:
+            log_11 = math.log(11.0)
+            frequency = [0.0 if n <= 0 else min(1.0, math.log(1.0 + float(n)) / log_11) for n in features.totals]
+        else:
+            cap = self.length_bonus_cap
+            frequency = [0.0 if not n else min(n / 1200.0, 1.0) * cap for n in (features.lengths or [])]
+        rw, fw = self.recency_weight, self.frequency_weight
+        scores = [r * rw + f * fw + b for r, f, b in zip(recency, frequency, features.bonus)]
+        return scores, recency, frequency
+
+    def _score_numpy(
+        self, features: RankFeatures, current_chapter: int
+    ) -> Tuple[List[float], List[float], List[float]]:
+        chapters = np.array([np.nan if ch is None else float(ch) for ch in features.chapters], dtype=float)
+        known = ~np.isnan(chapters)
+        gaps = np.maximum(0.0, float(int(current_chapter)) - np.where(known, chapters, 0.0))
+        recency = np.where(known, 1.0 / (1.0 + gaps), 0.0)
+        bonus = np.asarray(features.bonus, dtype=float)
+        if features.extra is not None:
+            frequency = np.asarray(features.extra, dtype=float)
+            scores = recency + frequency + bonus
+        else:
+            if features.totals is not None:
+                totals = np.asarray(features.totals, dtype=float)
+                frequency = np.where(
+                    totals > 0, np.minimum(1.0, np.log(1.0 + np.maximum(totals, 0.0)) / math.log(11.0)), 0.0
+                )
+            else:
+                lengths = np.asarray(features.lengths or [], dtype=float)
+                frequency = np.minimum(lengths / 1200.0, 1.0) * self.length_bonus_cap
+            scores = recency * self.recency_weight + frequency * self.frequency_weight + bonus
+        return scores.tolist(), recency.tolist(), frequency.tolist()
+
 
 class ContextRanker:
     """Rank context-pack sections with lightweight deterministic heuristics."""
@@ -25,154 +157,126 @@ class ContextRanker:
     def __init__(self, config=None):
         self.config = config or get_config()
 
+    # 参与排序的 section（其余 section 原样保留）
+    RANKED_SECTIONS = ("core", "scene", "story_skeleton", "alerts")
+
     def rank_pack(self, pack: Dict[str, Any], chapter: int) -> Dict[str, Any]:
         ranked = dict(pack)
-
-        core = dict(ranked.get("core") or {})
-        core["recent_summaries"] = self.rank_recent_summaries(core.get("recent_summaries") or [], chapter)
-        core["recent_meta"] = self.rank_recent_meta(core.get("recent_meta") or [], chapter)
-        ranked["core"] = core
-
-        scene = dict(ranked.get("scene") or {})
-        scene["appearing_characters"] = self.rank_appearances(scene.get("appearing_characters") or [], chapter)
-        ranked["scene"] = scene
-
-        ranked["story_skeleton"] = self.rank_story_skeleton(ranked.get("story_skeleton") or [], chapter)
-
-        alerts = dict(ranked.get("alerts") or {})
-        alerts["disambiguation_warnings"] = self.rank_alerts(alerts.get("disambiguation_warnings") or [], chapter)
-        alerts["disambiguation_pending"] = self.rank_alerts(alerts.get("disambiguation_pending") or [], chapter)
-        ranked["alerts"] = alerts
+        for name in self.RANKED_SECTIONS:
+            ranked[name] = self.rank_section(name, ranked.get(name), chapter)
 
         meta = dict(ranked.get("meta") or {})
         meta.setdefault("context_contract_version", "v2")
-        meta["ranker"] = {
+        meta["ranker"] = self.ranker_meta()
+        ranked["meta"] = meta
+        return ranked
+
+    def rank_section(self, name: str, content: Any, chapter: int) -> Any:
+        """对单个 section 内的条目排序；不参与排序的 section 原样返回。"""
+        if name == "core":
+            core = dict(content or {})
+            core["recent_summaries"] = self.rank_recent_summaries(core.get("recent_summaries") or [], chapter)
+            core["recent_meta"] = self.rank_recent_meta(core.get("recent_meta") or [], chapter)
+            return core
+        if name == "scene":
+            scene = dict(content or {})
+            scene["appearing_characters"] = self.rank_appearances(scene.get("appearing_characters") or [], chapter)
+            return scene
+        if name == "story_skeleton":
+            return self.rank_story_skeleton(content or [], chapter)
+        if name == "alerts":
+            alerts = dict(content or {})
+            alerts["disambiguation_warnings"] = self.rank_alerts(alerts.get("disambiguation_warnings") or [], chapter)
+            alerts["disambiguation_pending"] = self.rank_alerts(alerts.get("disambiguation_pending") or [], chapter)
+            return alerts
+        return content
+
+    def ranker_meta(self) -> Dict[str, Any]:
+        return {
             "enabled": True,
             "recency_weight": float(self.config.context_ranker_recency_weight),
             "frequency_weight": float(self.config.context_ranker_frequency_weight),
             "hook_bonus": float(self.config.context_ranker_hook_bonus),
         }
-        ranked["meta"] = meta
-        return ranked
 
     def rank_recent_summaries(self, items: List[Dict[str, Any]], current_chapter: int) -> List[Dict[str, Any]]:
-        scored = []
-        for raw in items:
-            item = dict(raw)
-            chapter = self._as_int(item.get("chapter"))
-            summary = str(item.get("summary") or "")
-
-            recency = self._recency_score(chapter, current_chapter)
-            frequency = self._length_score(summary)
-            hook_bonus = float(self.config.context_ranker_hook_bonus) if self._has_hook_hint(summary) else 0.0
-            score = self._combine_score(recency, frequency, hook_bonus)
-            scored.append(self._with_debug_score(item, score, recency, frequency, hook_bonus))
-
-        scored.sort(key=lambda row: row[0], reverse=True)
-        return [row[1] for row in scored]
+        rows = [dict(raw) for raw in items]
+        summaries = [str(item.get("summary") or "") for item in rows]
+        hook_bonus = float(self.config.context_ranker_hook_bonus)
+        hook_re = _keyword_pattern(self.SUMMARY_HOOK_HINTS)
+        features = RankFeatures(
+            chapters=[self._as_int(item.get("chapter")) for item in rows],
+            lengths=[len(text) for text in summaries],
+            bonus=[hook_bonus if _contains_any(hook_re, text) else 0.0 for text in summaries],
+        )
+        return self._rank(rows, features, current_chapter)
 
     def rank_recent_meta(self, items: List[Dict[str, Any]], current_chapter: int) -> List[Dict[str, Any]]:
-        scored = []
-        for raw in items:
-            item = dict(raw)
-            chapter = self._as_int(item.get("chapter"))
-            hook = str(item.get("hook") or "")
-            hook_bonus = float(self.config.context_ranker_hook_bonus) if hook else 0.0
-            recency = self._recency_score(chapter, current_chapter)
-            frequency = self._length_score(hook)
-            score = self._combine_score(recency, frequency, hook_bonus)
-            scored.append(self._with_debug_score(item, score, recency, frequency, hook_bonus))
-
-        scored.sort(key=lambda row: row[0], reverse=True)
-        return [row[1] for row in scored]
+        rows = [dict(raw) for raw in items]
+        hooks = [str(item.get("hook") or "") for item in rows]
+        hook_bonus = float(self.config.context_ranker_hook_bonus)
+        features = RankFeatures(
+            chapters=[self._as_int(item.get("chapter")) for item in rows],
+            lengths=[len(hook) for hook in hooks],
+            bonus=[hook_bonus if hook else 0.0 for hook in hooks],
+        )
+        return self._rank(rows, features, current_chapter)
 
     def rank_appearances(self, items: List[Dict[str, Any]], current_chapter: int) -> List[Dict[str, Any]]:
-        scored = []
-        for raw in items:
-            item = dict(raw)
-            last_chapter = self._as_int(item.get("last_chapter") or item.get("chapter"))
-            total = self._as_int(item.get("total")) or 0
-            warning_penalty = 0.15 if item.get("warning") else 0.0
-
-            recency = self._recency_score(last_chapter, current_chapter)
-            frequency = self._frequency_score(total)
-            score = self._combine_score(recency, frequency, 0.0) - warning_penalty
-            scored.append(self._with_debug_score(item, score, recency, frequency, -warning_penalty))
-
-        scored.sort(key=lambda row: row[0], reverse=True)
-        return [row[1] for row in scored]
+        rows = [dict(raw) for raw in items]
+        features = RankFeatures(
+            chapters=[self._as_int(item.get("last_chapter") or item.get("chapter")) for item in rows],
+            totals=[self._as_int(item.get("total")) or 0 for item in rows],
+            bonus=[-(0.15 if item.get("warning") else 0.0) for item in rows],
+        )
+        return self._rank(rows, features, current_chapter)
 
     def rank_story_skeleton(self, items: List[Dict[str, Any]], current_chapter: int) -> List[Dict[str, Any]]:
-        scored = []
-        for raw in items:
-            item = dict(raw)
-            chapter = self._as_int(item.get("chapter"))
-            summary = str(item.get("summary") or "")
-            recency = self._recency_score(chapter, current_chapter)
-            frequency = self._length_score(summary)
-            score = self._combine_score(recency, frequency, 0.0)
-            scored.append(self._with_debug_score(item, score, recency, frequency, 0.0))
-
-        scored.sort(key=lambda row: row[0], reverse=True)
-        return [row[1] for row in scored]
+        rows = [dict(raw) for raw in items]
+        features = RankFeatures(
+            chapters=[self._as_int(item.get("chapter")) for item in rows],
+            lengths=[len(str(item.get("summary") or "")) for item in rows],
+            bonus=[0.0] * len(rows),
+        )
+        return self._rank(rows, features, current_chapter)
 
     def rank_alerts(self, alerts: List[Any], current_chapter: int) -> List[Any]:
-        scored = []
-        keywords = tuple(self.config.context_ranker_alert_critical_keywords)
-
+        keyword_re = _keyword_pattern(tuple(self.config.context_ranker_alert_critical_keywords))
+        rows: List[Any] = []
+        chapters: List[Optional[int]] = []
+        critical: List[float] = []
+        keyword: List[float] = []
         for raw in alerts:
             if isinstance(raw, dict):
                 item: Any = dict(raw)
-                chapter = self._as_int(item.get("chapter"))
+                chapters.append(self._as_int(item.get("chapter")))
                 text = str(item.get("message") or item.get("content") or json_safe(item))
                 severity = str(item.get("severity") or "").lower()
-                critical_bonus = 0.3 if severity in {"critical", "high"} else 0.0
+                critical.append(0.3 if severity in {"critical", "high"} else 0.0)
             else:
                 item = raw
-                chapter = None
+                chapters.append(None)
                 text = str(raw)
-                critical_bonus = 0.0
-
-            recency = self._recency_score(chapter, current_chapter)
-            keyword_bonus = 0.3 if any(word and word in text for word in keywords) else 0.0
-            score = recency + critical_bonus + keyword_bonus
-
-            if isinstance(item, dict):
-                scored.append(self._with_debug_score(item, score, recency, critical_bonus, keyword_bonus))
-            else:
-                scored.append((score, item))
-
-        scored.sort(key=lambda row: row[0], reverse=True)
-        return [row[1] for row in scored]
-
-    def _combine_score(self, recency: float, frequency: float, bonus: float) -> float:
-        return (
-            recency * float(self.config.context_ranker_recency_weight)
-            + frequency * float(self.config.context_ranker_frequency_weight)
-            + bonus
+                critical.append(0.0)
+            keyword.append(0.3 if _contains_any(keyword_re, text) else 0.0)
+            rows.append(item)
+        features = RankFeatures(chapters=chapters, extra=critical, bonus=keyword)
+        return self._rank(rows, features, current_chapter)
+
+    def _engine(self) -> RankingEngine:
+        return RankingEngine(
+            recency_weight=float(self.config.context_ranker_recency_weight),
+            frequency_weight=float(self.config.context_ranker_frequency_weight),
+            length_bonus_cap=float(self.config.context_ranker_length_bonus_cap),
+            backend=str(getattr(self.config, "context_ranker_backend", "auto") or "auto"),
         )
 
-    def _recency_score(self, source_chapter: Optional[int], current_chapter: int) -> float:
-        if source_chapter is None:
-            return 0.0
-        gap = max(0, int(current_chapter) - int(source_chapter))
-        return 1.0 / (1.0 + gap)
-
-    def _frequency_score(self, total: int) -> float:
-        if total <= 0:
-            return 0.0
-        # log scale to avoid over-favoring very frequent entities
-        return min(1.0, math.log(1.0 + float(total)) / math.log(11.0))
-
-    def _length_score(self, text: str) -> float:
-        if not text:
-            return 0.0
-        ratio = min(len(text) / 1200.0, 1.0)
-        cap = float(self.config.context_ranker_length_bonus_cap)
-        return ratio * cap
-
-    def _has_hook_hint(self, text: str) -> bool:
-        return any(token in text for token in self.SUMMARY_HOOK_HINTS)
+    def _rank(self, rows: List[Any], features: RankFeatures, current_chapter: int) -> List[Any]:
+        order, scores, recency, frequency = self._engine().rank(features, current_chapter)
+        for i, item in enumerate(rows):
+            if isinstance(item, dict):
+                self._with_debug_score(item, scores[i], recency[i], frequency[i], features.bonus[i])
+        return [rows[i] for i in order]
 
     def _as_int(self, value: Any) -> Optional[int]:
         if value is None:
@@ -208,3 +312,67 @@ def json_safe(value: Any) -> str:
     except Exception:
         return str(value)
 
+
+def benchmark_ranking(items: int = 500, repeat: int = 20, config=None) -> Dict[str, Any]:
+    """Micro-benchmark: rank synthetic appearance and summary lists with each available backend.
+
+    Returns the best-of-``repeat`` milliseconds per backend and whether both backends agree on the order.
+    """
+    from .config import DataModulesConfig
+
+    base = config or DataModulesConfig()
+    current = items + 1
+    summaries = [
+        {"chapter": ch, "summary": ("悬念" if ch % 7 == 0 else "") + "剧情" * (ch % 300)}
+        for ch in range(1, items + 1)
+    ]
+    appearances = [
+        {"entity_id": f"e{i}", "last_chapter": (i * 37) % current, "total": i % 50, "warning": i % 11 == 0}
+        for i in range(items)
+    ]
+
+    backends = ["python"] + (["numpy"] if np is not None else [])
+    timings: Dict[str, float] = {}
+    orders: Dict[str, List[Any]] = {}
+    for backend in backends:
+        ranker = ContextRanker(_with_backend(base, backend))
+        best = float("inf")
+        for _ in range(max(1, int(repeat))):
+            started = time.perf_counter()
+            ranked_summaries = ranker.rank_recent_summaries(summaries, current)
+            ranked_appearances = ranker.rank_appearances(appearances, current)
+            best = min(best, time.perf_counter() - started)
+        timings[backend] = round(best * 1000, 3)
+        orders[backend] = [row["chapter"] for row in ranked_summaries] + [row["entity_id"] for row in ranked_appearances]
+
+    return {
+        "items": items,
+        "repeat": repeat,
+        "numpy_available": np is not None,
+        "best_ms": timings,
+        "orders_match": len({tuple(order) for order in orders.values()}) == 1,
+    }
+
+
+def _with_backend(config, backend: str):
+    import copy
+
+    cloned = copy.copy(config)
+    cloned.context_ranker_backend = backend
+    return cloned
+
+
+def main() -> None:
+    import argparse
+
+    from .cli_output import print_success
+
+    parser = argparse.ArgumentParser(description="Context Ranker micro-benchmark")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print_success(benchmark_ranking(items=args.items, repeat=args.repeat), message="ranker_benchmark")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,41 @@ import logging
 import re
 import sqlite3
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 
 logger = logging.getLogger(__name__)
 
+ENTITY_COLUMNS = (
+    "id",
+    "type",
+    "canonical_name",
+    "tier",
+    "desc",
+    "current_json",
+    "first_appearance",
+    "last_appearance",
+    "is_protagonist",
+    "is_archived",
+    "created_at",
+    "updated_at",
+)
+# SQLite 默认 SQLITE_MAX_VARIABLE_NUMBER 下限为 999，IN 查询按此分批
+_IN_BATCH_SIZE = 900
+
+
+def _select_columns(columns: Optional[Iterable[str]]) -> str:
+    """投影列白名单校验；始终带上 id，便于按 ID 归并结果。"""
+    if columns is None:
+        return "*"
+    selected = ["id"]
+    for column in columns:
+        if column not in ENTITY_COLUMNS:
+            raise ValueError(f"unknown entity column: {column}")
+        if column not in selected:
+            selected.append(column)
+    return ", ".join(selected)
+
 
 class IndexEntityMixin:
     def _register_alias_with_cursor(
@@ -218,6 +248,77 @@ class IndexEntityMixin:
                 for row in cursor.fetchall()
             ]
 
+    def get_entities(
+        self, entity_ids: Iterable[str], columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict]:
+        """按 ID 批量获取实体（单连接、IN 查询），返回 {id: entity}。
+
+        只做精确 ID 匹配，不走 get_entity 的别名兜底；查不到的 ID 不出现在结果中。
+        ``columns`` 可只取部分列（id 总会带上）。
+        """
+        ids = list(dict.fromkeys(str(eid) for eid in entity_ids if eid))
+        if not ids:
+            return {}
+        select = _select_columns(columns)
+        result: Dict[str, Dict] = {}
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), _IN_BATCH_SIZE):
+                batch = ids[start : start + _IN_BATCH_SIZE]
+                placeholders = ",".join("?" for _ in batch)
+                cursor.execute(
+                    f"SELECT {select} FROM entities WHERE id IN ({placeholders})",
+                    batch,
+                )
+                for row in cursor.fetchall():
+                    result[row["id"]] = self._row_to_dict(row, parse_json=["current_json"])
+        return result
+
+    def get_all_entities_grouped(
+        self, include_archived: bool = False, columns: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """一次查询取出全部实体并按类型分组：{type: [entity, ...]}。
+
+        组内顺序与 get_entities_by_type 一致（last_appearance 降序）。
+        """
+        select = _select_columns(columns)
+        if select != "*" and "type" not in select.split(", "):
+            select += ", type"
+        where = "" if include_archived else "WHERE is_archived = 0"
+        grouped: Dict[str, List[Dict]] = {}
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT {select} FROM entities {where}
+                ORDER BY type, last_appearance DESC
+            """
+            )
+            for row in cursor.fetchall():
+                entity = self._row_to_dict(row, parse_json=["current_json"])
+                grouped.setdefault(entity["type"], []).append(entity)
+        return grouped
+
+    def get_entities_last_seen_between(
+        self, entity_type: str, after_chapter: int, until_chapter: int
+    ) -> List[Dict]:
+        """按类型获取 last_appearance 落在 (after_chapter, until_chapter] 的未归档实体（增量扫描用）"""
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT * FROM entities
+                WHERE type = ? AND is_archived = 0
+                  AND last_appearance > ? AND last_appearance <= ?
+                ORDER BY last_appearance DESC
+            """,
+                (entity_type, int(after_chapter), int(until_chapter)),
+            )
+            return [
+                self._row_to_dict(row, parse_json=["current_json"])
+                for row in cursor.fetchall()
+            ]
+
     def get_entities_by_tier(self, tier: str) -> List[Dict]:
         """按重要度获取实体 (核心/重要/次要/装饰)"""
         with self._get_conn() as conn:
@@ -381,6 +482,25 @@ class IndexEntityMixin:
             )
             return [row["alias"] for row in cursor.fetchall()]
 
+    def get_aliases_for_entities(self, entity_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """批量获取多个实体的别名：{entity_id: [alias, ...]}（无别名的实体给空列表）。"""
+        ids = list(dict.fromkeys(str(eid) for eid in entity_ids if eid))
+        result: Dict[str, List[str]] = {eid: [] for eid in ids}
+        if not ids:
+            return result
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), _IN_BATCH_SIZE):
+                batch = ids[start : start + _IN_BATCH_SIZE]
+                placeholders = ",".join("?" for _ in batch)
+                cursor.execute(
+                    f"SELECT entity_id, alias FROM aliases WHERE entity_id IN ({placeholders})",
+                    batch,
+                )
+                for row in cursor.fetchall():
+                    result[row["entity_id"]].append(row["alias"])
+        return result
+
     def remove_alias(self, alias: str, entity_id: str) -> bool:
         """移除别名"""
         with self._get_conn() as conn:
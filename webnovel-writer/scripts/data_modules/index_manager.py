@@ -32,13 +32,15 @@ v5.1 变更:
 - 新增 relationships 表替代 state.json 中的 structured_relationships
 """
 
+import os
 import sqlite3
 import json
+import threading
 import time
 from pathlib import Path
 
 from runtime_compat import enable_windows_utf8_stdio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from contextlib import contextmanager
 from datetime import datetime
@@ -53,6 +55,38 @@ from .observability import safe_append_perf_timing, safe_log_tool_call
 from .override_ledger_service import ensure_override_ledger_columns
 
 
+# index.db 结构版本，写入 PRAGMA user_version。_apply_schema 中表、列、索引或触发器有变化时必须递增，
+# 已有数据库会在下次初始化时补跑一次（全部 DDL 幂等）。
+INDEX_SCHEMA_VERSION = 1
+
+# 进程内登记已确认结构为当前版本的数据库：路径 -> (st_dev, st_ino)。
+# 文件被删除重建或替换后标识变化，会重新检查。
+_schema_ready: Dict[str, Tuple[int, int]] = {}
+_schema_registry_lock = threading.Lock()
+
+
+def db_identity(path: Path) -> Optional[Tuple[int, int]]:
+    """SQLite 文件的 (st_dev, st_ino)；文件不存在或为空时返回 None。供结构版本登记判断文件是否被替换。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size <= 0:
+        return None
+    return st.st_dev, st.st_ino
+
+
+# 维护表级数据版本（table_versions）的表，供上下文缓存做输入指纹
+VERSIONED_TABLES = (
+    "appearances",
+    "invalid_facts",
+    "chapter_reading_power",
+    "review_metrics",
+    "chase_debt",
+    "override_contracts",
+)
+
+
 @dataclass
 class ChapterMeta:
     """章节元数据"""
@@ -228,404 +262,471 @@ class WritingChecklistScoreMeta:
     notes: str = ""
 
 
+class _UnitOfWorkConnection:
+    """工作单元内共享的连接代理：内层方法的 commit() 推迟到工作单元结束时统一提交。"""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def commit(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 class IndexManager(IndexChapterMixin, IndexEntityMixin, IndexDebtMixin, IndexReadingMixin, IndexObservabilityMixin):
     """索引管理器"""
 
     def __init__(self, config=None):
         self.config = config or get_config()
+        self._tx_local = threading.local()
         self._init_db()
 
     def _init_db(self):
-        """初始化数据库表"""
+        """初始化数据库表（结构已是当前版本时只读一次 PRAGMA user_version）"""
         self.config.ensure_dirs()
 
-        with self._get_conn() as conn:
-            cursor = conn.cursor()
-
-            # 章节表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chapters (
-                    chapter INTEGER PRIMARY KEY,
-                    title TEXT,
-                    location TEXT,
-                    word_count INTEGER,
-                    characters TEXT,
-                    summary TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 场景表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scenes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    chapter INTEGER,
-                    scene_index INTEGER,
-                    start_line INTEGER,
-                    end_line INTEGER,
-                    location TEXT,
-                    summary TEXT,
-                    characters TEXT,
-                    UNIQUE(chapter, scene_index)
-                )
-            """)
-
-            # 实体出场表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS appearances (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entity_id TEXT,
-                    chapter INTEGER,
-                    mentions TEXT,
-                    confidence REAL,
-                    UNIQUE(entity_id, chapter)
-                )
-            """)
+        db_path = self.config.index_db
+        registry_key = os.path.abspath(db_path)
+        identity = db_identity(db_path)
+        if identity is not None and _schema_ready.get(registry_key) == identity:
+            return
 
-            # 创建索引
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_scenes_chapter ON scenes(chapter)"
+        with self._get_conn() as conn:
+            version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+            if version != INDEX_SCHEMA_VERSION:
+                self._apply_schema(conn)
+                if version < INDEX_SCHEMA_VERSION:
+                    conn.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+                conn.commit()
+
+        identity = db_identity(db_path)
+        if identity is not None:
+            with _schema_registry_lock:
+                _schema_ready[registry_key] = identity
+
+    def _apply_schema(self, conn: sqlite3.Connection) -> None:
+        """建表、建索引与列迁移（全部幂等）；只在 user_version 不是当前版本时执行。"""
+        cursor = conn.cursor()
+
+        # 章节表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chapters (
+                chapter INTEGER PRIMARY KEY,
+                title TEXT,
+                location TEXT,
+                word_count INTEGER,
+                characters TEXT,
+                summary TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_appearances_entity ON appearances(entity_id)"
+        """)
+
+        # 场景表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scenes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chapter INTEGER,
+                scene_index INTEGER,
+                start_line INTEGER,
+                end_line INTEGER,
+                location TEXT,
+                summary TEXT,
+                characters TEXT,
+                UNIQUE(chapter, scene_index)
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_appearances_chapter ON appearances(chapter)"
+        """)
+
+        # 实体出场表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS appearances (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity_id TEXT,
+                chapter INTEGER,
+                mentions TEXT,
+                confidence REAL,
+                UNIQUE(entity_id, chapter)
             )
+        """)
 
-            # ==================== v5.1 引入表 ====================
-
-            # 实体表 (替代 state.json 中的 entities_v3)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS entities (
-                    id TEXT PRIMARY KEY,
-                    type TEXT NOT NULL,
-                    canonical_name TEXT NOT NULL,
-                    tier TEXT DEFAULT '装饰',
-                    desc TEXT,
-                    current_json TEXT,
-                    first_appearance INTEGER DEFAULT 0,
-                    last_appearance INTEGER DEFAULT 0,
-                    is_protagonist INTEGER DEFAULT 0,
-                    is_archived INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 别名表 (替代 state.json 中的 alias_index，支持一对多)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS aliases (
-                    alias TEXT NOT NULL,
-                    entity_id TEXT NOT NULL,
-                    entity_type TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (alias, entity_id, entity_type)
-                )
-            """)
-
-            # 状态变化表 (替代 state.json 中的 state_changes)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS state_changes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entity_id TEXT NOT NULL,
-                    field TEXT NOT NULL,
-                    old_value TEXT,
-                    new_value TEXT,
-                    reason TEXT,
-                    chapter INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 关系表 (替代 state.json 中的 structured_relationships)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS relationships (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    from_entity TEXT NOT NULL,
-                    to_entity TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    description TEXT,
-                    chapter INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(from_entity, to_entity, type)
-                )
-            """)
+        # 创建索引
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scenes_chapter ON scenes(chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_appearances_entity ON appearances(entity_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_appearances_chapter ON appearances(chapter)"
+        )
 
-            # v5.1 引入索引
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(type)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_entities_tier ON entities(tier)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_entities_protagonist ON entities(is_protagonist)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_aliases_entity ON aliases(entity_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_aliases_alias ON aliases(alias)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_state_changes_entity ON state_changes(entity_id)"
+        # ==================== v5.1 引入表 ====================
+
+        # 实体表 (替代 state.json 中的 entities_v3)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                canonical_name TEXT NOT NULL,
+                tier TEXT DEFAULT '装饰',
+                desc TEXT,
+                current_json TEXT,
+                first_appearance INTEGER DEFAULT 0,
+                last_appearance INTEGER DEFAULT 0,
+                is_protagonist INTEGER DEFAULT 0,
+                is_archived INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_state_changes_chapter ON state_changes(chapter)"
+        """)
+
+        # 别名表 (替代 state.json 中的 alias_index，支持一对多)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                entity_type TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (alias, entity_id, entity_type)
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationships_from ON relationships(from_entity)"
+        """)
+
+        # 状态变化表 (替代 state.json 中的 state_changes)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS state_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                reason TEXT,
+                chapter INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationships_to ON relationships(to_entity)"
+        """)
+
+        # 关系表 (替代 state.json 中的 structured_relationships)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS relationships (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                from_entity TEXT NOT NULL,
+                to_entity TEXT NOT NULL,
+                type TEXT NOT NULL,
+                description TEXT,
+                chapter INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(from_entity, to_entity, type)
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationships_chapter ON relationships(chapter)"
+        """)
+
+        # v5.1 引入索引
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(type)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entities_tier ON entities(tier)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entities_protagonist ON entities(is_protagonist)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aliases_entity ON aliases(entity_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_aliases_alias ON aliases(alias)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_state_changes_entity ON state_changes(entity_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_state_changes_chapter ON state_changes(chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationships_from ON relationships(from_entity)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationships_to ON relationships(to_entity)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationships_chapter ON relationships(chapter)"
+        )
+
+        # 关系事件表 (v5.5 引入，用于时序回放/图谱分析)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS relationship_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                from_entity TEXT NOT NULL,
+                to_entity TEXT NOT NULL,
+                type TEXT NOT NULL,
+                action TEXT NOT NULL DEFAULT 'update',
+                polarity INTEGER DEFAULT 0,
+                strength REAL DEFAULT 0.5,
+                description TEXT,
+                chapter INTEGER NOT NULL,
+                scene_index INTEGER DEFAULT 0,
+                evidence TEXT,
+                confidence REAL DEFAULT 1.0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationship_events_from_chapter ON relationship_events(from_entity, chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationship_events_to_chapter ON relationship_events(to_entity, chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationship_events_chapter ON relationship_events(chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_relationship_events_type_chapter ON relationship_events(type, chapter)"
+        )
 
-            # 关系事件表 (v5.5 引入，用于时序回放/图谱分析)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS relationship_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    from_entity TEXT NOT NULL,
-                    to_entity TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    action TEXT NOT NULL DEFAULT 'update',
-                    polarity INTEGER DEFAULT 0,
-                    strength REAL DEFAULT 0.5,
-                    description TEXT,
-                    chapter INTEGER NOT NULL,
-                    scene_index INTEGER DEFAULT 0,
-                    evidence TEXT,
-                    confidence REAL DEFAULT 1.0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationship_events_from_chapter ON relationship_events(from_entity, chapter)"
+        # ==================== v5.3 引入表：追读力债务管理 ====================
+
+        # Override Contract 表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS override_contracts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chapter INTEGER NOT NULL,
+                constraint_type TEXT NOT NULL,
+                constraint_id TEXT NOT NULL,
+                rationale_type TEXT NOT NULL,
+                rationale_text TEXT,
+                payback_plan TEXT,
+                due_chapter INTEGER NOT NULL,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                fulfilled_at TIMESTAMP,
+                UNIQUE(chapter, constraint_type, constraint_id)
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationship_events_to_chapter ON relationship_events(to_entity, chapter)"
+        """)
+
+        # 追读力债务表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chase_debt (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                debt_type TEXT NOT NULL,
+                original_amount REAL DEFAULT 1.0,
+                current_amount REAL DEFAULT 1.0,
+                interest_rate REAL DEFAULT 0.1,
+                source_chapter INTEGER NOT NULL,
+                due_chapter INTEGER NOT NULL,
+                override_contract_id INTEGER,
+                status TEXT DEFAULT 'active',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (override_contract_id) REFERENCES override_contracts(id)
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationship_events_chapter ON relationship_events(chapter)"
+        """)
+
+        # 债务事件日志表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS debt_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                debt_id INTEGER NOT NULL,
+                event_type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                chapter INTEGER NOT NULL,
+                note TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (debt_id) REFERENCES chase_debt(id) ON DELETE CASCADE
             )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_relationship_events_type_chapter ON relationship_events(type, chapter)"
+        """)
+
+        # 章节追读力元数据表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chapter_reading_power (
+                chapter INTEGER PRIMARY KEY,
+                hook_type TEXT,
+                hook_strength TEXT DEFAULT 'medium',
+                coolpoint_patterns TEXT,
+                micropayoffs TEXT,
+                hard_violations TEXT,
+                soft_suggestions TEXT,
+                is_transition INTEGER DEFAULT 0,
+                override_count INTEGER DEFAULT 0,
+                debt_balance REAL DEFAULT 0.0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        """)
 
-            # ==================== v5.3 引入表：追读力债务管理 ====================
-
-            # Override Contract 表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS override_contracts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    chapter INTEGER NOT NULL,
-                    constraint_type TEXT NOT NULL,
-                    constraint_id TEXT NOT NULL,
-                    rationale_type TEXT NOT NULL,
-                    rationale_text TEXT,
-                    payback_plan TEXT,
-                    due_chapter INTEGER NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    fulfilled_at TIMESTAMP,
-                    UNIQUE(chapter, constraint_type, constraint_id)
-                )
-            """)
-
-            # 追读力债务表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chase_debt (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    debt_type TEXT NOT NULL,
-                    original_amount REAL DEFAULT 1.0,
-                    current_amount REAL DEFAULT 1.0,
-                    interest_rate REAL DEFAULT 0.1,
-                    source_chapter INTEGER NOT NULL,
-                    due_chapter INTEGER NOT NULL,
-                    override_contract_id INTEGER,
-                    status TEXT DEFAULT 'active',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (override_contract_id) REFERENCES override_contracts(id)
-                )
-            """)
-
-            # 债务事件日志表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS debt_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    debt_id INTEGER NOT NULL,
-                    event_type TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    chapter INTEGER NOT NULL,
-                    note TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (debt_id) REFERENCES chase_debt(id) ON DELETE CASCADE
-                )
-            """)
-
-            # 章节追读力元数据表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS chapter_reading_power (
-                    chapter INTEGER PRIMARY KEY,
-                    hook_type TEXT,
-                    hook_strength TEXT DEFAULT 'medium',
-                    coolpoint_patterns TEXT,
-                    micropayoffs TEXT,
-                    hard_violations TEXT,
-                    soft_suggestions TEXT,
-                    is_transition INTEGER DEFAULT 0,
-                    override_count INTEGER DEFAULT 0,
-                    debt_balance REAL DEFAULT 0.0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        # v5.3 引入索引
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_override_contracts_chapter ON override_contracts(chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_override_contracts_status ON override_contracts(status)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_override_contracts_due ON override_contracts(due_chapter)"
+        )
+        ensure_override_ledger_columns(conn)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chase_debt_status ON chase_debt(status)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chase_debt_source ON chase_debt(source_chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chase_debt_due ON chase_debt(due_chapter)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_debt_events_debt ON debt_events(debt_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_debt_events_chapter ON debt_events(chapter)"
+        )
 
-            # v5.3 引入索引
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_override_contracts_chapter ON override_contracts(chapter)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_override_contracts_status ON override_contracts(status)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_override_contracts_due ON override_contracts(due_chapter)"
-            )
-            ensure_override_ledger_columns(conn)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_chase_debt_status ON chase_debt(status)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_chase_debt_source ON chase_debt(source_chapter)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_chase_debt_due ON chase_debt(due_chapter)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_debt_events_debt ON debt_events(debt_id)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_debt_events_chapter ON debt_events(chapter)"
+        # ==================== v5.4 新增表：无效事实与日志 ====================
+
+        # 无效事实表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS invalid_facts (
+                id INTEGER PRIMARY KEY,
+                source_type TEXT NOT NULL,
+                source_id TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                marked_by TEXT NOT NULL,
+                marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                confirmed_at TIMESTAMP,
+                chapter_discovered INTEGER
             )
+        """)
 
-            # ==================== v5.4 新增表：无效事实与日志 ====================
-
-            # 无效事实表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS invalid_facts (
-                    id INTEGER PRIMARY KEY,
-                    source_type TEXT NOT NULL,
-                    source_id TEXT NOT NULL,
-                    reason TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    marked_by TEXT NOT NULL,
-                    marked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    confirmed_at TIMESTAMP,
-                    chapter_discovered INTEGER
-                )
-            """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_invalid_status ON invalid_facts(status)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_invalid_source ON invalid_facts(source_type, source_id)"
+        )
 
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_invalid_status ON invalid_facts(status)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_invalid_source ON invalid_facts(source_type, source_id)"
+        # 审查指标表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS review_metrics (
+                start_chapter INTEGER NOT NULL,
+                end_chapter INTEGER NOT NULL,
+                overall_score REAL DEFAULT 0,
+                dimension_scores TEXT,
+                severity_counts TEXT,
+                critical_issues TEXT,
+                report_file TEXT,
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (start_chapter, end_chapter)
             )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_review_metrics_end ON review_metrics(end_chapter)"
+        )
 
-            # 审查指标表
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS review_metrics (
-                    start_chapter INTEGER NOT NULL,
-                    end_chapter INTEGER NOT NULL,
-                    overall_score REAL DEFAULT 0,
-                    dimension_scores TEXT,
-                    severity_counts TEXT,
-                    critical_issues TEXT,
-                    report_file TEXT,
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (start_chapter, end_chapter)
-                )
-            """)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_review_metrics_end ON review_metrics(end_chapter)"
+        # RAG 查询日志
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rag_query_log (
+                id INTEGER PRIMARY KEY,
+                query TEXT,
+                query_type TEXT,
+                results_count INTEGER,
+                hit_sources TEXT,
+                latency_ms INTEGER,
+                chapter INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rag_query_type ON rag_query_log(query_type)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rag_query_chapter ON rag_query_log(chapter)"
+        )
 
-            # RAG 查询日志
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS rag_query_log (
-                    id INTEGER PRIMARY KEY,
-                    query TEXT,
-                    query_type TEXT,
-                    results_count INTEGER,
-                    hit_sources TEXT,
-                    latency_ms INTEGER,
-                    chapter INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_rag_query_type ON rag_query_log(query_type)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_rag_query_chapter ON rag_query_log(chapter)"
+        # 工具调用统计
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tool_call_stats (
+                id INTEGER PRIMARY KEY,
+                tool_name TEXT,
+                success BOOLEAN,
+                retry_count INTEGER DEFAULT 0,
+                error_code TEXT,
+                error_message TEXT,
+                chapter INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_stats_name ON tool_call_stats(tool_name)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tool_stats_chapter ON tool_call_stats(chapter)"
+        )
 
-            # 工具调用统计
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tool_call_stats (
-                    id INTEGER PRIMARY KEY,
-                    tool_name TEXT,
-                    success BOOLEAN,
-                    retry_count INTEGER DEFAULT 0,
-                    error_code TEXT,
-                    error_message TEXT,
-                    chapter INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_tool_stats_name ON tool_call_stats(tool_name)"
-            )
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_tool_stats_chapter ON tool_call_stats(chapter)"
+        # 写作清单评分记录（Phase F）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS writing_checklist_scores (
+                chapter INTEGER PRIMARY KEY,
+                template TEXT DEFAULT 'plot',
+                total_items INTEGER DEFAULT 0,
+                required_items INTEGER DEFAULT 0,
+                completed_items INTEGER DEFAULT 0,
+                completed_required INTEGER DEFAULT 0,
+                total_weight REAL DEFAULT 0,
+                completed_weight REAL DEFAULT 0,
+                completion_rate REAL DEFAULT 0,
+                score REAL DEFAULT 0,
+                score_breakdown TEXT,
+                pending_items TEXT,
+                source TEXT,
+                notes TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_checklist_score_value ON writing_checklist_scores(score)"
+        )
 
-            # 写作清单评分记录（Phase F）
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS writing_checklist_scores (
-                    chapter INTEGER PRIMARY KEY,
-                    template TEXT DEFAULT 'plot',
-                    total_items INTEGER DEFAULT 0,
-                    required_items INTEGER DEFAULT 0,
-                    completed_items INTEGER DEFAULT 0,
-                    completed_required INTEGER DEFAULT 0,
-                    total_weight REAL DEFAULT 0,
-                    completed_weight REAL DEFAULT 0,
-                    completion_rate REAL DEFAULT 0,
-                    score REAL DEFAULT 0,
-                    score_breakdown TEXT,
-                    pending_items TEXT,
-                    source TEXT,
-                    notes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        # 表级数据版本：触发器在增删改时递增，供跨进程的上下文缓存判断输入是否变化
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # __epoch__ 在库创建时取随机值：库被删除重建后版本号从 0 重计，也不会与旧指纹撞上
+        cursor.execute(
+            "INSERT OR IGNORE INTO table_versions(table_name, version) VALUES ('__epoch__', random())"
+        )
+        for table in VERSIONED_TABLES:
             cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_checklist_score_value ON writing_checklist_scores(score)"
+                "INSERT OR IGNORE INTO table_versions(table_name, version) VALUES (?, 0)",
+                (table,),
             )
-
-            conn.commit()
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                    END
+                """)
+
+    def _active_unit_of_work(self) -> Optional[_UnitOfWorkConnection]:
+        local = getattr(self, "_tx_local", None)
+        return getattr(local, "conn", None) if local is not None else None
 
     @contextmanager
     def _get_conn(self):
-        """获取数据库连接"""
+        """获取数据库连接（处于 transaction() 内时复用工作单元的连接）"""
+        shared = self._active_unit_of_work()
+        if shared is not None:
+            yield shared
+            return
         conn = sqlite3.connect(str(self.config.index_db))
         conn.row_factory = sqlite3.Row
         try:
@@ -633,6 +734,44 @@ class IndexManager(IndexChapterMixin, IndexEntityMixin, IndexDebtMixin, IndexRea
         finally:
             conn.close()
 
+    @contextmanager
+    def transaction(self):
+        """连接级工作单元：块内所有经 _get_conn 的读写共用一个连接，结束时统一提交一次。
+
+        块内抛异常则整体回滚；嵌套调用并入最外层工作单元。工作单元按线程隔离。
+        """
+        shared = self._active_unit_of_work()
+        if shared is not None:
+            yield shared
+            return
+        if getattr(self, "_tx_local", None) is None:
+            self._tx_local = threading.local()
+        conn = sqlite3.connect(str(self.config.index_db))
+        conn.row_factory = sqlite3.Row
+        shared = _UnitOfWorkConnection(conn)
+        self._tx_local.conn = shared
+        try:
+            yield shared
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._tx_local.conn = None
+            conn.close()
+
+    def get_table_versions(self, tables: Iterable[str] = VERSIONED_TABLES) -> Dict[str, int]:
+        """返回各表的数据版本号（任何增删改都会使其递增），附带库实例标识 ``__epoch__``。"""
+        wanted = ["__epoch__"] + [t for t in tables if t in VERSIONED_TABLES]
+        placeholders = ",".join("?" for _ in wanted)
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})",
+                wanted,
+            ).fetchall()
+        versions = {row["table_name"]: int(row["version"]) for row in rows}
+        return {t: versions.get(t, 0) for t in wanted}
+
     def apply_entity_delta(self, delta: Dict[str, Any]) -> bool:
         """将 commit/entity 提取产物映射为实体或关系索引更新。"""
         if not isinstance(delta, dict):
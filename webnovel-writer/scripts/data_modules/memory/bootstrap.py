@@ -10,6 +10,7 @@ from typing import Any, Dict
 
 from ..config import DataModulesConfig, get_config
 from ..index_manager import IndexManager
+from ..summary_store import SummaryStore
 from .schema import MemoryItem
 from .store import ScratchpadManager
 
@@ -157,26 +158,31 @@ def bootstrap_from_index(config: DataModulesConfig | None = None) -> Dict[str, A
         by_category["relationship"] = by_category.get("relationship", 0) + 1
 
     # 从 summaries 中抽取“伏笔”区块回填 open_loop。
-    summaries_dir = cfg.webnovel_dir / "summaries"
-    if summaries_dir.exists():
-        for path in sorted(summaries_dir.glob("*.md")):
-            text = path.read_text(encoding="utf-8")
+    summary_store = SummaryStore(cfg)
+    summaries = [(summary.chapter, summary.text) for summary in summary_store.all()]
+    # 摘要索引只收规范文件名；ch12.md、第3章.md 等旧命名按文件名解析章节号后直接读取
+    if summary_store.summaries_dir.is_dir():
+        for path in sorted(summary_store.summaries_dir.glob("*.md")):
             chapter = _extract_chapter_from_name(path.stem)
-            for idx_loop, loop in enumerate(_extract_open_loops(text), start=1):
-                item = MemoryItem(
-                    id=f"bootstrap-open-loop-{chapter}-{idx_loop}",
-                    layer="semantic",
-                    category="open_loop",
-                    subject=loop[:64],
-                    field="status",
-                    value=loop,
-                    payload={"planted_chapter": chapter, "urgency": 50, "status": "active"},
-                    status="active",
-                    source_chapter=chapter,
-                    evidence=["bootstrap:summaries_foreshadowing"],
-                )
-                store.upsert_item(item)
-                created += 1
-                by_category["open_loop"] = by_category.get("open_loop", 0) + 1
+            if chapter > 0 and path.name == summary_store.summary_path(chapter).name:
+                continue
+            summaries.append((chapter, path.read_text(encoding="utf-8")))
+    for chapter, text in summaries:
+        for idx_loop, loop in enumerate(_extract_open_loops(text), start=1):
+            item = MemoryItem(
+                id=f"bootstrap-open-loop-{chapter}-{idx_loop}",
+                layer="semantic",
+                category="open_loop",
+                subject=loop[:64],
+                field="status",
+                value=loop,
+                payload={"planted_chapter": chapter, "urgency": 50, "status": "active"},
+                status="active",
+                source_chapter=chapter,
+                evidence=["bootstrap:summaries_foreshadowing"],
+            )
+            store.upsert_item(item)
+            created += 1
+            by_category["open_loop"] = by_category.get("open_loop", 0) + 1
 
     return {"items_created": created, "categories": by_category}
@@ -5,14 +5,18 @@
 """
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, List
+import copy
+import heapq
+from typing import Any, Dict, List, Optional
 
 from ..config import DataModulesConfig, get_config
 from ..index_manager import IndexManager
+from ..state_store import load_state
+from ..summary_store import SummaryStore
 from .schema import MemoryItem
 from .store import ScratchpadManager
 from .budget import allocate_limits
+from .relevance import RelevanceIndex, load_snapshot
 
 try:
     from chapter_outline_loader import load_chapter_outline
@@ -35,19 +39,21 @@ class MemoryOrchestrator:
         self.config = config or get_config()
         self.index_manager = IndexManager(self.config)
         self.store = ScratchpadManager(self.config)
+        self.summary_store = SummaryStore(self.config)
 
     def build_memory_pack(self, chapter: int, task_type: str = "write") -> Dict[str, Any]:
         outline = load_chapter_outline(self.config.project_root, chapter, max_chars=1500)
 
         working = self._build_working_memory(chapter=chapter, outline=outline)
         episodic = self._build_episodic_memory(chapter=chapter)
-        active_items = self.store.query(status="active")
-        conflicts = self.store.conflicts()
-        filtered = self._filter_relevant(active_items, chapter=chapter, outline=outline)
+        snapshot = load_snapshot(self.store)
+        active_items = snapshot.active_items
+        conflicts = snapshot.conflicts
+        filtered = self._filter_relevant(active_items, chapter=chapter, outline=outline, index=snapshot.index)
 
         max_items = max(1, int(getattr(self.config, "memory_orchestrator_max_items", 30)))
         limits = allocate_limits(max_items=max_items, task_type=task_type)
-        semantic_items = self._apply_budget(filtered, max_items=limits["semantic"])
+        semantic_items = self._apply_budget(filtered, max_items=limits["semantic"], by_recency=not outline)
         working_items = working[: limits["working"]]
         episodic_items = episodic[: limits["episodic"]]
         semantic_payload = [item.to_dict() for item in semantic_items]
@@ -67,7 +73,7 @@ class MemoryOrchestrator:
                 {
                     "type": "memory_conflict",
                     "count": len(conflicts),
-                    "sample": conflicts[:5],
+                    "sample": copy.deepcopy(conflicts[:5]),
                 }
             )
 
@@ -92,60 +98,57 @@ class MemoryOrchestrator:
             },
         }
 
-    def _filter_relevant(self, items: List[MemoryItem], chapter: int, outline: str) -> List[MemoryItem]:
-        if not items:
-            return []
-        if not outline:
-            return sorted(items, key=lambda x: (x.source_chapter, x.updated_at), reverse=True)
+    def _filter_relevant(
+        self,
+        items: List[MemoryItem],
+        chapter: int,
+        outline: str,
+        index: Optional[RelevanceIndex] = None,
+    ) -> List[MemoryItem]:
+        """保留与大纲相关的条目（按原顺序，不排序）：subject / field / value 前缀出现在大纲中，或来源章节足够近。
+
+        没有大纲时全部保留。``index`` 须基于同一 ``items`` 构建；未提供时现建。
+        """
+        if not items or not outline:
+            return list(items)
 
-        keep: List[MemoryItem] = []
+        index = index or RelevanceIndex(items)
+        matched = index.match(outline)
         source_window = max(1, int(getattr(self.config, "memory_orchestrator_source_window", 20)))
-        for item in items:
-            if item.subject and item.subject in outline:
-                keep.append(item)
-                continue
-            if item.field and item.field in outline:
-                keep.append(item)
-                continue
-            if item.value and item.value[:20] in outline:
-                keep.append(item)
-                continue
-            if item.source_chapter > 0 and chapter - item.source_chapter <= source_window:
-                keep.append(item)
-
-        return sorted(keep, key=lambda x: (self.PRIORITY.get(x.category, 99), -x.source_chapter))
-
-    def _apply_budget(self, items: List[MemoryItem], max_items: int) -> List[MemoryItem]:
+        return [
+            item
+            for pos, item in enumerate(items)
+            if pos in matched or (item.source_chapter > 0 and chapter - item.source_chapter <= source_window)
+        ]
+
+    def _apply_budget(self, items: List[MemoryItem], max_items: int, by_recency: bool = False) -> List[MemoryItem]:
+        """按优先级（类别、来源章节由近到远）取前 max_items 条；by_recency 时按来源章节与更新时间由新到旧。
+
+        heapq 的 top-N 与先整体排序再截断结果一致（同序项保持原顺序），但只维护 max_items 大小的堆。
+        """
         if max_items <= 0:
             return []
-        if len(items) <= max_items:
-            return list(items)
-        return list(items[:max_items])
+        if by_recency:
+            return heapq.nlargest(max_items, items, key=lambda x: (x.source_chapter, x.updated_at))
+        return heapq.nsmallest(max_items, items, key=lambda x: (self.PRIORITY.get(x.category, 99), -x.source_chapter))
 
     def _load_state(self) -> Dict[str, Any]:
         path = self.config.state_file
         if not path.exists():
             return {}
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            return load_state(path, strict=True)
         except Exception as exc:
             import sys
             print(f"⚠️ state.json 读取失败: {exc}", file=sys.stderr)
             return {}
 
     def _load_recent_summaries(self, chapter: int, window: int) -> List[Dict[str, Any]]:
-        result: List[Dict[str, Any]] = []
-        summary_dir = self.config.webnovel_dir / "summaries"
-        if not summary_dir.exists():
-            return result
-        for ch in range(max(1, chapter - window), chapter):
-            path = summary_dir / f"ch{ch:04d}.md"
-            if not path.exists():
-                continue
-            text = path.read_text(encoding="utf-8")
-            if text:
-                result.append({"layer": "working", "source": "summary", "chapter": ch, "content": text[:800]})
-        return result
+        return [
+            {"layer": "working", "source": "summary", "chapter": s.chapter, "content": s.text[:800]}
+            for s in self.summary_store.window(chapter, window)
+            if s.text
+        ]
 
     def _build_working_memory(self, chapter: int, outline: str) -> List[Dict[str, Any]]:
         state = self._load_state()
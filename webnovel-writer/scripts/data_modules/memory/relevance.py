@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长期记忆相关性索引。
+
+对全部 active 条目的 subject / field / value 前 20 字建一个 Aho-Corasick 自动机，
+大纲只需扫描一遍即可得到命中的条目，不再逐条做子串查找。
+索引连同 active 条目与冲突统计一起按 scratchpad 修订版本缓存在进程内，
+同一版本上连续构建多个章节的记忆包时不再重复加载和扫描 scratchpad。
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .schema import MemoryItem
+from .store import ScratchpadManager
+
+
+# 与原先逐条匹配时的 value[:20] 保持一致
+VALUE_PREFIX_CHARS = 20
+
+_CACHE_LIMIT = 8
+_snapshot_cache: "OrderedDict[Tuple[str, Any], MemorySnapshot]" = OrderedDict()
+_snapshot_lock = threading.Lock()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 多模式匹配：find 返回在文本中出现过的关键词下标。"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [-1]
+        for keyword in keywords:
+            self._insert(keyword)
+        self._build_links()
+
+    def _insert(self, keyword: str) -> None:
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+            node = nxt
+        if self._out[node] < 0:
+            self._out[node] = len(self.keywords)
+            self.keywords.append(keyword)
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                queue.append(child)
+
+    def find(self, text: str) -> Set[int]:
+        if not self.keywords or not text:
+            return set()
+        goto, fail = self._goto, self._fail
+        node = 0
+        visited: Set[int] = set()
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if node:
+                visited.add(node)
+        # 到达过的状态沿失败链上溯即为全部命中的后缀；每个状态只展开一次
+        found: Set[int] = set()
+        expanded: Set[int] = set()
+        for node in visited:
+            while node and node not in expanded:
+                expanded.add(node)
+                if self._out[node] >= 0:
+                    found.add(self._out[node])
+                node = fail[node]
+        return found
+
+
+class RelevanceIndex:
+    """条目关键词（subject / field / value 前缀）到条目位置的倒排 + 自动机。"""
+
+    def __init__(self, items: Iterable[MemoryItem]):
+        self.items: List[MemoryItem] = list(items)
+        postings: Dict[str, List[int]] = {}
+        for pos, item in enumerate(self.items):
+            for keyword in (item.subject, item.field, (item.value or "")[:VALUE_PREFIX_CHARS]):
+                if keyword:
+                    postings.setdefault(keyword, []).append(pos)
+        self._automaton = KeywordAutomaton(postings)
+        self._postings = [postings[keyword] for keyword in self._automaton.keywords]
+
+    def match(self, text: str) -> Set[int]:
+        """任一关键词出现在 text 中的条目位置。"""
+        positions: Set[int] = set()
+        for keyword_id in self._automaton.find(text):
+            positions.update(self._postings[keyword_id])
+        return positions
+
+
+@dataclass
+class MemorySnapshot:
+    """某一 scratchpad 版本的 active 条目、冲突统计与相关性索引。"""
+
+    revision: Any
+    active_items: List[MemoryItem]
+    conflicts: List[Dict[str, Any]]
+    index: RelevanceIndex
+
+
+def load_snapshot(store: ScratchpadManager) -> MemorySnapshot:
+    """按 scratchpad 修订版本取快照；版本未变时直接复用进程内缓存。"""
+    revision = store.revision()
+    cache_key: Optional[Tuple[str, Any]] = (str(store.path), revision) if revision is not None else None
+    if cache_key is not None:
+        with _snapshot_lock:
+            cached = _snapshot_cache.get(cache_key)
+            if cached is not None:
+                _snapshot_cache.move_to_end(cache_key)
+                return cached
+
+    active_items = store.query(status="active")
+    snapshot = MemorySnapshot(
+        revision=revision,
+        active_items=active_items,
+        conflicts=store.conflicts(),
+        index=RelevanceIndex(active_items),
+    )
+    # 构建期间有写入时版本已变，不缓存，下次按新版本重建
+    if cache_key is not None and store.revision() == revision:
+        with _snapshot_lock:
+            _snapshot_cache[cache_key] = snapshot
+            while len(_snapshot_cache) > _CACHE_LIMIT:
+                _snapshot_cache.popitem(last=False)
+    return snapshot
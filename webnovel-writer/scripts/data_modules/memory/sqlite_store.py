@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scratchpad 的 SQLite 后端。
+
+每条 MemoryItem 一行：按 id 唯一，按 (bucket, item_key) 建索引以便 upsert 直接定位同 key 旧值，
+query/stats/conflicts 下推为 SQL 过滤与聚合。单次 upsert 只触及相关行，不再整份读写 JSON。
+
+同 key 的 outdated 旧值要保留审计轨迹，因此 item_key 不能建唯一约束；唯一性落在 id 上，
+写入使用 ``INSERT ... ON CONFLICT(id) DO UPDATE``。``seq`` 记录写入顺序，用于还原与 JSON 后端一致的行序。
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config import DataModulesConfig
+from .schema import (
+    BUCKET_TO_CATEGORY,
+    CATEGORY_TO_BUCKET,
+    MemoryItem,
+    ScratchpadData,
+    memory_item_key,
+    now_iso,
+)
+
+try:
+    from security_utils import atomic_write_json, read_json_safe
+except ImportError:  # pragma: no cover
+    from scripts.security_utils import atomic_write_json, read_json_safe
+
+
+_COLUMNS = (
+    "id",
+    "layer",
+    "category",
+    "subject",
+    "field",
+    "value",
+    "payload",
+    "status",
+    "source_chapter",
+    "evidence",
+    "updated_at",
+)
+_CATEGORY_RANK: Dict[str, int] = {category: i for i, category in enumerate(CATEGORY_TO_BUCKET)}
+
+
+def _item_key(item: MemoryItem) -> str:
+    return json.dumps(list(memory_item_key(item)), ensure_ascii=False)
+
+
+def _row_to_item(row: sqlite3.Row) -> MemoryItem:
+    return MemoryItem(
+        id=row["id"],
+        layer=row["layer"],
+        category=row["category"],
+        subject=row["subject"],
+        field=row["field"],
+        value=row["value"],
+        payload=json.loads(row["payload"] or "{}"),
+        status=row["status"],
+        source_chapter=int(row["source_chapter"] or 0),
+        evidence=json.loads(row["evidence"] or "[]"),
+        updated_at=row["updated_at"] or "",
+    )
+
+
+def _insert_row(conn: sqlite3.Connection, item: MemoryItem, seq: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO memory_items(
+            id, bucket, item_key, layer, category, subject, field, value,
+            payload, status, source_chapter, evidence, updated_at, seq
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            bucket = excluded.bucket,
+            item_key = excluded.item_key,
+            layer = excluded.layer,
+            category = excluded.category,
+            subject = excluded.subject,
+            field = excluded.field,
+            value = excluded.value,
+            payload = excluded.payload,
+            status = excluded.status,
+            source_chapter = excluded.source_chapter,
+            evidence = excluded.evidence,
+            updated_at = excluded.updated_at,
+            seq = excluded.seq
+        """,
+        (
+            item.id,
+            CATEGORY_TO_BUCKET[item.category],
+            _item_key(item),
+            item.layer,
+            item.category,
+            item.subject,
+            item.field,
+            item.value,
+            json.dumps(item.payload, ensure_ascii=False),
+            item.status,
+            item.source_chapter,
+            json.dumps(item.evidence, ensure_ascii=False),
+            item.updated_at,
+            seq,
+        ),
+    )
+
+
+class SQLiteScratchpadStore:
+    """ScratchpadManager 的 SQLite 存储实现（由 ScratchpadManager 按配置委托）。"""
+
+    def __init__(self, config: DataModulesConfig):
+        self.config = config
+        self.path = Path(config.scratchpad_db)
+        self._init_db()
+
+    @contextmanager
+    def _get_conn(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if write:
+                # 读改写需串行：IMMEDIATE 在事务开始即取得写锁
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            else:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        self.config.ensure_dirs()
+        with self._get_conn(write=True) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_items (
+                    id TEXT PRIMARY KEY,
+                    bucket TEXT NOT NULL,
+                    item_key TEXT NOT NULL,
+                    layer TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    subject TEXT NOT NULL DEFAULT '',
+                    field TEXT NOT NULL DEFAULT '',
+                    value TEXT NOT NULL DEFAULT '',
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    status TEXT NOT NULL DEFAULT 'active',
+                    source_chapter INTEGER NOT NULL DEFAULT 0,
+                    evidence TEXT NOT NULL DEFAULT '[]',
+                    updated_at TEXT NOT NULL DEFAULT '',
+                    seq INTEGER NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_memory_items_key ON memory_items(bucket, item_key)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_memory_items_query ON memory_items(category, subject, status)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            imported = conn.execute("SELECT 1 FROM memory_meta WHERE key = 'json_imported'").fetchone()
+            if imported is None:
+                self._import_legacy_json(conn)
+                conn.execute("INSERT INTO memory_meta(key, value) VALUES ('json_imported', ?)", (now_iso(),))
+
+    def _import_legacy_json(self, conn: sqlite3.Connection) -> None:
+        """首次启用时导入已有的 memory_scratchpad.json，保持行序。"""
+        legacy = Path(self.config.scratchpad_file)
+        if not legacy.is_file():
+            return
+        payload = read_json_safe(legacy, default={})
+        if isinstance(payload, dict):
+            self._replace_rows(conn, ScratchpadData.from_dict(payload))
+
+    # ==================== 写入 ====================
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM memory_items").fetchone()
+        return int(row[0])
+
+    @staticmethod
+    def _touch(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "INSERT INTO memory_meta(key, value) VALUES ('last_updated', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (now_iso(),),
+        )
+        # last_updated 只精确到秒，另记单调递增的修订号供读取方判断内容是否变化
+        conn.execute(
+            "INSERT INTO memory_meta(key, value) VALUES ('revision', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT)"
+        )
+
+    @contextmanager
+    def write_session(self) -> Iterator["SQLiteWriteSession"]:
+        """单个写事务内的批量写会话（接口与 JSON 后端的 ScratchpadWriteSession 一致）。"""
+        with self._get_conn(write=True) as conn:
+            session = SQLiteWriteSession(conn, self._next_seq(conn))
+            yield session
+            if session.changed:
+                self._touch(conn)
+
+    def upsert_items(self, items: List[MemoryItem]) -> List[Dict[str, int]]:
+        if not items:
+            return []
+        with self.write_session() as session:
+            return [session.upsert(item) for item in items]
+
+    def mark_status(self, item_id: str, status: str) -> bool:
+        with self.write_session() as session:
+            return session.mark_status(item_id, status)
+
+    def _replace_rows(self, conn: sqlite3.Connection, data: ScratchpadData) -> None:
+        conn.execute("DELETE FROM memory_items")
+        seq = 0
+        for bucket in BUCKET_TO_CATEGORY:
+            for row in getattr(data, bucket):
+                seq += 1
+                _insert_row(conn, row.normalized(), seq)
+        self._touch(conn)
+
+    def replace(self, data: ScratchpadData) -> None:
+        """整体替换（ScratchpadManager.save / 压缩后写回）。"""
+        with self._get_conn(write=True) as conn:
+            self._replace_rows(conn, data)
+
+    # ==================== 读取 ====================
+
+    def revision(self) -> int:
+        """写入修订号：每次有变化的写事务递增 1。"""
+        with self._get_conn() as conn:
+            row = conn.execute("SELECT value FROM memory_meta WHERE key = 'revision'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def count(self) -> int:
+        with self._get_conn() as conn:
+            return int(conn.execute("SELECT COUNT(*) FROM memory_items").fetchone()[0])
+
+    def load(self) -> ScratchpadData:
+        data = ScratchpadData.empty()
+        with self._get_conn() as conn:
+            rows = conn.execute(f"SELECT {', '.join(_COLUMNS)}, bucket FROM memory_items ORDER BY seq").fetchall()
+            last = conn.execute("SELECT value FROM memory_meta WHERE key = 'last_updated'").fetchone()
+        for row in rows:
+            getattr(data, row["bucket"]).append(_row_to_item(row))
+        data.meta["last_updated"] = last["value"] if last else ""
+        data.meta["total_items"] = data.count_items()
+        return data
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        subject: Optional[str] = None,
+        status: Optional[str] = "active",
+    ) -> List[MemoryItem]:
+        if category and category not in CATEGORY_TO_BUCKET:
+            return []
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("category", category), ("subject", subject), ("status", status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM memory_items {where} ORDER BY seq", params
+            ).fetchall()
+        items = [_row_to_item(row) for row in rows]
+        items.sort(key=lambda item: _CATEGORY_RANK.get(item.category, len(_CATEGORY_RANK)))
+        return items
+
+    def stats(self) -> Dict[str, Any]:
+        by_category: Dict[str, int] = {category: 0 for category in CATEGORY_TO_BUCKET}
+        by_status: Dict[str, int] = {}
+        with self._get_conn() as conn:
+            for row in conn.execute(
+                "SELECT category, status, COUNT(*) AS n FROM memory_items GROUP BY category, status"
+            ):
+                by_category[row["category"]] = by_category.get(row["category"], 0) + row["n"]
+                by_status[row["status"]] = by_status.get(row["status"], 0) + row["n"]
+        return {
+            "total": sum(by_category.values()),
+            "active": by_status.get("active", 0),
+            "outdated": by_status.get("outdated", 0),
+            "contradicted": by_status.get("contradicted", 0),
+            "tentative": by_status.get("tentative", 0),
+            "by_category": by_category,
+            "path": str(self.path),
+        }
+
+    def conflicts(self) -> List[Dict[str, Any]]:
+        with self._get_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT bucket, item_key, COUNT(*) AS n, MIN(seq) AS first_seq
+                FROM memory_items
+                WHERE status = 'active'
+                GROUP BY bucket, item_key
+                HAVING COUNT(*) > 1
+                ORDER BY first_seq
+                """
+            ).fetchall()
+        conflicts = [
+            {"category": BUCKET_TO_CATEGORY[row["bucket"]], "key": json.loads(row["item_key"]), "active_items": row["n"]}
+            for row in rows
+        ]
+        conflicts.sort(key=lambda entry: _CATEGORY_RANK[entry["category"]])
+        return conflicts
+
+    def export_json(self, path: Optional[Path] = None) -> Dict[str, Any]:
+        """导出为与 JSON 后端同构的 memory_scratchpad.json，供旧读取方使用。"""
+        target = Path(path or self.config.scratchpad_file)
+        data = self.load()
+        stats = atomic_write_json(target, data.to_dict(), use_lock=True, backup=False, compact=True, skip_unchanged=True)
+        return {"path": str(target), "items": data.count_items(), **stats}
+
+
+class SQLiteWriteSession:
+    """绑定到一个写事务连接的 upsert/mark_status 会话，语义与 JSON 后端逐条一致。"""
+
+    def __init__(self, conn: sqlite3.Connection, next_seq: int):
+        self._conn = conn
+        self._seq = next_seq
+        self.changed = False
+
+    def upsert(self, item: MemoryItem) -> Dict[str, int]:
+        conn = self._conn
+        normalized = item.normalized()
+        bucket = CATEGORY_TO_BUCKET[normalized.category]
+        same_key = conn.execute(
+            "SELECT id, status FROM memory_items WHERE bucket = ? AND item_key = ? AND id != ?",
+            (bucket, _item_key(normalized), normalized.id),
+        ).fetchall()
+        same_id = conn.execute(
+            "SELECT 1 FROM memory_items WHERE id = ? AND bucket = ?",
+            (normalized.id, bucket),
+        ).fetchone()
+
+        # 同 key 旧值降级为 outdated，保留审计轨迹
+        stale_ids = [row["id"] for row in same_key if row["status"] != "outdated"]
+        if stale_ids:
+            conn.executemany(
+                "UPDATE memory_items SET status = 'outdated', updated_at = ? WHERE id = ?",
+                [(now_iso(), stale_id) for stale_id in stale_ids],
+            )
+
+        normalized.updated_at = normalized.updated_at or now_iso()
+        _insert_row(conn, normalized, self._seq)
+        self._seq += 1
+        self.changed = True
+
+        replaced_existing = bool(same_key) or same_id is not None
+        return {
+            "added": 0 if replaced_existing else 1,
+            "updated": 1 if replaced_existing else 0,
+            "outdated": len(stale_ids),
+        }
+
+    def mark_status(self, item_id: str, status: str) -> bool:
+        cursor = self._conn.execute(
+            "UPDATE memory_items SET status = ?, updated_at = ? WHERE id = ?",
+            (status, now_iso(), item_id),
+        )
+        updated = cursor.rowcount > 0
+        self.changed = self.changed or updated
+        return updated
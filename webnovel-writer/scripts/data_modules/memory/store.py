@@ -5,9 +5,13 @@ scratchpad 持久化与查询。
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from contextlib import contextmanager
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from ..config import DataModulesConfig, get_config
 from ..cli_output import print_error, print_success
@@ -22,6 +26,7 @@ from .schema import (
     memory_item_key,
     now_iso,
 )
+from .sqlite_store import SQLiteScratchpadStore
 
 try:
     from security_utils import atomic_write_json, read_json_safe
@@ -31,87 +36,197 @@ except ImportError:  # pragma: no cover
 from filelock import FileLock
 
 
+def _body_digest(payload: Dict[str, Any]) -> str:
+    """不含 meta.last_updated 的内容指纹，用于判断 scratchpad 是否真的发生变化。"""
+    meta = {k: v for k, v in (payload.get("meta") or {}).items() if k != "last_updated"}
+    body = {**payload, "meta": meta}
+    encoded = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ScratchpadWriteSession:
+    """JSON 后端的内存写会话：按 bucket 维护 id / key -> 行位置索引，删除以空位标记，finish 时压实。"""
+
+    def __init__(self, data: ScratchpadData):
+        self._data = data
+        self._rows: Dict[str, List[Optional[MemoryItem]]] = {}
+        self._by_id: Dict[str, Dict[str, List[int]]] = {}
+        self._by_key: Dict[str, Dict[tuple[Any, ...], List[int]]] = {}
+        self.changed = False
+        for bucket in BUCKET_TO_CATEGORY:
+            self._rows[bucket] = []
+            self._by_id[bucket] = {}
+            self._by_key[bucket] = {}
+            for row in getattr(data, bucket):
+                self._append(bucket, row)
+
+    def _append(self, bucket: str, row: MemoryItem) -> None:
+        rows = self._rows[bucket]
+        self._by_id[bucket].setdefault(row.id, []).append(len(rows))
+        self._by_key[bucket].setdefault(memory_item_key(row), []).append(len(rows))
+        rows.append(row)
+
+    def upsert(self, item: MemoryItem) -> Dict[str, int]:
+        normalized = item.normalized()
+        bucket = CATEGORY_TO_BUCKET[normalized.category]
+        rows = self._rows[bucket]
+
+        outdated = 0
+        replaced_existing = False
+        for pos in self._by_key[bucket].get(memory_item_key(normalized), []):
+            row = rows[pos]
+            if row is None or row.id == normalized.id:
+                continue
+            # 同 key 旧值降级为 outdated，保留审计轨迹
+            if row.status != "outdated":
+                rows[pos] = MemoryItem(**{**asdict(row), "status": "outdated", "updated_at": now_iso()})
+                outdated += 1
+            replaced_existing = True
+        for pos in self._by_id[bucket].pop(normalized.id, []):
+            if rows[pos] is not None:
+                rows[pos] = None
+                replaced_existing = True
+
+        normalized.updated_at = normalized.updated_at or now_iso()
+        self._append(bucket, normalized)
+        self.changed = True
+
+        return {
+            "added": 0 if replaced_existing else 1,
+            "updated": 1 if replaced_existing else 0,
+            "outdated": outdated,
+        }
+
+    def mark_status(self, item_id: str, status: str) -> bool:
+        updated = False
+        for bucket, rows in self._rows.items():
+            for pos in self._by_id[bucket].get(item_id, []):
+                row = rows[pos]
+                if row is not None:
+                    rows[pos] = MemoryItem(**{**asdict(row), "status": status, "updated_at": now_iso()})
+                    updated = True
+        self.changed = self.changed or updated
+        return updated
+
+    def finish(self) -> ScratchpadData:
+        for bucket, rows in self._rows.items():
+            setattr(self._data, bucket, [row for row in rows if row is not None])
+        return self._data
+
+
 class ScratchpadManager:
     def __init__(self, config: DataModulesConfig | None = None):
         self.config = config or get_config()
         self.path = Path(self.config.scratchpad_file)
         self._lock = FileLock(str(self.path) + ".lock", timeout=30)
+        self._loaded_body: Optional[str] = None
+        self._sqlite: Optional[SQLiteScratchpadStore] = None
+        if str(getattr(self.config, "memory_scratchpad_backend", "json")).lower() == "sqlite":
+            self._sqlite = SQLiteScratchpadStore(self.config)
 
     def load(self) -> ScratchpadData:
+        if self._sqlite is not None:
+            return self._sqlite.load()
+        self._loaded_body = None
         if not self.path.exists():
             return ScratchpadData.empty()
         payload = read_json_safe(self.path, default={})
         if not isinstance(payload, dict):
             return ScratchpadData.empty()
-        return ScratchpadData.from_dict(payload)
+        data = ScratchpadData.from_dict(payload)
+        self._loaded_body = _body_digest(data.to_dict())
+        return data
+
+    def revision(self) -> Optional[tuple[Any, ...]]:
+        """scratchpad 的内容版本标识，内容变化后必然改变；JSON 文件不存在时返回 None。
+
+        JSON 后端取文件的 (inode, mtime_ns, size)：atomic_write_json 每次写入都换新文件，
+        inode 即可区分相邻版本；SQLite 后端取数据库文件标识与写入修订号。
+        """
+        if self._sqlite is not None:
+            st = os.stat(self._sqlite.path)
+            return ("sqlite", st.st_dev, st.st_ino, self._sqlite.revision())
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return ("json", st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _compactor_threshold(self) -> Optional[int]:
+        if not bool(getattr(self.config, "memory_compactor_enabled", True)):
+            return None
+        return max(1, int(getattr(self.config, "memory_compactor_threshold", 500)))
 
     def save(self, data: ScratchpadData, _use_lock: bool = True) -> None:
         self.config.ensure_dirs()
-        if bool(getattr(self.config, "memory_compactor_enabled", True)):
-            threshold = max(1, int(getattr(self.config, "memory_compactor_threshold", 500)))
-            if data.count_items() > threshold:
-                from .compactor import compact_scratchpad
-
-                data = compact_scratchpad(data, max_items=threshold)
+        threshold = self._compactor_threshold()
+        if threshold is not None and data.count_items() > threshold:
+            from .compactor import compact_scratchpad
+
+            data = compact_scratchpad(data, max_items=threshold)
+        if self._sqlite is not None:
+            self._sqlite.replace(data)
+            return
         payload = data.to_dict()
         payload.setdefault("meta", {})
-        payload["meta"]["last_updated"] = now_iso()
         payload["meta"]["total_items"] = data.count_items()
-        atomic_write_json(self.path, payload, use_lock=_use_lock, backup=True)
+        # 内容未变时沿用原时间戳，使序列化结果与磁盘一致，由 skip_unchanged 跳过整次写入
+        if self._loaded_body is None or _body_digest(payload) != self._loaded_body:
+            payload["meta"]["last_updated"] = now_iso()
+        atomic_write_json(
+            self.path,
+            payload,
+            use_lock=_use_lock,
+            backup=True,
+            compact=True,
+            skip_unchanged=True,
+        )
+        self._loaded_body = _body_digest(payload)
 
     def _key_for(self, item: MemoryItem) -> tuple[Any, ...]:
         return memory_item_key(item)
 
     def upsert_item(self, item: MemoryItem) -> Dict[str, int]:
-        normalized = item.normalized()
+        if bool(getattr(self.config, "state_daemon_enabled", False)):
+            from ..state_daemon import submit_to_daemon
+
+            response = submit_to_daemon(self.config, {"memory_items": [item.to_dict()]})
+            if response is not None:
+                return response["memory"][0]
+        return self.upsert_items([item])[0]
+
+    @contextmanager
+    def write_session(self) -> Iterator["ScratchpadWriteSession"]:
+        """批量写入会话：一次加锁、一次读取，块内的 upsert/mark_status 走内存索引，退出时写回一次。
+
+        块内抛异常则放弃本次全部修改。SQLite 后端下会话对应一个写事务。
+        """
+        if self._sqlite is not None:
+            with self._sqlite.write_session() as session:
+                yield session
+            if session.changed:
+                threshold = self._compactor_threshold()
+                if threshold is not None and self._sqlite.count() > threshold:
+                    self.save(self._sqlite.load())
+            return
         with self._lock:
-            data = self.load()
-            bucket = CATEGORY_TO_BUCKET[normalized.category]
-            rows: List[MemoryItem] = list(getattr(data, bucket))
-            target_key = self._key_for(normalized)
-
-            outdated = 0
-            replaced_existing = False
-            new_rows: List[MemoryItem] = []
-            for row in rows:
-                row_key = self._key_for(row)
-                if row_key == target_key and row.id != normalized.id:
-                    # 同 key 旧值降级为 outdated，保留审计轨迹
-                    if row.status != "outdated":
-                        row = MemoryItem(**{**asdict(row), "status": "outdated", "updated_at": now_iso()})
-                        outdated += 1
-                    replaced_existing = True
-                elif row.id == normalized.id:
-                    replaced_existing = True
-                    continue
-                new_rows.append(row)
-
-            normalized.updated_at = normalized.updated_at or now_iso()
-            new_rows.append(normalized)
-            setattr(data, bucket, new_rows)
-            self.save(data, _use_lock=False)
-
-        return {
-            "added": 0 if replaced_existing else 1,
-            "updated": 1 if replaced_existing else 0,
-            "outdated": outdated,
-        }
+            session = ScratchpadWriteSession(self.load())
+            yield session
+            if session.changed:
+                self.save(session.finish(), _use_lock=False)
+
+    def upsert_items(self, items: List[MemoryItem]) -> List[Dict[str, int]]:
+        """批量 upsert：一次加锁、一次读取、一次写回，按顺序返回每条的统计。"""
+        if not items:
+            return []
+        with self.write_session() as session:
+            return [session.upsert(item) for item in items]
 
     def mark_status(self, item_id: str, status: str) -> bool:
         if not item_id:
             return False
-        with self._lock:
-            data = self.load()
-            updated = False
-            for bucket in BUCKET_TO_CATEGORY:
-                rows: List[MemoryItem] = getattr(data, bucket)
-                for i, row in enumerate(rows):
-                    if row.id == item_id:
-                        rows[i] = MemoryItem(**{**asdict(row), "status": status, "updated_at": now_iso()})
-                        updated = True
-            if updated:
-                self.save(data, _use_lock=False)
-        return updated
+        with self.write_session() as session:
+            return session.mark_status(item_id, status)
 
     def query(
         self,
@@ -119,6 +234,8 @@ class ScratchpadManager:
         subject: Optional[str] = None,
         status: Optional[str] = "active",
     ) -> List[MemoryItem]:
+        if self._sqlite is not None:
+            return self._sqlite.query(category, subject, status)
         data = self.load()
         categories = [category] if category else list(CATEGORY_TO_BUCKET.keys())
         result: List[MemoryItem] = []
@@ -136,6 +253,8 @@ class ScratchpadManager:
         return result
 
     def stats(self) -> Dict[str, Any]:
+        if self._sqlite is not None:
+            return self._sqlite.stats()
         data = self.load()
         by_category: Dict[str, int] = {}
         active = 0
@@ -168,6 +287,8 @@ class ScratchpadManager:
         return self.load().to_dict()
 
     def conflicts(self) -> List[Dict[str, Any]]:
+        if self._sqlite is not None:
+            return self._sqlite.conflicts()
         data = self.load()
         conflicts: List[Dict[str, Any]] = []
         for category, bucket in CATEGORY_TO_BUCKET.items():
@@ -183,6 +304,12 @@ class ScratchpadManager:
                     conflicts.append({"category": category, "key": list(key), "active_items": cnt})
         return conflicts
 
+    def export_json(self) -> Dict[str, Any]:
+        """把 SQLite 后端内容导出为 memory_scratchpad.json；JSON 后端下文件本身即导出结果。"""
+        if self._sqlite is not None:
+            return self._sqlite.export_json(self.path)
+        return {"path": str(self.path), "items": self.load().count_items(), "written": False}
+
 
 def main() -> None:
     import argparse
@@ -199,6 +326,7 @@ def main() -> None:
     p_query.add_argument("--status", type=str, default="active")
     sub.add_parser("dump")
     sub.add_parser("conflicts")
+    sub.add_parser("export")
 
     p_update = sub.add_parser("update")
     p_update.add_argument("--chapter", type=int, required=True)
@@ -226,6 +354,9 @@ def main() -> None:
     if args.command == "conflicts":
         print_success(manager.conflicts(), message="memory_conflicts")
         return
+    if args.command == "export":
+        print_success(manager.export_json(), message="memory_exported")
+        return
     if args.command == "query":
         rows = [row.to_dict() for row in manager.query(args.category, args.subject, args.status)]
         print_success(rows, message="memory_query")
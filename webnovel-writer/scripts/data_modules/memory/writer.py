@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from ..commit_artifacts import extraction_list
 from ..config import DataModulesConfig, get_config
@@ -19,6 +19,7 @@ class MemoryWriter:
     def __init__(self, config: DataModulesConfig | None = None):
         self.config = config or get_config()
         self.store = ScratchpadManager(self.config)
+        self._session: Optional[Any] = None
 
     def _item_id(self, category: str, subject: str, field: str, chapter: int) -> str:
         raw = f"{category}|{subject}|{field}|{chapter}"
@@ -26,7 +27,10 @@ class MemoryWriter:
         return f"mem-{category}-{digest}"
 
     def _upsert(self, item: MemoryItem, stats: Dict[str, Any]) -> None:
-        result = self.store.upsert_item(item)
+        if self._session is not None:
+            result = self._session.upsert(item)
+        else:
+            result = self.store.upsert_item(item)
         stats["items_added"] += int(result.get("added", 0))
         stats["items_updated"] += int(result.get("updated", 0))
         stats["items_outdated"] += int(result.get("outdated", 0))
@@ -58,6 +62,15 @@ class MemoryWriter:
         return subject
 
     def update_from_chapter_result(self, chapter: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        """整章记忆项在同一个 scratchpad 写会话内完成：一次加载、一次写回。"""
+        with self.store.write_session() as session:
+            self._session = session
+            try:
+                return self._update_from_chapter_result(chapter, result)
+            finally:
+                self._session = None
+
+    def _update_from_chapter_result(self, chapter: int, result: Dict[str, Any]) -> Dict[str, Any]:
         stats: Dict[str, Any] = {
             "chapter": int(chapter),
             "items_added": 0,
@@ -265,7 +265,8 @@ class MemoryContractAdapter:
             if not entity:
                 return None
 
-            entity_type = sm.get_entity_type(entity_id) or "角色"
+            # SQLite 实体行自带 type，免去 get_entity_type 的第二次查找
+            entity_type = entity.get("type") or sm.get_entity_type(entity_id) or "角色"
             state_changes = sm.get_state_changes(entity_id)
             recent_changes = state_changes[-5:] if state_changes else []
 
@@ -26,15 +26,16 @@ migrate_state_to_sqlite.py - 数据迁移脚本 (v5.4)
     python -m data_modules.migrate_state_to_sqlite --project-root "." --backup
 """
 
-import json
 import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
 
+import filelock
+
 from .config import get_config, DataModulesConfig
 from .sql_state_manager import SQLStateManager, EntityData
-from security_utils import atomic_write_json
+from .state_store import SEGMENTED_SECTIONS, SegmentedStateStore, get_section
 
 
 def migrate_state_to_sqlite(
@@ -70,8 +71,8 @@ def migrate_state_to_sqlite(
             print(f"❌ state.json 不存在: {state_file}")
         return stats
 
-    with open(state_file, 'r', encoding='utf-8') as f:
-        state = json.load(f)
+    store = SegmentedStateStore(state_file)
+    state = store.load(strict=True)
 
     if verbose:
         file_size = state_file.stat().st_size / 1024
@@ -258,7 +259,10 @@ def migrate_state_to_sqlite(
             "_migration_timestamp": datetime.now().isoformat()
         }
 
-        atomic_write_json(state_file, slim_state, use_lock=True)
+        # 分段布局：只改写精简后仍保留的分段，其余分段文件不动
+        kept_sections = [name for name in SEGMENTED_SECTIONS if get_section(slim_state, name) is not None]
+        with filelock.FileLock(f"{state_file}.lock", timeout=10):
+            store.save(slim_state, sections=kept_sections, backup=True)
 
         new_size = state_file.stat().st_size / 1024
         if verbose:
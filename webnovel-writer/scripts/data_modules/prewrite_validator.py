@@ -2,11 +2,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict
 
 from .placeholder_scanner import scan_placeholders
+from .state_store import load_state
 
 
 class PrewriteValidator:
@@ -20,9 +20,7 @@ class PrewriteValidator:
         plot_structure: Dict[str, Any],
         story_contract: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
-        state = json.loads(
-            (self.project_root / ".webnovel" / "state.json").read_text(encoding="utf-8")
-        )
+        state = load_state(self.project_root / ".webnovel" / "state.json", strict=True)
         pending = state.get("disambiguation_pending") or []
         warnings = state.get("disambiguation_warnings") or []
         contract_provided = story_contract is not None
@@ -16,6 +16,7 @@ except ImportError:  # pragma: no cover
     from scripts.chapter_paths import find_chapter_file, volume_num_for_chapter
 
 from .projection_log import latest_projection_run, projection_status_from_run
+from .state_store import read_state_sections
 
 
 PHASE_NO_PROJECT = "no_project"
@@ -151,10 +152,17 @@ def _chapter_from_path(path: Path) -> int:
 
 def _state_current_chapter(project_root: Path) -> tuple[int, str]:
     state_path = project_root / ".webnovel" / "state.json"
-    state, error = _read_json_object(state_path)
-    if error:
-        return 0, error
-    progress = state.get("progress") if isinstance(state, dict) else {}
+    try:
+        state = read_state_sections(state_path, ("progress",))
+    except FileNotFoundError:
+        return 0, "missing"
+    except json.JSONDecodeError as exc:
+        return 0, f"invalid_json:{exc}"
+    except OSError as exc:
+        return 0, f"read_error:{exc}"
+    except ValueError:
+        return 0, "not_object"
+    progress = state.get("progress")
     if not isinstance(progress, dict):
         return 0, ""
     try:
@@ -20,6 +20,7 @@ from .project_phase import (
     ProjectPhaseSnapshot,
     resolve_project_phase,
 )
+from .state_store import read_state_sections
 
 
 SCHEMA_VERSION = "webnovel-project-status/v1"
@@ -28,11 +29,9 @@ SCHEMA_VERSION = "webnovel-project-status/v1"
 def _project_title(project_root: Path) -> str:
     state_path = project_root / ".webnovel" / "state.json"
     try:
-        state = json.loads(state_path.read_text(encoding="utf-8"))
+        state = read_state_sections(state_path, ("project_info", "project"))
     except Exception:
         return ""
-    if not isinstance(state, dict):
-        return ""
     project_info = state.get("project_info") if isinstance(state.get("project_info"), dict) else {}
     project = state.get("project") if isinstance(state.get("project"), dict) else {}
     return str(project_info.get("title") or project.get("title") or "").strip()
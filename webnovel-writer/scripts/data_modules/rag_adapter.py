@@ -15,7 +15,9 @@ import sqlite3
 import json
 import math
 import logging
+import os
 import shutil
+import threading
 from pathlib import Path
 
 from runtime_compat import enable_windows_utf8_stdio
@@ -30,7 +32,7 @@ from datetime import datetime
 
 from .config import get_config
 from .api_client import get_client
-from .index_manager import IndexManager
+from .index_manager import IndexManager, db_identity
 from .query_router import QueryRouter
 from .observability import safe_append_perf_timing, safe_log_tool_call
 
@@ -38,6 +40,12 @@ from .observability import safe_append_perf_timing, safe_log_tool_call
 logger = logging.getLogger(__name__)
 
 RAG_SCHEMA_VERSION = "2"
+# 写入 vectors.db 的 PRAGMA user_version；与 RAG_SCHEMA_VERSION 同步递增
+VECTOR_SCHEMA_VERSION = int(RAG_SCHEMA_VERSION)
+
+# 进程内登记已确认结构为当前版本的向量库：路径 -> (st_dev, st_ino)
+_vector_schema_ready: Dict[str, Tuple[int, int]] = {}
+_vector_schema_registry_lock = threading.Lock()
 VECTOR_REQUIRED_COLUMNS = (
     "chunk_id",
     "chapter",
@@ -68,10 +76,10 @@ class SearchResult:
 class RAGAdapter:
     """RAG 检索适配器"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, index_manager: Optional[IndexManager] = None):
         self.config = config or get_config()
         self.api_client = get_client(config)
-        self.index_manager = IndexManager(self.config)
+        self.index_manager = index_manager or IndexManager(self.config)
         self.query_router = QueryRouter()
         self._degraded_mode_reason: Optional[str] = None
         self._init_db()
@@ -88,8 +96,27 @@ class RAGAdapter:
             self._degraded_mode_reason = "embedding_auth_failed"
 
     def _init_db(self):
-        """初始化向量数据库"""
+        """初始化向量数据库（结构已是当前版本时只读一次 PRAGMA user_version）"""
         self.config.ensure_dirs()
+
+        db_path = self.config.vector_db
+        registry_key = os.path.abspath(db_path)
+        identity = db_identity(db_path)
+        if identity is not None and _vector_schema_ready.get(registry_key) == identity:
+            return
+
+        with self._get_conn() as conn:
+            version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+        if version != VECTOR_SCHEMA_VERSION:
+            self._apply_schema(version)
+
+        identity = db_identity(db_path)
+        if identity is not None:
+            with _vector_schema_registry_lock:
+                _vector_schema_ready[registry_key] = identity
+
+    def _apply_schema(self, version: int) -> None:
+        """旧结构迁移 + 建表（全部幂等）；只在 user_version 不是当前版本时执行。"""
         needs_migration, existing_cols = self._inspect_vectors_schema()
         if needs_migration:
             backup_path = self._backup_vector_db(reason="schema_migration")
@@ -114,6 +141,8 @@ class RAGAdapter:
             cursor = conn.cursor()
             self._ensure_schema_meta(cursor)
             self._ensure_tables(cursor)
+            if version < VECTOR_SCHEMA_VERSION:
+                cursor.execute(f"PRAGMA user_version = {VECTOR_SCHEMA_VERSION}")
             conn.commit()
 
     def _table_exists(self, cursor, table_name: str) -> bool:
@@ -861,14 +890,16 @@ class RAGAdapter:
 
         limit = int(limit or self.config.graph_rag_candidate_limit)
         entity_terms: Dict[str, set[str]] = {}
+        entities = self.index_manager.get_entities(entity_ids, columns=["canonical_name"])
+        aliases_by_id = self.index_manager.get_aliases_for_entities(entity_ids)
         for entity_id in entity_ids:
             terms: set[str] = set()
-            entity = self.index_manager.get_entity(entity_id)
+            entity = entities.get(entity_id) or self.index_manager.get_entity(entity_id)
             if entity:
                 canonical_name = str(entity.get("canonical_name") or "").strip()
                 if canonical_name:
                     terms.add(canonical_name)
-            for alias in self.index_manager.get_entity_aliases(entity_id):
+            for alias in aliases_by_id.get(entity_id, []):
                 alias_text = str(alias or "").strip()
                 if alias_text:
                     terms.add(alias_text)
@@ -1026,10 +1057,12 @@ class RAGAdapter:
         # 构建实体术语集用于先验分
         seed_terms: set[str] = set()
         related_terms: set[str] = set()
+        entities = self.index_manager.get_entities(expanded_entities, columns=["canonical_name"])
+        aliases_by_id = self.index_manager.get_aliases_for_entities(expanded_entities)
         for idx, entity_id in enumerate(expanded_entities):
-            entity = self.index_manager.get_entity(entity_id)
+            entity = entities.get(entity_id) or self.index_manager.get_entity(entity_id)
             canonical_name = str((entity or {}).get("canonical_name") or "").strip()
-            aliases = [str(a).strip() for a in self.index_manager.get_entity_aliases(entity_id)]
+            aliases = [str(a).strip() for a in aliases_by_id.get(entity_id, [])]
             terms = {t for t in [canonical_name, *aliases] if t}
             if idx < len(seeds):
                 seed_terms.update(terms)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按依赖并发执行的 section 调度器（供 ContextManager 组装上下文包使用）。
+
+每个 section 声明依赖的其他 section；依赖全部完成后才会提交到有界线程池。
+结果按名称返回，耗时按登记顺序记录，因此输出与执行先后无关。
+多个 section 失败时，抛出登记顺序最靠前的那个异常，与顺序执行时的表现一致。
+
+登记时可以附带 ``fingerprint``（同样接收依赖结果）并给调度器传入 SectionCache：
+指纹不变的 section 直接复用缓存结果，命中情况记录在 ``cache_status``。
+指纹抛出 RacyStampError（输入文件刚被修改）时该 section 照常计算，但本次既不查也不写缓存。
+``finalize`` 在取得结果（无论是否命中缓存）后调用，用于补上不参与指纹的字段（如当前章节号）。
+``preloaded`` 中给出的 section 由调用方预先加载，直接作为结果，不执行 loader 也不参与缓存统计。
+
+``run(names)`` 只执行指定 section 及其传递依赖；已完成的 section 会被后续 run 复用，
+因此可以按需分批加载（预算耗尽后低优先级 section 根本不加载）。
+"""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .context_cache import RacyStampError, SectionCache, fingerprint_key
+
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[Dict[str, Any]], Any]
+
+
+class SectionScheduler:
+    def __init__(
+        self,
+        max_workers: int = 4,
+        cache: Optional[SectionCache] = None,
+        preloaded: Optional[Dict[str, Any]] = None,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.cache = cache
+        self.preloaded: Dict[str, Any] = dict(preloaded or {})
+        self.cache_status: Dict[str, str] = {}
+        self._order: List[str] = []
+        self._tasks: Dict[str, Tuple[Loader, Tuple[str, ...]]] = {}
+        self._fingerprints: Dict[str, Loader] = {}
+        self._finalizers: Dict[str, Callable[[Any], Any]] = {}
+        self._results: Dict[str, Any] = {}
+        self._timings: Dict[str, float] = {}
+
+    def add(
+        self,
+        name: str,
+        loader: Loader,
+        deps: Iterable[str] = (),
+        fingerprint: Optional[Loader] = None,
+        finalize: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """登记 section。``loader`` 接收已完成 section 的结果字典，只应读取自己声明的依赖。
+
+        ``fingerprint`` 返回该 section 全部输入的可 JSON 化描述；未提供时每次都重新计算。
+        """
+        if name in self._tasks:
+            raise ValueError(f"duplicate section: {name}")
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._tasks:
+                raise ValueError(f"section {name} depends on unknown section {dep}")
+        self._order.append(name)
+        if name in self.preloaded:
+            value = self.preloaded[name]
+            self._tasks[name] = (lambda results: value, deps)
+            return
+        self._tasks[name] = (loader, deps)
+        if fingerprint is not None:
+            self._fingerprints[name] = fingerprint
+        if finalize is not None:
+            self._finalizers[name] = finalize
+
+    def _load(self, name: str, results: Dict[str, Any]) -> Any:
+        value = self._load_cached(name, results)
+        finalize = self._finalizers.get(name)
+        return finalize(value) if finalize is not None else value
+
+    def _load_cached(self, name: str, results: Dict[str, Any]) -> Any:
+        loader, _ = self._tasks[name]
+        fingerprint = self._fingerprints.get(name)
+        if self.cache is None or not self.cache.enabled or fingerprint is None:
+            return loader(results)
+        try:
+            key = fingerprint_key(fingerprint(results))
+        except RacyStampError:
+            self.cache_status[name] = "miss"
+            return loader(results)
+        except Exception as exc:  # 指纹取不到时只是放弃缓存，不影响 section 本身
+            logger.debug("section_fingerprint_failed: %s %s", name, exc)
+            self.cache_status[name] = "miss"
+            return loader(results)
+        hit, value = self.cache.get(name, key)
+        if hit:
+            self.cache_status[name] = "hit"
+            return value
+        self.cache_status[name] = "miss"
+        value = loader(results)
+        self.cache.put(name, key, value)
+        return value
+
+    def _timed(self, name: str, results: Dict[str, Any]) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        value = self._load(name, results)
+        return value, round((time.perf_counter() - started) * 1000, 3)
+
+    def _closure(self, names: Iterable[str]) -> set:
+        needed: set = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            if name not in self._tasks:
+                raise ValueError(f"unknown section: {name}")
+            needed.add(name)
+            stack.extend(self._tasks[name][1])
+        return needed
+
+    def run(self, names: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """执行全部（或 ``names`` 及其依赖）尚未完成的 section，返回 (已完成结果, 按登记顺序排列的耗时毫秒)。"""
+        needed = set(self._order) if names is None else self._closure(names)
+        results: Dict[str, Any] = dict(self._results)
+        timings: Dict[str, float] = self._timings
+        errors: Dict[str, BaseException] = {}
+        todo = [name for name in self._order if name in needed and name not in results]
+
+        if self.max_workers == 1:
+            # 登记顺序天然满足依赖（add 时已校验），直接顺序执行
+            for name in todo:
+                results[name], timings[name] = self._timed(name, results)
+                self._results[name] = results[name]
+            return results, {name: timings[name] for name in self._order if name in timings}
+
+        pending = todo
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="context-section") as pool:
+            while pending or running:
+                blocked = set(errors) | set(pending) | set(running.values())
+                for name in list(pending):
+                    deps = self._tasks[name][1]
+                    if any(dep in errors for dep in deps):
+                        # 依赖失败：本 section 不再执行，沿用依赖的异常
+                        errors[name] = next(errors[dep] for dep in deps if dep in errors)
+                        pending.remove(name)
+                    elif not any(dep in blocked for dep in deps):
+                        pending.remove(name)
+                        # 传入结果快照，避免 loader 与主线程同时读写同一字典
+                        running[pool.submit(self._timed, name, dict(results))] = name
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name], timings[name] = future.result()
+                        self._results[name] = results[name]
+                    except BaseException as exc:  # noqa: BLE001 - 统一在结束后按登记顺序抛出
+                        errors[name] = exc
+
+        if errors:
+            first = next(name for name in self._order if name in errors)
+            raise errors[first]
+        return results, {name: timings[name] for name in self._order if name in timings}
+
+    def cache_report(self) -> Dict[str, Any]:
+        """本次运行的缓存命中统计（按登记顺序）。"""
+        sections = {name: self.cache_status[name] for name in self._order if name in self.cache_status}
+        hits = sum(1 for status in sections.values() if status == "hit")
+        return {"hits": hits, "misses": len(sections) - hits, "sections": sections}
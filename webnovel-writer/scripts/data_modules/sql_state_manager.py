@@ -163,11 +163,30 @@ class SQLStateManager:
             entity["aliases"] = self._index_manager.get_entity_aliases(entity["id"])
         return entity
 
+    def get_entities(self, entity_ids: List[str], columns: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """按 ID 批量获取实体详情（含别名），两条查询完成"""
+        entities = self._index_manager.get_entities(entity_ids, columns=columns)
+        self._attach_aliases(entities.values())
+        return entities
+
+    def get_all_entities_grouped(
+        self, include_archived: bool = False, columns: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """一次查询获取全部实体并按类型分组（含别名）"""
+        grouped = self._index_manager.get_all_entities_grouped(include_archived, columns=columns)
+        self._attach_aliases(e for entities in grouped.values() for e in entities)
+        return grouped
+
+    def _attach_aliases(self, entities) -> None:
+        entities = list(entities)
+        aliases = self._index_manager.get_aliases_for_entities(e["id"] for e in entities)
+        for e in entities:
+            e["aliases"] = aliases.get(e["id"], [])
+
     def get_entities_by_type(self, entity_type: str, include_archived: bool = False) -> List[Dict]:
         """按类型获取实体"""
         entities = self._index_manager.get_entities_by_type(entity_type, include_archived)
-        for e in entities:
-            e["aliases"] = self._index_manager.get_entity_aliases(e["id"])
+        self._attach_aliases(entities)
         return entities
 
     def get_core_entities(self) -> List[Dict]:
@@ -178,8 +197,7 @@ class SQLStateManager:
         （次要/装饰实体按需查询，不全量加载）
         """
         entities = self._index_manager.get_core_entities()
-        for e in entities:
-            e["aliases"] = self._index_manager.get_entity_aliases(e["id"])
+        self._attach_aliases(entities)
         return entities
 
     def get_protagonist(self) -> Optional[Dict]:
@@ -304,7 +322,22 @@ class SQLStateManager:
           [{"from": "xiaoyan", "to": "hongyi_girl", "type": "相识", "description": "初次见面"}]
 
         返回: 写入统计
+
+        整章写入在同一个 IndexManager 工作单元内完成：单连接、单次提交，中途失败整体回滚。
         """
+        with self._index_manager.transaction():
+            return self._process_chapter_entities(
+                chapter, entities_appeared, entities_new, state_changes, relationships_new
+            )
+
+    def _process_chapter_entities(
+        self,
+        chapter: int,
+        entities_appeared: List[Dict],
+        entities_new: List[Dict],
+        state_changes: List[Dict],
+        relationships_new: List[Dict]
+    ) -> Dict[str, int]:
         stats = {
             "entities_updated": 0,
             "entities_created": 0,
@@ -471,9 +504,9 @@ class SQLStateManager:
         """
         result = {t: {} for t in self.ENTITY_TYPES}
 
+        grouped = self.get_all_entities_grouped(include_archived=True)
         for entity_type in self.ENTITY_TYPES:
-            entities = self.get_entities_by_type(entity_type, include_archived=True)
-            for e in entities:
+            for e in grouped.get(entity_type, []):
                 entity_dict = {
                     "canonical_name": e.get("canonical_name"),
                     "name": e.get("canonical_name"),  # 兼容性别名
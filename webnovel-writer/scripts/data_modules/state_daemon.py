@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可选的本地状态守护进程（单写者 + 写合并）
+
+多个子 Agent 并发调用 update_state.py / StateManager.save_state / ScratchpadManager.upsert_item 时，
+每次都各自抢 filelock 并重写整份 JSON。守护进程在 Unix socket 上接收增量请求（JSON 行协议），
+把 flush_interval 时间窗口内到达的请求合并成一个批次：
+
+- state.json：批内所有 state ops 按到达顺序一次落盘（日志模式下为一次追加）；
+- index.db：批内所有 chapter_entities 在同一个 IndexManager 工作单元里提交；
+- memory_scratchpad.json：批内所有记忆条目一次读取、一次写回。
+
+应答语义：请求所在批次落盘（fsync + 原子替换）之后才回复 ok；批次失败则相关请求收到 error。
+客户端连不上守护进程（socket 不存在 / 拒绝连接 / 平台不支持 AF_UNIX）时 submit_to_daemon 返回 None，
+调用方回退为直写；请求已送达但等待应答超时则抛 RuntimeError，不回退，避免增量被重复应用。
+
+请求格式（可组合）::
+
+    {"state_ops": [...], "chapter_entities": {...}, "memory_items": [...]}
+    {"command": "ping" | "stats" | "shutdown"}
+
+用法:
+  python -m data_modules.state_daemon --project-root <root> serve [--flush-interval 0.05]
+  python -m data_modules.state_daemon --project-root <root> status
+  python -m data_modules.state_daemon --project-root <root> stop
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import filelock
+
+from .config import DataModulesConfig, get_config
+from .state_store import SegmentedStateStore
+
+logger = logging.getLogger(__name__)
+
+SOCKET_NAME = "state.sock"
+# AF_UNIX 路径上限约 104~108 字节，超长项目路径改用临时目录下按项目哈希命名的 socket
+_MAX_SOCKET_PATH = 100
+_KNOWN_STATE_OPS = {"set", "remove", "merge", "max", "incr", "append_unique", "advance"}
+
+
+def socket_path(config: DataModulesConfig) -> Path:
+    path = Path(config.webnovel_dir) / SOCKET_NAME
+    if len(str(path)) <= _MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha1(str(Path(config.project_root).resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"webnovel-{digest}.sock"
+
+
+def _validate_request(payload: Any) -> Optional[str]:
+    if not isinstance(payload, dict):
+        return "request must be a JSON object"
+    ops = payload.get("state_ops", [])
+    if not isinstance(ops, list):
+        return "state_ops must be a list"
+    for op in ops:
+        if not isinstance(op, dict) or op.get("op") not in _KNOWN_STATE_OPS or not isinstance(op.get("path"), str):
+            return f"invalid state op: {op!r}"
+    chapter_entities = payload.get("chapter_entities")
+    if chapter_entities is not None and not isinstance(chapter_entities, dict):
+        return "chapter_entities must be an object"
+    items = payload.get("memory_items", [])
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return "memory_items must be a list of objects"
+    return None
+
+
+class _PendingRequest:
+    __slots__ = ("payload", "done", "response")
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.done = threading.Event()
+        self.response: Dict[str, Any] = {}
+
+
+class StateDaemon:
+    """合并写入器：请求入队后阻塞到所在批次落盘，再取回各自的应答。"""
+
+    def __init__(self, config: Optional[DataModulesConfig] = None, *, flush_interval: Optional[float] = None):
+        base = config or get_config()
+        # 守护进程自身的写入必须直写，不能再转发给自己
+        self.config = dataclasses.replace(base, state_daemon_enabled=False)
+        self.flush_interval = max(0.0, float(
+            base.state_daemon_flush_interval if flush_interval is None else flush_interval
+        ))
+        self.socket_path = socket_path(self.config)
+        self._queue: List[_PendingRequest] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._flusher: Optional[threading.Thread] = None
+        self._server: Optional[socketserver.BaseServer] = None
+        self._sql_state_manager = None
+        self._stats = {"batches": 0, "requests": 0, "state_ops": 0, "memory_items": 0, "chapter_entities": 0}
+
+    # ==================== 入队 / 合并 ====================
+
+    def submit(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        error = _validate_request(payload)
+        if error:
+            return {"status": "error", "error": error}
+        request = _PendingRequest(payload)
+        with self._cond:
+            if self._stopping:
+                return {"status": "error", "error": "daemon is shutting down"}
+            self._queue.append(request)
+            self._cond.notify()
+        if not request.done.wait(timeout):
+            return {"status": "error", "error": "flush timeout"}
+        return request.response
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="state-daemon-flusher", daemon=True)
+            self._flusher.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._stats, "queued": len(self._queue), "flush_interval": self.flush_interval}
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue and self._stopping:
+                    return
+            # 攒一个时间窗口，让并发到达的请求落进同一批
+            if self.flush_interval and not self._stopping:
+                time.sleep(self.flush_interval)
+            with self._cond:
+                batch, self._queue = self._queue, []
+            self.flush_batch(batch)
+
+    def flush_batch(self, batch: List[_PendingRequest]) -> None:
+        responses: List[Dict[str, Any]] = [{"status": "ok"} for _ in batch]
+        try:
+            self._flush_state(batch, responses)
+            self._flush_memory(batch, responses)
+            self._flush_index(batch, responses)
+        except Exception as exc:  # pragma: no cover - 防御：任何意外都要唤醒等待方
+            logger.exception("state daemon batch failed")
+            for response in responses:
+                if response["status"] == "ok":
+                    response.update(status="error", error=str(exc))
+        with self._cond:
+            self._stats["batches"] += 1
+            self._stats["requests"] += len(batch)
+            batch_no = self._stats["batches"]
+        for request, response in zip(batch, responses):
+            response.setdefault("batch", batch_no)
+            response.setdefault("batch_size", len(batch))
+            request.response = response
+            request.done.set()
+
+    def _flush_state(self, batch: List[_PendingRequest], responses: List[Dict[str, Any]]) -> None:
+        members = [i for i, request in enumerate(batch) if request.payload.get("state_ops")]
+        if not members:
+            return
+        ops = [op for i in members for op in batch[i].payload["state_ops"]]
+        store = SegmentedStateStore(self.config.state_file)
+        try:
+            with filelock.FileLock(f"{self.config.state_file}.lock", timeout=10):
+                if self.config.state_journal_enabled:
+                    stats = store.append_journal(ops)
+                    if (
+                        stats["records"] >= self.config.state_journal_max_records
+                        or stats["bytes"] >= self.config.state_journal_max_bytes
+                    ):
+                        store.compact()
+                else:
+                    store.apply_ops(ops, backup=True)
+        except Exception as exc:
+            logger.warning("state daemon: state.json flush failed: %s", exc)
+            for i in members:
+                responses[i].update(status="error", error=f"state flush failed: {exc}")
+            return
+        with self._cond:
+            self._stats["state_ops"] += len(ops)
+
+    def _flush_memory(self, batch: List[_PendingRequest], responses: List[Dict[str, Any]]) -> None:
+        members = [
+            i for i, request in enumerate(batch)
+            if request.payload.get("memory_items") and responses[i]["status"] == "ok"
+        ]
+        if not members:
+            return
+        from .memory.schema import MemoryItem
+        from .memory.store import ScratchpadManager
+
+        items = [MemoryItem.from_dict(item) for i in members for item in batch[i].payload["memory_items"]]
+        try:
+            results = ScratchpadManager(self.config).upsert_items(items)
+        except Exception as exc:
+            logger.warning("state daemon: scratchpad flush failed: %s", exc)
+            for i in members:
+                responses[i].update(status="error", error=f"memory flush failed: {exc}")
+            return
+        offset = 0
+        for i in members:
+            count = len(batch[i].payload["memory_items"])
+            responses[i]["memory"] = results[offset : offset + count]
+            offset += count
+        with self._cond:
+            self._stats["memory_items"] += len(items)
+
+    def _flush_index(self, batch: List[_PendingRequest], responses: List[Dict[str, Any]]) -> None:
+        members = [
+            i for i, request in enumerate(batch)
+            if request.payload.get("chapter_entities") and responses[i]["status"] == "ok"
+        ]
+        if not members:
+            return
+        if self._sql_state_manager is None:
+            from .sql_state_manager import SQLStateManager
+
+            self._sql_state_manager = SQLStateManager(self.config)
+        manager = self._sql_state_manager
+        ok = True
+        try:
+            # 整批章节实体同步并入一个工作单元：一次提交，失败整体回滚
+            with manager._index_manager.transaction():
+                for i in members:
+                    payload = batch[i].payload["chapter_entities"]
+                    responses[i]["index_stats"] = manager.process_chapter_entities(
+                        chapter=payload.get("chapter"),
+                        entities_appeared=payload.get("entities_appeared", []),
+                        entities_new=payload.get("entities_new", []),
+                        state_changes=payload.get("state_changes", []),
+                        relationships_new=payload.get("relationships_new", []),
+                    )
+        except Exception as exc:
+            logger.warning("state daemon: index.db flush failed: %s", exc)
+            ok = False
+        for i in members:
+            responses[i]["sqlite_sync_ok"] = ok
+            if not ok:
+                responses[i].pop("index_stats", None)
+        if ok:
+            with self._cond:
+                self._stats["chapter_entities"] += len(members)
+
+    # ==================== Unix socket 服务 ====================
+
+    def serve_forever(self) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("当前平台不支持 Unix socket，无法启动状态守护进程")
+        path = self.socket_path
+        if path.exists():
+            if _ping(path, timeout=1.0):
+                raise RuntimeError(f"状态守护进程已在运行: {path}")
+            path.unlink()  # 上次崩溃残留
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        daemon = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        payload = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        response = {"status": "error", "error": f"invalid json: {exc}"}
+                    else:
+                        response = daemon._handle(payload)
+                    self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        self.start()
+        self._server = _Server(str(path), _Handler)
+        try:
+            os.chmod(path, 0o600)
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.stop()
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _handle(self, payload: Any) -> Dict[str, Any]:
+        command = payload.get("command") if isinstance(payload, dict) else None
+        if command == "ping":
+            return {"status": "ok", "pid": os.getpid()}
+        if command == "stats":
+            return {"status": "ok", "stats": self.stats()}
+        if command == "shutdown":
+            self.shutdown()
+            return {"status": "ok"}
+        return self.submit(payload)
+
+
+# ==================== 客户端 ====================
+
+
+def _request(path: Path, payload: Dict[str, Any], *, connect_timeout: float, timeout: float) -> Optional[Dict[str, Any]]:
+    """发送一个请求。连接阶段失败返回 None（请求未送达）；送达后失败抛 RuntimeError。"""
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(connect_timeout)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        sock.settimeout(timeout)
+        try:
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        except OSError as exc:
+            raise RuntimeError(f"状态守护进程无应答: {exc}") from exc
+    finally:
+        sock.close()
+    if not line:
+        raise RuntimeError("状态守护进程在应答前断开连接")
+    return json.loads(line)
+
+
+def _ping(path: Path, timeout: float = 1.0) -> bool:
+    try:
+        response = _request(path, {"command": "ping"}, connect_timeout=timeout, timeout=timeout)
+    except (RuntimeError, ValueError):
+        return False
+    return bool(response and response.get("status") == "ok")
+
+
+def submit_to_daemon(config: DataModulesConfig, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """把增量提交给守护进程并等待落盘应答。
+
+    守护进程未运行时返回 None（调用方应直写）；守护进程报告失败时抛 RuntimeError。
+    """
+    response = _request(
+        socket_path(config),
+        payload,
+        connect_timeout=1.0,
+        timeout=float(getattr(config, "state_daemon_timeout", 30.0)),
+    )
+    if response is None:
+        return None
+    if response.get("status") != "ok":
+        raise RuntimeError(f"状态守护进程写入失败: {response.get('error')}")
+    return response
+
+
+def daemon_status(config: DataModulesConfig) -> Optional[Dict[str, Any]]:
+    try:
+        response = _request(socket_path(config), {"command": "stats"}, connect_timeout=1.0, timeout=5.0)
+    except (RuntimeError, ValueError):
+        return None
+    return response.get("stats") if response else None
+
+
+def main() -> None:
+    import argparse
+    import sys
+
+    from .cli_args import normalize_global_project_root
+    from .cli_output import print_error, print_success
+
+    parser = argparse.ArgumentParser(description="State write-coalescing daemon")
+    parser.add_argument("--project-root", type=str, help="项目根目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve")
+    p_serve.add_argument("--flush-interval", type=float, default=None, help="合并窗口（秒）")
+    sub.add_parser("status")
+    sub.add_parser("stop")
+
+    args = parser.parse_args(normalize_global_project_root(sys.argv[1:]))
+
+    config = None
+    if args.project_root:
+        from project_locator import resolve_project_root
+
+        config = DataModulesConfig.from_project_root(resolve_project_root(args.project_root))
+    config = config or get_config()
+
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO)
+        daemon = StateDaemon(config, flush_interval=args.flush_interval)
+        try:
+            daemon.serve_forever()
+        except RuntimeError as exc:
+            print_error("DAEMON_START_FAILED", str(exc))
+            raise SystemExit(1)
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.command == "status":
+        stats = daemon_status(config)
+        print_success({"running": stats is not None, "socket": str(socket_path(config)), "stats": stats}, message="daemon_status")
+        return
+    if args.command == "stop":
+        try:
+            response = _request(socket_path(config), {"command": "shutdown"}, connect_timeout=1.0, timeout=5.0)
+        except RuntimeError:
+            response = None
+        print_success({"stopped": response is not None}, message="daemon_stop")
+        return
+
+
+if __name__ == "__main__":
+    main()
@@ -28,19 +28,21 @@ import filelock
 
 from .config import get_config
 from .observability import safe_append_perf_timing, safe_log_tool_call
+from .state_store import (
+    BUCKETED_SECTIONS,
+    CHAPTER_META,
+    DEFAULT_SHARD_CHAPTERS,
+    SEGMENTED_SECTIONS,
+    SegmentedStateStore,
+    apply_state_ops,
+    get_section,
+    set_section,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
-try:
-    # 当 scripts 目录在 sys.path 中（常见：从 scripts/ 运行）
-    from security_utils import atomic_write_json, read_json_safe
-except ImportError:  # pragma: no cover
-    # 当以 `python -m scripts.data_modules...` 从仓库根目录运行
-    from scripts.security_utils import atomic_write_json, read_json_safe
-
-
 @dataclass
 class EntityState:
     """实体状态"""
@@ -125,6 +127,8 @@ class StateManager:
         self._state: Dict[str, Any] = {}
         # 与 security_utils.atomic_write_json 保持一致：state.json.lock
         self._lock_path = self.config.state_file.with_suffix(self.config.state_file.suffix + ".lock")
+        # state.json 读写门面：单文件 / 分段布局由磁盘上的 _segments 标记决定
+        self._store = SegmentedStateStore(self.config.state_file)
 
         # v5.1 引入: SQLite 同步
         self._enable_sqlite_sync = enable_sqlite_sync
@@ -221,10 +225,72 @@ class StateManager:
     def _load_state(self):
         """加载状态文件"""
         if self.config.state_file.exists():
-            self._state = read_json_safe(self.config.state_file, default={})
+            self._state = self._store.load()
             self._state = self._ensure_state_schema(self._state)
         else:
             self._state = self._ensure_state_schema({})
+        # 日志模式下只在快照仍含旧版膨胀字段时才追加清理操作
+        self._needs_sqlite_cleanup = not self._state.get("_migrated_to_sqlite") or any(
+            name in self._state for name in ("entities_v3", "alias_index", "state_changes", "structured_relationships")
+        )
+
+    def _pending_state_ops(self, *, include_cleanup: bool = True) -> List[Dict[str, Any]]:
+        """把 state.json 侧的 pending 增量序列化为补丁操作（见 state_store.apply_state_ops）。"""
+        ops: List[Dict[str, Any]] = []
+        now = self._now_progress_timestamp()
+
+        # progress（合并为 max(chapter) + words_delta 累加）
+        if self._pending_progress_chapter is not None or self._pending_progress_words_delta != 0:
+            if self._pending_progress_chapter is not None:
+                ops.append({"op": "max", "path": "progress.current_chapter", "value": int(self._pending_progress_chapter)})
+            if self._pending_progress_words_delta:
+                ops.append({"op": "incr", "path": "progress.total_words", "value": int(self._pending_progress_words_delta)})
+            ops.append({"op": "set", "path": "progress.last_updated", "value": now})
+
+        # chapter_status（单调递进，不回退）
+        if self._pending_chapter_status:
+            ops.append(
+                {
+                    "op": "advance",
+                    "path": "progress.chapter_status",
+                    "value": dict(self._pending_chapter_status),
+                    "order": list(self.CHAPTER_STATUS_ORDER),
+                }
+            )
+            ops.append({"op": "set", "path": "progress.last_updated", "value": now})
+
+        # v5.1 引入: 强制使用 SQLite 模式，确保 state.json 中不存在膨胀字段并标记已迁移
+        if include_cleanup:
+            for name in ["entities_v3", "alias_index", "state_changes", "structured_relationships"]:
+                ops.append({"op": "remove", "path": name})
+            ops.append({"op": "set", "path": "_migrated_to_sqlite", "value": True})
+
+        # disambiguation_*（追加去重 + 只保留最近 N 条，避免文件无限增长）
+        if self._pending_disambiguation_warnings:
+            ops.append(
+                {
+                    "op": "append_unique",
+                    "path": "disambiguation_warnings",
+                    "value": list(self._pending_disambiguation_warnings),
+                    "key": ["chapter", "mention", "chosen_id", "confidence"],
+                    "max_keep": self.config.max_disambiguation_warnings,
+                }
+            )
+        if self._pending_disambiguation_pending:
+            ops.append(
+                {
+                    "op": "append_unique",
+                    "path": "disambiguation_pending",
+                    "value": list(self._pending_disambiguation_pending),
+                    "key": ["chapter", "mention", "suggested_id", "confidence"],
+                    "max_keep": self.config.max_disambiguation_pending,
+                }
+            )
+
+        # chapter_meta（按章节号覆盖写入）
+        if self._pending_chapter_meta:
+            ops.append({"op": "merge", "path": "chapter_meta", "value": dict(self._pending_chapter_meta)})
+        return ops
 
     def save_state(self) -> Dict[str, Any]:
         """
@@ -235,6 +301,11 @@ class StateManager:
         - 重新读取磁盘最新 state.json
         - 仅合并本实例产生的增量（pending_*）
         - 原子化写入
+
+        config.state_journal_enabled 为 True 时改为日志模式：锁内只追加一条 fsync 过的
+        补丁记录到 state.journal.jsonl，日志超过阈值时再压缩回快照。
+
+        检测到正在运行的 state_daemon 时，增量改为提交给守护进程合并落盘（见 state_daemon）。
         """
         # 无增量时不写入，避免无意义覆盖
         has_pending = any(
@@ -255,171 +326,150 @@ class StateManager:
             return {"saved": False, "sqlite_sync_ok": True}
 
         self.config.ensure_dirs()
+        if self.config.state_daemon_enabled:
+            result = self._save_state_via_daemon()
+            if result is not None:
+                return result
+        if self.config.state_journal_enabled:
+            return self._save_state_journaled()
+
+        # 分段布局下只重读/重写本次有增量的分段；单文件布局下 sections 被忽略
+        dirty_sections = []
+        if self._pending_disambiguation_warnings:
+            dirty_sections.append("disambiguation_warnings")
+        if self._pending_disambiguation_pending:
+            dirty_sections.append("disambiguation_pending")
+        if self._pending_chapter_meta:
+            dirty_sections.append(CHAPTER_META)
 
         lock = filelock.FileLock(str(self._lock_path), timeout=10)
         try:
             with lock:
-                disk_state = read_json_safe(self.config.state_file, default={})
+                segmented = self._store.is_segmented()
+                # chapter_meta 只按章节覆盖写入，无需读取已有分桶
+                disk_state = self._store.load(
+                    sections=[name for name in dirty_sections if name not in BUCKETED_SECTIONS]
+                )
                 disk_state = self._ensure_state_schema(disk_state)
-
-                # progress（合并为 max(chapter) + words_delta 累加）
-                if self._pending_progress_chapter is not None or self._pending_progress_words_delta != 0:
-                    progress = disk_state.get("progress", {})
-                    if not isinstance(progress, dict):
-                        progress = {}
-                        disk_state["progress"] = progress
-
-                    try:
-                        current_chapter = int(progress.get("current_chapter", 0) or 0)
-                    except (TypeError, ValueError):
-                        current_chapter = 0
-
-                    if self._pending_progress_chapter is not None:
-                        progress["current_chapter"] = max(current_chapter, int(self._pending_progress_chapter))
-
-                    if self._pending_progress_words_delta:
-                        try:
-                            total_words = int(progress.get("total_words", 0) or 0)
-                        except (TypeError, ValueError):
-                            total_words = 0
-                        progress["total_words"] = total_words + int(self._pending_progress_words_delta)
-
-                    progress["last_updated"] = self._now_progress_timestamp()
-
-                if self._pending_chapter_status:
-                    progress = disk_state.get("progress", {})
-                    if not isinstance(progress, dict):
-                        progress = {}
-                        disk_state["progress"] = progress
-                    chapter_status = progress.get("chapter_status")
-                    if not isinstance(chapter_status, dict):
-                        chapter_status = {}
-                        progress["chapter_status"] = chapter_status
-
-                    def _status_rank(value: str) -> int:
-                        if value == self.REJECTED_CHAPTER_STATUS:
-                            return -1
-                        try:
-                            return self.CHAPTER_STATUS_ORDER.index(value)
-                        except ValueError:
-                            return -1
-
-                    for chapter, pending_status in self._pending_chapter_status.items():
-                        current_status = str(chapter_status.get(chapter) or "")
-                        if current_status == pending_status:
-                            continue
-                        if current_status and _status_rank(pending_status) < _status_rank(current_status):
-                            continue
-                        chapter_status[chapter] = pending_status
-                    progress["last_updated"] = self._now_progress_timestamp()
-
-                # v5.1 引入: 强制使用 SQLite 模式，移除大数据字段
-                # 确保 state.json 中不存在这些膨胀字段
-                for field in ["entities_v3", "alias_index", "state_changes", "structured_relationships"]:
-                    disk_state.pop(field, None)
-                # 标记已迁移
-                disk_state["_migrated_to_sqlite"] = True
-
-                # disambiguation_warnings（追加去重 + 截断）
-                if self._pending_disambiguation_warnings:
-                    warnings_list = disk_state.get("disambiguation_warnings")
-                    if not isinstance(warnings_list, list):
-                        warnings_list = []
-                        disk_state["disambiguation_warnings"] = warnings_list
-
-                    def _warn_key(w: Dict[str, Any]) -> tuple:
-                        return (
-                            w.get("chapter"),
-                            w.get("mention"),
-                            w.get("chosen_id"),
-                            w.get("confidence"),
-                        )
-
-                    existing_keys = {_warn_key(w) for w in warnings_list if isinstance(w, dict)}
-                    for w in self._pending_disambiguation_warnings:
-                        if not isinstance(w, dict):
-                            continue
-                        k = _warn_key(w)
-                        if k in existing_keys:
-                            continue
-                        warnings_list.append(w)
-                        existing_keys.add(k)
-
-                    # 只保留最近 N 条，避免文件无限增长
-                    max_keep = self.config.max_disambiguation_warnings
-                    if len(warnings_list) > max_keep:
-                        disk_state["disambiguation_warnings"] = warnings_list[-max_keep:]
-
-                # disambiguation_pending（追加去重 + 截断）
-                if self._pending_disambiguation_pending:
-                    pending_list = disk_state.get("disambiguation_pending")
-                    if not isinstance(pending_list, list):
-                        pending_list = []
-                        disk_state["disambiguation_pending"] = pending_list
-
-                    def _pending_key(w: Dict[str, Any]) -> tuple:
-                        return (
-                            w.get("chapter"),
-                            w.get("mention"),
-                            w.get("suggested_id"),
-                            w.get("confidence"),
-                        )
-
-                    existing_keys = {_pending_key(w) for w in pending_list if isinstance(w, dict)}
-                    for w in self._pending_disambiguation_pending:
-                        if not isinstance(w, dict):
-                            continue
-                        k = _pending_key(w)
-                        if k in existing_keys:
-                            continue
-                        pending_list.append(w)
-                        existing_keys.add(k)
-
-                    max_keep = self.config.max_disambiguation_pending
-                    if len(pending_list) > max_keep:
-                        disk_state["disambiguation_pending"] = pending_list[-max_keep:]
-
-                # chapter_meta（新增：按章节号覆盖写入）
-                if self._pending_chapter_meta:
-                    chapter_meta = disk_state.get("chapter_meta")
-                    if not isinstance(chapter_meta, dict):
-                        chapter_meta = {}
-                        disk_state["chapter_meta"] = chapter_meta
-                    chapter_meta.update(self._pending_chapter_meta)
+                apply_state_ops(disk_state, self._pending_state_ops())
 
                 # 原子写入（锁已持有，不再二次加锁）
-                atomic_write_json(self.config.state_file, disk_state, use_lock=False, backup=True)
+                self._store.save(
+                    disk_state,
+                    sections=dirty_sections,
+                    chapter_keys=list(self._pending_chapter_meta),
+                    backup=True,
+                )
 
                 # v5.1 引入: 同步到 SQLite（失败时保留 pending 以便重试）
                 sqlite_pending_snapshot = self._snapshot_sqlite_pending()
                 sqlite_sync_ok = self._sync_to_sqlite()
 
-                # 同步内存为磁盘最新快照
+                # 同步内存为磁盘最新快照（分段布局下未重读的分段沿用内存值）
+                if segmented:
+                    loaded = set(dirty_sections) - set(BUCKETED_SECTIONS)
+                    for name in SEGMENTED_SECTIONS:
+                        if name not in loaded:
+                            set_section(disk_state, name, get_section(self._state, name))
                 self._state = disk_state
 
-                # state.json 侧 pending 已写盘，直接清空
-                self._pending_disambiguation_warnings.clear()
-                self._pending_disambiguation_pending.clear()
-                self._pending_chapter_meta.clear()
-                self._pending_progress_chapter = None
-                self._pending_progress_words_delta = 0
-                self._pending_chapter_status.clear()
-
-                # SQLite 侧 pending：成功后清空，失败则恢复快照（避免静默丢数据）
-                if sqlite_sync_ok:
-                    self._pending_entity_patches.clear()
-                    self._pending_alias_entries.clear()
-                    self._pending_state_changes.clear()
-                    self._pending_structured_relationships.clear()
-                    self._clear_pending_sqlite_data()
-                else:
-                    self._restore_sqlite_pending(sqlite_pending_snapshot)
-
+                self._clear_state_pending()
+                self._finish_sqlite_pending(sqlite_sync_ok, sqlite_pending_snapshot)
                 return {"saved": True, "sqlite_sync_ok": sqlite_sync_ok}
 
         except filelock.Timeout:
             raise RuntimeError("无法获取 state.json 文件锁，请稍后重试")
 
+    def _save_state_journaled(self) -> Dict[str, Any]:
+        """日志模式：锁内只做一次追加（必要时压缩），SQLite 同步在锁外进行。"""
+        ops = self._pending_state_ops(include_cleanup=self._needs_sqlite_cleanup)
+        lock = filelock.FileLock(str(self._lock_path), timeout=10)
+        try:
+            with lock:
+                stats = self._store.append_journal(ops)
+                compacted = (
+                    stats["records"] >= self.config.state_journal_max_records
+                    or stats["bytes"] >= self.config.state_journal_max_bytes
+                )
+                if compacted:
+                    self._store.compact()
+        except filelock.Timeout:
+            raise RuntimeError("无法获取 state.json 文件锁，请稍后重试")
+
+        # 内存快照已由各 setter 就地更新（total_words 已在 update_progress 中累加），
+        # 这里只重放幂等操作以对齐截断/去重规则；其它进程的记录在下次 _load_state 时折叠进来。
+        apply_state_ops(self._state, [op for op in ops if op["op"] != "incr"])
+        self._needs_sqlite_cleanup = False
+        self._clear_state_pending()
+
+        sqlite_pending_snapshot = self._snapshot_sqlite_pending()
+        sqlite_sync_ok = self._sync_to_sqlite()
+        self._finish_sqlite_pending(sqlite_sync_ok, sqlite_pending_snapshot)
+        return {"saved": True, "sqlite_sync_ok": sqlite_sync_ok, "journaled": True, "compacted": compacted}
+
+    def _save_state_via_daemon(self) -> Optional[Dict[str, Any]]:
+        """守护进程模式：state ops 与章节实体交给 state_daemon 合并落盘；守护进程未运行时返回 None。"""
+        from .state_daemon import submit_to_daemon
+
+        ops = self._pending_state_ops(include_cleanup=self._needs_sqlite_cleanup)
+        payload: Dict[str, Any] = {"state_ops": ops}
+        sqlite_data = self._pending_sqlite_data
+        chapter = sqlite_data.get("chapter")
+        if self._sql_state_manager and chapter is not None:
+            payload["chapter_entities"] = {
+                "chapter": chapter,
+                "entities_appeared": sqlite_data.get("entities_appeared", []),
+                "entities_new": sqlite_data.get("entities_new", []),
+                "state_changes": sqlite_data.get("state_changes", []),
+                "relationships_new": sqlite_data.get("relationships_new", []),
+            }
+
+        sqlite_pending_snapshot = self._snapshot_sqlite_pending()
+        response = submit_to_daemon(self.config, payload)
+        if response is None:
+            return None
+
+        # 与日志模式相同：内存快照已由 setter 就地更新，只重放幂等操作
+        apply_state_ops(self._state, [op for op in ops if op["op"] != "incr"])
+        self._needs_sqlite_cleanup = False
+        self._clear_state_pending()
+
+        sqlite_sync_ok = bool(response.get("sqlite_sync_ok", True))
+        if sqlite_sync_ok and self._sql_state_manager:
+            processed = self._processed_appearances(sqlite_data) if "chapter_entities" in payload else set()
+            try:
+                sqlite_sync_ok = self._sync_pending_patches_to_sqlite(processed)
+            except Exception as exc:
+                logger.warning("SQLite sync failed (pending patches): %s", exc)
+                sqlite_sync_ok = False
+        self._finish_sqlite_pending(sqlite_sync_ok, sqlite_pending_snapshot)
+        return {
+            "saved": True,
+            "sqlite_sync_ok": sqlite_sync_ok,
+            "daemon": True,
+            "batch_size": response.get("batch_size", 1),
+        }
+
+    def _clear_state_pending(self) -> None:
+        # state.json 侧 pending 已写盘，直接清空
+        self._pending_disambiguation_warnings.clear()
+        self._pending_disambiguation_pending.clear()
+        self._pending_chapter_meta.clear()
+        self._pending_progress_chapter = None
+        self._pending_progress_words_delta = 0
+        self._pending_chapter_status.clear()
+
+    def _finish_sqlite_pending(self, sqlite_sync_ok: bool, snapshot: Dict[str, Any]) -> None:
+        # SQLite 侧 pending：成功后清空，失败则恢复快照（避免静默丢数据）
+        if sqlite_sync_ok:
+            self._pending_entity_patches.clear()
+            self._pending_alias_entries.clear()
+            self._pending_state_changes.clear()
+            self._pending_structured_relationships.clear()
+            self._clear_pending_sqlite_data()
+        else:
+            self._restore_sqlite_pending(snapshot)
+
     def _sync_to_sqlite(self) -> bool:
         """同步待处理数据到 SQLite（v5.1 引入，v5.4 沿用）"""
         if not self._sql_state_manager:
@@ -442,13 +492,7 @@ class StateManager:
                     relationships_new=sqlite_data.get("relationships_new", [])
                 )
                 # 标记已处理的出场记录
-                for entity in sqlite_data.get("entities_appeared", []):
-                    if entity.get("id"):
-                        processed_appearances.add((entity.get("id"), chapter))
-                for entity in sqlite_data.get("entities_new", []):
-                    eid = entity.get("suggested_id") or entity.get("id")
-                    if eid:
-                        processed_appearances.add((eid, chapter))
+                processed_appearances = self._processed_appearances(sqlite_data)
             except Exception as exc:
                 logger.warning("SQLite sync failed (process_chapter_entities): %s", exc)
                 return False
@@ -461,6 +505,20 @@ class StateManager:
             logger.warning("SQLite sync failed (pending patches): %s", exc)
             return False
 
+    @staticmethod
+    def _processed_appearances(sqlite_data: Dict[str, Any]) -> set:
+        """process_chapter_entities 已写入的 (entity_id, chapter) 出场组合"""
+        chapter = sqlite_data.get("chapter")
+        processed = set()
+        for entity in sqlite_data.get("entities_appeared", []):
+            if entity.get("id"):
+                processed.add((entity.get("id"), chapter))
+        for entity in sqlite_data.get("entities_new", []):
+            eid = entity.get("suggested_id") or entity.get("id")
+            if eid:
+                processed.add((eid, chapter))
+        return processed
+
     def _sync_pending_patches_to_sqlite(self, processed_appearances: set = None) -> bool:
         """同步 _pending_entity_patches 等到 SQLite（v5.1 引入，v5.4 沿用）
 
@@ -714,7 +772,9 @@ class StateManager:
     def _save_state(self) -> None:
         """直接持久化当前内存状态到 state.json（轻量写入，不走 pending 合并）。"""
         self.config.ensure_dirs()
-        atomic_write_json(self.config.state_file, self._state, backup=False)
+        lock = filelock.FileLock(str(self._lock_path), timeout=10)
+        with lock:
+            self._store.save(self._state, backup=False)
 
     # ==================== 实体管理 (v5.1 SQLite-first) ====================
 
@@ -741,7 +801,9 @@ class StateManager:
         """获取实体所属类型"""
         # v5.1 引入: 优先从 SQLite 读取
         if self._sql_state_manager:
-            entity = self._sql_state_manager._index_manager.get_entity(entity_id)
+            entity = self._sql_state_manager._index_manager.get_entities([entity_id], columns=["type"]).get(entity_id)
+            if entity is None:
+                entity = self._sql_state_manager._index_manager.get_entity(entity_id)
             if entity:
                 return entity.get("type")
 
@@ -755,13 +817,13 @@ class StateManager:
         """获取所有实体（扁平化视图）"""
         # v5.1 引入: 优先从 SQLite 读取
         if self._sql_state_manager:
+            grouped = self._sql_state_manager._index_manager.get_all_entities_grouped()
             result = {}
             for entity_type in self.ENTITY_TYPES:
-                entities = self._sql_state_manager._index_manager.get_entities_by_type(entity_type)
-                for e in entities:
+                for e in grouped.get(entity_type, []):
                     eid = e.get("id")
                     if eid:
-                        result[eid] = {**e, "type": entity_type}
+                        result[eid] = e
             if result:
                 return result
 
@@ -788,12 +850,11 @@ class StateManager:
         # v5.1 引入: 优先从 SQLite 读取
         if self._sql_state_manager:
             result = {}
-            for entity_type in self.ENTITY_TYPES:
-                entities = self._sql_state_manager._index_manager.get_entities_by_tier(tier)
-                for e in entities:
-                    eid = e.get("id")
-                    if eid and e.get("type") == entity_type:
-                        result[eid] = {**e, "type": entity_type}
+            entities = self._sql_state_manager._index_manager.get_entities_by_tier(tier)
+            for e in entities:
+                eid = e.get("id")
+                if eid and e.get("type") in self.ENTITY_TYPES:
+                    result[eid] = e
             if result:
                 return result
 
@@ -1219,9 +1280,24 @@ class StateManager:
 
     def export_for_context(self) -> Dict:
         """导出用于上下文的精简版状态（v5.0 引入，v5.4 沿用）"""
-        # 从 entities_v3 构建精简视图
         entities_flat = {}
-        for type_name, entities in self._state.get("entities_v3", {}).items():
+        # 优先从 SQLite 一次性按投影列读取（不取 desc 等大字段，也不查别名）
+        if self._sql_state_manager:
+            grouped = self._sql_state_manager._index_manager.get_all_entities_grouped(
+                columns=["canonical_name", "tier", "current_json"]
+            )
+            for type_name, entities in grouped.items():
+                for e in entities:
+                    entities_flat[e["id"]] = {
+                        "name": e.get("canonical_name") or e["id"],
+                        "type": type_name,
+                        "tier": e.get("tier") or "装饰",
+                        "current": e.get("current_json") or {},
+                    }
+
+        # 回退到 entities_v3 构建精简视图（未迁移场景）
+        legacy_entities = {} if entities_flat else self._state.get("entities_v3", {})
+        for type_name, entities in legacy_entities.items():
             for eid, e in entities.items():
                 entities_flat[eid] = {
                     "name": e.get("canonical_name", eid),
@@ -1379,6 +1455,16 @@ def main():
     status_set_parser.add_argument("--status", required=True,
         choices=["chapter_rejected", "chapter_drafted", "chapter_reviewed", "chapter_committed"])
 
+    # state.json 布局迁移（单文件 <-> 分段）
+    layout_parser = subparsers.add_parser("migrate-layout", help="切换 state.json 存储布局")
+    layout_parser.add_argument("--to", choices=["segmented", "single"], default="segmented")
+    layout_parser.add_argument(
+        "--shard-chapters", type=int, default=DEFAULT_SHARD_CHAPTERS, help="chapter_meta 每个分桶的章节数"
+    )
+
+    # 手动压缩 state.journal.jsonl（日志模式）
+    subparsers.add_parser("compact-journal", help="把 state.journal.jsonl 折叠回 state.json")
+
     argv = normalize_global_project_root(sys.argv[1:])
     args = parser.parse_args(argv)
     command_started_at = time.perf_counter()
@@ -1500,6 +1586,22 @@ def main():
         emit_success({"chapter": args.chapter, "status": args.status},
                      message="chapter_status_set")
 
+    elif args.command == "migrate-layout":
+        if not manager.config.state_file.exists():
+            emit_error("STATE_NOT_FOUND", f"state.json 不存在: {manager.config.state_file}")
+            return
+        with filelock.FileLock(str(manager._lock_path), timeout=10):
+            if args.to == "segmented":
+                result = manager._store.migrate_to_segmented(shard_chapters=args.shard_chapters)
+            else:
+                result = manager._store.migrate_to_single()
+        emit_success(result, message="state_layout_migrated")
+
+    elif args.command == "compact-journal":
+        with filelock.FileLock(str(manager._lock_path), timeout=10):
+            result = manager._store.compact()
+        emit_success(result, message="state_journal_compacted")
+
     else:
         emit_error("UNKNOWN_COMMAND", "未指定有效命令", suggestion="请查看 --help")
 
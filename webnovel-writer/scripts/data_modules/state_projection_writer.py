@@ -10,36 +10,35 @@ from typing import Any
 import filelock
 
 from .commit_artifacts import extraction_dict, extraction_list, extraction_text
-from .story_contracts import read_json_if_exists
+from .state_store import STRAND_HISTORY, SegmentedStateStore
 
 try:
     from chapter_paths import find_chapter_file
 except ImportError:  # pragma: no cover
     from scripts.chapter_paths import find_chapter_file
 
-try:
-    from security_utils import atomic_write_json
-except ImportError:  # pragma: no cover
-    from scripts.security_utils import atomic_write_json
-
 
 class _LockedState:
+    # 分段布局下只重读/重写 strand_tracker.history，其余冷数据分段不动
+    SECTIONS = (STRAND_HISTORY,)
+
     def __init__(self, state_path: Path, lock_path: Path):
         self.state_path = state_path
         self.lock_path = lock_path
         self.state: dict[str, Any] = {}
+        self._store = SegmentedStateStore(state_path)
         self._lock: filelock.FileLock | None = None
 
     def __enter__(self) -> dict[str, Any]:
         self._lock = filelock.FileLock(str(self.lock_path), timeout=10)
         self._lock.acquire()
-        self.state = read_json_if_exists(self.state_path) or {}
+        self.state = self._store.load(self.SECTIONS, strict=True)
         return self.state
 
     def __exit__(self, exc_type, exc, tb) -> bool:
         try:
             if exc_type is None:
-                atomic_write_json(self.state_path, self.state, use_lock=False, backup=True)
+                self._store.save(self.state, sections=self.SECTIONS, backup=True)
         finally:
             if self._lock is not None:
                 self._lock.release()
@@ -0,0 +1,762 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分段式 state.json 存储
+
+单文件布局下，每次保存都要整体重写 state.json；而 chapter_meta、disambiguation_*、
+review_checkpoints、strand_tracker.history 会随章节数持续增长。分段布局把它们拆出去：
+
+- 根文档 ``.webnovel/state.json``：progress、protagonist_state 等热数据，体积恒定；
+  带 ``_segments`` 标记，声明分段目录与分桶大小；
+- 分段目录 ``.webnovel/state_segments/``：
+  - ``chapter_meta/0001-0100.json``：按章节号分桶（默认每桶 100 章）；
+  - ``disambiguation_warnings.json`` / ``disambiguation_pending.json`` /
+    ``review_checkpoints.json`` / ``strand_tracker.history.json``：每节一个文件。
+
+SegmentedStateStore.load() 始终返回与单文件布局相同结构的完整 dict；save() 只重写
+指定的分段（chapter_meta 可进一步限定到具体章节所在的桶）。未迁移的项目保持单文件读写，
+行为与旧版完全一致。调用方负责持有 ``state.json.lock``。
+
+只读调用方（project-status、session_start 钩子、extract_state_summary 等）可用
+read_state_sections() 只解析需要的顶层键，并按文件 mtime 在进程内缓存。
+
+日志模式（write-ahead journal）：StateManager 可以不重写快照，而是把本次增量序列化为
+一条补丁记录追加到 ``state.journal.jsonl``（fsync 后返回）。load() 在快照之上依次折叠
+日志记录；compact() 把折叠结果写回快照并清空日志。补丁操作见 apply_state_ops。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from security_utils import atomic_write_json, read_json_safe
+except ImportError:  # pragma: no cover
+    from scripts.security_utils import atomic_write_json, read_json_safe
+
+
+SEGMENTS_MARKER = "_segments"
+SEGMENTS_VERSION = 1
+SEGMENT_DIR_NAME = "state_segments"
+DEFAULT_SHARD_CHAPTERS = 100
+
+CHAPTER_META = "chapter_meta"
+STRAND_HISTORY = "strand_tracker.history"
+# 按章节分桶的映射型分段
+BUCKETED_SECTIONS = (CHAPTER_META,)
+# 整节一个文件的列表型分段
+LIST_SECTIONS = (
+    "disambiguation_warnings",
+    "disambiguation_pending",
+    "review_checkpoints",
+    STRAND_HISTORY,
+)
+SEGMENTED_SECTIONS = BUCKETED_SECTIONS + LIST_SECTIONS
+
+_MISC_BUCKET = "misc"
+
+JOURNAL_NAME = "state.journal.jsonl"
+JOURNAL_VERSION = 1
+# 快照中记录已折叠到的最后一条日志 id：压缩在「写快照」与「截断日志」之间崩溃时不会重复折叠
+JOURNAL_APPLIED_KEY = "_journal_applied"
+
+
+def get_section(state: Dict[str, Any], name: str) -> Any:
+    """按点分路径读取分段值（如 ``strand_tracker.history``），不存在时返回 None。"""
+    node: Any = state
+    for part in name.split("."):
+        if not isinstance(node, dict):
+            return None
+        node = node.get(part)
+    return node
+
+
+def set_section(state: Dict[str, Any], name: str, value: Any) -> None:
+    parts = name.split(".")
+    node = state
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        node = child
+    node[parts[-1]] = value
+
+
+def pop_section(state: Dict[str, Any], name: str) -> Any:
+    parts = name.split(".")
+    node: Any = state
+    for part in parts[:-1]:
+        node = node.get(part) if isinstance(node, dict) else None
+    if isinstance(node, dict):
+        return node.pop(parts[-1], None)
+    return None
+
+
+def _empty_section(name: str) -> Any:
+    return {} if name in BUCKETED_SECTIONS else []
+
+
+def _chapter_of_key(key: Any) -> Optional[int]:
+    try:
+        chapter = int(str(key).strip())
+    except (TypeError, ValueError):
+        return None
+    return chapter if chapter > 0 else None
+
+
+def _merge_list(base: List[Any], extra: List[Any]) -> List[Any]:
+    """把根文档中残留的列表项（旧版写入方直接写根文档）追加到分段之后，精确去重。"""
+    if not extra:
+        return base
+    seen = {json.dumps(item, ensure_ascii=False, sort_keys=True) for item in base}
+    merged = list(base)
+    for item in extra:
+        key = json.dumps(item, ensure_ascii=False, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            merged.append(item)
+    return merged
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _container(state: Dict[str, Any], path: str, factory: type) -> Any:
+    value = get_section(state, path)
+    if not isinstance(value, factory):
+        value = factory()
+        set_section(state, path, value)
+    return value
+
+
+def apply_state_ops(state: Dict[str, Any], ops: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """把补丁操作依次应用到 state（原地修改并返回）。
+
+    支持的操作（``path`` 为点分路径）：
+
+    - ``set``：直接赋值；``remove``：删除键；``merge``：dict.update；
+    - ``max`` / ``incr``：整数取大 / 累加（非法旧值按 0 处理）；
+    - ``append_unique``：按 ``key`` 字段组合去重追加，``max_keep`` 截断保留最近 N 条；
+    - ``advance``：按 ``order`` 单调推进的状态字典（不在 order 中的值视为最低级，
+      同值或回退时保持原值）。
+    """
+    for op in ops:
+        if not isinstance(op, dict):
+            continue
+        kind = op.get("op")
+        path = str(op.get("path") or "")
+        if not path:
+            continue
+        value = op.get("value")
+        if kind == "set":
+            set_section(state, path, value)
+        elif kind == "remove":
+            pop_section(state, path)
+        elif kind == "merge" and isinstance(value, dict):
+            _container(state, path, dict).update(value)
+        elif kind == "max":
+            set_section(state, path, max(_as_int(get_section(state, path)), _as_int(value)))
+        elif kind == "incr":
+            set_section(state, path, _as_int(get_section(state, path)) + _as_int(value))
+        elif kind == "append_unique" and isinstance(value, list):
+            items = _container(state, path, list)
+            fields = list(op.get("key") or [])
+
+            def _key(item: Any) -> Any:
+                if fields and isinstance(item, dict):
+                    return tuple(item.get(name) for name in fields)
+                return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+            existing = {_key(item) for item in items if isinstance(item, dict) or not fields}
+            for item in value:
+                if fields and not isinstance(item, dict):
+                    continue
+                item_key = _key(item)
+                if item_key in existing:
+                    continue
+                items.append(item)
+                existing.add(item_key)
+            max_keep = _as_int(op.get("max_keep"))
+            if max_keep and len(items) > max_keep:
+                set_section(state, path, items[-max_keep:])
+        elif kind == "advance" and isinstance(value, dict):
+            order = list(op.get("order") or [])
+            statuses = _container(state, path, dict)
+
+            def _rank(status: str) -> int:
+                return order.index(status) if status in order else -1
+
+            for key, pending in value.items():
+                current = str(statuses.get(key) or "")
+                if current == pending:
+                    continue
+                if current and _rank(pending) < _rank(current):
+                    continue
+                statuses[key] = pending
+    return state
+
+
+def _section_of(path: str) -> Optional[str]:
+    for name in SEGMENTED_SECTIONS:
+        if path == name or path.startswith(name + "."):
+            return name
+    return None
+
+
+class SegmentedStateStore:
+    """state.json 的读写门面（单文件 / 分段两种布局透明切换）。"""
+
+    def __init__(self, state_file: Path):
+        self.state_file = Path(state_file)
+
+    @property
+    def segment_dir(self) -> Path:
+        return self.state_file.parent / SEGMENT_DIR_NAME
+
+    @property
+    def journal_file(self) -> Path:
+        return self.state_file.parent / JOURNAL_NAME
+
+    # ==================== 布局探测 ====================
+
+    def read_root(self, *, strict: bool = False) -> Dict[str, Any]:
+        """读取根文档；strict=True 时 JSON 损坏直接抛出 ValueError/OSError。"""
+        if strict:
+            if not self.state_file.exists():
+                return {}
+            root = json.loads(self.state_file.read_text(encoding="utf-8"))
+        else:
+            root = read_json_safe(self.state_file, default={})
+        return root if isinstance(root, dict) else {}
+
+    @staticmethod
+    def _marker(root: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        marker = root.get(SEGMENTS_MARKER)
+        return marker if isinstance(marker, dict) else None
+
+    def is_segmented(self, root: Optional[Dict[str, Any]] = None) -> bool:
+        if root is None:
+            root = self.read_root()
+        return self._marker(root) is not None
+
+    def shard_chapters(self, root: Optional[Dict[str, Any]] = None) -> int:
+        if root is None:
+            root = self.read_root()
+        marker = self._marker(root) or {}
+        try:
+            size = int(marker.get("shard_chapters") or DEFAULT_SHARD_CHAPTERS)
+        except (TypeError, ValueError):
+            size = DEFAULT_SHARD_CHAPTERS
+        return max(1, size)
+
+    # ==================== 分段文件 ====================
+
+    def _list_path(self, name: str) -> Path:
+        return self.segment_dir / f"{name}.json"
+
+    def _bucket_dir(self, name: str) -> Path:
+        return self.segment_dir / name
+
+    def _bucket_name(self, key: Any, shard_chapters: int) -> str:
+        chapter = _chapter_of_key(key)
+        if chapter is None:
+            return _MISC_BUCKET
+        start = (chapter - 1) // shard_chapters * shard_chapters + 1
+        return f"{start:04d}-{start + shard_chapters - 1:04d}"
+
+    def _read_items(self, path: Path, default: Any) -> Any:
+        payload = read_json_safe(path, default={})
+        items = payload.get("items") if isinstance(payload, dict) else None
+        return items if isinstance(items, type(default)) else default
+
+    def _write_items(self, path: Path, name: str, items: Any) -> int:
+        payload = {"section": name, "items": items}
+        # 分段文件仅供程序读取：紧凑编码，且内容未变的桶不再重写
+        stats = atomic_write_json(
+            path, payload, use_lock=False, backup=False, compact=True, skip_unchanged=True
+        )
+        return stats["bytes"]
+
+    def _load_section(self, name: str) -> Any:
+        if name in BUCKETED_SECTIONS:
+            merged: Dict[str, Any] = {}
+            bucket_dir = self._bucket_dir(name)
+            if bucket_dir.is_dir():
+                for path in sorted(bucket_dir.glob("*.json")):
+                    merged.update(self._read_items(path, {}))
+            return merged
+        return self._read_items(self._list_path(name), [])
+
+    def _save_bucketed(
+        self,
+        name: str,
+        value: Dict[str, Any],
+        shard_chapters: int,
+        keys: Optional[Iterable[Any]],
+    ) -> int:
+        bucket_dir = self._bucket_dir(name)
+        written = 0
+        if keys is None:
+            # 整节重写：按桶重新分组，并删除已不存在的桶
+            buckets: Dict[str, Dict[str, Any]] = {}
+            for key, entry in value.items():
+                buckets.setdefault(self._bucket_name(key, shard_chapters), {})[key] = entry
+            if bucket_dir.is_dir():
+                for stale in bucket_dir.glob("*.json"):
+                    if stale.stem not in buckets:
+                        stale.unlink()
+            for bucket, items in buckets.items():
+                written += self._write_items(bucket_dir / f"{bucket}.json", name, items)
+            return written
+
+        # 增量：只读改写涉及到的桶
+        touched: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            if key in value:
+                touched.setdefault(self._bucket_name(key, shard_chapters), {})[key] = value[key]
+        for bucket, updates in touched.items():
+            path = bucket_dir / f"{bucket}.json"
+            items = self._read_items(path, {})
+            items.update(updates)
+            written += self._write_items(path, name, items)
+        return written
+
+    # ==================== 读写入口 ====================
+
+    def load(self, sections: Optional[Iterable[str]] = None, *, strict: bool = False) -> Dict[str, Any]:
+        """读取完整 state。
+
+        分段布局下 ``sections`` 可限定要合并的分段（None 表示全部）；未请求的分段
+        在返回值中不存在。单文件布局忽略该参数。
+        """
+        state = self.read_root(strict=strict)
+        if not self.is_segmented(state):
+            return self._fold_journal(state, None)
+
+        wanted = SEGMENTED_SECTIONS if sections is None else tuple(sections)
+        for name in SEGMENTED_SECTIONS:
+            residual = pop_section(state, name)
+            if name not in wanted:
+                continue
+            value = self._load_section(name)
+            if name in BUCKETED_SECTIONS and isinstance(residual, dict):
+                value.update(residual)
+            elif isinstance(residual, list):
+                value = _merge_list(value, residual)
+            set_section(state, name, value)
+        return self._fold_journal(state, wanted)
+
+    def save(
+        self,
+        state: Dict[str, Any],
+        *,
+        sections: Optional[Iterable[str]] = None,
+        chapter_keys: Optional[Iterable[Any]] = None,
+        backup: bool = True,
+    ) -> Dict[str, Any]:
+        """写回 state。
+
+        - 单文件布局：整体原子写入（与旧行为一致），忽略 sections / chapter_keys；
+        - 分段布局：根文档总是重写；``sections`` 指定要落盘的分段（None 表示全部），
+          ``chapter_keys`` 非空时 chapter_meta 只改写这些章节所在的桶。
+
+        返回 ``{"segmented", "bytes_written", "sections"}``。
+        """
+        # 日志里尚未折叠的记录先落入快照，避免被本次（可能只含部分分段的）写入覆盖。
+        if self.journal_stats()["records"]:
+            self.compact()
+
+        # 以磁盘上的布局为准：内存里的旧快照不能把已回滚的项目重新拆分。
+        marker = self._marker(self.read_root()) if self.state_file.exists() else self._marker(state)
+        if marker is None:
+            state.pop(SEGMENTS_MARKER, None)
+            atomic_write_json(self.state_file, state, use_lock=False, backup=backup)
+            return {
+                "segmented": False,
+                "bytes_written": self.state_file.stat().st_size,
+                "sections": [],
+            }
+        return self._save_segmented(state, marker, sections=sections, chapter_keys=chapter_keys, backup=backup)
+
+    def _save_segmented(
+        self,
+        state: Dict[str, Any],
+        marker: Dict[str, Any],
+        *,
+        sections: Optional[Iterable[str]] = None,
+        chapter_keys: Optional[Iterable[Any]] = None,
+        backup: bool = True,
+    ) -> Dict[str, Any]:
+        shard_chapters = self.shard_chapters({SEGMENTS_MARKER: marker})
+        wanted = SEGMENTED_SECTIONS if sections is None else tuple(sections)
+        keys = None if chapter_keys is None else list(chapter_keys)
+
+        root = dict(state)
+        if isinstance(root.get("strand_tracker"), dict):
+            root["strand_tracker"] = dict(root["strand_tracker"])
+        written = 0
+        saved: List[str] = []
+        for name in SEGMENTED_SECTIONS:
+            value = pop_section(root, name)
+            if name not in wanted:
+                continue
+            if not isinstance(value, type(_empty_section(name))):
+                value = _empty_section(name)
+            if name in BUCKETED_SECTIONS:
+                written += self._save_bucketed(name, value, shard_chapters, keys)
+            else:
+                written += self._write_items(self._list_path(name), name, value)
+            saved.append(name)
+
+        root[SEGMENTS_MARKER] = {
+            "version": SEGMENTS_VERSION,
+            "dir": SEGMENT_DIR_NAME,
+            "shard_chapters": shard_chapters,
+        }
+        # 根文档最后写入：崩溃时最多丢失本次根文档变更，分段文件各自原子替换。
+        atomic_write_json(self.state_file, root, use_lock=False, backup=backup)
+        written += self.state_file.stat().st_size
+        return {"segmented": True, "bytes_written": written, "sections": saved}
+
+    def apply_ops(self, ops: List[Dict[str, Any]], *, backup: bool = True) -> Dict[str, Any]:
+        """把一批 state ops 直接落盘（调用方持有 state.json.lock）。
+
+        分段布局下只读写 ops 触及的分段；仅被 merge 的 chapter_meta 不读取已有分桶，
+        只改写涉及章节所在的桶。
+        """
+        load_sections: List[str] = []
+        save_sections: List[str] = []
+        chapter_keys: Optional[List[Any]] = []
+        for op in ops:
+            path = str(op.get("path") or "")
+            top = path.split(".")[0]
+            for name in SEGMENTED_SECTIONS:
+                if name.split(".")[0] != top:
+                    continue
+                if name not in save_sections:
+                    save_sections.append(name)
+                if name in BUCKETED_SECTIONS and path == name and op.get("op") == "merge" and chapter_keys is not None:
+                    chapter_keys.extend((op.get("value") or {}).keys())
+                    continue
+                if name not in load_sections:
+                    load_sections.append(name)
+                if name in BUCKETED_SECTIONS:
+                    chapter_keys = None
+        state = self.load(sections=load_sections)
+        apply_state_ops(state, ops)
+        return self.save(state, sections=save_sections, chapter_keys=chapter_keys, backup=backup)
+
+    # ==================== 补丁日志 ====================
+
+    def read_journal(self) -> List[Dict[str, Any]]:
+        """按顺序读取日志记录；写到一半的尾行（崩溃残留）会被跳过。"""
+        if not self.journal_file.exists():
+            return []
+        records: List[Dict[str, Any]] = []
+        with open(self.journal_file, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get("ops"), list):
+                    records.append(record)
+        return records
+
+    def journal_stats(self) -> Dict[str, int]:
+        try:
+            size = self.journal_file.stat().st_size
+        except OSError:
+            return {"records": 0, "bytes": 0}
+        if size == 0:
+            return {"records": 0, "bytes": 0}
+        with open(self.journal_file, "rb") as fh:
+            records = fh.read().count(b"\n")
+        return {"records": records, "bytes": size}
+
+    def append_journal(self, ops: List[Dict[str, Any]]) -> Dict[str, int]:
+        """追加一条补丁记录并 fsync（调用方持有 state.json.lock）。"""
+        record = {
+            "v": JOURNAL_VERSION,
+            "id": uuid.uuid4().hex[:16],
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "ops": ops,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, "a", encoding="utf-8") as fh:
+            fh.write(line)
+            fh.flush()
+            os.fsync(fh.fileno())
+        return self.journal_stats()
+
+    def _fold_journal(self, state: Dict[str, Any], wanted: Optional[Iterable[str]]) -> Dict[str, Any]:
+        records = self.read_journal()
+        applied = state.get(JOURNAL_APPLIED_KEY)
+        if applied:
+            for index, record in enumerate(records):
+                if record.get("id") == applied:
+                    records = records[index + 1:]
+                    break
+        if not records:
+            return state
+        wanted_set = None if wanted is None else set(wanted)
+        for record in records:
+            ops = record["ops"]
+            if wanted_set is not None:
+                # 分段布局下，未加载分段上的操作留给下次完整读取或压缩时折叠
+                ops = [op for op in ops if _section_of(str(op.get("path") or "")) in wanted_set | {None}]
+            apply_state_ops(state, ops)
+        return state
+
+    def compact(self) -> Dict[str, Any]:
+        """把日志折叠进快照并清空日志（调用方持有 state.json.lock）。"""
+        stats = self.journal_stats()
+        if not stats["records"]:
+            return {"compacted": False, **stats}
+        state = self.load()
+        marker = self._marker(state)
+        self._mark_journal_applied(state)
+        if marker is None:
+            atomic_write_json(self.state_file, state, use_lock=False, backup=True)
+        else:
+            self._save_segmented(state, marker, backup=True)
+        self._truncate_journal()
+        return {"compacted": True, **stats}
+
+    def _mark_journal_applied(self, state: Dict[str, Any]) -> None:
+        records = self.read_journal()
+        if records and records[-1].get("id"):
+            state[JOURNAL_APPLIED_KEY] = records[-1]["id"]
+
+    def _truncate_journal(self) -> None:
+        if not self.journal_file.exists():
+            return
+        # 写入空文件后原子替换，避免并发读者看到半截内容
+        tmp = self.journal_file.with_suffix(self.journal_file.suffix + ".tmp")
+        tmp.write_bytes(b"")
+        os.replace(tmp, self.journal_file)
+
+    # ==================== 布局迁移 ====================
+
+    def migrate_to_segmented(self, shard_chapters: int = DEFAULT_SHARD_CHAPTERS) -> Dict[str, Any]:
+        """把单文件 state.json 拆分为分段布局（已分段时按新分桶大小重排）。"""
+        state = self.load()
+        before = self.state_file.stat().st_size if self.state_file.exists() else 0
+        marker = {
+            "version": SEGMENTS_VERSION,
+            "dir": SEGMENT_DIR_NAME,
+            "shard_chapters": max(1, int(shard_chapters)),
+        }
+        if self.segment_dir.exists():
+            shutil.rmtree(self.segment_dir)
+        self._mark_journal_applied(state)
+        result = self._save_segmented(state, marker, backup=True)
+        self._truncate_journal()
+        return {
+            "layout": "segmented",
+            "shard_chapters": max(1, int(shard_chapters)),
+            "root_bytes_before": before,
+            "root_bytes_after": self.state_file.stat().st_size,
+            "segment_dir": str(self.segment_dir),
+            "sections": result["sections"],
+        }
+
+    def migrate_to_single(self) -> Dict[str, Any]:
+        """把分段布局合并回单个 state.json（回滚用）。"""
+        state = self.load()
+        state.pop(SEGMENTS_MARKER, None)
+        self._mark_journal_applied(state)
+        atomic_write_json(self.state_file, state, use_lock=False, backup=True)
+        self._truncate_journal()
+        if self.segment_dir.exists():
+            shutil.rmtree(self.segment_dir)
+        return {
+            "layout": "single",
+            "root_bytes_after": self.state_file.stat().st_size,
+        }
+
+
+# ==================== 惰性分节读取 ====================
+
+_SCAN_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class _TopLevelScanner:
+    """逐个解析 JSON 顶层对象的键值对，按需从文件追加读取。
+
+    每个值仍由标准库 C 解码器解析；找齐所需的键后即可停止，文件剩余部分不再读取。
+    """
+
+    def __init__(self, fh):
+        self._fh = fh
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._chunk = _SCAN_CHUNK_SIZE
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._fh.read(self._chunk)
+        # 单个值跨越多个块时按倍数放大读取量，避免反复从值开头重试导致平方复杂度
+        self._chunk *= 2
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _skip_ws(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise json.JSONDecodeError("Unexpected end of data", self._buf, self._pos)
+
+    def _decode(self) -> Any:
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # 数字/字面量恰好停在缓冲区末尾时可能被截断，补读后重新解析
+            if end >= len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self):
+        if self._skip_ws() != "{":
+            raise ValueError("state.json 顶层不是 JSON 对象")
+        self._pos += 1
+        first = True
+        while True:
+            ch = self._skip_ws()
+            if ch == "}":
+                return
+            if not first:
+                if ch != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos)
+                self._pos += 1
+                self._skip_ws()
+            first = False
+            key = self._decode()
+            if self._skip_ws() != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", self._buf, self._pos)
+            self._pos += 1
+            self._skip_ws()
+            yield key, self._decode()
+
+
+def state_stamp(state_file: Path) -> Optional[Tuple[Any, ...]]:
+    """state 的版本戳：(state.json, state.journal.jsonl) 的 mtime/size；state.json 缺失时返回 None。
+
+    read_state_sections 以它作为缓存键，只读调用方可用它缓存自己从 state 派生的结果。
+    """
+    path = Path(state_file)
+    root_key = _stat_key(path)
+    if root_key is None:
+        return None
+    return (root_key, _stat_key(SegmentedStateStore(path).journal_file))
+
+
+_section_cache: Dict[Path, Tuple[Tuple[Any, ...], Dict[str, Any], bool]] = {}
+_section_cache_lock = threading.Lock()
+_ABSENT = object()
+
+
+def read_state_sections(state_file: Path, sections: Iterable[str]) -> Dict[str, Any]:
+    """只读取 state.json 中指定的顶层键（只读调用方专用）。
+
+    - 单文件布局：流式扫描顶层键值对，所需键全部拿到后立即停止；
+    - 分段布局或日志非空：根文档本身很小，走 SegmentedStateStore.load 合并所需分段并折叠日志。
+
+    结果按 (state.json, state.journal.jsonl) 的 mtime/size 在进程内缓存，返回值为副本；
+    不存在的键不会出现在结果中。文件缺失抛 FileNotFoundError，JSON 损坏抛 JSONDecodeError，
+    顶层不是对象抛 ValueError。
+    """
+    path = Path(state_file)
+    wanted = list(dict.fromkeys(str(name) for name in sections))
+    store = SegmentedStateStore(path)
+    cache_key = state_stamp(path)
+    if cache_key is None:
+        raise FileNotFoundError(str(path))
+    cache_path = path.resolve()
+
+    known: Dict[str, Any] = {}
+    complete = False
+    with _section_cache_lock:
+        cached = _section_cache.get(cache_path)
+        if cached is not None and cached[0] == cache_key:
+            known, complete = dict(cached[1]), cached[2]
+    missing = [] if complete else [name for name in wanted if name not in known]
+
+    if missing:
+        journal_pending = (cache_key[1] or (0, 0))[1] > 0
+        if journal_pending or store.segment_dir.is_dir():
+            segment_names = [name for name in SEGMENTED_SECTIONS if name.split(".")[0] in missing]
+            state = store.load(segment_names, strict=True)
+            for name in missing:
+                known[name] = state.get(name, _ABSENT)
+        else:
+            remaining = set(missing)
+            seen: Dict[str, Any] = {}
+            with open(path, "r", encoding="utf-8") as fh:
+                for key, value in _TopLevelScanner(fh).items():
+                    seen[key] = value
+                    remaining.discard(key)
+                    if not remaining:
+                        break
+                else:
+                    # 扫描到了文件末尾：整份文档已解析，全部缓存，后续任何键都不必再读文件
+                    complete = True
+            if complete:
+                known = seen
+            else:
+                known.update({name: seen[name] for name in missing})
+        with _section_cache_lock:
+            _section_cache[cache_path] = (cache_key, dict(known), complete)
+
+    return {name: deepcopy(known[name]) for name in wanted if known.get(name, _ABSENT) is not _ABSENT}
+
+
+def load_state(
+    state_file: Path,
+    sections: Optional[Iterable[str]] = None,
+    *,
+    strict: bool = False,
+) -> Dict[str, Any]:
+    """只读便捷入口：返回完整 state（两种布局通用）。"""
+    return SegmentedStateStore(state_file).load(sections, strict=strict)
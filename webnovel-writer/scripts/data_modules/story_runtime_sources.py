@@ -8,6 +8,7 @@ from typing import Any
 
 from chapter_outline_loader import volume_num_for_chapter_from_state
 
+from .commit_catalog import CommitCatalog
 from .story_contracts import StoryContractPaths, read_json_if_exists
 
 
@@ -35,22 +36,6 @@ def _volume_for_chapter(project_root: Path, chapter: int) -> int:
     return volume_num_for_chapter_from_state(project_root, chapter) or 1
 
 
-def _load_latest_commit(paths: StoryContractPaths, chapter: int) -> dict[str, Any] | None:
-    for current in range(chapter, 0, -1):
-        payload = read_json_if_exists(paths.commit_json(current))
-        if payload:
-            return payload
-    return None
-
-
-def _load_latest_accepted_commit(paths: StoryContractPaths, chapter: int) -> dict[str, Any] | None:
-    for current in range(chapter, 0, -1):
-        payload = read_json_if_exists(paths.commit_json(current))
-        if payload and (payload.get("meta") or {}).get("status") == "accepted":
-            return payload
-    return None
-
-
 def load_runtime_sources(project_root: Path, chapter: int) -> RuntimeSourceSnapshot:
     project_root = Path(project_root)
     paths = StoryContractPaths.from_project_root(project_root)
@@ -62,8 +47,15 @@ def load_runtime_sources(project_root: Path, chapter: int) -> RuntimeSourceSnaps
         "chapter": read_json_if_exists(paths.chapter_json(chapter)) or {},
         "review": read_json_if_exists(paths.review_json(chapter)) or {},
     }
-    latest_commit = _load_latest_commit(paths, chapter)
-    latest_accepted_commit = _load_latest_accepted_commit(paths, chapter)
+    # 由 commit 目录索引二分定位，两者是同一章时只解析一次
+    catalog = CommitCatalog(paths)
+    latest_chapter = catalog.latest(chapter)
+    accepted_chapter = catalog.latest(chapter, status="accepted")
+    latest_commit = catalog.load(latest_chapter)
+    if accepted_chapter == latest_chapter:
+        latest_accepted_commit = latest_commit
+    else:
+        latest_accepted_commit = catalog.load(accepted_chapter)
 
     fallback_sources: list[str] = []
     for key, payload in contracts.items():
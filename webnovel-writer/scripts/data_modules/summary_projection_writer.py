@@ -2,9 +2,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import sqlite3
 from pathlib import Path
 
 from .commit_artifacts import extraction_text
+from .summary_store import SummaryStore
 
 
 def append_summary_projection(project_root: Path, commit_payload: dict) -> dict:
@@ -18,7 +20,11 @@ def append_summary_projection(project_root: Path, commit_payload: dict) -> dict:
     if "## 剧情摘要" not in summary_text:
         summary_text = f"## 剧情摘要\n{summary_text}\n"
     target.write_text(summary_text, encoding="utf-8")
-    return {"applied": True, "writer": "summary", "path": str(target)}
+    try:
+        indexed = SummaryStore.from_project_root(project_root).record(chapter) is not None
+    except (OSError, sqlite3.Error):
+        indexed = False  # 索引只是缓存，读取时会按文件 stat 自行补齐
+    return {"applied": True, "writer": "summary", "path": str(target), "indexed": indexed}
 
 
 class SummaryProjectionWriter:
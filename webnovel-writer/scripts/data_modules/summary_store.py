@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节摘要存储：`.webnovel/summaries/chNNNN.md` 的 SQLite 索引（.webnovel/summary_index.db）。
+
+每章一行，保存全文与预先抽取的「## 剧情摘要」区块，以及源文件的 mtime/size。
+SummaryProjectionWriter 写入摘要文件后同步登记；其他途径改动的文件在读取时按 stat 发现并重新索引，
+因此读取方拿到的始终与磁盘一致，索引库本身只是可再生的缓存。
+mtime 仍在竞态窗口内的文件登记时不记真实 stamp，下次读取必然重新校验，同一刻内的同尺寸改写不会被漏掉。
+只索引规范文件名（chNNNN.md）；其他命名的摘要文件不在索引范围内。
+
+窗口（最近 N 章）与抽样（每隔 interval 章取一章）都是一次 IN 查询批量取回，
+上下文构建不再逐个打开小文件、重复跑正则。
+"""
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import DataModulesConfig
+from .context_cache import is_racy_mtime
+
+
+SUMMARY_SECTION_RE = re.compile(r"##\s*剧情摘要\s*\r?\n(.*?)(?=\r?\n##|\Z)", re.DOTALL)
+_SUMMARY_NAME_RE = re.compile(r"^ch(\d+)\.md$")
+# 竞态窗口内登记的行使用的 mtime 占位值，与任何真实 stamp 都不相等
+_UNVERIFIED_MTIME_NS = -1
+
+
+def extract_summary_section(text: str) -> str:
+    """抽取「## 剧情摘要」区块；没有该区块时返回空串。"""
+    match = SUMMARY_SECTION_RE.search(text or "")
+    return match.group(1).strip() if match else ""
+
+
+@dataclass
+class ChapterSummary:
+    chapter: int
+    text: str
+    excerpt: str
+
+    def snippet(self, max_chars: int = 0) -> str:
+        """max_chars > 0 时取剧情摘要区块（缺失时退回全文）并截断；否则返回全文。"""
+        if max_chars <= 0:
+            return self.text
+        base = self.excerpt or self.text.strip()
+        if len(base) > max_chars:
+            return base[:max_chars].rstrip()
+        return base
+
+
+class SummaryStore:
+    def __init__(self, config: DataModulesConfig):
+        self.config = config
+        self.summaries_dir = config.webnovel_dir / "summaries"
+        self.path = config.summary_index_db
+        self._initialized = False
+
+    @classmethod
+    def from_project_root(cls, project_root: str | Path) -> "SummaryStore":
+        return cls(DataModulesConfig.from_project_root(project_root))
+
+    def summary_path(self, chapter: int) -> Path:
+        return self.summaries_dir / f"ch{int(chapter):04d}.md"
+
+    @contextmanager
+    def _get_conn(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS chapter_summaries (
+                        chapter INTEGER PRIMARY KEY,
+                        mtime_ns INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        text TEXT NOT NULL,
+                        excerpt TEXT NOT NULL
+                    )
+                    """
+                )
+                self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _sync(self, stats: Dict[int, Optional[Tuple[int, int]]]) -> Dict[int, ChapterSummary]:
+        """按 stat 校验给定章节的索引行，重新索引变化的文件，删除已消失文件的行。"""
+        if not stats:
+            return {}
+        result: Dict[int, ChapterSummary] = {}
+        stale: List[Tuple[int, int, int, str, str]] = []
+        removed: List[int] = []
+        try:
+            with self._get_conn() as conn:
+                chapters = list(stats)
+                rows = {}
+                # 分批避免超出 SQLite 参数上限
+                for start in range(0, len(chapters), 500):
+                    batch = chapters[start:start + 500]
+                    placeholders = ",".join("?" for _ in batch)
+                    for row in conn.execute(
+                        f"SELECT * FROM chapter_summaries WHERE chapter IN ({placeholders})", batch
+                    ):
+                        rows[int(row["chapter"])] = row
+                for chapter, stamp in stats.items():
+                    row = rows.get(chapter)
+                    if stamp is None:
+                        if row is not None:
+                            removed.append(chapter)
+                        continue
+                    if row is not None and (row["mtime_ns"], row["size"]) == stamp:
+                        result[chapter] = ChapterSummary(chapter, row["text"], row["excerpt"])
+                        continue
+                    try:
+                        text = self.summary_path(chapter).read_text(encoding="utf-8")
+                    except OSError:
+                        continue
+                    excerpt = extract_summary_section(text)
+                    result[chapter] = ChapterSummary(chapter, text, excerpt)
+                    mtime_ns = _UNVERIFIED_MTIME_NS if is_racy_mtime(stamp[0]) else stamp[0]
+                    stale.append((chapter, mtime_ns, stamp[1], text, excerpt))
+                if stale or removed:
+                    self._write(conn, stale, removed)
+        except sqlite3.Error:
+            # 索引库不可用（只读目录、损坏等）时直接读文件，结果不变
+            fallback = (self._read_file(ch) for ch, stamp in stats.items() if stamp is not None)
+            return {ch: summary for ch, summary in fallback if summary is not None}
+        return result
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, stale: List[Tuple[int, int, int, str, str]], removed: List[int]) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO chapter_summaries(chapter, mtime_ns, size, text, excerpt) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(chapter) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns,
+                    size = excluded.size,
+                    text = excluded.text,
+                    excerpt = excluded.excerpt
+                """,
+                stale,
+            )
+            conn.executemany("DELETE FROM chapter_summaries WHERE chapter = ?", [(ch,) for ch in removed])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _read_file(self, chapter: int) -> Tuple[int, Optional[ChapterSummary]]:
+        try:
+            text = self.summary_path(chapter).read_text(encoding="utf-8")
+        except OSError:
+            return chapter, None
+        return chapter, ChapterSummary(chapter, text, extract_summary_section(text))
+
+    def get_many(self, chapters: Iterable[int]) -> Dict[int, ChapterSummary]:
+        """批量读取指定章节的摘要；缺失的章节不出现在结果里。"""
+        wanted = sorted({int(ch) for ch in chapters if int(ch) > 0})
+        if not wanted or not self.summaries_dir.is_dir():
+            return {}
+        return self._sync({ch: self._stat(self.summary_path(ch)) for ch in wanted})
+
+    def get(self, chapter: int) -> Optional[ChapterSummary]:
+        return self.get_many([chapter]).get(int(chapter))
+
+    def window(self, chapter: int, size: int) -> List[ChapterSummary]:
+        """chapter 之前最近 size 章的摘要，按章节升序。"""
+        found = self.get_many(range(max(1, chapter - size), chapter))
+        return [found[ch] for ch in sorted(found)]
+
+    def sample(self, chapter: int, interval: int, max_samples: int, snippet_chars: int = 0) -> List[ChapterSummary]:
+        """从 chapter - interval 起每隔 interval 章向前抽样，最多 max_samples 条非空摘要，按章节升序。"""
+        interval = max(1, int(interval))
+        if max_samples <= 0:
+            return []
+        candidates = list(range(chapter - interval, 0, -interval))
+        samples: List[ChapterSummary] = []
+        # 只按需校验：先取一批候选，不够再往前取，长篇也不会 stat 全部历史章节
+        for start in range(0, len(candidates), max_samples):
+            found = self.get_many(candidates[start:start + max_samples])
+            for ch in candidates[start:start + max_samples]:
+                summary = found.get(ch)
+                if summary is not None and summary.snippet(snippet_chars):
+                    samples.append(summary)
+                    if len(samples) >= max_samples:
+                        return list(reversed(samples))
+        return list(reversed(samples))
+
+    def all(self) -> List[ChapterSummary]:
+        """扫描摘要目录，返回全部 chNNNN.md 的摘要（按章节升序），顺带清理已删除文件的索引行。"""
+        if not self.summaries_dir.is_dir():
+            return []
+        stats: Dict[int, Optional[Tuple[int, int]]] = {}
+        for entry in os.scandir(self.summaries_dir):
+            match = _SUMMARY_NAME_RE.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            chapter = int(match.group(1))
+            # 只认规范文件名（ch0001.md），与 summary_path 保持一一对应
+            if chapter > 0 and entry.name == self.summary_path(chapter).name:
+                st = entry.stat()
+                stats[chapter] = (st.st_mtime_ns, st.st_size)
+        try:
+            with self._get_conn() as conn:
+                for row in conn.execute("SELECT chapter FROM chapter_summaries"):
+                    stats.setdefault(int(row["chapter"]), None)
+        except sqlite3.Error:
+            pass
+        found = self._sync(stats)
+        return [found[ch] for ch in sorted(found)]
+
+    def record(self, chapter: int) -> Optional[ChapterSummary]:
+        """摘要文件写入后立即登记（SummaryProjectionWriter 调用）。"""
+        return self.get(chapter)
@@ -136,3 +136,64 @@ def test_restore_character_deletes_archive_after_sqlite_restore_succeeds(archive
     assert calls == [("li_xue", "status", "active")]
     assert json.loads(manager.characters_archive.read_text(encoding="utf-8")) == []
 
+
+def test_archive_appends_jsonl_segments_and_restore_compacts(archive_env):
+    module = _load_archive_module()
+    manager = module.ArchiveManager(project_root=archive_env)
+    manager.characters_archive.write_text(json.dumps([{"id": "a", "name": "甲"}], ensure_ascii=False), encoding="utf-8")
+    base_before = manager.characters_archive.read_text(encoding="utf-8")
+
+    manager.append_archive(manager.characters_archive, [{"id": "li_xue", "name": "李雪"}])
+    manager.append_archive(manager.characters_archive, [{"id": "b", "name": "乙"}])
+
+    # 追加不改写历史 JSON 数组
+    assert manager.characters_archive.read_text(encoding="utf-8") == base_before
+    assert [c["name"] for c in manager.load_archive(manager.characters_archive)] == ["甲", "李雪", "乙"]
+
+    assert manager.restore_character("李雪") is True
+    assert not manager.characters_archive.with_suffix(".jsonl").exists()
+    assert [c["name"] for c in json.loads(manager.characters_archive.read_text(encoding="utf-8"))] == ["甲", "乙"]
+
+
+def test_run_auto_check_is_incremental_via_high_water_marks(archive_env):
+    module = _load_archive_module()
+    manager = module.ArchiveManager(project_root=archive_env)
+    manager.config.update(plot_resolved_threshold=5, review_old_threshold=5, character_inactive_threshold=5)
+
+    def write_state(current_chapter, threads, reviews):
+        manager.state_file.write_text(
+            json.dumps(
+                {
+                    "progress": {"current_chapter": current_chapter},
+                    "plot_threads": {"foreshadowing": threads},
+                    "review_checkpoints": reviews,
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    write_state(
+        20,
+        [
+            {"content": "旧伏笔", "status": "已回收", "resolved_chapter": 10},
+            {"content": "新伏笔", "status": "已回收", "resolved_chapter": 18},
+        ],
+        [{"chapters": "1-10", "report": "r1.md"}],
+    )
+    manager.run_auto_check(force=True)
+
+    assert manager.load_marks() == {"characters": 15, "plot_threads": 15, "reviews": 15}
+    assert [t["content"] for t in manager.load_archive(manager.plot_threads_archive)] == ["旧伏笔"]
+    assert len(manager.load_archive(manager.reviews_archive)) == 1
+
+    # 第二轮：截止线前的数据已处理过，只归档新进入窗口的伏笔
+    state = json.loads(manager.state_file.read_text(encoding="utf-8"))
+    state["progress"]["current_chapter"] = 30
+    write_state(30, state["plot_threads"]["foreshadowing"], state["review_checkpoints"])
+    manager.run_auto_check(force=True)
+
+    assert [t["content"] for t in manager.load_archive(manager.plot_threads_archive)] == ["旧伏笔", "新伏笔"]
+    assert json.loads(manager.state_file.read_text(encoding="utf-8"))["plot_threads"]["foreshadowing"] == []
+    assert manager.load_marks()["plot_threads"] == 25
+    assert not manager.plot_threads_archive.exists()
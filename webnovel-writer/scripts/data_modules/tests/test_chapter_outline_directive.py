@@ -2,8 +2,35 @@
 # -*- coding: utf-8 -*-
 
 import json
+import os
+import time
 
-from chapter_outline_loader import load_chapter_execution_directive
+from chapter_outline_loader import (
+    _extract_outline_section,
+    load_chapter_execution_directive,
+    load_chapter_execution_directives,
+    load_chapter_outline,
+    load_chapter_plot_structure,
+    load_outline_index,
+)
+
+
+def _backdate(path, seconds=60):
+    past = time.time_ns() - seconds * 1_000_000_000
+    os.utime(path, ns=(past, past))
+
+
+def _write_volume_project(tmp_path, lines):
+    outline_dir = tmp_path / "大纲"
+    outline_dir.mkdir(exist_ok=True)
+    (tmp_path / ".webnovel").mkdir(exist_ok=True)
+    (tmp_path / ".webnovel" / "state.json").write_text(
+        json.dumps({"progress": {"volumes_planned": [{"volume": 1, "chapters_range": "1-50"}]}}),
+        encoding="utf-8",
+    )
+    path = outline_dir / "第1卷-详细大纲.md"
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
 
 
 def test_load_chapter_execution_directive_from_volume_outline(tmp_path):
@@ -53,3 +80,57 @@ def test_load_chapter_execution_directive_from_volume_outline(tmp_path):
     assert "不得离开宗门" in directive["forbidden_zones"]
     assert "借据" in directive["key_entities"]
     assert directive["chapter_end_open_question"] == "谁改了借据？"
+
+
+def test_outline_index_matches_full_scan_and_tracks_edits(tmp_path):
+    path = _write_volume_project(
+        tmp_path,
+        [
+            "## 第一幕",
+            "### 第1章：入宗",
+            "CBN：拜入山门",
+            "CPNs：测灵根",
+            "### 第 2 章：试炼",
+            "- 目标：通过外门试炼",
+            "必须覆盖节点：发现陷阱、隐忍",
+            "### 第3章：",
+            "## 第二幕",
+            "### 第3章：重复标题只认第一个",
+        ],
+    )
+    _backdate(path)
+    content = path.read_text(encoding="utf-8")
+
+    index = load_outline_index(path)
+    assert load_outline_index(path) is index
+    assert index.chapters() == [1, 2, 3]
+    for chapter in (1, 2, 3, 4):
+        assert index.outline_section(chapter) == _extract_outline_section(content, chapter)
+
+    assert load_chapter_plot_structure(tmp_path, 1)["cbn"] == "拜入山门"
+    assert load_chapter_plot_structure(tmp_path, 2)["mandatory_nodes"] == ["发现陷阱", "隐忍"]
+    directives = load_chapter_execution_directives(tmp_path, 1, 4)
+    assert sorted(directives) == [1, 2]
+    assert directives[2]["goal"] == "通过外门试炼"
+
+    # 返回值是副本，调用方修改不会污染缓存
+    directives[2]["goal"] = "篡改"
+    assert load_chapter_execution_directive(tmp_path, 2)["goal"] == "通过外门试炼"
+
+    path.write_text(content.replace("通过外门试炼", "通过内门大比"), encoding="utf-8")
+    _backdate(path, seconds=30)
+    assert load_outline_index(path) is not index
+    assert load_chapter_execution_directive(tmp_path, 2)["goal"] == "通过内门大比"
+
+
+def test_split_outline_listing_picks_up_new_files(tmp_path):
+    outline_dir = tmp_path / "大纲"
+    outline_dir.mkdir()
+    (outline_dir / "第1章-入宗.md").write_text("拆分大纲一", encoding="utf-8")
+    _backdate(outline_dir)
+
+    assert load_chapter_outline(tmp_path, 1) == "拆分大纲一"
+    assert load_chapter_outline(tmp_path, 2).startswith("⚠️")
+
+    (outline_dir / "第002章-试炼.md").write_text("拆分大纲二", encoding="utf-8")
+    assert load_chapter_outline(tmp_path, 2) == "拆分大纲二"
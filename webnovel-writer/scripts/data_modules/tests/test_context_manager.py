@@ -9,6 +9,7 @@ import logging
 
 import pytest
 
+from data_modules import context_cache
 from data_modules.config import DataModulesConfig
 from data_modules.index_manager import (
     IndexManager,
@@ -907,3 +908,129 @@ CEN：决定将计就计
     assert plot_structure.get("cen") == "决定将计就计"
     assert plot_structure.get("mandatory_nodes") == ["发现陷阱"]
     assert plot_structure.get("prohibitions") == ["不能直接翻脸"]
+
+
+def test_context_manager_parallel_sections_match_sequential(temp_project):
+    state = {
+        "protagonist_state": {"name": "萧炎", "location": {"current": "天云宗"}},
+        "chapter_meta": {"0001": {"hook": "测试"}},
+        "disambiguation_warnings": [{"mention": "宗主"}],
+    }
+    temp_project.state_file.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    (temp_project.webnovel_dir / "summaries").mkdir(parents=True, exist_ok=True)
+    (temp_project.webnovel_dir / "summaries" / "ch0001.md").write_text("## 剧情摘要\n萧炎入宗", encoding="utf-8")
+
+    def _build(workers):
+        temp_project.context_parallel_workers = workers
+        pack = ContextManager(temp_project)._build_pack(2)
+        meta = pack.pop("meta")
+        return pack, meta
+
+    sequential, seq_meta = _build(1)
+    parallel, par_meta = _build(4)
+
+    assert json.dumps(parallel, ensure_ascii=False, sort_keys=True, default=str) == json.dumps(
+        sequential, ensure_ascii=False, sort_keys=True, default=str
+    )
+    assert list(par_meta["section_timings_ms"]) == list(seq_meta["section_timings_ms"])
+    assert par_meta["section_build"]["workers"] == 4 and seq_meta["section_build"]["workers"] == 1
+    assert parallel["core"]["recent_summaries"][0]["chapter"] == 1
+
+
+def test_context_manager_section_cache_reuses_unchanged_sections(temp_project, monkeypatch):
+    # 用例中的文件都是刚写入的，关闭竞态窗口才能在同一秒内验证命中
+    monkeypatch.setattr(context_cache, "RACY_WINDOW_NS", 0)
+    state = {"project": {"genre": "xuanhuan"}, "protagonist_state": {"name": "萧炎"}, "chapter_meta": {}}
+    temp_project.state_file.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    temp_project.settings_dir.mkdir(parents=True, exist_ok=True)
+    (temp_project.settings_dir / "世界观.md").write_text("斗气大陆", encoding="utf-8")
+    (temp_project.webnovel_dir / "summaries").mkdir(parents=True, exist_ok=True)
+    (temp_project.webnovel_dir / "summaries" / "ch0001.md").write_text("## 剧情摘要\n萧炎入宗", encoding="utf-8")
+    idx = IndexManager(temp_project)
+    idx.save_chapter_reading_power(ChapterReadingPowerMeta(chapter=1, hook_type="悬念钩", hook_strength="strong"))
+
+    def _build():
+        pack = ContextManager(temp_project)._build_pack(2)
+        meta = pack.pop("meta")
+        # writing_guidance 的评分参考历次落库的趋势，每次构建本就不同，且不参与缓存
+        pack.pop("writing_guidance")
+        return json.dumps(pack, ensure_ascii=False, sort_keys=True, default=str), meta["section_cache"]
+
+    cold, cold_stats = _build()
+    assert cold_stats["hits"] == 0 and cold_stats["misses"] == len(cold_stats["sections"]) > 0
+    assert temp_project.context_cache_file.exists()
+
+    warm, warm_stats = _build()
+    assert warm == cold
+    assert warm_stats["misses"] == 0 and warm_stats["hits"] == cold_stats["misses"]
+
+    (temp_project.settings_dir / "世界观.md").write_text("斗气大陆·中州", encoding="utf-8")
+    idx.save_chapter_reading_power(ChapterReadingPowerMeta(chapter=2, hook_type="危机钩", hook_strength="medium"))
+    changed, changed_stats = _build()
+    missed = {name for name, status in changed_stats["sections"].items() if status == "miss"}
+    assert missed == {"worldview_skeleton", "reader_signal"}
+    assert "斗气大陆·中州" in changed
+
+    temp_project.context_section_cache_enabled = False
+    uncached, uncached_stats = _build()
+    assert uncached == changed
+    assert uncached_stats["enabled"] is False and uncached_stats["sections"] == {}
+
+
+def test_context_manager_reuses_reader_signal_for_next_chapter(temp_project, monkeypatch):
+    monkeypatch.setattr(context_cache, "RACY_WINDOW_NS", 0)
+    temp_project.state_file.write_text(json.dumps({"chapter_meta": {}}, ensure_ascii=False), encoding="utf-8")
+    idx = IndexManager(temp_project)
+    idx.save_chapter_reading_power(ChapterReadingPowerMeta(chapter=1, hook_type="悬念钩", hook_strength="strong"))
+
+    first = ContextManager(temp_project)._build_pack(2)
+    assert first["meta"]["section_cache"]["sections"]["reader_signal"] == "miss"
+    assert first["reader_signal"]["next_chapter"] == 2
+
+    second = ContextManager(temp_project)._build_pack(3)
+    assert second["meta"]["section_cache"]["sections"]["reader_signal"] == "hit"
+    assert second["reader_signal"]["next_chapter"] == 3
+    assert second["reader_signal"]["recent_reading_power"] == first["reader_signal"]["recent_reading_power"]
+
+
+def test_context_manager_token_budget_skips_low_priority_sections(temp_project, monkeypatch):
+    state = {
+        "protagonist_state": {"name": "萧炎"},
+        "chapter_meta": {},
+        "disambiguation_warnings": [{"chapter": 1, "message": "告警" * 50}],
+    }
+    temp_project.state_file.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    summaries = temp_project.webnovel_dir / "summaries"
+    summaries.mkdir(parents=True, exist_ok=True)
+    for ch in (1, 2, 3):
+        (summaries / f"ch{ch:04d}.md").write_text(f"## 剧情摘要\n第{ch}章" + "剧情" * 40, encoding="utf-8")
+    (temp_project.webnovel_dir / "preferences.json").write_text(json.dumps({"tone": "热血"}, ensure_ascii=False), encoding="utf-8")
+
+    unlimited = ContextManager(temp_project).build_context(4)
+    assert "token_budget" not in unlimited["meta"]
+
+    loaded = []
+    original = ContextManager._load_json_optional
+    monkeypatch.setattr(
+        ContextManager, "_load_json_optional", lambda self, path: loaded.append(path.name) or original(self, path)
+    )
+    payload = ContextManager(temp_project).build_context(4, token_budget=160)
+
+    budget = payload["meta"]["token_budget"]
+    assert budget["budget"] == 160 and budget["used"] <= 160
+    assert "preferences" in budget["skipped"] and "preferences" not in payload
+    assert "preferences.json" not in loaded
+    assert "preferences" not in payload["meta"]["section_timings_ms"]
+    summaries_kept = payload["core"]["recent_summaries"]
+    assert 0 < len(summaries_kept) < len(unlimited["core"]["recent_summaries"])
+    # 贪心按 ranker 顺序装入：保留的是最近的章节
+    assert summaries_kept[0]["chapter"] == unlimited["core"]["recent_summaries"][0]["chapter"] == 3
+
+    roomy = ContextManager(temp_project).build_context(4, token_budget=100000)
+    assert roomy["meta"]["token_budget"]["skipped"] == []
+    roomy_sections = {k: v for k, v in roomy.items() if k != "meta"}
+    unlimited_sections = {k: v for k, v in unlimited.items() if k not in {"meta", "writing_guidance"}}
+    roomy_sections.pop("writing_guidance", None)
+    assert json.dumps(roomy_sections, ensure_ascii=False, sort_keys=True, default=str) == json.dumps(
+        unlimited_sections, ensure_ascii=False, sort_keys=True, default=str
+    )
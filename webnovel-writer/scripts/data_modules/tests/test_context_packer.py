@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from data_modules.context_packer import BudgetedPacker, TokenEstimator, estimate_text_tokens
+
+
+def test_estimate_text_tokens_counts_cjk_per_char():
+    assert estimate_text_tokens("") == 0
+    assert estimate_text_tokens("萧炎突破") == 4
+    assert estimate_text_tokens("abcdefgh") == 2
+    assert estimate_text_tokens("萧炎 abc") == 3
+
+
+def test_token_estimator_caches_by_content():
+    estimator = TokenEstimator(max_entries=2)
+    first = estimator.estimate({"summary": "萧炎入宗"})
+    assert estimator.estimate({"summary": "萧炎入宗"}) == first
+    estimator.estimate("a")
+    estimator.estimate("b")
+    assert len(estimator._cache) == 2
+
+
+def test_budgeted_packer_fills_lists_greedily_and_drops_rest():
+    estimator = TokenEstimator()
+    long_item = {"chapter": 1, "summary": "长" * 200}
+    short_item = {"chapter": 2, "summary": "短"}
+    core = {"chapter_outline": "大纲", "recent_summaries": [long_item, short_item]}
+    packer = BudgetedPacker(60, estimator=estimator)
+
+    assert packer.add("core", core, required=True)
+    assert packer.sections["core"]["recent_summaries"] == [short_item]
+    assert list(packer.sections["core"]) == ["chapter_outline", "recent_summaries"]
+
+    assert not packer.add("preferences", {"tone": "热" * 100})
+    packer.skip("memory")
+    report = packer.report()
+    assert report["used"] <= report["budget"] == 60
+    assert report["sections"]["core"]["items_dropped"] == 1
+    assert report["dropped"] == ["preferences"] and report["skipped"] == ["memory"]
+
+
+def test_budgeted_packer_keeps_required_section_over_budget():
+    packer = BudgetedPacker(1)
+    assert packer.add("core", {"chapter_outline": "很长的大纲" * 10, "recent_summaries": [{"summary": "x"}]}, required=True)
+    assert packer.sections["core"]["recent_summaries"] == []
+    assert packer.exhausted
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import pytest
+
 from data_modules.config import DataModulesConfig
 from data_modules.context_ranker import ContextRanker
 
@@ -53,3 +55,47 @@ def test_rank_pack_adds_context_contract_meta(tmp_path):
     assert ranked["meta"]["context_contract_version"] == "v2"
     assert ranked["meta"]["ranker"]["enabled"] is True
 
+
+def test_rank_keeps_ties_stable_and_debug_scores(tmp_path):
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.context_ranker_debug = True
+    ranker = ContextRanker(cfg)
+
+    items = [
+        {"entity_id": "a", "last_chapter": 5, "total": 2},
+        {"entity_id": "b", "last_chapter": 5, "total": 2},
+        {"entity_id": "w", "last_chapter": 9, "total": 2, "warning": "pending_invalid"},
+    ]
+    ranked = ranker.rank_appearances(items, current_chapter=10)
+    assert [item["entity_id"] for item in ranked] == ["w", "a", "b"]
+    assert ranked[0]["_context_score_detail"]["bonus"] == -0.15
+    assert ranked[1]["_context_score"] == ranked[2]["_context_score"]
+    assert "_context_score" not in items[0]
+
+    alerts = ranker.rank_alerts(["普通", {"chapter": 9, "message": "矛盾", "severity": "high"}], current_chapter=10)
+    assert alerts[0]["_context_score_detail"] == {"recency": 0.5, "frequency": 0.3, "bonus": 0.3}
+    assert alerts[1] == "普通"
+
+
+def test_numpy_backend_matches_python_backend(tmp_path):
+    pytest.importorskip("numpy")
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.context_ranker_debug = True
+    items = [
+        {"entity_id": f"e{i}", "last_chapter": (i * 7) % 40 or None, "total": i % 13, "warning": i % 5 == 0}
+        for i in range(150)
+    ]
+
+    results = {}
+    for backend in ("python", "numpy"):
+        cfg.context_ranker_backend = backend
+        results[backend] = ContextRanker(cfg).rank_appearances(items, current_chapter=40)
+    assert results["numpy"] == results["python"]
+
+
+def test_benchmark_ranking_reports_each_backend(tmp_path):
+    from data_modules.context_ranker import benchmark_ranking, np
+
+    report = benchmark_ranking(items=50, repeat=1, config=DataModulesConfig.from_project_root(tmp_path))
+    assert report["orders_match"] is True
+    assert set(report["best_ms"]) == ({"python", "numpy"} if np is not None else {"python"})
@@ -9,6 +9,7 @@ import sqlite3
 import sys
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 from data_modules.config import DataModulesConfig
@@ -38,9 +39,10 @@ def _create_dashboard_client(monkeypatch, project_root: Path) -> TestClient:
         clean_path.insert(0, str(plugin_root))
 
     monkeypatch.setattr(sys, "path", clean_path)
+    # 用 monkeypatch 移除，测试结束后恢复原模块，避免其他用例持有的模块引用与 sys.modules 脱节
     for name in list(sys.modules):
         if name == "dashboard.app" or name == "data_modules" or name.startswith("data_modules."):
-            sys.modules.pop(name, None)
+            monkeypatch.delitem(sys.modules, name, raising=False)
 
     module = importlib.import_module("dashboard.app")
     app = module.create_app(project_root)
@@ -341,9 +343,10 @@ def test_dashboard_app_imports_without_scripts_path(monkeypatch, tmp_path):
         clean_path.insert(0, str(plugin_root))
 
     monkeypatch.setattr(sys, "path", clean_path)
+    # 用 monkeypatch 移除，测试结束后恢复原模块，避免其他用例持有的模块引用与 sys.modules 脱节
     for name in list(sys.modules):
         if name == "dashboard.app" or name == "data_modules" or name.startswith("data_modules."):
-            sys.modules.pop(name, None)
+            monkeypatch.delitem(sys.modules, name, raising=False)
 
     module = importlib.import_module("dashboard.app")
     app = module.create_app(project_root)
@@ -438,3 +441,304 @@ def test_dashboard_env_status_endpoints_report_local_rag_state(monkeypatch, tmp_
     assert "embed_api_key" in check_names
     assert "rerank_api_key" in check_names
     assert "vector_db" in check_names
+
+
+def test_dashboard_db_endpoints_return_etag_and_honor_if_none_match(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    first = client.get("/api/chapters")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert [item["chapter"] for item in first.json()] == [1, 2, 3]
+
+    cached = client.get("/api/chapters", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    # 不同查询参数对应不同 ETag
+    other = client.get("/api/chapters", params={"x": 1})
+    assert other.headers["etag"] != etag
+
+    # 写入 index.db 后 data_version 变化，旧 ETag 失效
+    cfg = DataModulesConfig.from_project_root(project_root)
+    IndexManager(cfg).add_chapter(
+        ChapterMeta(chapter=4, title="新章", location="", word_count=10, characters=[], summary="")
+    )
+    refreshed = client.get("/api/chapters", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert [item["chapter"] for item in refreshed.json()] == [1, 2, 3, 4]
+
+
+def test_dashboard_chapter_trend_etag_tracks_state_json(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    first = client.get("/api/stats/chapter-trend")
+    etag = first.headers["etag"]
+
+    state_path = project_root / ".webnovel" / "state.json"
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    state["strand_tracker"]["history"][0]["strand"] = "constellation"
+    state_path.write_text(json.dumps(state, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    second = client.get("/api/stats/chapter-trend", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.json()["items"][0]["strand"] == "constellation"
+
+
+def test_dashboard_read_only_pool_reuses_connections_and_rejects_writes(tmp_path):
+    from dashboard.data_layer import ReadOnlyConnectionPool
+
+    db_path = tmp_path / "index.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+
+    pool = ReadOnlyConnectionPool(db_path, max_size=2)
+    with pool.connection() as conn:
+        first_conn = conn
+        assert conn.execute("SELECT v FROM t").fetchone()[0] == 1
+    with pool.connection() as conn:
+        assert conn is first_conn
+        try:
+            conn.execute("INSERT INTO t VALUES (2)")
+        except sqlite3.OperationalError as exc:
+            assert "readonly" in str(exc).lower() or "query_only" in str(exc).lower()
+        else:  # pragma: no cover - 只读保护失效
+            raise AssertionError("read-only connection accepted a write")
+
+    version = pool.data_version()
+    assert pool.data_version() == version
+    with sqlite3.connect(db_path) as writer:
+        writer.execute("INSERT INTO t VALUES (3)")
+        writer.commit()
+    assert pool.data_version() != version
+    pool.close()
+
+
+def test_dashboard_read_only_pool_times_out_when_exhausted(tmp_path):
+    from dashboard.data_layer import PoolTimeout, ReadOnlyConnectionPool
+
+    db_path = tmp_path / "index.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.commit()
+
+    pool = ReadOnlyConnectionPool(db_path, max_size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_dashboard_etag_matching_handles_weak_and_lists():
+    from dashboard.data_layer import etag_matches, make_etag
+
+    etag = make_etag("/api/chapters?", "v1")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"nope"', etag)
+
+
+def test_dashboard_file_tree_and_subtree_endpoints(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    (project_root / ".webnovel").mkdir(parents=True)
+    (project_root / ".webnovel" / "state.json").write_text("{}", encoding="utf-8")
+    volume_dir = project_root / "正文" / "第1卷"
+    volume_dir.mkdir(parents=True)
+    (volume_dir / "第0001章.md").write_text("正文", encoding="utf-8")
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    tree = client.get("/api/files/tree")
+    assert tree.status_code == 200
+    payload = tree.json()
+    assert payload["大纲"] == [] and payload["设定集"] == []
+    assert payload["正文"][0]["children"][0]["path"] == "正文/第1卷/第0001章.md"
+
+    subtree = client.get("/api/files/subtree", params={"path": "正文"})
+    assert subtree.status_code == 200
+    assert subtree.json()["items"][0]["child_count"] == 1
+
+    assert client.get("/api/files/subtree", params={"path": ".webnovel"}).status_code == 403
+    assert client.get("/api/files/subtree", params={"path": "正文/第9卷"}).status_code == 404
+
+
+def test_dashboard_file_tree_follows_watchdog_events(monkeypatch, tmp_path):
+    import time
+
+    project_root = tmp_path / "book"
+    (project_root / ".webnovel").mkdir(parents=True)
+    (project_root / ".webnovel" / "state.json").write_text("{}", encoding="utf-8")
+    (project_root / "正文").mkdir()
+
+    with _create_dashboard_client(monkeypatch, project_root) as client:
+        assert client.get("/api/files/tree").json()["正文"] == []
+        tree_index = client.app.state.tree_index
+        assert tree_index.live is True
+
+        (project_root / "正文" / "第0001章.md").write_text("正文", encoding="utf-8")
+        deadline = time.monotonic() + 5
+        names: list[str] = []
+        while time.monotonic() < deadline:
+            names = [item["name"] for item in client.get("/api/files/tree").json()["正文"]]
+            if names:
+                break
+            time.sleep(0.05)
+        assert names == ["第0001章.md"]
+
+
+def test_dashboard_chapter_rollups_aggregate_per_volume(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    cfg = DataModulesConfig.from_project_root(project_root)
+    index = IndexManager(cfg)
+    index.add_chapter(
+        ChapterMeta(chapter=4, title="第四章", location="黑市", word_count=2800, characters=[], summary="")
+    )
+    index.save_chapter_reading_power(
+        ChapterReadingPowerMeta(chapter=4, hook_type="追杀钩", hook_strength="strong", debt_balance=1.5)
+    )
+    index.save_review_metrics(ReviewMetrics(start_chapter=4, end_chapter=4, overall_score=92))
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    response = client.get("/api/stats/chapter-rollups")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["group_by"] == "volume"
+    assert payload["total_chapters"] == 4
+    assert payload["total_words"] == 3000 + 3100 + 3200 + 2800
+    assert payload["latest_chapter"] == 4
+
+    first, second = payload["groups"]
+    assert first["volume"] == 1
+    assert (first["chapter_start"], first["chapter_end"]) == (1, 2)
+    assert first["word_count"]["total"] == 6100
+    assert first["word_count"]["cumulative"] == 6100
+    assert first["hook_strength"] == {"strong": 0, "medium": 1, "weak": 1, "none": 0, "avg_value": 2.0}
+    assert first["review_score"]["p50"] == 71
+    assert first["review_score"]["p90"] == 83
+
+    assert second["volume"] == 2
+    assert second["chapters"] == 2
+    assert second["word_count"]["cumulative"] == 12100
+    assert second["hook_strength"]["strong"] == 2
+    assert second["review_score"]["count"] == 2
+    assert second["review_score"]["avg"] == 90.0
+    assert second["debt_balance"]["closing"] == 1.5
+
+    buckets = client.get("/api/stats/chapter-rollups", params={"group_by": "bucket", "bucket_size": 3}).json()
+    assert [(g["bucket"], g["chapters"]) for g in buckets["groups"]] == [(0, 3), (1, 1)]
+    assert buckets["groups"][1]["bucket_start"] == 4
+
+    assert client.get("/api/stats/chapter-rollups", params={"group_by": "genre"}).status_code == 422
+
+
+def test_dashboard_chapter_rollups_put_unplanned_chapters_last(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    state_path = project_root / ".webnovel" / "state.json"
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    state["progress"]["volumes_planned"] = [{"volume": 1, "chapters_range": "1-2"}]
+    state_path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    groups = client.get("/api/stats/chapter-rollups").json()["groups"]
+    assert [g["volume"] for g in groups] == [1, None]
+    assert groups[1]["chapter_start"] == 3
+
+
+def test_dashboard_api_responses_are_compressed_above_threshold(monkeypatch, tmp_path):
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    cfg = DataModulesConfig.from_project_root(project_root)
+    index = IndexManager(cfg)
+    for chapter in range(4, 40):
+        index.add_chapter(
+            ChapterMeta(chapter=chapter, title=f"第{chapter}章", location="青元宗", word_count=3000, characters=[], summary="概要" * 20)
+        )
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    compressed = client.get("/api/chapters", headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert len(compressed.json()) == 39
+    assert int(compressed.headers["content-length"]) < len(
+        client.get("/api/chapters", headers={"Accept-Encoding": "identity"}).content
+    )
+
+    small = client.get("/api/story-events/health", headers={"Accept-Encoding": "gzip"})
+    assert small.status_code == 200
+    assert "content-encoding" not in small.headers
+
+    plain = client.get("/api/chapters", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_dashboard_msgpack_content_negotiation(monkeypatch, tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+
+    project_root = tmp_path / "book"
+    _build_project_data(project_root)
+    client = _create_dashboard_client(monkeypatch, project_root)
+
+    packed = client.get("/api/chapters", headers={"Accept": "application/msgpack"})
+    assert packed.headers["content-type"].startswith("application/msgpack")
+    assert [item["chapter"] for item in msgpack.unpackb(packed.content)] == [1, 2, 3]
+
+    as_json = client.get("/api/chapters", headers={"Accept": "application/json"})
+    assert as_json.headers["content-type"].startswith("application/json")
+    assert as_json.headers["etag"] != packed.headers["etag"]
+
+    info = client.get("/api/project/info", headers={"Accept": "application/msgpack"})
+    assert msgpack.unpackb(info.content)["project_info"]["title"] == "像素写手测试书"
+
+
+def test_dashboard_encoding_helpers_fall_back_to_json(monkeypatch):
+    from dashboard import encoding
+
+    monkeypatch.setattr(encoding, "msgpack", None)
+    assert encoding.negotiate_media_type("application/msgpack") == encoding.JSON_MEDIA_TYPE
+
+    monkeypatch.setattr(encoding, "orjson", None)
+    body = encoding.encode_payload({"名字": "林长青", 1: [b"raw"]})
+    assert json.loads(body) == {"名字": "林长青", "1": ["raw"]}
+    assert encoding.accepts_encoding("br;q=0.5, gzip;q=0", "br")
+    assert not encoding.accepts_encoding("br;q=0.5, gzip;q=0", "gzip")
+    # 显式 q=0 优先于通配符
+    assert not encoding.accepts_encoding("gzip;q=0, *", "gzip")
+    assert encoding.accepts_encoding("gzip;q=0, *", "br")
+    assert not encoding.accepts_encoding("*;q=0", "gzip")
+
+
+def test_dashboard_encoding_middleware_weakens_etag_of_compressed_body():
+    from fastapi import FastAPI
+    from starlette.responses import Response as StarletteResponse
+
+    from dashboard.encoding import ResponseEncodingMiddleware
+
+    app = FastAPI()
+    app.add_middleware(ResponseEncodingMiddleware, minimum_size=16)
+
+    @app.get("/api/strong")
+    def strong():
+        return StarletteResponse(b"x" * 64, media_type="text/plain", headers={"ETag": '"abc"'})
+
+    client = TestClient(app)
+    compressed = client.get("/api/strong", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == 'W/"abc"'
+    plain = client.get("/api/strong", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == '"abc"'
@@ -6,6 +6,8 @@ from __future__ import annotations
 from pathlib import Path
 from types import SimpleNamespace
 
+import pytest
+
 
 def test_dashboard_watcher_notifies_story_system_commit_changes(tmp_path):
     from dashboard.watcher import _WebnovelFileHandler
@@ -25,3 +27,146 @@ def test_dashboard_watcher_notifies_story_system_commit_changes(tmp_path):
     handler.on_modified(event)
 
     assert changed == [("chapter_003.commit.json", "modified")]
+
+
+def _make_docs(root: Path) -> None:
+    (root / "正文" / "第1卷").mkdir(parents=True)
+    (root / "正文" / "第1卷" / "第0001章.md").write_text("一", encoding="utf-8")
+    (root / "正文" / "第1卷" / "第0002章.md").write_text("二二", encoding="utf-8")
+    (root / "大纲").mkdir()
+    (root / "大纲" / "总纲.md").write_text("纲", encoding="utf-8")
+
+
+def test_file_tree_index_snapshot_and_lazy_subtree(tmp_path):
+    from dashboard.file_tree import FileTreeIndex
+
+    _make_docs(tmp_path)
+    index = FileTreeIndex(tmp_path)
+
+    snapshot = index.snapshot()
+    assert snapshot["设定集"] == []
+    volume = snapshot["正文"][0]
+    assert volume["type"] == "dir" and volume["path"] == "正文/第1卷"
+    assert [item["name"] for item in volume["children"]] == ["第0001章.md", "第0002章.md"]
+    assert volume["children"][1]["size"] == len("二二".encode("utf-8"))
+
+    top = index.subtree("正文", depth=1)
+    assert top == [
+        {
+            "name": "第1卷",
+            "type": "dir",
+            "path": "正文/第1卷",
+            "children": [],
+            "has_children": True,
+            "child_count": 2,
+        }
+    ]
+    assert [item["path"] for item in index.subtree("正文/第1卷")] == [
+        "正文/第1卷/第0001章.md",
+        "正文/第1卷/第0002章.md",
+    ]
+    assert index.subtree("正文/不存在") is None
+    assert index.subtree(".webnovel") is None
+
+
+def test_file_tree_index_applies_watchdog_events_incrementally(tmp_path):
+    from dashboard.file_tree import FileTreeIndex
+
+    _make_docs(tmp_path)
+    index = FileTreeIndex(tmp_path)
+    index.build()
+    index.set_live(True)
+    version = index.version
+
+    new_file = tmp_path / "正文" / "第1卷" / "第0003章.md"
+    new_file.write_text("三", encoding="utf-8")
+    assert index.apply_event("created", str(new_file)) is True
+    assert index.version > version
+    assert len(index.subtree("正文/第1卷")) == 3
+
+    moved = tmp_path / "正文" / "第1卷" / "第0003章-改.md"
+    new_file.rename(moved)
+    index.apply_event("moved", str(new_file), str(moved))
+    names = [item["name"] for item in index.subtree("正文/第1卷")]
+    assert "第0003章.md" not in names and "第0003章-改.md" in names
+
+    moved.write_text("三三三", encoding="utf-8")
+    index.apply_event("modified", str(moved))
+    sizes = {item["name"]: item["size"] for item in index.subtree("正文/第1卷")}
+    assert sizes["第0003章-改.md"] == len("三三三".encode("utf-8"))
+
+    (tmp_path / "设定集").mkdir()
+    (tmp_path / "设定集" / "世界观.md").write_text("世界", encoding="utf-8")
+    index.apply_event("created", str(tmp_path / "设定集" / "世界观.md"))
+    assert [item["name"] for item in index.snapshot()["设定集"]] == ["世界观.md"]
+
+    moved.unlink()
+    index.apply_event("deleted", str(moved))
+    assert len(index.subtree("正文/第1卷")) == 2
+
+    # 三大目录之外的事件被忽略
+    assert index.apply_event("created", str(tmp_path / ".webnovel" / "state.json")) is False
+    assert index.apply_event("opened", str(tmp_path / "大纲" / "总纲.md")) is False
+
+
+def test_document_tree_handler_skips_directory_modified_events(tmp_path):
+    from dashboard.file_tree import FileTreeIndex
+    from dashboard.watcher import _DocumentTreeHandler
+
+    _make_docs(tmp_path)
+    index = FileTreeIndex(tmp_path)
+    index.build()
+    version = index.version
+    handler = _DocumentTreeHandler(index)
+
+    handler.on_any_event(
+        SimpleNamespace(is_directory=True, event_type="modified", src_path=str(tmp_path / "正文"))
+    )
+    assert index.version == version
+
+    (tmp_path / "正文" / "第2卷").mkdir()
+    handler.on_any_event(
+        SimpleNamespace(is_directory=True, event_type="created", src_path=str(tmp_path / "正文" / "第2卷"))
+    )
+    assert index.version == version + 1
+    assert [item["name"] for item in index.subtree("正文")] == ["第1卷", "第2卷"]
+
+
+def test_line_offset_index_reads_windows_across_checkpoints(tmp_path):
+    from dashboard.file_reader import LineIndexCache, LineOffsetIndex, read_line_window
+
+    path = tmp_path / "outline.md"
+    path.write_text("".join(f"line-{i}\n" for i in range(1000)) + "tail", encoding="utf-8")
+
+    index = LineOffsetIndex.build(path, stride=64)
+    assert index.total_lines == 1001
+    assert index.read_lines(0, 2) == b"line-0\nline-1\n"
+    assert index.read_lines(127, 3) == b"line-127\nline-128\nline-129\n"
+    assert index.read_lines(999, 5) == b"line-999\ntail"
+    assert index.read_lines(1001, 5) == b""
+
+    cache = LineIndexCache(stride=64)
+    window = read_line_window(cache, path, 64, 2)
+    assert window["content"] == "line-64\nline-65\n"
+    assert window["has_more"] is True
+    assert cache.get(path) is cache.get(path)
+
+    path.write_text("only\n", encoding="utf-8")
+    assert read_line_window(cache, path, 0, 10)["total_lines"] == 1
+
+
+def test_parse_range_variants():
+    from dashboard.file_reader import RangeNotSatisfiable, accepts_gzip, parse_range
+
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=95-200", 100) == (95, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+    assert accepts_gzip("gzip, deflate, br")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("identity")
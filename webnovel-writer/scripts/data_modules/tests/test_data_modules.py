@@ -473,6 +473,42 @@ class TestIndexManager:
         assert manager.get_entities_by_alias("陈锋")[0]["id"] == "chenfeng"
         assert manager.get_entity("陈锋")["id"] == "chenfeng"
 
+    def test_batch_entity_reads(self, temp_project):
+        manager = IndexManager(temp_project)
+        for eid, etype, name, last, archived in [
+            ("xiaoyan", "角色", "萧炎", 5, False),
+            ("yaolao", "角色", "药老", 9, False),
+            ("wutan", "地点", "乌坦城", 1, False),
+            ("old", "角色", "旧人", 2, True),
+        ]:
+            manager.upsert_entity(
+                EntityMeta(
+                    id=eid,
+                    type=etype,
+                    canonical_name=name,
+                    current={"hp": last},
+                    first_appearance=1,
+                    last_appearance=last,
+                    is_archived=archived,
+                )
+            )
+        manager.register_alias("小炎子", "xiaoyan", "角色")
+
+        found = manager.get_entities(["xiaoyan", "wutan", "missing", "xiaoyan"], columns=["canonical_name", "current_json"])
+        assert set(found) == {"xiaoyan", "wutan"}
+        assert found["xiaoyan"] == {"id": "xiaoyan", "canonical_name": "萧炎", "current_json": {"hp": 5}}
+        with pytest.raises(ValueError):
+            manager.get_entities(["xiaoyan"], columns=["id; DROP TABLE entities"])
+
+        grouped = manager.get_all_entities_grouped()
+        assert [e["id"] for e in grouped["角色"]] == ["yaolao", "xiaoyan"]
+        assert [e["id"] for e in grouped["地点"]] == ["wutan"]
+        assert len(manager.get_all_entities_grouped(include_archived=True)["角色"]) == 3
+
+        aliases = manager.get_aliases_for_entities(["xiaoyan", "missing"])
+        assert aliases["xiaoyan"] == manager.get_entity_aliases("xiaoyan")
+        assert aliases["missing"] == []
+
     def test_entity_alias_and_relationships(self, temp_project):
         manager = IndexManager(temp_project)
 
@@ -1383,6 +1419,46 @@ class TestIndexManager:
         with pytest.raises(ValueError, match="outside allowed directory"):
             index_manager_module.main()
 
+    def test_init_db_skips_ddl_when_schema_current(self, temp_project, monkeypatch):
+        import sqlite3
+        from contextlib import closing
+
+        IndexManager(temp_project)
+        with closing(sqlite3.connect(str(temp_project.index_db))) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == index_manager_module.INDEX_SCHEMA_VERSION
+
+        applied = []
+        original = IndexManager._apply_schema
+        monkeypatch.setattr(IndexManager, "_apply_schema", lambda self, conn: applied.append(1) or original(self, conn))
+
+        # 同一进程内再次初始化：命中登记表，不再执行 DDL
+        IndexManager(temp_project)
+        assert applied == []
+
+        # 登记表清空但版本一致：只读 user_version
+        monkeypatch.setattr(index_manager_module, "_schema_ready", {})
+        IndexManager(temp_project)
+        assert applied == []
+
+        # 版本落后：补跑一次结构迁移并写回当前版本
+        monkeypatch.setattr(index_manager_module, "_schema_ready", {})
+        with closing(sqlite3.connect(str(temp_project.index_db))) as conn:
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        manager = IndexManager(temp_project)
+        assert applied == [1]
+        assert manager.get_chapter(1) is None
+        with closing(sqlite3.connect(str(temp_project.index_db))) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == index_manager_module.INDEX_SCHEMA_VERSION
+
+    def test_init_db_recreates_schema_after_db_replaced(self, temp_project):
+        IndexManager(temp_project)
+        temp_project.index_db.unlink()
+
+        manager = IndexManager(temp_project)
+        manager.add_chapter(ChapterMeta(chapter=1, title="重建", location="", word_count=1, characters=[]))
+        assert manager.get_chapter(1)["title"] == "重建"
+
 
 class TestStyleSampler:
     """风格样本测试"""
@@ -553,3 +553,47 @@ def test_render_text_contains_runtime_status_section(tmp_path):
     parsed = json.loads(text)
     assert parsed["runtime_status"]["primary_write_source"] == "chapter_commit"
     assert parsed["runtime_status"]["fallback_sources"] == ["missing_accepted_commit"]
+
+
+def test_context_session_shares_resources_and_matches_standalone_context(tmp_path):
+    scripts_dir = Path(__file__).resolve().parents[2]
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+
+    from extract_chapter_context import ContextSession, _load_contract_context, build_chapter_context_payload
+    from data_modules.config import DataModulesConfig
+    from data_modules.context_manager import ContextManager
+
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.ensure_dirs()
+    state = {"project": {"genre": "xuanhuan"}, "progress": {"current_chapter": 3}, "protagonist_state": {"name": "萧炎"}}
+    cfg.state_file.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    summaries_dir = cfg.webnovel_dir / "summaries"
+    summaries_dir.mkdir(parents=True, exist_ok=True)
+    (summaries_dir / "ch0001.md").write_text("## 剧情摘要\n第一章", encoding="utf-8")
+    (summaries_dir / "ch0002.md").write_text("## 剧情摘要\n第二章\n\n## 伏笔\n- 玉佩", encoding="utf-8")
+    outline_dir = tmp_path / "大纲"
+    outline_dir.mkdir(parents=True, exist_ok=True)
+    (outline_dir / "第1卷-详细大纲.md").write_text("### 第3章：入宗\n测试大纲", encoding="utf-8")
+
+    session = ContextSession(tmp_path)
+    assert session.rag_adapter.index_manager is session.index_manager
+    assert session.context_manager.index_manager is session.index_manager
+    assert session.config is session.config
+
+    shared = _load_contract_context(tmp_path, 3, session=session)
+    standalone = ContextManager(cfg).build_context(chapter=3, template="plot")
+    assert shared["core"]["chapter_outline"] == standalone["core"]["chapter_outline"]
+    assert shared["core"]["recent_summaries"] == standalone["core"]["recent_summaries"]
+    assert shared["core"]["protagonist_snapshot"] == standalone["core"]["protagonist_snapshot"]
+
+    payload = build_chapter_context_payload(tmp_path, 3)
+    assert payload["previous_summaries"] == ["### 第1章摘要\n第一章", "### 第2章摘要\n第二章"]
+    assert payload["timing"]["total_ms"] >= 0
+    assert set(payload["timing"]["stages_ms"]) == {
+        "outline",
+        "summaries",
+        "state_summary",
+        "contract_context",
+        "rag_assist",
+    }
@@ -76,3 +76,21 @@ def test_bootstrap_from_index_includes_state_changes_and_open_loops(tmp_path):
     loops = store.query(category="open_loop", status="active")
     assert any("三年之约" in item.value for item in loops)
 
+
+def test_bootstrap_reads_open_loops_from_non_canonical_summary_names(tmp_path):
+    cfg = _cfg(tmp_path)
+    summaries_dir = cfg.webnovel_dir / "summaries"
+    summaries_dir.mkdir(parents=True, exist_ok=True)
+    (summaries_dir / "ch0005.md").write_text("## 伏笔\n- 规范命名的伏笔\n", encoding="utf-8")
+    (summaries_dir / "ch12.md").write_text("## 伏笔\n- 短编号的伏笔\n", encoding="utf-8")
+    (summaries_dir / "第3章.md").write_text("## 伏笔\n- 中文命名的伏笔\n", encoding="utf-8")
+
+    result = bootstrap_from_index(cfg)
+    assert result["categories"].get("open_loop") == 3
+
+    loops = ScratchpadManager(cfg).query(category="open_loop", status="active")
+    assert {item.value: item.source_chapter for item in loops} == {
+        "规范命名的伏笔": 5,
+        "短编号的伏笔": 12,
+        "中文命名的伏笔": 3,
+    }
@@ -62,3 +62,53 @@ def test_build_memory_pack_filter_and_budget(tmp_path):
     assert len(pack["long_term_facts"]) == 1
     assert pack["stats"]["semantic_total"] >= 1
     assert pack["long_term_facts"] == pack["semantic_memory"]
+
+
+def test_keyword_automaton_matches_like_substring_search():
+    from data_modules.memory.relevance import KeywordAutomaton
+
+    keywords = ["萧炎", "炎", "萧炎突破", "突破", "斗师", "he", "she", "hers", "his", ""]
+    automaton = KeywordAutomaton(keywords)
+    for text in ["第10章：萧炎突破斗师", "ushers", "萧萧炎", "无关文本", ""]:
+        found = {automaton.keywords[i] for i in automaton.find(text)}
+        assert found == {kw for kw in keywords if kw and kw in text}
+
+
+def test_filter_relevant_uses_index_and_top_n(tmp_path):
+    cfg = _cfg(tmp_path)
+    orchestrator = MemoryOrchestrator(cfg)
+    items = [
+        MemoryItem(id="a", layer="semantic", category="story_fact", subject="药老", field="x", value="v", source_chapter=1),
+        MemoryItem(id="b", layer="semantic", category="world_rule", subject="斗气", field="rule", value="v", source_chapter=2),
+        MemoryItem(id="c", layer="semantic", category="timeline", subject="t", field="f", value="三年之约到期", source_chapter=3),
+        MemoryItem(id="d", layer="semantic", category="character_state", subject="旁人", field="f", value="v", source_chapter=99),
+        MemoryItem(id="e", layer="semantic", category="relationship", subject="无关", field="f", value="v", source_chapter=5),
+    ]
+    outline = "药老现身，讲解斗气规则，三年之约到期在即。"
+
+    kept = orchestrator._filter_relevant(items, chapter=100, outline=outline)
+    assert [item.id for item in kept] == ["a", "b", "c", "d"]
+    assert [item.id for item in orchestrator._apply_budget(kept, max_items=2)] == ["b", "d"]
+    assert [item.id for item in orchestrator._apply_budget(kept, max_items=10)] == ["b", "d", "a", "c"]
+    assert [item.id for item in orchestrator._apply_budget(items, max_items=2, by_recency=True)] == ["d", "e"]
+
+
+def test_memory_snapshot_reused_until_scratchpad_changes(tmp_path, monkeypatch):
+    cfg = _cfg(tmp_path)
+    cfg.memory_scratchpad_backend = "sqlite"
+    store = ScratchpadManager(cfg)
+    store.upsert_item(MemoryItem(id="m1", layer="semantic", category="world_rule", subject="斗气", field="rule", value="v"))
+
+    orchestrator = MemoryOrchestrator(cfg)
+    first = orchestrator.build_memory_pack(1)
+    assert first["stats"]["total"] == 1
+
+    calls = []
+    original_query = ScratchpadManager.query
+    monkeypatch.setattr(ScratchpadManager, "query", lambda self, *a, **kw: calls.append(1) or original_query(self, *a, **kw))
+    assert orchestrator.build_memory_pack(2)["stats"]["total"] == 1
+    assert calls == []
+
+    store.upsert_item(MemoryItem(id="m2", layer="semantic", category="timeline", subject="三年之约", field="deadline", value="v"))
+    assert orchestrator.build_memory_pack(2)["stats"]["total"] == 2
+    assert calls == [1]
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import pytest
+
 from data_modules.config import DataModulesConfig
 from data_modules.memory.schema import MemoryItem
 from data_modules.memory.store import ScratchpadManager
@@ -204,3 +206,110 @@ def test_compactor_enforces_global_limit_and_dedupes_timeline_summary(tmp_path):
         if row.get("subject") == "timeline_summary"
     )
     assert summary_count2 <= 1
+
+
+def test_save_skips_unchanged_payload_and_links_backup(tmp_path):
+    cfg = _cfg(tmp_path)
+    cfg.memory_scratchpad_backend = "json"
+    manager = ScratchpadManager(cfg)
+    item = MemoryItem(
+        id="s1",
+        layer="semantic",
+        category="story_facts",
+        subject="tiangang",
+        field="founder",
+        value="萧玄",
+        source_chapter=1,
+    )
+    manager.upsert_item(item)
+    first = manager.path.read_bytes()
+    assert b"\n" not in first  # 紧凑编码
+
+    manager.upsert_item(MemoryItem(**{**item.to_dict(), "value": "萧玄（斗帝）"}))
+    second = manager.path.read_bytes()
+    backup = manager.path.with_suffix(".json.bak")
+    assert second != first
+    assert backup.read_bytes() == first
+
+    # 无变化的写回不触碰文件，也不轮换备份
+    before = manager.path.stat().st_mtime_ns
+    manager.save(manager.load())
+    assert manager.path.stat().st_mtime_ns == before
+    assert manager.path.read_bytes() == second
+    assert backup.read_bytes() == first
+
+    manager.mark_status("s1", "tentative")
+    assert manager.load().story_facts[0].status == "tentative"
+    assert backup.read_bytes() == second
+
+
+def _workload():
+    return [
+        MemoryItem(id="c1", layer="semantic", category="character_state", subject="xiaoyan", field="realm", value="斗者", source_chapter=1, updated_at="2026-01-01T00:00:01"),
+        MemoryItem(id="w1", layer="semantic", category="world_rule", subject="修炼体系", field="境界", value="九境", source_chapter=1, updated_at="2026-01-01T00:00:02"),
+        MemoryItem(id="c2", layer="semantic", category="character_state", subject="xiaoyan", field="realm", value="斗师", source_chapter=2, updated_at="2026-01-01T00:00:03"),
+        MemoryItem(id="o1", layer="episodic", category="open_loop", subject="三年之约", field="loop", value="挑战纳兰", payload={"k": 1}, evidence=["ch1"], source_chapter=2, updated_at="2026-01-01T00:00:04"),
+        MemoryItem(id="c1", layer="semantic", category="character_state", subject="xiaoyan", field="realm", value="斗者（回滚）", source_chapter=3, updated_at="2026-01-01T00:00:05"),
+    ]
+
+
+def test_sqlite_backend_matches_json_backend(tmp_path):
+    json_mgr = ScratchpadManager(_cfg(tmp_path / "json"))
+    sql_cfg = _cfg(tmp_path / "sql")
+    sql_cfg.memory_scratchpad_backend = "sqlite"
+    sql_mgr = ScratchpadManager(sql_cfg)
+
+    for item in _workload():
+        assert sql_mgr.upsert_item(item) == json_mgr.upsert_item(item)
+    assert sql_mgr.mark_status("w1", "tentative") is json_mgr.mark_status("w1", "tentative") is True
+    assert sql_mgr.mark_status("c2", "active") is json_mgr.mark_status("c2", "active") is True
+    assert sql_mgr.mark_status("missing", "active") is json_mgr.mark_status("missing", "active") is False
+
+    def _strip(rows):
+        return [{k: v for k, v in row.to_dict().items() if k != "updated_at"} for row in rows]
+
+    for kwargs in ({}, {"status": None}, {"category": "character_state", "status": "outdated"}, {"subject": "xiaoyan"}):
+        assert _strip(sql_mgr.query(**kwargs)) == _strip(json_mgr.query(**kwargs))
+    assert sql_mgr.conflicts() == json_mgr.conflicts()
+    sql_stats, json_stats = sql_mgr.stats(), json_mgr.stats()
+    sql_stats.pop("path"), json_stats.pop("path")
+    assert sql_stats == json_stats
+    assert not sql_cfg.scratchpad_file.exists()
+
+    exported = sql_mgr.export_json()
+    assert exported["items"] == 4
+    assert ScratchpadManager(_cfg(tmp_path / "sql")).load().to_dict()["open_loops"] == json_mgr.dump()["open_loops"]
+
+
+def test_sqlite_backend_imports_legacy_json(tmp_path):
+    cfg = _cfg(tmp_path)
+    json_mgr = ScratchpadManager(cfg)
+    for item in _workload():
+        json_mgr.upsert_item(item)
+
+    cfg.memory_scratchpad_backend = "sqlite"
+    sql_mgr = ScratchpadManager(cfg)
+    assert cfg.scratchpad_db.is_file()
+    assert [row.id for row in sql_mgr.query(status=None)] == [row.id for row in json_mgr.query(status=None)]
+    # 只导入一次：之后的写入以数据库为准
+    sql_mgr.mark_status("o1", "outdated")
+    assert ScratchpadManager(cfg).query(category="open_loop") == []
+
+
+def test_write_session_discards_changes_on_error(tmp_path):
+    for backend in ("json", "sqlite"):
+        cfg = _cfg(tmp_path / backend)
+        cfg.memory_scratchpad_backend = backend
+        manager = ScratchpadManager(cfg)
+        manager.upsert_item(_workload()[0])
+        with pytest.raises(RuntimeError):
+            with manager.write_session() as session:
+                assert session.upsert(_workload()[2])["outdated"] == 1
+                raise RuntimeError("boom")
+        assert [row.value for row in manager.query(category="character_state")] == ["斗者"]
+
+        with manager.write_session() as session:
+            stats = [session.upsert(item) for item in _workload()]
+            assert session.mark_status("o1", "tentative") is True
+        assert stats[-1] == {"added": 0, "updated": 1, "outdated": 1}
+        assert [row.id for row in manager.query(status=None)] == ["c2", "c1", "w1", "o1"]
@@ -49,3 +49,35 @@ def test_writer_stage4_memory_facts_mapping(tmp_path):
     assert store.query(category="open_loop", status="active")
     assert store.query(category="reader_promise", status="active")
 
+
+def test_writer_uses_single_write_session_per_chapter(tmp_path, monkeypatch):
+    result = {
+        "entities_new": [{"suggested_id": "yaolao", "name": "药老", "type": "角色", "tier": "重要"}],
+        "state_changes": [
+            {"entity_id": "xiaoyan", "field": "realm", "old": "斗者", "new": "斗师"},
+            {"entity_id": "xiaoyan", "field": "realm", "old": "斗师", "new": "大斗师"},
+        ],
+        "memory_facts": {"open_loops": [{"content": "三年之约", "status": "active"}]},
+    }
+    # 对照：逐条 upsert_item 的旧路径
+    baseline_cfg = _cfg(tmp_path / "baseline")
+    baseline = MemoryWriter(baseline_cfg)
+    expected = baseline._update_from_chapter_result(5, result)
+
+    cfg = _cfg(tmp_path / "batched")
+    cfg.memory_scratchpad_backend = "json"
+    writer = MemoryWriter(cfg)
+    saves = []
+    original_save = ScratchpadManager.save
+    monkeypatch.setattr(
+        ScratchpadManager, "save", lambda self, data, _use_lock=True: saves.append(1) or original_save(self, data, _use_lock)
+    )
+    summary = writer.update_from_chapter_result(5, result)
+
+    assert len(saves) == 1
+    assert summary == expected
+    rows = ScratchpadManager(cfg).query(category="character_state", status=None)
+    assert [(r.field, r.value, r.status) for r in rows] == [
+        (r.field, r.value, r.status)
+        for r in ScratchpadManager(baseline_cfg).query(category="character_state", status=None)
+    ]
@@ -52,7 +52,7 @@ SUBAGENT_PROMPT_FILES = (
 REGISTERED_CLI_SUBCOMMANDS = {
     "where", "preflight", "project-status", "doctor", "write-gate", "projections", "user-report",
     "run-ledger", "run-log", "use",
-    "index", "state", "rag", "style", "entity", "context", "memory",
+    "index", "state", "state-daemon", "rag", "style", "entity", "context", "memory",
     "migrate", "status", "update-state", "backup", "archive",
     "init", "extract-context", "memory-contract", "project-memory", "review-pipeline",
     "placeholder-scan", "master-outline-sync",
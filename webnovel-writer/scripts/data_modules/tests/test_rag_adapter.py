@@ -449,6 +449,32 @@ def test_init_db_migrates_legacy_vectors_schema(tmp_path, monkeypatch):
     backups = list(backup_dir.glob("vectors.db.schema_migration.v*.bak"))
     assert backups
 
+    with adapter._get_conn() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == rag_module.VECTOR_SCHEMA_VERSION
+
+
+def test_init_db_skips_schema_when_version_current(tmp_path, monkeypatch):
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.ensure_dirs()
+    monkeypatch.setattr(rag_module, "get_client", lambda config: StubClient())
+    RAGAdapter(cfg)
+
+    applied = []
+    original = RAGAdapter._apply_schema
+    monkeypatch.setattr(RAGAdapter, "_apply_schema", lambda self, version: applied.append(version) or original(self, version))
+    monkeypatch.setattr(rag_module, "_vector_schema_ready", {})
+
+    RAGAdapter(cfg)
+    RAGAdapter(cfg)
+    assert applied == []
+
+    monkeypatch.setattr(rag_module, "_vector_schema_ready", {})
+    with closing(sqlite3.connect(str(cfg.vector_db))) as conn:
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+    RAGAdapter(cfg)
+    assert applied == [1]
+
 
 def test_rag_adapter_cli(temp_project, monkeypatch, capsys):
     # stats
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SectionScheduler tests
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from data_modules.context_cache import SectionCache, file_stamp
+from data_modules.section_scheduler import SectionScheduler
+
+
+def test_independent_sections_run_concurrently_and_respect_deps():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def slow(name):
+        def _load(results):
+            barrier.wait()  # 三个独立 section 必须同时在跑，否则超时失败
+            return name
+        return _load
+
+    scheduler = SectionScheduler(max_workers=4)
+    scheduler.add("a", slow("a"))
+    scheduler.add("b", slow("b"))
+    scheduler.add("c", slow("c"))
+
+    scheduler.add("combined", lambda r: r["a"] + r["c"], deps=("a", "c"))
+    results, timings = scheduler.run()
+
+    assert results["combined"] == "ac"
+    assert list(timings) == ["a", "b", "c", "combined"]
+
+
+def test_errors_follow_registration_order_and_skip_dependents():
+    calls = []
+
+    def fail(message, delay):
+        def _load(results):
+            time.sleep(delay)
+            raise RuntimeError(message)
+        return _load
+
+    scheduler = SectionScheduler(max_workers=4)
+    scheduler.add("first", fail("first", 0.05))
+    scheduler.add("second", fail("second", 0))
+    scheduler.add("dependent", lambda r: calls.append("dependent"), deps=("second",))
+    with pytest.raises(RuntimeError, match="first"):
+        scheduler.run()
+    assert calls == []
+
+
+def test_single_worker_runs_sequentially_and_rejects_unknown_deps():
+    order = []
+    scheduler = SectionScheduler(max_workers=1)
+    scheduler.add("x", lambda r: order.append("x") or 1)
+    scheduler.add("y", lambda r: order.append("y") or r["x"] + 1, deps=("x",))
+    results, _ = scheduler.run()
+    assert results == {"x": 1, "y": 2} and order == ["x", "y"]
+
+    with pytest.raises(ValueError):
+        scheduler.add("z", lambda r: None, deps=("missing",))
+
+
+def test_fingerprinted_sections_reuse_cache_across_runs(tmp_path):
+    calls = []
+    inputs = {"a": 1, "b": 1}
+
+    def _run():
+        scheduler = SectionScheduler(max_workers=2, cache=SectionCache(tmp_path / "cache.json"))
+        for name in ("a", "b"):
+            scheduler.add(
+                name,
+                lambda r, name=name: calls.append(name) or {"value": inputs[name]},
+                fingerprint=lambda r, name=name: inputs[name],
+            )
+        scheduler.add("plain", lambda r: calls.append("plain") or r["a"]["value"], deps=("a",))
+        results, _ = scheduler.run()
+        scheduler.cache.save()
+        return results, scheduler.cache_report()
+
+    first, report = _run()
+    assert report == {"hits": 0, "misses": 2, "sections": {"a": "miss", "b": "miss"}}
+
+    calls.clear()
+    inputs["b"] = 2
+    second, report = _run()
+    assert report["sections"] == {"a": "hit", "b": "miss"}
+    assert sorted(calls) == ["b", "plain"]
+    assert second == {"a": {"value": 1}, "b": {"value": 2}, "plain": 1}
+
+
+def test_recently_modified_inputs_bypass_cache(tmp_path):
+    source = tmp_path / "source.md"
+    source.write_text("v1", encoding="utf-8")
+    calls = []
+
+    def _run():
+        scheduler = SectionScheduler(max_workers=1, cache=SectionCache(tmp_path / "cache.json"))
+        scheduler.add(
+            "doc",
+            lambda r: calls.append("doc") or source.read_text(encoding="utf-8"),
+            fingerprint=lambda r: file_stamp(source),
+        )
+        results, _ = scheduler.run()
+        scheduler.cache.save()
+        return results["doc"], scheduler.cache_report()["sections"]
+
+    # 刚写入的文件 mtime 仍在竞态窗口内：同尺寸改写可能不改变 stamp，结果不进缓存
+    assert _run() == ("v1", {"doc": "miss"})
+    source.write_text("v2", encoding="utf-8")
+    assert _run() == ("v2", {"doc": "miss"})
+    assert not (tmp_path / "cache.json").exists()
+
+    old = time.time_ns() - 60_000_000_000
+    os.utime(source, ns=(old, old))
+    assert _run() == ("v2", {"doc": "miss"})
+    assert _run() == ("v2", {"doc": "hit"})
+    assert calls == ["doc"] * 3
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_partial_runs_load_only_requested_sections_once(workers):
+    calls = []
+
+    def _loader(name, value):
+        return lambda r: calls.append(name) or value
+
+    scheduler = SectionScheduler(max_workers=workers)
+    scheduler.add("base", _loader("base", 1))
+    scheduler.add("derived", lambda r: calls.append("derived") or r["base"] + 1, deps=("base",))
+    scheduler.add("unused", _loader("unused", 0))
+
+    results, timings = scheduler.run(["derived"])
+    assert results == {"base": 1, "derived": 2}
+    assert list(timings) == ["base", "derived"]
+
+    results, _ = scheduler.run(["base"])
+    assert calls == ["base", "derived"]
+    assert "unused" not in results
+
+    with pytest.raises(ValueError):
+        scheduler.run(["missing"])
@@ -5,6 +5,7 @@ SQLStateManager tests
 """
 
 import json
+import sqlite3
 import sys
 
 import pytest
@@ -117,6 +118,40 @@ def test_sql_state_manager_process_chapter_entities_and_exports(temp_project):
     assert isinstance(alias_index, dict)
 
 
+def test_process_chapter_entities_is_one_atomic_transaction(temp_project, monkeypatch):
+    manager = SQLStateManager(temp_project)
+    manager.upsert_entity(EntityData(id="xiaoyan", type="角色", name="萧炎"))
+
+    connects = []
+    real_connect = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        connects.append(args)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, "connect", counting_connect)
+    payload = dict(
+        chapter=5,
+        entities_appeared=[{"id": "xiaoyan", "mentions": ["萧炎", "小炎子"]}],
+        entities_new=[{"suggested_id": f"npc{i}", "name": f"路人{i}"} for i in range(10)],
+        state_changes=[{"entity_id": "xiaoyan", "field": "realm", "old": "斗者", "new": "斗师"}],
+        relationships_new=[{"from": "xiaoyan", "to": "npc0", "type": "相识"}],
+    )
+    manager.process_chapter_entities(**payload)
+    assert len(connects) == 1
+    assert len(manager._index_manager.get_entities([f"npc{i}" for i in range(10)])) == 10
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("relationship write failed")
+
+    monkeypatch.setattr(manager, "upsert_relationship", boom)
+    payload.update(chapter=6, entities_new=[{"suggested_id": "late", "name": "迟到者"}])
+    with pytest.raises(RuntimeError):
+        manager.process_chapter_entities(**payload)
+    assert manager.get_entity("late") is None
+    assert manager.get_entity("xiaoyan")["last_appearance"] == 5
+
+
 def test_sql_state_manager_existing_entity_updates_and_stats(temp_project):
     manager = SQLStateManager(temp_project)
     manager.upsert_entity(
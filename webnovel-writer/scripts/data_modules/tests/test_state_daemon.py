@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+StateDaemon tests
+"""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from data_modules.config import DataModulesConfig
+from data_modules.index_manager import IndexManager
+from data_modules.memory.schema import MemoryItem
+from data_modules.memory.store import ScratchpadManager
+from data_modules.state_daemon import StateDaemon, daemon_status, socket_path, submit_to_daemon
+from data_modules.state_manager import StateManager
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix sockets")
+
+
+@pytest.fixture
+def temp_project(tmp_path):
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.ensure_dirs()
+    cfg.state_file.write_text(
+        json.dumps({"progress": {"current_chapter": 0, "total_words": 0}}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    return cfg
+
+
+@pytest.fixture
+def running_daemon(temp_project):
+    daemon = StateDaemon(temp_project, flush_interval=0.2)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    path = socket_path(temp_project)
+    deadline = time.time() + 5
+    while daemon_status(temp_project) is None:
+        assert time.time() < deadline, "daemon did not start"
+        time.sleep(0.01)
+    yield daemon
+    daemon.shutdown()
+    thread.join(timeout=5)
+    assert not path.exists()
+
+
+def test_concurrent_save_state_is_coalesced(temp_project, running_daemon):
+    results = []
+
+    def writer(chapter):
+        manager = StateManager(temp_project, enable_sqlite_sync=False)
+        manager.process_chapter_result(chapter, {"chapter_meta": {"hook": f"钩子{chapter}"}})
+        manager.update_progress(chapter, words=100)
+        results.append(manager.save_state())
+
+    threads = [threading.Thread(target=writer, args=(ch,)) for ch in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r["daemon"] and r["saved"] for r in results)
+    assert max(r["batch_size"] for r in results) > 1
+    assert running_daemon.stats()["batches"] < 8
+
+    state = json.loads(temp_project.state_file.read_text(encoding="utf-8"))
+    assert state["progress"]["current_chapter"] == 8
+    assert state["progress"]["total_words"] == 800
+    assert sorted(state["chapter_meta"]) == [f"{ch:04d}" for ch in range(1, 9)]
+
+
+def test_memory_and_index_writes_go_through_daemon(temp_project, running_daemon):
+    stats = ScratchpadManager(temp_project).upsert_item(
+        MemoryItem(id="m1", layer="semantic", category="character_state", subject="xiaoyan", field="realm", value="斗者")
+    )
+    assert stats == {"added": 1, "updated": 0, "outdated": 0}
+    assert running_daemon.stats()["memory_items"] == 1
+    assert ScratchpadManager(temp_project).load().count_items() == 1
+
+    manager = StateManager(temp_project)
+    manager.process_chapter_result(
+        3,
+        {"entities_new": [{"suggested_id": "yaolao", "name": "药老", "type": "角色", "tier": "重要"}]},
+    )
+    result = manager.save_state()
+    assert result["daemon"] is True and result["sqlite_sync_ok"] is True
+    assert IndexManager(temp_project).get_entity("yaolao")["canonical_name"] == "药老"
+    assert running_daemon.stats()["chapter_entities"] == 1
+
+
+def test_daemon_rejects_invalid_ops(temp_project, running_daemon):
+    with pytest.raises(RuntimeError):
+        submit_to_daemon(temp_project, {"state_ops": [{"op": "explode", "path": "progress"}]})
+    assert json.loads(temp_project.state_file.read_text(encoding="utf-8"))["progress"]["current_chapter"] == 0
+
+
+def test_falls_back_to_direct_write_without_daemon(temp_project):
+    assert submit_to_daemon(temp_project, {"state_ops": []}) is None
+
+    # 崩溃残留的 socket 文件同样视为未运行
+    socket_path(temp_project).write_text("", encoding="utf-8")
+    manager = StateManager(temp_project, enable_sqlite_sync=False)
+    manager.update_progress(2, words=10)
+    result = manager.save_state()
+    assert result["saved"] is True and "daemon" not in result
+    assert json.loads(temp_project.state_file.read_text(encoding="utf-8"))["progress"]["current_chapter"] == 2
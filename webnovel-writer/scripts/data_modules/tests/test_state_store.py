@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SegmentedStateStore tests
+"""
+
+import json
+import sys
+
+import pytest
+
+from data_modules.config import DataModulesConfig
+from data_modules.state_manager import StateManager
+from data_modules.state_projection_writer import StateProjectionWriter
+from data_modules.state_store import (
+    SEGMENTS_MARKER,
+    SegmentedStateStore,
+    apply_state_ops,
+    load_state,
+    read_state_sections,
+)
+
+
+@pytest.fixture
+def temp_project(tmp_path):
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.ensure_dirs()
+    return cfg
+
+
+def _full_state():
+    return {
+        "project_info": {"title": "测试书"},
+        "progress": {"current_chapter": 150, "total_words": 300000},
+        "protagonist_state": {"name": "萧炎"},
+        "chapter_meta": {
+            f"{ch:04d}": {"hook": f"钩子{ch}", "pattern": "反转"} for ch in range(1, 151)
+        },
+        "disambiguation_warnings": [{"chapter": 3, "mention": "宗主", "chosen_id": "a", "confidence": 0.7}],
+        "disambiguation_pending": [{"chapter": 4, "mention": "长老", "suggested_id": "b", "confidence": 0.3}],
+        "review_checkpoints": [{"chapters": "1-10", "report": "r1.md", "reviewed_at": "2024-01-01"}],
+        "strand_tracker": {
+            "current_dominant": "quest",
+            "chapters_since_switch": 2,
+            "history": [{"chapter": 149, "dominant": "quest"}, {"chapter": 150, "dominant": "quest"}],
+        },
+    }
+
+
+def _write_state(cfg, state):
+    cfg.state_file.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+
+
+def test_migrate_to_segmented_roundtrip(temp_project):
+    state = _full_state()
+    _write_state(temp_project, state)
+    store = SegmentedStateStore(temp_project.state_file)
+
+    result = store.migrate_to_segmented(shard_chapters=100)
+    assert result["layout"] == "segmented"
+    assert result["root_bytes_after"] < result["root_bytes_before"]
+
+    root = json.loads(temp_project.state_file.read_text(encoding="utf-8"))
+    assert root[SEGMENTS_MARKER]["shard_chapters"] == 100
+    assert "chapter_meta" not in root
+    assert "history" not in root["strand_tracker"]
+    assert root["strand_tracker"]["current_dominant"] == "quest"
+
+    buckets = sorted(p.name for p in (store.segment_dir / "chapter_meta").glob("*.json"))
+    assert buckets == ["0001-0100.json", "0101-0200.json"]
+
+    loaded = load_state(temp_project.state_file)
+    loaded.pop(SEGMENTS_MARKER)
+    assert loaded == state
+
+    store.migrate_to_single()
+    assert not store.segment_dir.exists()
+    assert json.loads(temp_project.state_file.read_text(encoding="utf-8")) == state
+
+
+def test_load_merges_residual_root_keys_from_legacy_writers(temp_project):
+    _write_state(temp_project, _full_state())
+    store = SegmentedStateStore(temp_project.state_file)
+    store.migrate_to_segmented()
+
+    root = json.loads(temp_project.state_file.read_text(encoding="utf-8"))
+    root["review_checkpoints"] = [{"chapters": "11-20", "report": "r2.md", "reviewed_at": "2024-02-01"}]
+    root["chapter_meta"] = {"0151": {"hook": "新钩子"}}
+    _write_state(temp_project, root)
+
+    loaded = store.load()
+    assert [r["report"] for r in loaded["review_checkpoints"]] == ["r1.md", "r2.md"]
+    assert loaded["chapter_meta"]["0151"] == {"hook": "新钩子"}
+    assert loaded["chapter_meta"]["0001"]["hook"] == "钩子1"
+
+
+def test_state_manager_save_only_touches_dirty_buckets(temp_project):
+    _write_state(temp_project, _full_state())
+    store = SegmentedStateStore(temp_project.state_file)
+    store.migrate_to_segmented(shard_chapters=100)
+
+    untouched = [
+        store.segment_dir / "chapter_meta" / "0001-0100.json",
+        store.segment_dir / "review_checkpoints.json",
+        store.segment_dir / "disambiguation_pending.json",
+    ]
+    before = {p: p.stat().st_mtime_ns for p in untouched}
+
+    manager = StateManager(temp_project, enable_sqlite_sync=False)
+    assert manager._state["chapter_meta"]["0001"]["hook"] == "钩子1"
+
+    manager.process_chapter_result(
+        151,
+        {
+            "chapter_meta": {"hook": "新钩子"},
+            "uncertain": [{"mention": "师尊", "confidence": 0.9, "suggested": "c", "adopted": True}],
+        },
+    )
+    manager.save_state()
+
+    assert {p: p.stat().st_mtime_ns for p in untouched} == before
+
+    reloaded = StateManager(temp_project, enable_sqlite_sync=False)._state
+    assert reloaded["progress"]["current_chapter"] == 151
+    assert reloaded["chapter_meta"]["0151"] == {"hook": "新钩子"}
+    assert len(reloaded["chapter_meta"]) == 151
+    assert [w["mention"] for w in reloaded["disambiguation_warnings"]] == ["宗主", "师尊"]
+    assert len(reloaded["review_checkpoints"]) == 1
+
+    # 内存快照保留未重读的分段
+    assert len(manager._state["chapter_meta"]) == 151
+    assert manager._state["review_checkpoints"] == reloaded["review_checkpoints"]
+
+
+def test_projection_writer_updates_strand_history_segment(temp_project):
+    _write_state(temp_project, _full_state())
+    store = SegmentedStateStore(temp_project.state_file)
+    store.migrate_to_segmented()
+
+    writer = StateProjectionWriter(temp_project.project_root)
+    writer.apply({"meta": {"chapter": 151, "status": "accepted"}, "chapter_meta": {"dominant_strand": "fire"}})
+
+    loaded = store.load()
+    assert loaded["strand_tracker"]["history"][-1] == {"chapter": 151, "dominant": "fire"}
+    assert loaded["strand_tracker"]["current_dominant"] == "fire"
+    assert loaded["progress"]["chapter_status"]["151"] == "chapter_committed"
+    assert len(loaded["chapter_meta"]) == 150
+
+
+def test_state_manager_cli_migrate_layout(temp_project, monkeypatch, capsys):
+    _write_state(temp_project, _full_state())
+
+    def run_cli(args):
+        monkeypatch.setattr(sys, "argv", ["state_manager", "--project-root", str(temp_project.project_root), *args])
+        from data_modules import state_manager as sm
+
+        sm.main()
+        return json.loads(capsys.readouterr().out)
+
+    out = run_cli(["migrate-layout", "--to", "segmented", "--shard-chapters", "50"])
+    assert out["status"] == "success"
+    assert out["data"]["shard_chapters"] == 50
+    assert len(list((temp_project.webnovel_dir / "state_segments" / "chapter_meta").glob("*.json"))) == 3
+
+    out = run_cli(["migrate-layout", "--to", "single"])
+    assert out["status"] == "success"
+    assert not (temp_project.webnovel_dir / "state_segments").exists()
+    assert len(load_state(temp_project.state_file)["chapter_meta"]) == 150
+
+
+def test_apply_state_ops_semantics():
+    state = {"progress": {"current_chapter": "5", "total_words": "bad"}}
+    apply_state_ops(
+        state,
+        [
+            {"op": "max", "path": "progress.current_chapter", "value": 3},
+            {"op": "incr", "path": "progress.total_words", "value": 100},
+            {
+                "op": "advance",
+                "path": "progress.chapter_status",
+                "value": {"1": "chapter_reviewed", "2": "chapter_rejected"},
+                "order": ["chapter_drafted", "chapter_reviewed", "chapter_committed"],
+            },
+            {
+                "op": "advance",
+                "path": "progress.chapter_status",
+                "value": {"1": "chapter_drafted", "2": "chapter_drafted"},
+                "order": ["chapter_drafted", "chapter_reviewed", "chapter_committed"],
+            },
+            {"op": "append_unique", "path": "items", "value": [{"k": 1}, {"k": 2}, {"k": 1}], "key": ["k"], "max_keep": 1},
+            {"op": "merge", "path": "chapter_meta", "value": {"0001": {"hook": "x"}}},
+            {"op": "remove", "path": "progress.total_words"},
+        ],
+    )
+    assert state["progress"]["current_chapter"] == 5
+    assert "total_words" not in state["progress"]
+    assert state["progress"]["chapter_status"] == {"1": "chapter_reviewed", "2": "chapter_drafted"}
+    assert state["items"] == [{"k": 2}]
+    assert state["chapter_meta"] == {"0001": {"hook": "x"}}
+
+
+def test_journal_mode_appends_without_rewriting_snapshot(temp_project):
+    temp_project.state_journal_enabled = True
+    _write_state(temp_project, {"progress": {"current_chapter": 1, "total_words": 1000}})
+    snapshot_before = temp_project.state_file.read_bytes()
+
+    manager = StateManager(temp_project, enable_sqlite_sync=False)
+    manager.process_chapter_result(2, {"chapter_meta": {"hook": "钩子2"}})
+    manager.update_progress(2, words=500)
+    result = manager.save_state()
+
+    assert result["journaled"] is True and result["compacted"] is False
+    assert temp_project.state_file.read_bytes() == snapshot_before
+    store = SegmentedStateStore(temp_project.state_file)
+    assert store.journal_stats()["records"] == 1
+    assert manager._state["progress"]["total_words"] == 1500
+
+    reloaded = StateManager(temp_project, enable_sqlite_sync=False)._state
+    assert reloaded["progress"]["current_chapter"] == 2
+    assert reloaded["progress"]["total_words"] == 1500
+    assert reloaded["chapter_meta"]["0002"] == {"hook": "钩子2"}
+    assert reloaded["_migrated_to_sqlite"] is True
+
+    # 日志模式下再次保存不再重复追加清理操作
+    manager.update_progress(3)
+    manager.save_state()
+    last_ops = store.read_journal()[-1]["ops"]
+    assert all(op["op"] != "remove" for op in last_ops)
+
+
+def test_journal_compacts_after_threshold(temp_project):
+    temp_project.state_journal_enabled = True
+    temp_project.state_journal_max_records = 3
+    _write_state(temp_project, {"progress": {"current_chapter": 0, "total_words": 0}})
+    store = SegmentedStateStore(temp_project.state_file)
+
+    results = []
+    for chapter in range(1, 4):
+        manager = StateManager(temp_project, enable_sqlite_sync=False)
+        manager.update_progress(chapter, words=10)
+        results.append(manager.save_state())
+
+    assert [r["compacted"] for r in results] == [False, False, True]
+    assert store.journal_stats()["records"] == 0
+    snapshot = json.loads(temp_project.state_file.read_text(encoding="utf-8"))
+    assert snapshot["progress"]["current_chapter"] == 3
+    assert snapshot["progress"]["total_words"] == 30
+    assert store.load()["progress"]["total_words"] == 30
+
+
+def test_journal_is_not_folded_twice_after_interrupted_compaction(temp_project):
+    _write_state(temp_project, {"progress": {"total_words": 100}})
+    store = SegmentedStateStore(temp_project.state_file)
+    store.append_journal([{"op": "incr", "path": "progress.total_words", "value": 50}])
+    journal_bytes = store.journal_file.read_bytes()
+
+    store.compact()
+    # 模拟「快照已写、日志未截断」的崩溃现场
+    store.journal_file.write_bytes(journal_bytes)
+    assert store.load()["progress"]["total_words"] == 150
+
+    store.append_journal([{"op": "incr", "path": "progress.total_words", "value": 1}])
+    assert store.load()["progress"]["total_words"] == 151
+
+
+def test_snapshot_writers_compact_pending_journal_first(temp_project):
+    temp_project.state_journal_enabled = True
+    _write_state(temp_project, _full_state())
+    SegmentedStateStore(temp_project.state_file).migrate_to_segmented()
+
+    manager = StateManager(temp_project, enable_sqlite_sync=False)
+    manager.process_chapter_result(151, {"chapter_meta": {"hook": "新钩子"}})
+    manager.update_progress(151, words=2000)
+    manager.save_state()
+
+    writer = StateProjectionWriter(temp_project.project_root)
+    writer.apply({"meta": {"chapter": 151, "status": "rejected"}})
+
+    store = SegmentedStateStore(temp_project.state_file)
+    assert store.journal_stats()["records"] == 0
+    loaded = store.load()
+    assert loaded["chapter_meta"]["0151"] == {"hook": "新钩子"}
+    assert loaded["progress"]["total_words"] == 302000
+    assert loaded["progress"]["chapter_status"]["151"] == "chapter_rejected"
+
+
+def test_read_state_sections_stops_after_requested_keys(temp_project, monkeypatch):
+    from data_modules import state_store
+
+    monkeypatch.setattr(state_store, "_SCAN_CHUNK_SIZE", 7)
+    head = json.dumps({"project_info": {"title": "测试书"}, "progress": {"current_chapter": 12345}}, ensure_ascii=False)
+    # 尾部故意损坏：只要扫描在拿到所需键后停止，就不会读到这里
+    temp_project.state_file.write_text(head[:-1] + ', "chapter_meta": {broken', encoding="utf-8")
+
+    assert read_state_sections(temp_project.state_file, ["progress"]) == {"progress": {"current_chapter": 12345}}
+    with pytest.raises(json.JSONDecodeError):
+        read_state_sections(temp_project.state_file, ["missing_key"])
+
+
+def test_read_state_sections_memoizes_per_mtime(temp_project):
+    _write_state(temp_project, _full_state())
+    first = read_state_sections(temp_project.state_file, ["progress", "nope"])
+    assert first == {"progress": {"current_chapter": 150, "total_words": 300000}}
+    first["progress"]["current_chapter"] = 0
+    assert read_state_sections(temp_project.state_file, ["progress"])["progress"]["current_chapter"] == 150
+
+    state = _full_state()
+    state["progress"]["current_chapter"] = 1510
+    _write_state(temp_project, state)
+    assert read_state_sections(temp_project.state_file, ["progress"])["progress"]["current_chapter"] == 1510
+
+
+def test_read_state_sections_handles_segments_and_journal(temp_project):
+    _write_state(temp_project, _full_state())
+    store = SegmentedStateStore(temp_project.state_file)
+    store.migrate_to_segmented()
+    store.append_journal([{"op": "max", "path": "progress.current_chapter", "value": 152}])
+
+    result = read_state_sections(temp_project.state_file, ["progress", "strand_tracker"])
+    assert result["progress"]["current_chapter"] == 152
+    assert len(result["strand_tracker"]["history"]) == 2
+    assert "chapter_meta" not in result
@@ -3,6 +3,7 @@
 
 import json
 
+import data_modules.commit_catalog as commit_catalog_module
 from data_modules.story_runtime_sources import load_runtime_sources
 
 
@@ -46,3 +47,41 @@ def test_load_runtime_sources_prefers_latest_accepted_commit(tmp_path):
     assert snapshot.latest_accepted_commit["meta"]["status"] == "accepted"
     assert snapshot.primary_write_source == "chapter_commit"
     assert snapshot.fallback_sources == []
+
+
+def test_runtime_sources_use_commit_catalog(tmp_path, monkeypatch):
+    from data_modules.chapter_commit_service import ChapterCommitService
+
+    service = ChapterCommitService(tmp_path)
+    for chapter, status in [(1, "accepted"), (2, "accepted"), (4, "rejected"), (5, "rejected")]:
+        service.persist_commit({"meta": {"chapter": chapter, "status": status}})
+    catalog_file = tmp_path / ".story-system" / "commits" / "catalog.json"
+    entries = json.loads(catalog_file.read_text(encoding="utf-8"))["entries"]
+    assert sorted(entries) == ["1", "2", "4", "5"]
+    assert entries["5"]["status"] == "rejected" and len(entries["5"]["sha256"]) == 64
+
+    loads = []
+    original = commit_catalog_module.read_json_if_exists
+    monkeypatch.setattr(
+        commit_catalog_module, "read_json_if_exists", lambda path: loads.append(path.name) or original(path)
+    )
+
+    snapshot = load_runtime_sources(tmp_path, chapter=6)
+    assert snapshot.latest_commit["meta"]["chapter"] == 5
+    assert snapshot.latest_accepted_commit["meta"]["chapter"] == 2
+    assert loads == ["chapter_005.commit.json", "chapter_002.commit.json"]
+
+    # 绕过 persist_commit 写入/删除的 commit 文件按 stat 校验被发现
+    (tmp_path / ".story-system" / "commits" / "chapter_003.commit.json").write_text(
+        json.dumps({"meta": {"chapter": 3, "status": "accepted"}}), encoding="utf-8"
+    )
+    (tmp_path / ".story-system" / "commits" / "chapter_005.commit.json").unlink()
+    loads.clear()
+    snapshot = load_runtime_sources(tmp_path, chapter=6)
+    assert snapshot.latest_commit["meta"]["chapter"] == 4
+    assert snapshot.latest_accepted_commit["meta"]["chapter"] == 3
+    assert sorted(json.loads(catalog_file.read_text(encoding="utf-8"))["entries"]) == ["1", "2", "3", "4"]
+
+    snapshot = load_runtime_sources(tmp_path, chapter=3)
+    assert snapshot.latest_commit is snapshot.latest_accepted_commit
+    assert snapshot.latest_commit["meta"]["chapter"] == 3
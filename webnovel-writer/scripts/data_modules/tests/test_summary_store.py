@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SummaryStore tests
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from data_modules.config import DataModulesConfig
+from data_modules.summary_projection_writer import SummaryProjectionWriter
+from data_modules.summary_store import SummaryStore
+
+
+@pytest.fixture
+def temp_project(tmp_path):
+    cfg = DataModulesConfig.from_project_root(tmp_path)
+    cfg.ensure_dirs()
+    (cfg.webnovel_dir / "summaries").mkdir(parents=True, exist_ok=True)
+    return cfg
+
+
+def _write(cfg, chapter, text):
+    path = cfg.webnovel_dir / "summaries" / f"ch{chapter:04d}.md"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _indexed_chapters(cfg):
+    with sqlite3.connect(str(cfg.summary_index_db)) as conn:
+        return [row[0] for row in conn.execute("SELECT chapter FROM chapter_summaries ORDER BY chapter")]
+
+
+def test_window_and_sample_read_excerpts_in_batches(temp_project):
+    for ch in range(1, 7):
+        _write(temp_project, ch, f"## 剧情摘要\n第{ch}章摘要\n\n## 伏笔\n- 线索{ch}\n")
+    _write(temp_project, 2, "没有摘要区块的正文")
+
+    store = SummaryStore(temp_project)
+    window = store.window(6, 3)
+    assert [s.chapter for s in window] == [3, 4, 5]
+    assert window[0].excerpt == "第3章摘要"
+    assert "## 伏笔" in window[0].text
+
+    samples = store.sample(7, 2, max_samples=2, snippet_chars=3)
+    assert [s.chapter for s in samples] == [3, 5]
+    assert [s.snippet(3) for s in samples] == ["第3章", "第5章"]
+    assert store.get(2).excerpt == "" and store.get(2).snippet() == "没有摘要区块的正文"
+    assert store.get(3).snippet(0) == "## 剧情摘要\n第3章摘要\n\n## 伏笔\n- 线索3\n"
+    assert _indexed_chapters(temp_project) == [2, 3, 4, 5]
+
+
+def test_store_picks_up_external_edits_and_deletions(temp_project):
+    path = _write(temp_project, 1, "## 剧情摘要\n旧摘要")
+    _write(temp_project, 2, "## 剧情摘要\n第二章")
+    (temp_project.webnovel_dir / "summaries" / "ch1.md").write_text("## 剧情摘要\n非规范文件名", encoding="utf-8")
+    store = SummaryStore(temp_project)
+    assert [s.chapter for s in store.all()] == [1, 2]
+
+    path.write_text("## 剧情摘要\n新摘要，长度也变了", encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert store.get(1).excerpt == "新摘要，长度也变了"
+
+    (temp_project.webnovel_dir / "summaries" / "ch0002.md").unlink()
+    assert [s.chapter for s in store.all()] == [1]
+    assert _indexed_chapters(temp_project) == [1]
+
+
+def test_recently_modified_summary_is_reverified_until_it_settles(temp_project):
+    path = _write(temp_project, 1, "## 剧情摘要\n甲")
+    stamp = path.stat()
+    store = SummaryStore(temp_project)
+    assert store.get(1).excerpt == "甲"
+
+    # 同一时间戳内的同尺寸改写：(mtime_ns, size) 不变，仍能读到新内容
+    path.write_text("## 剧情摘要\n乙", encoding="utf-8")
+    os.utime(path, ns=(stamp.st_atime_ns, stamp.st_mtime_ns))
+    assert store.get(1).excerpt == "乙"
+
+    old = stamp.st_mtime_ns - 60_000_000_000
+    os.utime(path, ns=(old, old))
+    assert store.get(1).excerpt == "乙"
+    with sqlite3.connect(str(temp_project.summary_index_db)) as conn:
+        assert conn.execute("SELECT mtime_ns FROM chapter_summaries WHERE chapter = 1").fetchone()[0] == old
+
+
+def test_summary_projection_writer_indexes_written_summary(temp_project):
+    result = SummaryProjectionWriter(temp_project.project_root).apply(
+        {"meta": {"status": "accepted", "chapter": 4}, "extraction_result": {"summary_text": "萧炎隐忍不发。"}}
+    )
+    assert result["applied"] is True and result["indexed"] is True
+    assert _indexed_chapters(temp_project) == [4]
+    assert SummaryStore(temp_project).get(4).excerpt == "萧炎隐忍不发。"
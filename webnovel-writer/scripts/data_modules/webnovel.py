@@ -75,6 +75,7 @@ def _strip_project_root_args(argv: list[str]) -> list[str]:
 PASSTHROUGH_TOOLS = {
     "index",
     "state",
+    "state-daemon",
     "rag",
     "style",
     "entity",
@@ -505,6 +506,9 @@ def main() -> None:
     p_state = sub.add_parser("state", help="转发到 state_manager")
     p_state.add_argument("args", nargs=argparse.REMAINDER)
 
+    p_state_daemon = sub.add_parser("state-daemon", help="转发到 state_daemon（可选的写合并守护进程）")
+    p_state_daemon.add_argument("args", nargs=argparse.REMAINDER)
+
     p_rag = sub.add_parser("rag", help="转发到 rag_adapter")
     p_rag.add_argument("args", nargs=argparse.REMAINDER)
 
@@ -625,6 +629,8 @@ def main() -> None:
         raise SystemExit(_run_data_module("index_manager", [*forward_args, *rest]))
     if tool == "state":
         raise SystemExit(_run_data_module("state_manager", [*forward_args, *rest]))
+    if tool == "state-daemon":
+        raise SystemExit(_run_data_module("state_daemon", [*forward_args, *rest]))
     if tool == "rag":
         raise SystemExit(_run_data_module("rag_adapter", [*forward_args, *rest]))
     if tool == "style":
@@ -143,7 +143,9 @@ def run_postcommit_gate(project_root: Path, chapter: int) -> dict:
                 repair="补跑 index projection 或重新执行 chapter-commit。",
             )
         )
-    if isinstance(projection_status, dict) and projection_status.get("memory") == "done" and not cfg.scratchpad_file.is_file():
+    if isinstance(projection_status, dict) and projection_status.get("memory") == "done" and not (
+        cfg.scratchpad_file.is_file() or cfg.scratchpad_db.is_file()
+    ):
         warnings.append(
             issue(
                 "memory_projection_missing",
@@ -8,6 +8,9 @@ Features:
 - previous chapter summaries (prefers .webnovel/summaries)
 - compact state summary
 - ContextManager contract sections (reader_signal / genre_profile / writing_guidance)
+
+All loads of one invocation go through a ContextSession, so config, IndexManager,
+RAGAdapter, state, outline and summaries are each loaded once.
 """
 
 from __future__ import annotations
@@ -17,8 +20,10 @@ import asyncio
 import json
 import re
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from chapter_outline_loader import load_chapter_outline, load_chapter_plot_structure
 
@@ -63,27 +68,112 @@ def find_project_root(start_path: Path | None = None) -> Path:
     return resolve_project_root(str(start_path))
 
 
-def extract_chapter_outline(project_root: Path, chapter_num: int) -> str:
+class ContextSession:
+    """Per-invocation shared resources: one config / IndexManager / RAGAdapter and a memo of loaded artefacts."""
+
+    def __init__(self, project_root: Path):
+        _ensure_scripts_path()
+        self.project_root = Path(project_root)
+        self.started = time.perf_counter()
+        self.stages_ms: Dict[str, float] = {}
+        self._memo: Dict[Any, Any] = {}
+
+    def memo(self, key: Any, loader: Callable[[], Any]) -> Any:
+        if key not in self._memo:
+            self._memo[key] = loader()
+        return self._memo[key]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+
+    def timing(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages_ms": dict(self.stages_ms),
+        }
+
+    @property
+    def config(self):
+        from data_modules.config import DataModulesConfig
+
+        return self.memo("config", lambda: DataModulesConfig.from_project_root(self.project_root))
+
+    @property
+    def index_manager(self):
+        from data_modules.index_manager import IndexManager
+
+        return self.memo("index_manager", lambda: IndexManager(self.config))
+
+    @property
+    def rag_adapter(self):
+        from data_modules.rag_adapter import RAGAdapter
+
+        return self.memo("rag_adapter", lambda: RAGAdapter(self.config, index_manager=self.index_manager))
+
+    @property
+    def context_manager(self):
+        from data_modules.context_manager import ContextManager
+
+        return self.memo("context_manager", lambda: ContextManager(self.config, index_manager=self.index_manager))
+
+    @property
+    def summary_store(self):
+        from data_modules.summary_store import SummaryStore
+
+        return self.memo("summary_store", lambda: SummaryStore(self.config))
+
+    def outline(self, chapter_num: int) -> str:
+        return self.memo(
+            ("outline", chapter_num),
+            lambda: load_chapter_outline(self.project_root, chapter_num, max_chars=1500),
+        )
+
+    def state(self) -> Dict[str, Any]:
+        """Full state as ContextManager loads it ({} when state.json is missing)."""
+        from data_modules.state_store import load_state
+
+        def _load() -> Dict[str, Any]:
+            state_file = self.config.state_file
+            return load_state(state_file, strict=True) if state_file.exists() else {}
+
+        return self.memo("state", _load)
+
+    def summaries(self, chapter_num: int, window: int) -> Dict[int, Any]:
+        """Summaries of the `window` chapters before chapter_num, fetched in one batch and memoized per chapter."""
+        wanted = [ch for ch in range(max(1, chapter_num - window), chapter_num) if ("summary", ch) not in self._memo]
+        if wanted:
+            found = self.summary_store.get_many(wanted)
+            for ch in wanted:
+                self._memo[("summary", ch)] = found.get(ch)
+        return {
+            ch: self._memo[("summary", ch)]
+            for ch in range(max(1, chapter_num - window), chapter_num)
+            if self._memo[("summary", ch)] is not None
+        }
+
+
+def extract_chapter_outline(project_root: Path, chapter_num: int, session: Optional[ContextSession] = None) -> str:
     """Extract chapter outline segment from volume outline file."""
+    if session is not None:
+        return session.outline(chapter_num)
     return load_chapter_outline(project_root, chapter_num, max_chars=1500)
 
 
-def _load_summary_file(project_root: Path, chapter_num: int) -> str:
-    """Load summary section from `.webnovel/summaries/chNNNN.md`."""
-    summary_path = project_root / ".webnovel" / "summaries" / f"ch{chapter_num:04d}.md"
-    if not summary_path.exists():
-        return ""
-
-    text = summary_path.read_text(encoding="utf-8")
-    summary_match = re.search(r"##\s*剧情摘要\s*\r?\n(.+?)(?=\r?\n##|$)", text, re.DOTALL)
-    if summary_match:
-        return summary_match.group(1).strip()
-    return ""
+def _load_summary_file(project_root: Path, chapter_num: int, session: Optional[ContextSession] = None) -> str:
+    """Load summary section from `.webnovel/summaries/chNNNN.md` (via the summary index)."""
+    session = session or ContextSession(project_root)
+    summary = session.summaries(chapter_num + 1, 1).get(chapter_num)
+    return summary.excerpt if summary else ""
 
 
-def extract_chapter_summary(project_root: Path, chapter_num: int) -> str:
+def extract_chapter_summary(project_root: Path, chapter_num: int, session: Optional[ContextSession] = None) -> str:
     """Extract chapter summary, fallback to chapter body head."""
-    summary = _load_summary_file(project_root, chapter_num)
+    summary = _load_summary_file(project_root, chapter_num, session=session)
     if summary:
         return summary
 
@@ -107,13 +197,18 @@ def extract_chapter_summary(project_root: Path, chapter_num: int) -> str:
     return f"[自动截取前500字]\n{text}..."
 
 
-def extract_state_summary(project_root: Path) -> str:
+def extract_state_summary(project_root: Path, session: Optional[ContextSession] = None) -> str:
     """Extract key fields from `.webnovel/state.json`."""
     state_file = project_root / ".webnovel" / "state.json"
     if not state_file.exists():
         return "⚠️ state.json 不存在"
 
-    state = json.loads(state_file.read_text(encoding="utf-8"))
+    if session is not None:
+        state = session.state()
+    else:
+        from data_modules.state_store import read_state_sections
+
+        state = read_state_sections(state_file, ("progress", "protagonist_state", "strand_tracker", "plot_threads"))
     summary_parts: List[str] = []
 
     if "progress" in state:
@@ -196,13 +291,11 @@ def _search_with_rag(
     chapter_num: int,
     query: str,
     top_k: int,
+    session: Optional[ContextSession] = None,
 ) -> Dict[str, Any]:
-    _ensure_scripts_path()
-    from data_modules.config import DataModulesConfig
-    from data_modules.rag_adapter import RAGAdapter
-
-    config = DataModulesConfig.from_project_root(project_root)
-    adapter = RAGAdapter(config)
+    session = session or ContextSession(project_root)
+    config = session.config
+    adapter = session.rag_adapter
     intent_payload = adapter.query_router.route_intent(query)
     center_entities = list(intent_payload.get("entities") or [])
 
@@ -257,11 +350,14 @@ def _search_with_rag(
     }
 
 
-def _load_rag_assist(project_root: Path, chapter_num: int, outline: str) -> Dict[str, Any]:
-    _ensure_scripts_path()
-    from data_modules.config import DataModulesConfig
-
-    config = DataModulesConfig.from_project_root(project_root)
+def _load_rag_assist(
+    project_root: Path,
+    chapter_num: int,
+    outline: str,
+    session: Optional[ContextSession] = None,
+) -> Dict[str, Any]:
+    session = session or ContextSession(project_root)
+    config = session.config
     enabled = bool(getattr(config, "context_rag_assist_enabled", True))
     top_k = max(1, int(getattr(config, "context_rag_assist_top_k", 4)))
     min_chars = max(20, int(getattr(config, "context_rag_assist_min_outline_chars", 40)))
@@ -283,7 +379,13 @@ def _load_rag_assist(project_root: Path, chapter_num: int, outline: str) -> Dict
         return base_payload
 
     try:
-        rag_payload = _search_with_rag(project_root=project_root, chapter_num=chapter_num, query=query, top_k=top_k)
+        rag_payload = _search_with_rag(
+            project_root=project_root,
+            chapter_num=chapter_num,
+            query=query,
+            top_k=top_k,
+            session=session,
+        )
         rag_payload["enabled"] = True
         return rag_payload
     except Exception as exc:
@@ -291,15 +393,24 @@ def _load_rag_assist(project_root: Path, chapter_num: int, outline: str) -> Dict
         return base_payload
 
 
-def _load_contract_context(project_root: Path, chapter_num: int) -> Dict[str, Any]:
+def _load_contract_context(
+    project_root: Path,
+    chapter_num: int,
+    session: Optional[ContextSession] = None,
+) -> Dict[str, Any]:
     """Build context via ContextManager and return selected sections."""
-    _ensure_scripts_path()
-    from data_modules.config import DataModulesConfig
-    from data_modules.context_manager import ContextManager
-
-    config = DataModulesConfig.from_project_root(project_root)
-    manager = ContextManager(config)
-    payload = manager.build_context(chapter=chapter_num, template="plot")
+    session = session or ContextSession(project_root)
+    window = session.config.context_recent_summaries_window
+    # 本次调用里已加载过的 section 直接交给 ContextManager，不再重复读取
+    preloaded = {
+        "state": session.state(),
+        "chapter_outline": session.outline(chapter_num),
+        "recent_summaries": [
+            {"chapter": ch, "summary": summary.text}
+            for ch, summary in sorted(session.summaries(chapter_num, window).items())
+        ],
+    }
+    payload = session.context_manager.build_context(chapter=chapter_num, template="plot", preloaded=preloaded)
 
     return {
         "context_contract_version": (payload.get("meta") or {}).get("context_contract_version"),
@@ -320,17 +431,25 @@ def _load_contract_context(project_root: Path, chapter_num: int) -> Dict[str, An
 
 def build_chapter_context_payload(project_root: Path, chapter_num: int) -> Dict[str, Any]:
     """Assemble full chapter context payload for text/json output."""
-    outline = extract_chapter_outline(project_root, chapter_num)
-
-    prev_summaries = []
-    for prev_ch in range(max(1, chapter_num - 2), chapter_num):
-        summary = extract_chapter_summary(project_root, prev_ch)
-        prev_summaries.append(f"### 第{prev_ch}章摘要\n{summary}")
-
-    state_summary = extract_state_summary(project_root)
-    contract_context = _load_contract_context(project_root, chapter_num)
+    session = ContextSession(project_root)
+    with session.stage("outline"):
+        outline = extract_chapter_outline(project_root, chapter_num, session=session)
+
+    with session.stage("summaries"):
+        # 一次批量取回本脚本与 ContextManager 都要用到的摘要窗口
+        session.summaries(chapter_num, max(2, session.config.context_recent_summaries_window))
+        prev_summaries = []
+        for prev_ch in range(max(1, chapter_num - 2), chapter_num):
+            summary = extract_chapter_summary(project_root, prev_ch, session=session)
+            prev_summaries.append(f"### 第{prev_ch}章摘要\n{summary}")
+
+    with session.stage("state_summary"):
+        state_summary = extract_state_summary(project_root, session=session)
+    with session.stage("contract_context"):
+        contract_context = _load_contract_context(project_root, chapter_num, session=session)
     plot_structure = contract_context.get("plot_structure") or load_chapter_plot_structure(project_root, chapter_num)
-    rag_assist = _load_rag_assist(project_root, chapter_num, outline)
+    with session.stage("rag_assist"):
+        rag_assist = _load_rag_assist(project_root, chapter_num, outline, session=session)
 
     return {
         "chapter": chapter_num,
@@ -351,6 +470,7 @@ def build_chapter_context_payload(project_root: Path, chapter_num: int) -> Dict[
         "scene": contract_context.get("scene", {}),
         "core": contract_context.get("core", {}),
         "rag_assist": rag_assist,
+        "timing": session.timing(),
     }
 
 
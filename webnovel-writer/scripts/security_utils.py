@@ -8,15 +8,17 @@
 修复方案: 集中管理所有安全相关的输入清理函数
 """
 
+import hashlib
 import json
 import os
 import re
 import sys
 import tempfile
+import time
 from pathlib import Path
 
 from runtime_compat import enable_windows_utf8_stdio
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 # 尝试导入 filelock（可选依赖）
 try:
@@ -343,14 +345,73 @@ class AtomicWriteError(Exception):
     pass
 
 
+# 进程内记录最近一次写入：路径 -> (mtime_ns, size, sha256)，供 skip_unchanged 免读比对
+_LAST_WRITE_DIGESTS: Dict[str, Tuple[int, int, str]] = {}
+
+
+def _payload_unchanged(file_path: Path, payload: bytes, digest: str) -> bool:
+    """判断目标文件内容是否已与 payload 一致。
+
+    先比对进程内记录的上次写入指纹（stat 未变即可信），未命中时仅在大小一致的前提下
+    读取原文件做字节比对。
+    """
+    try:
+        st = file_path.stat()
+    except OSError:
+        return False
+    key = str(file_path)
+    cached = _LAST_WRITE_DIGESTS.get(key)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2] == digest
+    if st.st_size != len(payload):
+        return False
+    try:
+        current = file_path.read_bytes()
+    except OSError:
+        return False
+    if current != payload:
+        return False
+    _LAST_WRITE_DIGESTS[key] = (st.st_mtime_ns, st.st_size, digest)
+    return True
+
+
+def _rotate_backup(file_path: Path, backup_path: Path) -> Optional[str]:
+    """把当前文件轮换为 .bak，返回使用的方式（"link"/"copy"），失败返回 None。
+
+    随后的 os.replace 会让目标路径指向新 inode，旧 inode 不会再被修改，
+    因此硬链接即可保留旧内容，无需整份复制；不支持硬链接时退回 copy2。
+    """
+    link_tmp = backup_path.with_name(backup_path.name + '.tmp')
+    try:
+        if link_tmp.exists():
+            link_tmp.unlink()
+        os.link(file_path, link_tmp)
+        os.replace(link_tmp, backup_path)
+        return "link"
+    except (OSError, NotImplementedError, AttributeError):
+        try:
+            if link_tmp.exists():
+                link_tmp.unlink()
+        except OSError:
+            pass
+    try:
+        import shutil
+        shutil.copy2(file_path, backup_path)
+        return "copy"
+    except OSError:
+        return None  # 备份失败不阻止写入
+
+
 def atomic_write_json(
     file_path: Union[str, Path],
     data: Dict[str, Any],
     *,
     use_lock: bool = True,
     backup: bool = True,
-    indent: int = 2
-) -> None:
+    indent: int = 2,
+    compact: bool = False,
+    skip_unchanged: bool = False,
+) -> Dict[str, Any]:
     """
     原子化写入 JSON 文件，防止并发冲突和数据损坏 (CWE-362, CWE-367)
 
@@ -359,7 +420,7 @@ def atomic_write_json(
     实现策略:
     1. 写入临时文件（同目录，确保同文件系统）
     2. 可选：使用 filelock 获取排他锁
-    3. 可选：备份原文件
+    3. 可选：备份原文件（优先硬链接轮换，失败时复制）
     4. 原子重命名（os.replace 在 POSIX 上是原子的）
 
     Args:
@@ -368,6 +429,12 @@ def atomic_write_json(
         use_lock: 是否使用文件锁（需要 filelock 库）
         backup: 是否在写入前备份原文件
         indent: JSON 缩进（默认 2）
+        compact: 紧凑编码（无缩进、无多余空格），适用于仅供程序读取的文件
+        skip_unchanged: 序列化结果与现有文件内容一致时跳过写入（含备份）
+
+    Returns:
+        写入统计 ``{"written", "bytes", "elapsed_ms", "backup"}``；
+        跳过时 ``written`` 为 False、``bytes`` 为 0。
 
     Raises:
         AtomicWriteError: 写入失败时抛出
@@ -381,15 +448,32 @@ def atomic_write_json(
         - ✅ 支持回滚（备份机制）
         - ✅ 跨平台兼容
     """
+    started = time.perf_counter()
     file_path = Path(file_path)
     parent_dir = file_path.parent
     parent_dir.mkdir(parents=True, exist_ok=True)
 
     # 准备 JSON 内容
     try:
-        json_content = json.dumps(data, ensure_ascii=False, indent=indent)
+        if compact:
+            json_content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json_content = json.dumps(data, ensure_ascii=False, indent=indent)
     except (TypeError, ValueError) as e:
         raise AtomicWriteError(f"JSON 序列化失败: {e}")
+    payload = json_content.encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()
+
+    def _stats(written: bool, backup_mode: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "written": written,
+            "bytes": len(payload) if written else 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "backup": backup_mode,
+        }
+
+    if skip_unchanged and _payload_unchanged(file_path, payload, digest):
+        return _stats(False)
 
     # 锁文件路径
     lock_path = file_path.with_suffix(file_path.suffix + '.lock')
@@ -402,10 +486,11 @@ def atomic_write_json(
         dir=parent_dir
     )
 
+    backup_mode: Optional[str] = None
     try:
-        # Step 1: 写入临时文件
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            f.write(json_content)
+        # Step 1: 写入临时文件（按字节写入，磁盘内容与 payload 完全一致）
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
             f.flush()
             os.fsync(f.fileno())  # 确保写入磁盘
 
@@ -418,11 +503,7 @@ def atomic_write_json(
         try:
             # Step 3: 备份原文件（如果存在且启用备份）
             if backup and file_path.exists():
-                try:
-                    import shutil
-                    shutil.copy2(file_path, backup_path)
-                except OSError:
-                    pass  # 备份失败不阻止写入
+                backup_mode = _rotate_backup(file_path, backup_path)
 
             # Step 4: 原子重命名
             try:
@@ -432,11 +513,26 @@ def atomic_write_json(
                 if os.environ.get("WEBNOVEL_TEST_RELAX_ATOMIC_REPLACE") != "1":
                     raise
                 # 测试沙箱可能允许写入但拒绝替换/删除既有文件；生产环境不启用该降级。
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(json_content)
+                # 原地覆盖会修改共享 inode，硬链接备份需先换成独立副本。
+                if backup_mode == "link":
+                    try:
+                        import shutil
+                        backup_path.unlink()
+                        shutil.copy2(file_path, backup_path)
+                        backup_mode = "copy"
+                    except OSError:
+                        backup_mode = None
+                with open(file_path, "wb") as f:
+                    f.write(payload)
                     f.flush()
                     os.fsync(f.fileno())
 
+            try:
+                st = file_path.stat()
+                _LAST_WRITE_DIGESTS[str(file_path)] = (st.st_mtime_ns, st.st_size, digest)
+            except OSError:
+                _LAST_WRITE_DIGESTS.pop(str(file_path), None)
+
         finally:
             if lock is not None:
                 lock.release()
@@ -452,6 +548,8 @@ def atomic_write_json(
             except OSError:
                 pass
 
+    return _stats(True, backup_mode)
+
 
 def read_json_safe(
     file_path: Union[str, Path],
@@ -578,6 +676,14 @@ def _run_self_tests():
         restored = json.load(f)
     assert restored == test_data, "恢复数据不匹配"
 
+    # 内容未变跳过 + 紧凑编码
+    stats = atomic_write_json(test_file, test_data, use_lock=False, backup=False, compact=True)
+    assert stats["written"] and stats["bytes"] == test_file.stat().st_size, "写入统计不正确"
+    stats = atomic_write_json(
+        test_file, test_data, use_lock=False, backup=True, compact=True, skip_unchanged=True
+    )
+    assert not stats["written"], "内容未变时应跳过写入"
+
     # 清理
     import shutil
     shutil.rmtree(test_dir)
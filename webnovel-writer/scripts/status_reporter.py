@@ -94,6 +94,7 @@ from runtime_compat import enable_windows_utf8_stdio
 try:
     from data_modules.config import get_config, DataModulesConfig
     from data_modules.index_manager import IndexManager
+    from data_modules.state_store import load_state
     from data_modules.state_validator import (
         get_chapter_meta_entry,
         is_resolved_foreshadowing_status,
@@ -105,6 +106,7 @@ try:
 except ImportError:
     from scripts.data_modules.config import get_config, DataModulesConfig
     from scripts.data_modules.index_manager import IndexManager
+    from scripts.data_modules.state_store import load_state
     from scripts.data_modules.state_validator import (
         get_chapter_meta_entry,
         is_resolved_foreshadowing_status,
@@ -157,8 +159,7 @@ class StatusReporter:
             print(f"❌ 状态文件不存在: {self.state_file}")
             return False
 
-        with open(self.state_file, 'r', encoding='utf-8') as f:
-            self.state = json.load(f)
+        self.state = load_state(self.state_file, strict=True)
 
         if isinstance(self.state, dict):
             self.state = normalize_state_runtime_sections(self.state)
@@ -395,12 +396,12 @@ class StatusReporter:
                     if isinstance(stored, str):
                         stored = json.loads(stored)
                     if isinstance(stored, list):
-                        for entity_id in stored:
-                            entity_id = str(entity_id).strip()
-                            if not entity_id:
-                                continue
-                            # 尝试获取 canonical_name
-                            entity = self._index_manager.get_entity(entity_id)
+                        entity_ids = [str(entity_id).strip() for entity_id in stored]
+                        entity_ids = [entity_id for entity_id in entity_ids if entity_id]
+                        # 一次批量查询 canonical_name；ID 未命中的再走 get_entity 的别名兜底
+                        found = self._index_manager.get_entities(entity_ids, columns=["canonical_name"])
+                        for entity_id in entity_ids:
+                            entity = found.get(entity_id) or self._index_manager.get_entity(entity_id)
                             name = entity.get("canonical_name", entity_id) if entity else entity_id
                             characters.append(name)
             except Exception:
@@ -64,3 +64,99 @@ def test_dashboard_file_read_rejects_large_files(monkeypatch, tmp_path):
     response = client.get("/api/files/read", params={"path": "正文/huge.md"})
 
     assert response.status_code == 413
+
+
+def test_dashboard_file_read_pages_large_files_by_line_window(monkeypatch, tmp_path):
+    (tmp_path / ".webnovel").mkdir(parents=True)
+    (tmp_path / ".webnovel" / "state.json").write_text("{}", encoding="utf-8")
+    outline_dir = tmp_path / "大纲"
+    outline_dir.mkdir()
+    line = "第{:05d}行" + "字" * 200 + "\n"
+    big_file = outline_dir / "合并大纲.md"
+    big_file.write_text("".join(line.format(i) for i in range(4000)), encoding="utf-8")
+    assert big_file.stat().st_size > 2 * 1024 * 1024
+    client = _create_dashboard_client(monkeypatch, tmp_path)
+
+    response = client.get(
+        "/api/files/read",
+        params={"path": "大纲/合并大纲.md", "offset_line": 3998, "limit_lines": 5},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["total_lines"] == 4000
+    assert payload["has_more"] is False
+    assert payload["content"].splitlines()[0].startswith("第03998行")
+    assert len(payload["content"].splitlines()) == 2
+
+
+def test_dashboard_file_raw_supports_range_and_gzip(monkeypatch, tmp_path):
+    import gzip
+
+    (tmp_path / ".webnovel").mkdir(parents=True)
+    (tmp_path / ".webnovel" / "state.json").write_text("{}", encoding="utf-8")
+    prose_dir = tmp_path / "正文"
+    prose_dir.mkdir()
+    data = ("正文内容" * 1000).encode("utf-8")
+    (prose_dir / "第0001章.md").write_bytes(data)
+    client = _create_dashboard_client(monkeypatch, tmp_path)
+
+    ranged = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"Range": "bytes=12-23", "Accept-Encoding": "identity"},
+    )
+    assert ranged.status_code == 206
+    assert ranged.headers["content-range"] == f"bytes 12-23/{len(data)}"
+    assert ranged.content == data[12:24]
+
+    unsatisfiable = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"Range": f"bytes={len(data)}-"},
+    )
+    assert unsatisfiable.status_code == 416
+
+    compressed = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"].startswith("text/markdown")
+    # httpx 会自动解压；再校验一次原始字节与内容一致
+    assert compressed.content == data or gzip.decompress(compressed.content) == data
+
+    not_modified = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"If-None-Match": compressed.headers["etag"]},
+    )
+    assert not_modified.status_code == 304
+
+    # gzip 与原始字节是不同表示：ETag 不同，互相不能用于 304 / If-Range
+    identity_etag = ranged.headers["etag"]
+    assert compressed.headers["etag"] != identity_etag
+    plain = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"If-None-Match": compressed.headers["etag"], "Accept-Encoding": "identity"},
+    )
+    assert plain.status_code == 200 and plain.content == data
+    assert plain.headers["etag"] == identity_etag
+    stale_range = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"Range": "bytes=12-23", "If-Range": compressed.headers["etag"], "Accept-Encoding": "identity"},
+    )
+    assert stale_range.status_code == 200 and stale_range.content == data
+    fresh_range = client.get(
+        "/api/files/raw",
+        params={"path": "正文/第0001章.md"},
+        headers={"Range": "bytes=12-23", "If-Range": identity_etag},
+    )
+    assert fresh_range.status_code == 206 and fresh_range.content == data[12:24]
+
+    forbidden = client.get("/api/files/raw", params={"path": ".webnovel/state.json"})
+    assert forbidden.status_code == 403
@@ -48,17 +48,23 @@ import os
 import sys
 import argparse
 import shutil
+from copy import deepcopy
 from pathlib import Path
 
 from runtime_compat import enable_windows_utf8_stdio
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+import filelock
+
 # ============================================================================
 # 安全修复：导入安全工具函数（P1 MEDIUM）
 # ============================================================================
-from security_utils import create_secure_directory, atomic_write_json, restore_from_backup
+from security_utils import create_secure_directory, restore_from_backup
 from project_locator import resolve_state_file
+from data_modules.config import DataModulesConfig
+from data_modules.state_daemon import submit_to_daemon
+from data_modules.state_store import JOURNAL_APPLIED_KEY, SEGMENTS_MARKER, SegmentedStateStore
 from data_modules.state_validator import (
     normalize_foreshadowing_status,
     normalize_state_runtime_sections,
@@ -76,6 +82,7 @@ class StateUpdater:
         self.dry_run = dry_run
         self.backup_file = None
         self.state = None
+        self._loaded_state = None
 
     def _validate_schema(self, state: Dict) -> bool:
         """验证 state.json 的基本结构（v5.0 引入，v5.4 沿用）"""
@@ -143,8 +150,9 @@ class StateUpdater:
             return False
 
         try:
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                self.state = json.load(f)
+            self.state = SegmentedStateStore(Path(self.state_file)).load(strict=True)
+            # 校验阶段的自动补全也算作变更，故在校验前留底
+            self._loaded_state = deepcopy(self.state)
 
             if not self._validate_schema(self.state):
                 print("❌ state.json 结构不完整，请检查")
@@ -185,9 +193,25 @@ class StateUpdater:
             print(json.dumps(self.state, ensure_ascii=False, indent=2))
             return True
 
+        ops = self._delta_ops()
+        config = DataModulesConfig(project_root=Path(self.state_file).resolve().parent.parent)
+        if ops and config.state_daemon_enabled:
+            try:
+                response = submit_to_daemon(config, {"state_ops": ops})
+            except RuntimeError as e:
+                print(f"❌ 保存失败: {e}")
+                return False
+            if response is not None:
+                print(
+                    f"✅ 已由状态守护进程落盘: {self.state_file}"
+                    f"（批次 {response.get('batch')}，合并 {response.get('batch_size')} 个请求）"
+                )
+                return True
+
         try:
-            # 使用集中式原子写入（带 filelock + 自动备份）
-            atomic_write_json(self.state_file, self.state, use_lock=True, backup=True)
+            # 使用集中式原子写入（带 filelock + 自动备份；分段布局同步写回各分段）
+            with filelock.FileLock(f"{self.state_file}.lock", timeout=10):
+                SegmentedStateStore(Path(self.state_file)).save(self.state, backup=True)
             print(f"✅ 已保存（原子化）: {self.state_file}")
             return True
 
@@ -198,6 +222,20 @@ class StateUpdater:
                 print(f"✅ 已从备份恢复")
             return False
 
+    def _delta_ops(self) -> list:
+        """与加载时相比发生变化的顶层字段，转换为 set/remove 增量（提交给状态守护进程）"""
+        before = self._loaded_state or {}
+        after = self.state or {}
+        ops = []
+        for key in list(before) + [k for k in after if k not in before]:
+            if key in (SEGMENTS_MARKER, JOURNAL_APPLIED_KEY):
+                continue
+            if key not in after:
+                ops.append({"op": "remove", "path": key})
+            elif before.get(key) != after[key]:
+                ops.append({"op": "set", "path": key, "value": after[key]})
+        return ops
+
     def update_protagonist_power(self, realm: str, layer: int, bottleneck: str):
         """更新主角实力（支持嵌套和平铺两种格式）"""
         ps = self.state["protagonist_state"]